@@ -5,6 +5,7 @@ import pickle
 from typing import Dict, List
 from simulator.initial_layout.layout_synthesizer import LayoutMethod, LayoutSynthesizer
 from simulator.event_simulator.cluster_simulator import ClusterSimulator, ModelName, SchedulingMethod, RequestPhase
+from simulator.event_simulator.fair_share_network import NetworkModel
 from simulator.trace_generator.simulator_query_feeder import OnlineRequestFeeder, OfflineRequestFeeder
 from simulator.scheduler.global_maxflow.global_maxflow_scheduler import KVParameters, SchedulingMode
 
@@ -35,6 +36,7 @@ def simulate_maxflow_online(
         simulator_cluster_file_name: str,
         avg_throughput: float,
         machine_num_dict: Dict[str, int],
+        network_model: NetworkModel = NetworkModel.Reserved,
 ) -> float:
     # load cluster
     layout_synthesizer = LayoutSynthesizer(
@@ -52,7 +54,8 @@ def simulate_maxflow_online(
     cluster_file_path = layout_synthesizer.synthesize(args=layout_args)
 
     # initialize the simulator
-    simulator = ClusterSimulator(model_name=model_name, machine_num_dict=machine_num_dict)
+    simulator = ClusterSimulator(model_name=model_name, machine_num_dict=machine_num_dict,
+                                 network_model=network_model)
     simulator.from_ini_file(config_file_name=cluster_file_path)
     scheduler_args = {
         # offline
@@ -122,6 +125,7 @@ def simulate_maxflow_offline(
         complete_cluster_file_name: str,
         simulator_cluster_file_name: str,
         machine_num_dict: Dict[str, int],
+        network_model: NetworkModel = NetworkModel.Reserved,
 ):
     # load cluster
     layout_synthesizer = LayoutSynthesizer(
@@ -139,7 +143,8 @@ def simulate_maxflow_offline(
     cluster_file_path = layout_synthesizer.synthesize(args=layout_args)
 
     # initialize the simulator
-    simulator = ClusterSimulator(model_name=model_name, machine_num_dict=machine_num_dict)
+    simulator = ClusterSimulator(model_name=model_name, machine_num_dict=machine_num_dict,
+                                 network_model=network_model)
     simulator.from_ini_file(config_file_name=cluster_file_path)
     scheduler_args = {
         # offline
@@ -201,6 +206,7 @@ def simulate_heuristic_online(
         avg_throughput: float,
         machine_num_dict: Dict[str, int],
         force_set: bool = False,
+        network_model: NetworkModel = NetworkModel.Reserved,
 ) -> float:
     # load cluster
     layout_synthesizer = LayoutSynthesizer(
@@ -218,7 +224,8 @@ def simulate_heuristic_online(
     cluster_file_path = layout_synthesizer.synthesize(args=layout_args)
 
     # initialize the simulator
-    simulator = ClusterSimulator(model_name=model_name, machine_num_dict=machine_num_dict)
+    simulator = ClusterSimulator(model_name=model_name, machine_num_dict=machine_num_dict,
+                                 network_model=network_model)
     simulator.model_manager.allow_force_set = force_set  # for baseline: separate pipelines
     simulator.from_ini_file(config_file_name=cluster_file_path)
     simulator.init_scheduler(scheduling_method=scheduling_method, args=None)
@@ -287,6 +294,7 @@ def simulate_heuristic_offline(
         scheduling_method: SchedulingMethod,
         machine_num_dict: Dict[str, int],
         force_set: bool = False,
+        network_model: NetworkModel = NetworkModel.Reserved,
 ) -> float:
     # load cluster
     layout_synthesizer = LayoutSynthesizer(
@@ -304,7 +312,8 @@ def simulate_heuristic_offline(
     cluster_file_path = layout_synthesizer.synthesize(args=layout_args)
 
     # initialize the simulator
-    simulator = ClusterSimulator(model_name=model_name, machine_num_dict=machine_num_dict)
+    simulator = ClusterSimulator(model_name=model_name, machine_num_dict=machine_num_dict,
+                                 network_model=network_model)
     simulator.model_manager.allow_force_set = force_set  # for baseline: separate pipelines
     simulator.from_ini_file(config_file_name=cluster_file_path)
     simulator.init_scheduler(scheduling_method=scheduling_method, args=None)
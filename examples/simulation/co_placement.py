@@ -0,0 +1,35 @@
+# 2026.10.19 Yixuan Mei
+import os
+from simulator.initial_layout.co_placement_layout import CoPlacementLayout
+from simulator.model_manager.model_manager import ModelManager, ModelName
+
+
+def co_placement():
+    # serve two LLaMa30B deployments on the same cluster, where the first one only needs 200 tokens/s
+    # Note: LLaMa70B and LLaMa30B together need more vram than single24 has (see cluster42 for a larger cluster)
+    machine_num_dict = {"A100": 4, "L4": 8, "T4": 12}
+    model_managers = [ModelManager(model_name=ModelName.LLaMa30B, machine_num_dict=machine_num_dict),
+                      ModelManager(model_name=ModelName.LLaMa30B, machine_num_dict=machine_num_dict)]
+    layout = CoPlacementLayout(model_managers=model_managers, weights=[1, 1], demands=[200, 2000])
+    layout.from_ini(cluster_file_name="./config/single24.ini", machine_profile_name="./config/machine_profile.ini")
+    layout.search_layout(allow_partial_inference=False, seed=0, max_run_time=60, patience=20000)
+
+    # save the layouts and compare with the static partition in the simulator
+    workspace_path = "./layouts/co_placement"
+    layout.save_layouts(workspace_path=workspace_path, allow_partial_inference=False)
+    layout.save_search_statistics(save_path=os.path.join(workspace_path, "co_placement_statistics.ini"))
+    results = layout.simulate_co_placement(workspace_path=os.path.join(workspace_path, "simulation"),
+                                           allow_partial_inference=False, warm_up=60, duration=300)
+    print(f"Max flow: joint {layout.objective:.1f}, static {layout.static_objective:.1f}")
+    print(f"Useful decode throughput: joint {results['joint_objective']:.1f}, static {results['static_objective']:.1f}")
+
+
+def main():
+    """
+    Split one cluster between two models, and compare with a static partition of the machines.
+    """
+    co_placement()
+
+
+if __name__ == '__main__':
+    main()
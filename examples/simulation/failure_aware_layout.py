@@ -0,0 +1,64 @@
+# 2026.10.19 Yixuan Mei
+import os
+from simulator.initial_layout.layout_synthesizer import LayoutMethod, LayoutSynthesizer, ModelName
+from simulator.initial_layout.failure_aware_layout import FailureAwareLayout
+from simulator.model_manager.model_manager import ModelManager
+
+
+def swarm_layout():
+    # in the swarm layout of LLaMa30B, some stages are held by a single node, whose failure cuts all pipelines
+    layout_synthesizer = LayoutSynthesizer(
+        complete_cluster_file_name="./config/single24.ini",
+        machine_profile_name="./config/machine_profile.ini",
+        model_name=ModelName.LLaMa30B,
+        workspace_path="./layouts/failure_aware/swarm",
+        layout_method=LayoutMethod.Swarm,
+        machine_num_dict={"A100": 4, "L4": 8, "T4": 12}
+    )
+    swarm_args = {
+        "seed": 0,
+        "num_stages": 10,
+        "max_out_links_per_node": 24,
+    }
+    layout_synthesizer.synthesize(args=swarm_args)
+
+
+def failure_aware_layout():
+    # LLaMa30B fits twice into the 24 nodes, so a layout can survive any single node failure
+    # Note: for LLaMa70B, the total layer capacity of single24 is less than 2 x 80 layers, and the worst case
+    #       is always 0
+    model_manager = ModelManager(model_name=ModelName.LLaMa30B, machine_num_dict={"A100": 4, "L4": 8, "T4": 12})
+    layout = FailureAwareLayout(model_manager=model_manager)
+    layout.from_ini(cluster_file_name="./config/single24.ini", machine_profile_name="./config/machine_profile.ini")
+    layout.search_layout(heuristic_sol_path="./layouts/failure_aware/swarm/swarm_sol.ini",
+                         allow_partial_inference=False, seed=0, num_restarts=1, num_workers=1, max_run_time=60,
+                         patience=3000, num_perturb_moves=0, num_failures=1)
+    assert layout.initial_worst_case_flow <= 1e-9 < layout.worst_case_flow, \
+        "Failure aware layout should survive the failures that cut the swarm layout!"
+
+    # save the layout
+    workspace_path = "./layouts/failure_aware"
+    layout.generate_simulator_cluster(cluster_file_path=os.path.join(workspace_path, "simulator_cluster.ini"),
+                                      allow_partial_inference=False)
+    layout.save_layout_solution(save_path=os.path.join(workspace_path, "failure_aware_sol.ini"))
+    layout.save_search_statistics(save_path=os.path.join(workspace_path, "failure_aware_statistics.ini"))
+
+    # throughput retained in the simulator under the worst-case failure
+    results = layout.simulate_node_failures(cluster_file_name="./config/single24.ini",
+                                            machine_profile_name="./config/machine_profile.ini",
+                                            workspace_path=workspace_path, allow_partial_inference=False,
+                                            failed_node_sets=[layout.worst_case_failure], warm_up=60, duration=120)
+    print(f"Worst-case failure {layout.worst_case_failure}: retained flow {results[1]['retained_flow']:.2f}, "
+          f"retained throughput {results[1]['retained_throughput']}")
+
+
+def main():
+    """
+    Search a layout that keeps serving when any single compute node fails.
+    """
+    swarm_layout()
+    failure_aware_layout()
+
+
+if __name__ == '__main__':
+    main()
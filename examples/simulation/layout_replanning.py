@@ -0,0 +1,89 @@
+# 2026.10.19 Yixuan Mei
+import os
+from simulator.event_simulator.cluster_simulator import ClusterSimulator, ModelName, SchedulingMethod
+from simulator.initial_layout.layout_synthesizer import LayoutMethod, LayoutSynthesizer
+from simulator.initial_layout.local_search_layout import LocalSearchLayout
+from simulator.initial_layout.layout_replanner import LayoutReplanner
+from simulator.model_manager.model_manager import ModelManager
+from simulator.scheduler.global_maxflow.global_maxflow_scheduler import KVParameters, SchedulingMode
+from simulator.trace_generator.length_sampler import LengthSampler, Dataset
+from simulator.trace_generator.simulator_query_feeder import OfflineRequestFeeder
+
+
+def initial_layout():
+    # search a layout of LLaMa30B with the typical throughput of each node (i.e. for an average workload)
+    machine_num_dict = {"A100": 4, "L4": 8, "T4": 12}
+    layout_synthesizer = LayoutSynthesizer(
+        complete_cluster_file_name="./config/single24.ini",
+        machine_profile_name="./config/machine_profile.ini",
+        model_name=ModelName.LLaMa30B,
+        workspace_path="./layouts/replanning/swarm",
+        layout_method=LayoutMethod.Swarm,
+        machine_num_dict=machine_num_dict
+    )
+    layout_synthesizer.synthesize(args={"seed": 0, "num_stages": 10, "max_out_links_per_node": 24})
+    layout = LocalSearchLayout(model_manager=ModelManager(model_name=ModelName.LLaMa30B,
+                                                          machine_num_dict=machine_num_dict))
+    layout.from_ini(cluster_file_name="./config/single24.ini", machine_profile_name="./config/machine_profile.ini")
+    layout.search_layout(heuristic_sol_path="./layouts/replanning/swarm/swarm_sol.ini", allow_partial_inference=False,
+                         seed=0, num_restarts=1, num_workers=1, max_run_time=20, patience=5000, num_perturb_moves=0)
+
+    # re-planning changes which links are valid, so the simulator cluster includes all links
+    layout.generate_simulator_cluster(cluster_file_path="./layouts/replanning/simulator_cluster.ini",
+                                      allow_partial_inference=False, include_all_links=True)
+    layout.save_layout_solution(save_path="./layouts/replanning/local_search_sol.ini")
+    return layout
+
+
+def layout_replanning(layout: LocalSearchLayout):
+    # initialize the simulator
+    machine_num_dict = {"A100": 4, "L4": 8, "T4": 12}
+    simulator = ClusterSimulator(model_name=ModelName.LLaMa30B, machine_num_dict=machine_num_dict)
+    simulator.from_ini_file(config_file_name="./layouts/replanning/simulator_cluster.ini")
+    scheduler_args = {
+        "kv_param": KVParameters(expected_kv_hwm=0.85, expected_output_length_ratio=1),
+        "scheduling_mode": SchedulingMode.Offline,
+    }
+    simulator.init_scheduler(scheduling_method=SchedulingMethod.MaxFlow, args=scheduler_args)
+    simulator.init_query_manager()
+    simulator.mark_as_ready()
+    finish_model_loading_time = layout.set_initial_layout(simulator=simulator)
+    simulator.update_scheduler()
+
+    # the workload has long prompts and short outputs (Azure Code), which moves the bottleneck of some nodes
+    # Note: each stage of a transition waits until all queries routed through its nodes finish, so workloads
+    #       with long outputs make transitions last minutes (see LayoutReplanner)
+    warm_up, duration = 60, 240
+    feeder = OfflineRequestFeeder(initial_query_count=20, start_time=finish_model_loading_time,
+                                  duration=warm_up + duration, stop_at_duration=True, feed_hwm=0.8, seed=0)
+    feeder.length_sampler = LengthSampler(dataset=Dataset.AzureCode, seed=0)
+    feeder.start(simulator=simulator)
+
+    # re-plan every 60 seconds, a target layout changes at most 4 nodes and is reloaded if it pays back the
+    # reload cost within 120 seconds
+    replanner = LayoutReplanner(layout=layout, simulator=simulator, feeder=feeder, allow_partial_inference=False,
+                                max_stage_size=1, min_gain=0.05, max_break_even_time=120, max_nodes_changed=4)
+    replanner.simulate(until=finish_model_loading_time + warm_up + duration, replan_interval=60)
+    replanner.save_replanning_statistics(save_path="./layouts/replanning/replanning_statistics.ini")
+
+    # throughput gained against the cost of the reloads
+    # Note: with this setup, the plan at t=132 reloads 4 nodes (flow 6170 -> 7337) in 115s (drain 85s, load 30s),
+    #       and decode throughput goes from 99.5 (before) to 98.9 (during) and 139.5 (after the transition)
+    for entry in replanner.replanning_log:
+        if entry["executed"]:
+            print(f"Reload at t={entry['time']:.1f}: transition {entry['transition_time']:.1f}s, decode throughput "
+                  f"{entry['throughput_before']:.2f} before, {entry['transition_throughput']:.2f} during and "
+                  f"{entry['throughput_after']:.2f} after the transition.")
+
+
+def main():
+    """
+    Re-plan the layout of a running cluster when the workload differs from the one it was planned for.
+    """
+    os.makedirs("./layouts/replanning", exist_ok=True)
+    layout = initial_layout()
+    layout_replanning(layout=layout)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ import os
 import time
 
 from simulator.trace_generator.trace_generator import TraceGenerator, ArrivalRateSource, Dataset, LengthSampler
+from simulator.trace_generator.trace_replayer import TraceReplayer
 from llm_sys.utils import get_local_ip, CONFIG_BROADCAST_ADDR, FlyingQuery
 
 
@@ -18,6 +19,8 @@ def run_heuristic_host_online(
         duration: int,
         # result
         result_logging_dir: str,
+        # trace
+        trace_replayer: TraceReplayer or None = None,
 ) -> None:
     """
     Run host with !!![Swarm/Random + Online mode]!!!.
@@ -26,10 +29,15 @@ def run_heuristic_host_online(
     print(f"Initializing host with {scheduler_name} scheduling!")
 
     # ------------------------------------- Online Generator ------------------------------------ #
-    trace_generator = TraceGenerator(arrival_rate_source=ArrivalRateSource.AzureConv,
-                                     length_dataset=Dataset.AzureConversation,
-                                     cluster_token_throughput=avg_throughput, seed=0)
-    trace = trace_generator.generate_trace(start_time=0, duration=duration)
+    # requests are either generated or replayed from a request log (streamed while serving)
+    if trace_replayer is None:
+        trace_generator = TraceGenerator(arrival_rate_source=ArrivalRateSource.AzureConv,
+                                         length_dataset=Dataset.AzureConversation,
+                                         cluster_token_throughput=avg_throughput, seed=0)
+        trace_iterator = iter(trace_generator.generate_trace(start_time=0, duration=duration))
+    else:
+        trace_iterator = trace_replayer.iter_trace(start_time=0, duration=duration)
+    next_arrival = next(trace_iterator, None)
     # ------------------------------------------------------------------------------------------- #
 
     # ------------------------------------- Init System ------------------------------------ #
@@ -55,9 +63,10 @@ def run_heuristic_host_online(
             break
 
         # send new requests into cluster if needed
-        while not len(trace) == 0 and trace[0][0] <= now:
+        while next_arrival is not None and next_arrival[0] <= now:
             # the request has a time stamp smaller than now, should be sent
-            expected_submit_time, input_length, output_length = trace.pop(0)
+            expected_submit_time, input_length, output_length = next_arrival
+            next_arrival = next(trace_iterator, None)
 
             # get query id
             cur_query_id = next_query_id
@@ -10,6 +10,7 @@ from simulator.event_simulator.request import InferenceRequest, RequestPhase, Pi
 from simulator.initial_layout.layout_synthesizer import LayoutSynthesizer, LayoutMethod
 from simulator.scheduler.global_maxflow.global_maxflow_scheduler import SchedulingMode, KVParameters, SchedulerCore
 from simulator.trace_generator.trace_generator import TraceGenerator, LengthSampler, ArrivalRateSource, Dataset
+from simulator.trace_generator.trace_replayer import TraceReplayer
 
 from llm_sys.utils import SIMULATOR_NODE_OFFSET, get_local_ip, CONFIG_BROADCAST_ADDR, FlyingQuery
 
@@ -91,6 +92,8 @@ def run_maxflow_host_online(
         duration: int,
         # result
         result_logging_dir: str,
+        # trace
+        trace_replayer: TraceReplayer or None = None,
 ) -> None:
     """
     Run host with !!![MaxFlow + Online mode]!!!.
@@ -130,10 +133,15 @@ def run_maxflow_host_online(
     # -------------------------------------------------------------------------------------- #
 
     # ------------------------------------- Online Generator ------------------------------------ #
-    trace_generator = TraceGenerator(arrival_rate_source=ArrivalRateSource.AzureConv,
-                                     length_dataset=Dataset.AzureConversation,
-                                     cluster_token_throughput=avg_throughput, seed=0)
-    trace = trace_generator.generate_trace(start_time=0, duration=duration)
+    # requests are either generated or replayed from a request log (streamed while serving)
+    if trace_replayer is None:
+        trace_generator = TraceGenerator(arrival_rate_source=ArrivalRateSource.AzureConv,
+                                         length_dataset=Dataset.AzureConversation,
+                                         cluster_token_throughput=avg_throughput, seed=0)
+        trace_iterator = iter(trace_generator.generate_trace(start_time=0, duration=duration))
+    else:
+        trace_iterator = trace_replayer.iter_trace(start_time=0, duration=duration)
+    next_arrival = next(trace_iterator, None)
     # ------------------------------------------------------------------------------------------- #
 
     # ------------------------------------- Init System ------------------------------------ #
@@ -159,9 +167,10 @@ def run_maxflow_host_online(
             break
 
         # send new requests into cluster if needed
-        while not len(trace) == 0 and trace[0][0] <= now:
+        while next_arrival is not None and next_arrival[0] <= now:
             # the request has a time stamp smaller than now, should be sent
-            expected_submit_time, input_length, output_length = trace.pop(0)
+            expected_submit_time, input_length, output_length = next_arrival
+            next_arrival = next(trace_iterator, None)
 
             # schedule the request
             compute_node_uids, start_layers, end_layers, pipeline = get_schedule(scheduler=maxflow_scheduler,
@@ -18,6 +18,10 @@ import llm_sys.engine.llama
 
 import llm_sys.utils as utils
 
+# if True, log the running time of each batch as "[Profile] phase=... tokens=... layers=... time=...ms"
+# the logs can be fitted into simulator profiles with simulator/model_manager/profiled/profile_fitter.py
+LOG_PROFILE: bool = False
+
 
 def init_engine(layer_ids, model_name, vram_usage=0.8):
     engine_args = EngineArgs(model=model_name, block_size=16,
@@ -35,6 +39,7 @@ def run_and_submit(engine, start_idx, end_idx, is_last_layer, hidden_size, force
     """
     # Step 2.2: run inference layer by layer
     finished_seq_infos, output = [], None
+    batch_start_time = time.time()
     for layer_id in range(start_idx, end_idx):
         output = engine.step(layer_id=layer_id, finished_seq_infos=finished_seq_infos,
                              force_decode=force_decode)
@@ -48,6 +53,11 @@ def run_and_submit(engine, start_idx, end_idx, is_last_layer, hidden_size, force
         # output_tensor: a large tensor
         output_info_list, output_tensor, parsed_prompt = output
         output_tensor = output_tensor.cpu()
+        if LOG_PROFILE and len(output_info_list) > 0:
+            # .cpu() synchronizes with the GPU, so the time here includes all layers
+            num_tokens = sum([output_info[2] - output_info[1] for output_info in output_info_list])
+            print(f"[Profile] phase={'prompt' if parsed_prompt else 'decode'} tokens={num_tokens} "
+                  f"layers={end_idx - start_idx} time={(time.time() - batch_start_time) * 1000:.3f}ms")
 
         # build finished reqeust information
         finished_ids, finished_offsets, finished_lengths = [], [], []
@@ -9,6 +9,7 @@ setup(
         "networkx~=3.2.1",
         "matplotlib~=3.8.2",
         "gurobipy~=11.0.0",
+        "scipy~=1.11",
     ],
     author="Yixuan Mei",
     author_email="yixuanm@andrew.cmu.edu",
@@ -1,24 +1,26 @@
 # 2023.12.16 Yixuan Mei
 
 import copy
-import configparser
 import math
 import os.path
 
 import networkx as nx
 import matplotlib.pyplot as plt
 
-from typing import Dict, List, Tuple, Set, Any, Optional, TYPE_CHECKING
+from typing import Dict, Iterator, List, Tuple, Set, Any, Optional, TYPE_CHECKING
 from queue import PriorityQueue
 
 from simulator.event_simulator.utils import BASE_NODE_UID, BASE_LINK_UID, BASE_EVENT_UID, BASE_REQUEST_UID
 from simulator.event_simulator.utils import kbps, mbps, gbps, Byte, KB, MB, GB, Sec, MilliSec
+from simulator.event_simulator.typed_config import read_ini_file, parse_value
 from simulator.event_simulator.model import ModelLayer, create_model
 from simulator.event_simulator.logger import Logger
 from simulator.event_simulator.kv_cache import KVTracker, KVCache
 from simulator.event_simulator.coordinator_node import SourceNode, SinkNode
 from simulator.event_simulator.compute_node import ComputeNode, InferenceBatch
 from simulator.event_simulator.network_link import NetworkLink, LinkStatus, TransmissionObject, TransmissionType
+from simulator.event_simulator.fair_share_network import NetworkModel, FairShareNetwork
+from simulator.event_simulator.link_codec import LinkCodec
 from simulator.event_simulator.request import InferenceRequest, RequestPhase, RequestLocation, PipelineStage
 from simulator.event_simulator.event import EventDescription, Event, EventHandler
 from simulator.event_simulator.base_node import NodeType
@@ -28,15 +30,19 @@ from simulator.scheduler.base_scheduler import BaseScheduler, TransmissionSchedu
 
 if TYPE_CHECKING:
     from simulator.trace_generator.simulator_query_feeder import OfflineRequestFeeder
+    from simulator.trace_generator.workload_feeder import WorkloadFeeder
 
 
 class ClusterSimulator:
-    def __init__(self, model_name: ModelName, machine_num_dict: Dict[str, int]) -> None:
+    def __init__(self, model_name: ModelName, machine_num_dict: Dict[str, int],
+                 profile_dir: str or None = None, network_model: NetworkModel = NetworkModel.Reserved) -> None:
         """
         Create an empty cluster simulator.
 
         :param model_name: name of the LLM to simulate
         :param machine_num_dict: {machine_name -> num of machine}
+        :param profile_dir: (optional) load model statistics from this profile directory
+        :param network_model: how transmissions use bandwidth (reserved by scheduler or max-min fair sharing)
         :return: None
         """
         # global uid record
@@ -55,6 +61,10 @@ class ClusterSimulator:
         self.sink_node: SinkNode or None = None
         self.compute_nodes: Dict[int, ComputeNode] = {}
         self.links: Dict[int, NetworkLink] = {}
+        self.network_model: NetworkModel = network_model
+        self.fair_share_network: FairShareNetwork or None = None
+        if network_model == NetworkModel.FairShare:
+            self.fair_share_network = FairShareNetwork()
 
         # a mapping from name to nodes and links (only available when loading from a cluster file)
         self.name_2_compute_node: Dict[str, ComputeNode] = {}
@@ -64,7 +74,8 @@ class ClusterSimulator:
         # model_manager: stores the profiling results, etc.
         # model: the real model (full)
         self.model_name: ModelName = model_name
-        self.model_manager: ModelManager = ModelManager(model_name=model_name, machine_num_dict=machine_num_dict)
+        self.model_manager: ModelManager = ModelManager(model_name=model_name, machine_num_dict=machine_num_dict,
+                                                        profile_dir=profile_dir)
         self.model: Dict[int, ModelLayer] = {}
 
         # request tracker
@@ -79,6 +90,10 @@ class ClusterSimulator:
         # scheduler
         self.scheduler: BaseScheduler or None = None
 
+        # compute nodes that are being drained before reloading their model
+        # (the MaxFlow scheduler routes no new query through them after the next scheduler update)
+        self.draining_compute_nodes: Set[int] = set()
+
         # query manager
         self.query_manager: QueryManager or None = None
 
@@ -86,6 +101,14 @@ class ClusterSimulator:
         self.use_offline_mode = False
         self.offline_query_feeder: Optional["OfflineRequestFeeder"] = None
 
+        # workload feeder (feeds queries through CommandFeedQueries events and query finish callbacks)
+        self.workload_feeder: Optional["WorkloadFeeder"] = None
+
+        # query arrivals that are issued lazily as simulated time advances (see set_query_arrivals)
+        self.query_arrivals: Optional[Iterator[Tuple[float, int, int]]] = None
+        self.next_query_arrival: Optional[Tuple[float, int, int]] = None
+        self.num_issued_query_arrivals: int = 0
+
         # logger
         self.last_watch_time: Optional[float] = None
         self.logger: Logger = Logger()
@@ -269,34 +292,33 @@ class ClusterSimulator:
         assert len(self.compute_nodes) == 0 and len(self.links) == 0, "Cluster should be empty!"
 
         # construct the parser
-        config = configparser.ConfigParser()
-        config.read(config_file_name)
+        config: Dict[str, Dict[str, str]] = read_ini_file(file_name=config_file_name)
 
         # parse the coordinator and the model
-        _coordinator_inbound_nic_speed: float = eval(config["Coordinator"]["inbound_nic_speed"])
-        _coordinator_outbound_nic_speed: float = eval(config["Coordinator"]["outbound_nic_speed"])
+        _coordinator_inbound_nic_speed: float = parse_value(config["Coordinator"]["inbound_nic_speed"])
+        _coordinator_outbound_nic_speed: float = parse_value(config["Coordinator"]["outbound_nic_speed"])
         _model_param_sizes: List[float] = self.model_manager.get_model_params()
         _full_model: Dict[int, ModelLayer] = create_model(layer_parameter_sizes=_model_param_sizes)
-        _machine_types: List[str] = eval(config["MachineTypes"]["types"])
+        _machine_types: List[str] = parse_value(config["MachineTypes"]["types"])
         source_node, sink_node = self.initialize(coordinator_inbound_nic_speed=_coordinator_inbound_nic_speed,
                                                  coordinator_outbound_nic_speed=_coordinator_outbound_nic_speed,
                                                  full_model=_full_model,
                                                  machine_types=_machine_types)
 
         # parse compute nodes
-        compute_node_names: List[str] = eval(config["ComputeNodes"]["names"])
+        compute_node_names: List[str] = parse_value(config["ComputeNodes"]["names"])
         compute_nodes: Dict[str, ComputeNode] = {}
         for compute_node_name in compute_node_names:
             assert compute_node_name not in compute_nodes, "Found duplicate compute node definitions!"
 
             # parameters
-            _vram_size: float = eval(config[compute_node_name]["vram_size"])
-            _inbound_nic_speed: float = eval(config[compute_node_name]["inbound_nic_speed"])
-            _outbound_nic_speed: float = eval(config[compute_node_name]["outbound_nic_speed"])
-            _disk_speed: float = eval(config[compute_node_name]["disk_speed"])
-            _machine_type: str = eval(config[compute_node_name]["machine_type"])
-            _kv_cache_capacity: int = eval(config[compute_node_name]["kv_cache_capacity"])
-            _activation_backup_capacity: int = eval(config[compute_node_name]["activation_backup_capacity"])
+            _vram_size: float = parse_value(config[compute_node_name]["vram_size"])
+            _inbound_nic_speed: float = parse_value(config[compute_node_name]["inbound_nic_speed"])
+            _outbound_nic_speed: float = parse_value(config[compute_node_name]["outbound_nic_speed"])
+            _disk_speed: float = parse_value(config[compute_node_name]["disk_speed"])
+            _machine_type: str = parse_value(config[compute_node_name]["machine_type"])
+            _kv_cache_capacity: int = parse_value(config[compute_node_name]["kv_cache_capacity"])
+            _activation_backup_capacity: int = parse_value(config[compute_node_name]["activation_backup_capacity"])
 
             # construct
             _new_compute_node = self.add_compute_node(vram_size=_vram_size,
@@ -309,7 +331,7 @@ class ClusterSimulator:
             compute_nodes[compute_node_name] = _new_compute_node
 
         # parse links
-        link_names: List[str] = eval(config["Links"]["names"])
+        link_names: List[str] = parse_value(config["Links"]["names"])
         links: Dict[str, NetworkLink] = {}
         for link_name in link_names:
             assert link_name not in links, "Found duplicate link definitions!"
@@ -317,8 +339,8 @@ class ClusterSimulator:
             # parameters
             _node_in_name = config[link_name]["in"]
             _node_out_name = config[link_name]["out"]
-            _latency = eval(config[link_name]["latency"])
-            _bandwidth = eval(config[link_name]["bandwidth"])
+            _latency = parse_value(config[link_name]["latency"])
+            _bandwidth = parse_value(config[link_name]["bandwidth"])
 
             def parse_node_name(node_name):
                 if node_name == "source":
@@ -346,6 +368,23 @@ class ClusterSimulator:
         # return refs to source, sink, all compute nodes and links
         return source_node, sink_node, compute_nodes, links
 
+    def set_link_codec(self, link_codec: LinkCodec or None, link_uids: List[int] or None = None) -> None:
+        """
+        Set the codec used for transmissions over links between compute nodes.
+        Note: call this before initializing the scheduler, so that MaxFlow-based schedulers plan with the
+              transmission size on the wire
+
+        :param link_codec: the codec (None means sending activations as is)
+        :param link_uids: links to set (None means all links between compute nodes)
+        :return: None
+        """
+        if link_uids is None:
+            link_uids = [link_uid for link_uid, link in self.links.items()
+                         if link.node_in_type == NodeType.Compute and link.node_out_type == NodeType.Compute]
+        for link_uid in link_uids:
+            assert link_uid in self.links, "Unknown link!"
+            self.links[link_uid].set_link_codec(link_codec=link_codec)
+
     def set_scheduler(self, scheduler: BaseScheduler) -> None:
         """
         Set scheduler that will be used in the simulator.
@@ -365,7 +404,9 @@ class ClusterSimulator:
         SchedulingMethod.Swarm:
             /
         SchedulingMethod.Naive:
-            /
+            1. "seed": random seed for path selection (optional, default 0)
+        SchedulingMethod.ShortestQueue:
+            1. "seed": random seed for tie breaking (optional, default 0)
 
         :param scheduling_method: scheduling method
         :param args: arguments for the scheduler
@@ -393,12 +434,12 @@ class ClusterSimulator:
         elif scheduling_method == SchedulingMethod.Naive:
             # Naive
             from simulator.scheduler.naive_scheduler import NaiveScheduler
-            self.scheduler = NaiveScheduler()
+            self.scheduler = NaiveScheduler(seed=0 if args is None else args.get("seed", 0))
 
         elif scheduling_method == SchedulingMethod.ShortestQueue:
             # ShortestQueue
             from simulator.scheduler.shortest_queue.shortest_queue_scheduler import ShortestQueueScheduler
-            self.scheduler = ShortestQueueScheduler()
+            self.scheduler = ShortestQueueScheduler(seed=0 if args is None else args.get("seed", 0))
 
         else:
             assert False, "Found unknown scheduling method!"
@@ -486,6 +527,48 @@ class ClusterSimulator:
         self.use_offline_mode = True
         self.offline_query_feeder = offline_query_feeder
 
+    def register_workload_feeder(self, workload_feeder: "WorkloadFeeder") -> None:
+        """
+        Register workload feeder.
+
+        :param workload_feeder: the workload feeder
+        :return: None
+        """
+        assert not self.use_offline_mode, "Can not use workload feeder together with offline query feeder!"
+        self.workload_feeder = workload_feeder
+
+    def set_query_arrivals(self, query_arrivals: Iterator[Tuple[float, int, int]]) -> None:
+        """
+        Set a stream of query arrivals (arrive time, input length, output length), sorted by arrive time. The first
+        query is issued right away, and each later query is issued when simulation reaches its arrive time (i.e.
+        before the first event at or after its arrive time). This gives exactly the same simulation as issuing
+        each query and then calling simulate(until=next arrive time), but the whole trace can be simulated with
+        one call to simulate, and the trace is pulled from the iterator lazily.
+        Note: this only streams the arrivals, so that a long trace is not held in memory. It does not make the
+              simulation faster, as the events simulated are the same.
+
+        :param query_arrivals: an iterator of (arrive time, input length, output length)
+        :return: None
+        """
+        assert self.query_manager is not None, "Query manager must be initialized before setting arrivals!"
+        self.query_arrivals = iter(query_arrivals)
+        self.next_query_arrival = next(self.query_arrivals, None)
+        self.issue_next_query_arrival()
+
+    def issue_next_query_arrival(self) -> None:
+        """
+        Issue the next query arrival into query manager and pull the one after it from the arrivals.
+
+        :return: None
+        """
+        if self.next_query_arrival is None:
+            return
+        arrive_time, input_length, output_length = self.next_query_arrival
+        self.query_manager.issue_query(creation_time=arrive_time, input_seq_length=input_length,
+                                       output_seq_length=output_length)
+        self.num_issued_query_arrivals += 1
+        self.next_query_arrival = next(self.query_arrivals, None)
+
     def mark_as_ready(self) -> None:
         """
         Mark the simulator as ready to simulate.
@@ -621,6 +704,8 @@ class ClusterSimulator:
         :param event: the event to handle
         :return: a dict of transmission object handle -> (link_uid, finish_sending_time), a list of node uids
                  that needs to call start_transmission again
+                 (with fair sharing, the dict may contain transmissions of other nodes whose finish sending time
+                 changes)
         """
         # determine which node initiates the transmission
         transmission_node: ComputeNode or SourceNode = event.args["node"]
@@ -642,11 +727,14 @@ class ClusterSimulator:
         for schedule in schedules:
             assert schedule.link_uid in link_bandwidth_requirement, "Found schedule using unknown link!"
             link_bandwidth_requirement[schedule.link_uid] += schedule.bandwidth_usage
+        # (with fair sharing, bandwidth is not reserved and the links are always available)
         for link_uid in link_bandwidth_requirement:
             link: NetworkLink = transmission_node.outbound_links[link_uid]
             total_bandwidth: float = link_bandwidth_requirement[link_uid]
-            link_status: LinkStatus = link.check_availability(planned_bandwidth=total_bandwidth)
-            assert link_status == LinkStatus.Available, f"Unable to schedule send over link (status: {link_status})!"
+            if self.fair_share_network is None:
+                link_status: LinkStatus = link.check_availability(planned_bandwidth=total_bandwidth)
+                assert link_status == LinkStatus.Available, \
+                    f"Unable to schedule send over link (status: {link_status})!"
 
         # define some data structures that will be used in transmission
         # uids of all requests that are scheduled for normal execution
@@ -692,9 +780,11 @@ class ClusterSimulator:
                 assert False, "Unknown transmission type!"
 
             # send scheduled requests over link
-            cur_trans: TransmissionObject = cur_link.start_sending(requests=schedule.requests,
-                                                                   bandwidth_requirement=schedule.bandwidth_usage,
-                                                                   transmission_type=schedule.transmission_type)
+            cur_trans: TransmissionObject = cur_link.start_sending(
+                requests=schedule.requests, bandwidth_requirement=schedule.bandwidth_usage,
+                transmission_type=schedule.transmission_type,
+                reserve_bandwidth=self.fair_share_network is None
+            )
 
             # update request locations if the schedule is normal execution
             if schedule.transmission_type == TransmissionType.NormalExecution:
@@ -708,8 +798,14 @@ class ClusterSimulator:
             # record handle and link uid & finish sending time
             cur_trans_handle: str = cur_trans.get_handle()
             assert cur_trans_handle not in transmission_object_end_time, "Duplicate requests scheduled!"
-            finish_sending_time: float = self.current_time + cur_trans.duration - cur_link.latency
-            transmission_object_end_time[cur_trans_handle] = (cur_link.link_uid, finish_sending_time)
+            if self.fair_share_network is None:
+                finish_sending_time: float = self.current_time + cur_trans.duration - cur_link.latency
+                transmission_object_end_time[cur_trans_handle] = (cur_link.link_uid, finish_sending_time)
+            else:
+                # with fair sharing, other transmissions may need new finish sending events as well
+                transmission_object_end_time.update(self.fair_share_network.add_flow(
+                    current_time=self.current_time, handle=cur_trans_handle, link=cur_link, size=cur_trans.size
+                ))
 
         # check that backup requests are not scheduled through the same path as normal execution
         # Note: the check here can not block all such attempts (since normal execution might be sent
@@ -769,7 +865,7 @@ class ClusterSimulator:
                                         f"request_uids: {_finished_request_uids}")
 
         # return transmission_object_handle, link_uid, finish_transmission_time
-        return handle, link_uid, self.current_time + cur_link.latency
+        return handle, link_uid, self.current_time + cur_link.latency + cur_transmission_object.codec_delay
 
     def handle_finish_transmission(self, event: Event) -> None:
         """
@@ -855,6 +951,11 @@ class ClusterSimulator:
                         backup_node.activation_backup_cache.remove_activation_backup(layer_id=layer_id,
                                                                                      query_uid=request.base_query_uid)
 
+            # notify the workload feeder (e.g. a closed-loop client may send its next query)
+            if query_finished and self.workload_feeder is not None:
+                self.workload_feeder.on_query_finished(query_uid=request.base_query_uid,
+                                                       finish_time=self.current_time)
+
             # if we are in offline mode also need to check whether we need to launch new queries
             if self.use_offline_mode:
                 assert not (request.phase == RequestPhase.Initialization and query_finished), \
@@ -1022,6 +1123,14 @@ class ClusterSimulator:
         assert compute_node.node_type == NodeType.Compute, "Only compute node can finish loading model!"
 
         # finish loading model
+        # when reloading, the kv cache capacity in the cluster file (set for the initial number of layers) is
+        # replaced with the capacity for the new number of layers
+        num_new_layers: int = len(compute_node.new_model_layers)
+        if not len(compute_node.in_vram_model_layers) == 0:
+            compute_node.kv_cache_capacity = self.model_manager.get_kv_cache_capacity(
+                machine_type=compute_node.machine_type, num_on_node_layers=num_new_layers)
+            compute_node.activation_backup_cache_capacity = self.model_manager.get_activation_backup_capacity(
+                machine_type=compute_node.machine_type, num_on_node_layers=num_new_layers)
         compute_node.finish_loading_model()
 
         # logging
@@ -1085,31 +1194,21 @@ class ClusterSimulator:
                                                   description=start_loading_event_description)
                 self.event_queue.put((start_loading_model_event.event_time, start_loading_model_event))
 
+        elif event.event_handler == EventHandler.CommandFeedQueries:
+            # workload feeder issues the queries arriving in the next feed interval
+            assert self.workload_feeder is not None, "Found feed queries command without workload feeder!"
+            self.workload_feeder.feed(current_time=self.current_time)
+
         elif event.event_handler == EventHandler.StartTransmission:
             # start transmission for a node
             # transmission_object_end_time: transmission object handle -> (link_uid, finish_sending_time)
             transmission_object_end_time: Dict[int, Tuple[int, float]]
             retransmission_node_uids: List[int]
             transmission_object_end_time, retransmission_node_uids = self.handle_start_transmission(event=event)
-            transmission_node: ComputeNode or SourceNode = event.args["node"]
 
             # create new events to handle finish_sending for each transmission
-            for transmission_object_handle in transmission_object_end_time:
-                link_uid, send_end_time = transmission_object_end_time[transmission_object_handle]
-                new_event_args: Dict[str, Any] = {"transmission_node": transmission_node,
-                                                  "transmission_object_handle": transmission_object_handle,
-                                                  "link_uid": link_uid,
-                                                  "send_end_time": send_end_time}
-                new_event_description = EventDescription(who=transmission_node.entity_name,
-                                                         at_when=send_end_time,
-                                                         does_what="Finish sending")
-                new_event = Event(event_uid=self.get_next_event_uid(),
-                                  event_time=send_end_time,
-                                  event_handler=EventHandler.FinishSending,
-                                  args=new_event_args,
-                                  background=event.description,
-                                  description=new_event_description)
-                self.event_queue.put((new_event.event_time, new_event))
+            self.create_finish_sending_events(transmission_object_end_time=transmission_object_end_time,
+                                              background=event.description)
 
             # create new events to call start_transmission again on specific nodes
             for retransmission_node_uid in retransmission_node_uids:
@@ -1131,6 +1230,18 @@ class ClusterSimulator:
                 self.event_queue.put((retransmission_event.event_time, retransmission_event))
 
         elif event.event_handler == EventHandler.FinishSending:
+            # with fair sharing, the transmission may have slowed down (or finished) since this event was created
+            if self.fair_share_network is not None:
+                send_finished, next_check_time = self.fair_share_network.check_finished(
+                    handle=event.args["transmission_object_handle"], event_time=self.current_time
+                )
+                if not send_finished:
+                    if next_check_time is not None:
+                        self.create_finish_sending_events(transmission_object_end_time={
+                            event.args["transmission_object_handle"]: (event.args["link_uid"], next_check_time)
+                        }, background=event.description)
+                    return
+
             # the node finishes sending, link resource can be deallocated
             handle, link_uid, finish_transmission_time = self.handle_finish_sending(event=event)
             transmission_node: ComputeNode or SourceNode = event.args["transmission_node"]
@@ -1164,6 +1275,14 @@ class ClusterSimulator:
                                  description=finish_event_description)
             self.event_queue.put((finish_event.event_time, finish_event))
 
+            # with fair sharing, transmissions that shared bandwidth with this one speed up
+            if self.fair_share_network is not None:
+                self.create_finish_sending_events(
+                    transmission_object_end_time=self.fair_share_network.remove_flow(current_time=self.current_time,
+                                                                                     handle=handle),
+                    background=event.description
+                )
+
         elif event.event_handler == EventHandler.FinishTransmission:
             # finish transmission over a link
             self.handle_finish_transmission(event=event)
@@ -1314,6 +1433,33 @@ class ClusterSimulator:
         else:
             assert False, f"Found unknown event handler name: {event.event_handler}!"
 
+    def create_finish_sending_events(self, transmission_object_end_time: Dict[str, Tuple[int, float]],
+                                     background: EventDescription) -> None:
+        """
+        Create events to handle finish_sending for transmissions.
+
+        :param transmission_object_end_time: transmission object handle -> (link_uid, finish_sending_time)
+        :param background: description of the event that causes these events
+        :return: None
+        """
+        for transmission_object_handle in transmission_object_end_time:
+            link_uid, send_end_time = transmission_object_end_time[transmission_object_handle]
+            transmission_node: ComputeNode or SourceNode = self.links[link_uid].node_in
+            new_event_args: Dict[str, Any] = {"transmission_node": transmission_node,
+                                              "transmission_object_handle": transmission_object_handle,
+                                              "link_uid": link_uid,
+                                              "send_end_time": send_end_time}
+            new_event_description = EventDescription(who=transmission_node.entity_name,
+                                                     at_when=send_end_time,
+                                                     does_what="Finish sending")
+            new_event = Event(event_uid=self.get_next_event_uid(),
+                              event_time=send_end_time,
+                              event_handler=EventHandler.FinishSending,
+                              args=new_event_args,
+                              background=background,
+                              description=new_event_description)
+            self.event_queue.put((new_event.event_time, new_event))
+
     def simulate_next_event(self) -> Tuple[bool, float]:
         """
         Simulate next event in the event queue.
@@ -1428,6 +1574,13 @@ class ClusterSimulator:
             simulation_end_time: float = math.inf
 
         while True:
+            # issue the next query arrival once all events before its arrive time are simulated
+            if self.next_query_arrival is not None and self.next_query_arrival[0] < simulation_end_time:
+                if self.event_queue.empty() or self.next_query_arrival[0] <= self.event_queue.queue[0][0]:
+                    self.current_time = self.next_query_arrival[0]
+                    self.issue_next_query_arrival()
+                    continue
+
             # if there are no events remaining, then march directly to end time
             if self.event_queue.empty():
                 self.current_time = simulation_end_time
@@ -1540,6 +1693,25 @@ class ClusterSimulator:
                           description=new_event_description)
         self.event_queue.put((new_event.event_time, new_event))
 
+    def issue_command_feed_queries(self, feed_time: float) -> None:
+        """
+        Issue command: the workload feeder feeds new queries into the cluster at feed_time.
+
+        :param feed_time: when shall the workload feeder feed new queries
+        :return: None
+        """
+        assert feed_time >= self.current_time, "Can not feed queries at a past time!"
+        new_event_description = EventDescription(who=self.source_node.entity_name,
+                                                 at_when=feed_time,
+                                                 does_what="Feed new queries")
+        new_event = Event(event_uid=self.get_next_event_uid(),
+                          event_time=feed_time,
+                          event_handler=EventHandler.CommandFeedQueries,
+                          args={},
+                          background=new_event_description,
+                          description=new_event_description)
+        self.event_queue.put((new_event.event_time, new_event))
+
     # ******************************** Profile and Plot ******************************** #
     def get_connection_info(self) -> Dict[str, int or float]:
         """
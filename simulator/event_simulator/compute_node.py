@@ -1,6 +1,6 @@
 # 2023.12.12 Yixuan Mei
 
-from typing import Dict, List, Set, Any, Tuple
+from typing import Callable, Dict, List, Set, Any, Tuple
 
 from simulator.event_simulator.base_node import BaseNode, NodeType
 from simulator.event_simulator.model import ModelLayer, ModelStatus
@@ -127,6 +127,9 @@ class ComputeNode(BaseNode):
         self.available_vram: float = vram_size
         self.model_status: ModelStatus = ModelStatus.NoModel
         self.in_vram_model_layers: Dict[int, ModelLayer] = {}
+        # sorted ids of in vram layers and layer id -> position (updated when the model is loaded)
+        self.in_vram_layer_ids: List[int] = []
+        self.in_vram_layer_positions: Dict[int, int] = {}
         self.new_model_layers: Dict[int, ModelLayer] or None = None
         self.inference_settings: InferenceSettings or None = None
         self.new_inference_settings: InferenceSettings or None = None
@@ -141,13 +144,18 @@ class ComputeNode(BaseNode):
         self.outbound_available_bandwidth: float = outbound_nic_speed
         self.outbound_requests_on_the_fly: Dict[str, TransmissionObject] = {}
         # local inbound and outbound request queue
-        self.inbound_request_queue: List[InferenceRequest] = []
+        # (inbound queue: request_uid -> request, insertion-ordered, so that removal by uid is O(1))
+        self.inbound_request_queue: Dict[int, InferenceRequest] = {}
         self.outbound_request_dict: Dict[int, InferenceRequest] = {}
+        # length of inbound request queue, the listener (if any) is called whenever it changes
+        self.inbound_queue_length: int = 0
+        self.inbound_queue_listener: Callable[["ComputeNode"], None] or None = None
 
         # model inference
         self.current_inference_batch: InferenceBatch or None = None
         self.current_layer_id: int = -1
-        self.between_layer_queues: Dict[Tuple[int, int], List[InferenceRequest]] = {}
+        # (layer id, next layer id) -> queue (request_uid -> request, insertion-ordered)
+        self.between_layer_queues: Dict[Tuple[int, int], Dict[int, InferenceRequest]] = {}
 
         # kv cache and activation backup cache
         self.kv_cache_capacity: int = kv_cache_capacity
@@ -230,7 +238,7 @@ class ComputeNode(BaseNode):
                 self.request_uids_to_wait.add(request_uid)
 
         # a sanity check: all requests already issued to this node must be waited on
-        for request in self.inbound_request_queue:
+        for request in self.inbound_request_queue.values():
             assert request.request_uid in self.request_uids_to_wait, "Found request not waited-on but should be!"
 
         # return whether we can start loading right away
@@ -289,11 +297,13 @@ class ComputeNode(BaseNode):
         self.request_uids_to_wait = None
 
         # initialize inference-related data structures
-        self.current_layer_id = min(self.in_vram_model_layers.keys())
-        all_layer_ids = sorted(list(self.in_vram_model_layers.keys()))
-        between_layer_queues: Dict[Tuple[int, int], List[InferenceRequest]] = {}
+        self.in_vram_layer_ids = sorted(list(self.in_vram_model_layers.keys()))
+        self.in_vram_layer_positions = {layer_id: idx for idx, layer_id in enumerate(self.in_vram_layer_ids)}
+        self.current_layer_id = self.in_vram_layer_ids[0]
+        all_layer_ids = self.in_vram_layer_ids
+        between_layer_queues: Dict[Tuple[int, int], Dict[int, InferenceRequest]] = {}
         for idx in range(len(all_layer_ids) - 1):
-            between_layer_queues[(all_layer_ids[idx], all_layer_ids[idx + 1])] = []
+            between_layer_queues[(all_layer_ids[idx], all_layer_ids[idx + 1])] = {}
         self.between_layer_queues = between_layer_queues
 
         # initialize kv cache
@@ -302,9 +312,9 @@ class ComputeNode(BaseNode):
         # TODO: should not get kv-cache size from file, instead, use the current num layers to get
         #  from model_manager (get from file will be incorrect if we may assign different number of
         #  layers to a compute node)
-        self.kv_cache = KVCache(layer_ids=sorted(list(self.in_vram_model_layers.keys())),
+        self.kv_cache = KVCache(layer_ids=list(self.in_vram_layer_ids),
                                 max_capacity=self.kv_cache_capacity)
-        self.activation_backup_cache = ActivationBackupCache(layer_ids=sorted(list(self.in_vram_model_layers.keys())),
+        self.activation_backup_cache = ActivationBackupCache(layer_ids=list(self.in_vram_layer_ids),
                                                              max_capacity=self.activation_backup_cache_capacity)
 
         # calculate available vram
@@ -313,6 +323,18 @@ class ComputeNode(BaseNode):
             total_vram_usage += self.in_vram_model_layers[layer_id].vram_usage
         self.available_vram = self.vram_size - total_vram_usage
 
+    def change_inbound_queue_length(self, delta: int) -> None:
+        """
+        Update the length of inbound request queue and notify the listener.
+
+        :param delta: change of queue length
+        :return: None
+        """
+        self.inbound_queue_length += delta
+        assert self.inbound_queue_length == len(self.inbound_request_queue), "Queue length mismatch!"
+        if self.inbound_queue_listener is not None:
+            self.inbound_queue_listener(self)
+
     def receive_request(self, request: InferenceRequest) -> None:
         """
         Receives a request from one inbound link after sending is finished.
@@ -371,12 +393,16 @@ class ComputeNode(BaseNode):
         # add the request
         if infer_with_current_model:
             next_layer_to_infer = min(cur_layers_to_infer)
-            if next_layer_to_infer == min(self.in_vram_model_layers.keys()):
+            if next_layer_to_infer == self.in_vram_layer_ids[0]:
                 # inference will start from the first layer
-                self.inbound_request_queue.append(request)
+                assert request.request_uid not in self.inbound_request_queue, "Duplicate requests!"
+                self.inbound_request_queue[request.request_uid] = request
+                self.change_inbound_queue_length(delta=1)
             else:
                 # skip some layers and put the request to the queue before next_layer_to_infer
-                self.between_layer_queues[(next_layer_to_infer - 1, next_layer_to_infer)].append(request)
+                next_queue = self.between_layer_queues[(next_layer_to_infer - 1, next_layer_to_infer)]
+                assert request.request_uid not in next_queue, "Duplicate requests!"
+                next_queue[request.request_uid] = request
             self.cpu_buffer[request.request_uid] = request
         else:
             # TODO: if the request arrives and does not use current model, we need to cache it and
@@ -444,10 +470,10 @@ class ComputeNode(BaseNode):
         if self.model_status == ModelStatus.Ready or self.model_status == ModelStatus.Flushing:
             # in Ready / Flushing, all requests in the queues are executable
             # return the queue for current layer (model inference happens in a cyclic way)
-            if self.current_layer_id == min(self.in_vram_model_layers.keys()):
-                return self.inbound_request_queue
+            if self.current_layer_id == self.in_vram_layer_ids[0]:
+                return list(self.inbound_request_queue.values())
             else:
-                return self.between_layer_queues[(self.current_layer_id - 1, self.current_layer_id)]
+                return list(self.between_layer_queues[(self.current_layer_id - 1, self.current_layer_id)].values())
         elif self.model_status == ModelStatus.Loading:
             # loading: no requests are executable
             return []
@@ -469,7 +495,7 @@ class ComputeNode(BaseNode):
         cur_layer_time, cur_layer_vram_usage = cur_layer.get_inference_statistics(requests=requests)
 
         # overhead modeling
-        if layer_id == min(self.in_vram_model_layers.keys()):
+        if layer_id == self.in_vram_layer_ids[0]:
             num_tokens = sum([req.token_seq_length for req in self.cpu_buffer.values()])
             activation_size = 0 if len(self.cpu_buffer) == 0 else list(self.cpu_buffer.values())[0].activation_size
             concat_overhead = (num_tokens * activation_size) / (4 * gbps)
@@ -553,34 +579,20 @@ class ComputeNode(BaseNode):
         assert self.available_vram >= inference_vram_usage, "VRAM is not enough for inference!"
 
         # get the queue we are currently working on
-        if self.current_layer_id == min(self.in_vram_model_layers.keys()):
+        if self.current_layer_id == self.in_vram_layer_ids[0]:
             current_queue = self.inbound_request_queue
         else:
             current_queue = self.between_layer_queues[(self.current_layer_id - 1, self.current_layer_id)]
 
-        # check requests exist and remove them from inbound request queue
-        # get uids of requests waiting for execution
+        # check requests exist and remove them from the queue (cost is proportional to batch size)
         execute_request_uids: Set[int] = set()
         for execute_request in requests:
             assert execute_request.request_uid not in execute_request_uids, "Duplicate request found!"
             execute_request_uids.add(execute_request.request_uid)
-        # get uids of all requests currently on node
-        all_current_request_uids: Set[int] = set()
-        for current_request in current_queue:
-            assert current_request.request_uid not in all_current_request_uids, "Duplicate request found!"
-            all_current_request_uids.add(current_request.request_uid)
-        # check whether all these requests exist
-        for execute_request_uid in execute_request_uids:
-            assert execute_request_uid in all_current_request_uids, "Found unknown request!"
-        # remove the requests from inbound request queue
-        new_queue: List[InferenceRequest] = []
-        for existing_request in current_queue:
-            if existing_request.request_uid not in execute_request_uids:
-                new_queue.append(existing_request)
-        if self.current_layer_id == min(self.in_vram_model_layers.keys()):
-            self.inbound_request_queue = new_queue
-        else:
-            self.between_layer_queues[(self.current_layer_id - 1, self.current_layer_id)] = new_queue
+            assert execute_request.request_uid in current_queue, "Found unknown request!"
+            del current_queue[execute_request.request_uid]
+        if self.current_layer_id == self.in_vram_layer_ids[0]:
+            self.change_inbound_queue_length(delta=-len(requests))
 
         # start inference
         inference_batch = InferenceBatch(requests=requests,
@@ -599,15 +611,15 @@ class ComputeNode(BaseNode):
 
         :return: next layer idx
         """
-        all_layer_ids: List[int] = sorted(list(self.in_vram_model_layers.keys()))
-        cur_layer_id_position = all_layer_ids.index(self.current_layer_id)
+        all_layer_ids: List[int] = self.in_vram_layer_ids
+        cur_layer_id_position = self.in_vram_layer_positions[self.current_layer_id]
         for pos_offset in range(1, len(all_layer_ids)):
             # get new layer id
             new_pos = (cur_layer_id_position + pos_offset) % len(all_layer_ids)
             new_layer_id = all_layer_ids[new_pos]
 
             # check whether this layer's input is empty
-            if new_layer_id == min(all_layer_ids):
+            if new_layer_id == all_layer_ids[0]:
                 if not len(self.inbound_request_queue) == 0:
                     self.current_layer_id = new_layer_id
                     return new_layer_id
@@ -640,7 +652,7 @@ class ComputeNode(BaseNode):
         # if this layer is the last layer, then we need to:
         # (1) update request_uids_to_wait (only when flushing)
         # (2) mark request as inferred
-        if self.current_layer_id == max(self.in_vram_model_layers.keys()):
+        if self.current_layer_id == self.in_vram_layer_ids[-1]:
             # if we are flushing, also need to remove the requests from wait list
             if self.model_status == ModelStatus.Flushing:
                 for request in current_inference_batch.requests:
@@ -668,7 +680,7 @@ class ComputeNode(BaseNode):
                 self.kv_cache.grow_query_kv_cache(layers=kv_update_layer_ids, query_uid=request.base_query_uid)
 
         # put the requests into the next queue
-        if self.current_layer_id == max(self.in_vram_model_layers.keys()):
+        if self.current_layer_id == self.in_vram_layer_ids[-1]:
             # last layer, put into output dict
             for request in current_inference_batch.requests:
                 assert request.request_uid not in self.outbound_request_dict, "Duplicate requests!"
@@ -679,7 +691,7 @@ class ComputeNode(BaseNode):
             next_queue = self.between_layer_queues[(self.current_layer_id, self.current_layer_id + 1)]
             for request in current_inference_batch.requests:
                 assert request.request_uid not in next_queue, "Duplicate requests!"
-                next_queue.append(request)
+                next_queue[request.request_uid] = request
             trigger_network_send = False
 
         # march to the next layer (otherwise, the next start_execution will continue working on the same layer)
@@ -11,6 +11,7 @@ class EventHandler(Enum):
     # --------------------- External -------------------- #
     CommandNewRequest = "EventHandler.Command.NewRequest"
     CommandLoadModel = "EventHandler.Command.LoadModel"
+    CommandFeedQueries = "EventHandler.Command.FeedQueries"
     # --------------------- Internal -------------------- #
     StartTransmission = "EventHandler.StartTransmission"
     FinishSending = "EventHandler.FinishSending"
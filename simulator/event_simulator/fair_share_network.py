@@ -0,0 +1,201 @@
+# 2026.10.19 Yixuan Mei
+
+import heapq
+import math
+
+from enum import Enum
+from typing import Dict, List, Tuple
+
+from simulator.event_simulator.network_link import NetworkLink
+
+# a pending FinishSending event is kept if the new finish time is earlier by less than this (floating point noise)
+FINISH_TIME_TOLERANCE: float = 1e-9
+
+
+class NetworkModel(Enum):
+    """ How transmissions use network bandwidth. """
+    # each transmission reserves the bandwidth chosen by the scheduler on sender nic, link and receiver nic
+    Reserved = "NetworkModel.Reserved"
+    # concurrent transmissions share sender nic, link and receiver nic max-min fairly (no reservation)
+    FairShare = "NetworkModel.FairShare"
+
+
+class NetworkFlow:
+    def __init__(self, handle: str, link: NetworkLink, size: float, start_time: float) -> None:
+        """
+        A transmission in the fair share network.
+
+        :param handle: handle of the transmission object
+        :param link: the link this transmission is on
+        :param size: size of the transmission
+        :param start_time: when the transmission starts
+        :return: None
+        """
+        self.handle: str = handle
+        self.link: NetworkLink = link
+        # resources used: sender's outbound nic, link, receiver's inbound nic
+        self.resources: List[Tuple[str, int]] = [("out", link.node_in.node_uid), ("link", link.link_uid),
+                                                 ("in", link.node_out.node_uid)]
+
+        # progress
+        self.remaining_size: float = size
+        self.rate: float = 0
+        self.last_update_time: float = start_time
+        self.finish_time: float = math.inf
+        # earliest pending FinishSending event of this flow
+        self.next_event_time: float = math.inf
+
+
+class FairShareNetwork:
+    def __init__(self) -> None:
+        """
+        Max-min fair sharing of bandwidth between concurrent transmissions. Each transmission uses three
+        resources (sender's outbound nic, link and receiver's inbound nic), and rates are recomputed with
+        progressive filling whenever a transmission starts or finishes.
+        Note: 1. only the transmissions that (transitively) share a resource with the one that starts or
+                 finishes are recomputed, as max-min fair rates of other transmissions do not change
+              2. when rates change, a new FinishSending event is created only if the transmission finishes
+                 earlier than its pending event. A pending event that fires too early is moved to the new
+                 finish time (see check_finished), and events of finished transmissions are ignored.
+
+        :return: None
+        """
+        # handle -> flow
+        self.flows: Dict[str, NetworkFlow] = {}
+        # resource -> capacity, resource -> handles of flows using it (dict for deterministic order)
+        self.resource_capacity: Dict[Tuple[str, int], float] = {}
+        self.resource_flows: Dict[Tuple[str, int], Dict[str, None]] = {}
+
+    def add_flow(self, current_time: float, handle: str, link: NetworkLink,
+                 size: float) -> Dict[str, Tuple[int, float]]:
+        """
+        A transmission starts.
+
+        :param current_time: current time
+        :param handle: handle of the transmission object
+        :param link: the link this transmission is on
+        :param size: size of the transmission
+        :return: FinishSending events to create, transmission object handle -> (link uid, send end time)
+        """
+        assert handle not in self.flows, "Duplicate flow found!"
+        assert size > 0, "Flow size must be positive!"
+        new_flow: NetworkFlow = NetworkFlow(handle=handle, link=link, size=size, start_time=current_time)
+        self.flows[handle] = new_flow
+        capacities: List[float] = [link.node_in.outbound_nic_speed, link.bandwidth, link.node_out.inbound_nic_speed]
+        for resource, capacity in zip(new_flow.resources, capacities):
+            self.resource_capacity[resource] = capacity
+            self.resource_flows.setdefault(resource, {})[handle] = None
+        return self.update_rates(current_time=current_time, resources=new_flow.resources)
+
+    def remove_flow(self, current_time: float, handle: str) -> Dict[str, Tuple[int, float]]:
+        """
+        A transmission finishes sending.
+
+        :param current_time: current time
+        :param handle: handle of the transmission object
+        :return: FinishSending events to create, transmission object handle -> (link uid, send end time)
+        """
+        assert handle in self.flows, "Unknown flow!"
+        finished_flow: NetworkFlow = self.flows.pop(handle)
+        for resource in finished_flow.resources:
+            del self.resource_flows[resource][handle]
+            if len(self.resource_flows[resource]) == 0:
+                del self.resource_flows[resource]
+                del self.resource_capacity[resource]
+        remaining_resources = [resource for resource in finished_flow.resources if resource in self.resource_flows]
+        return self.update_rates(current_time=current_time, resources=remaining_resources)
+
+    def check_finished(self, handle: str, event_time: float) -> Tuple[bool, float or None]:
+        """
+        Check a FinishSending event of a transmission.
+
+        :param handle: handle of the transmission object
+        :param event_time: time of the event
+        :return: whether the transmission finishes sending, time of the event to create (None if no event)
+        """
+        flow: NetworkFlow or None = self.flows.get(handle, None)
+        if flow is None or not event_time == flow.next_event_time:
+            # stale event: the transmission has finished, or it has an earlier pending event
+            return False, None
+        if flow.finish_time <= event_time + FINISH_TIME_TOLERANCE:
+            return True, None
+
+        # the transmission slowed down after this event was created
+        flow.next_event_time = flow.finish_time
+        return False, flow.finish_time
+
+    def update_rates(self, current_time: float, resources: List[Tuple[str, int]]) -> Dict[str, Tuple[int, float]]:
+        """
+        Recompute the rates of all transmissions connected to the given resources.
+
+        :param current_time: current time
+        :param resources: resources whose transmissions have changed
+        :return: FinishSending events to create, transmission object handle -> (link uid, send end time)
+        """
+        # Step 1: find the connected component of flows and resources
+        component_resources: Dict[Tuple[str, int], None] = {resource: None for resource in resources}
+        component_flows: Dict[str, None] = {}
+        resource_stack: List[Tuple[str, int]] = list(resources)
+        while not len(resource_stack) == 0:
+            resource = resource_stack.pop()
+            for handle in self.resource_flows[resource]:
+                if handle not in component_flows:
+                    component_flows[handle] = None
+                    for next_resource in self.flows[handle].resources:
+                        if next_resource not in component_resources:
+                            component_resources[next_resource] = None
+                            resource_stack.append(next_resource)
+
+        # Step 2: advance the progress of these flows to current time
+        for handle in component_flows:
+            flow: NetworkFlow = self.flows[handle]
+            flow.remaining_size = max(flow.remaining_size - flow.rate * (current_time - flow.last_update_time), 0)
+            flow.last_update_time = current_time
+
+        # Step 3: progressive filling, repeatedly saturate the resource with the smallest fair share
+        remaining_capacity: Dict[Tuple[str, int], float] = {}
+        num_unfrozen_flows: Dict[Tuple[str, int], int] = {}
+        share_heap: List[Tuple[float, Tuple[str, int]]] = []
+        for resource in component_resources:
+            remaining_capacity[resource] = self.resource_capacity[resource]
+            num_unfrozen_flows[resource] = len(self.resource_flows[resource])
+            share_heap.append((remaining_capacity[resource] / num_unfrozen_flows[resource], resource))
+        heapq.heapify(share_heap)
+        frozen_flows: Dict[str, None] = {}
+        while not len(share_heap) == 0:
+            share, resource = heapq.heappop(share_heap)
+            if num_unfrozen_flows[resource] == 0 or \
+                    not share == max(remaining_capacity[resource], 0) / num_unfrozen_flows[resource]:
+                # saturated or stale entry
+                continue
+            for handle in self.resource_flows[resource]:
+                if handle in frozen_flows:
+                    continue
+                frozen_flows[handle] = None
+                self.flows[handle].rate = share
+                for flow_resource in self.flows[handle].resources:
+                    remaining_capacity[flow_resource] -= share
+                    num_unfrozen_flows[flow_resource] -= 1
+                    if num_unfrozen_flows[flow_resource] > 0:
+                        heapq.heappush(share_heap, (max(remaining_capacity[flow_resource], 0) /
+                                                    num_unfrozen_flows[flow_resource], flow_resource))
+
+        # Step 4: new finish times, create events for flows that finish before their pending event
+        finish_sending_events: Dict[str, Tuple[int, float]] = {}
+        for handle in component_flows:
+            flow: NetworkFlow = self.flows[handle]
+            assert flow.rate > 0, "Found a flow without bandwidth!"
+            flow.finish_time = current_time + flow.remaining_size / flow.rate
+            if flow.finish_time < flow.next_event_time - FINISH_TIME_TOLERANCE:
+                flow.next_event_time = flow.finish_time
+                finish_sending_events[handle] = (flow.link.link_uid, flow.finish_time)
+        return finish_sending_events
+
+    def get_rate(self, handle: str) -> float:
+        """
+        Get the current rate of a transmission.
+
+        :param handle: handle of the transmission object
+        :return: current rate
+        """
+        return self.flows[handle].rate
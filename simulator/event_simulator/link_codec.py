@@ -0,0 +1,118 @@
+# 2026.10.19 Yixuan Mei
+
+from enum import Enum
+from typing import List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from simulator.event_simulator.request import InferenceRequest
+
+
+class ActivationPrecision(Enum):
+    """ Precision of activations on the wire. """
+    FP16 = "ActivationPrecision.FP16"
+    FP8 = "ActivationPrecision.FP8"
+    INT8 = "ActivationPrecision.INT8"
+
+
+# size of activations in each precision, relative to fp16 (model activation sizes are profiled in fp16)
+ACTIVATION_PRECISION_FACTOR = {
+    ActivationPrecision.FP16: 1.0,
+    ActivationPrecision.FP8: 0.5,
+    ActivationPrecision.INT8: 0.5,
+}
+
+
+class LinkCodec:
+    def __init__(self, activation_precision: ActivationPrecision = ActivationPrecision.FP16,
+                 compression_ratio: float = 1, encode_speed: float or None = None,
+                 decode_speed: float or None = None, message_overhead: float = 0,
+                 coalesce_messages: bool = False) -> None:
+        """
+        Codec used for transmissions between two compute nodes. It models activation quantization and
+        compression, the cpu cost of encoding and decoding, and the fixed cost of each message on the wire.
+        Note: 1. only activations are quantized and compressed, tokens are sent as is
+              2. encoding and decoding are not overlapped with sending, the codec delay is added to the
+                 latency of the transmission (i.e. it delays the receiver but does not occupy the link)
+              3. message_overhead is a fixed time each message occupies the link (framing, syscalls, rpc).
+                 Without coalescing, each request in a transmission is a separate message. With coalescing,
+                 a transmission is sent as one frame, and the scheduler packs all requests waiting for a free
+                 link into one transmission.
+
+        :param activation_precision: precision of activations on the wire
+        :param compression_ratio: lossless compression ratio applied after quantization (>= 1)
+        :param encode_speed: speed of encoding (bytes of fp16 activation / s, None means free)
+        :param decode_speed: speed of decoding (bytes of fp16 activation / s, None means free)
+        :param message_overhead: fixed time of each message on the link (s)
+        :param coalesce_messages: whether to send all requests in a transmission as one frame
+        :return: None
+        """
+        assert compression_ratio >= 1, "Compression ratio must be at least 1!"
+        assert encode_speed is None or encode_speed > 0, "Encode speed must be positive!"
+        assert decode_speed is None or decode_speed > 0, "Decode speed must be positive!"
+        assert message_overhead >= 0, "Message overhead must be non-negative!"
+
+        # save parameters
+        self.activation_precision: ActivationPrecision = activation_precision
+        self.compression_ratio: float = compression_ratio
+        self.encode_speed: float or None = encode_speed
+        self.decode_speed: float or None = decode_speed
+        self.message_overhead: float = message_overhead
+        self.coalesce_messages: bool = coalesce_messages
+
+    def get_activation_scale(self) -> float:
+        """
+        Get the size of activations on the wire relative to fp16.
+
+        :return: activation scale
+        """
+        return ACTIVATION_PRECISION_FACTOR[self.activation_precision] / self.compression_ratio
+
+    def get_token_transmission_size(self, token_size: float, activation_size: float) -> float:
+        """
+        Get the size of one token on the wire.
+
+        :param token_size: size of a token
+        :param activation_size: size of the activation of a token (fp16)
+        :return: size of one token on the wire
+        """
+        return token_size + activation_size * self.get_activation_scale()
+
+    def get_transmission_size(self, requests: List["InferenceRequest"]) -> float:
+        """
+        Get the size of requests on the wire.
+
+        :param requests: the list of requests to be transferred
+        :return: transmission size
+        """
+        total_size: float = 0
+        for request in requests:
+            total_size += self.get_token_transmission_size(token_size=request.token_size,
+                                                           activation_size=request.activation_size) * \
+                          request.token_seq_length
+        return total_size
+
+    def get_codec_delay(self, requests: List["InferenceRequest"]) -> float:
+        """
+        Get the time spent on encoding (sender) and decoding (receiver) the requests.
+
+        :param requests: the list of requests to be transferred
+        :return: codec delay
+        """
+        raw_activation_size: float = sum([request.activation_size * request.token_seq_length
+                                          for request in requests])
+        codec_delay: float = 0
+        if self.encode_speed is not None:
+            codec_delay += raw_activation_size / self.encode_speed
+        if self.decode_speed is not None:
+            codec_delay += raw_activation_size / self.decode_speed
+        return codec_delay
+
+    def get_message_overhead(self, requests: List["InferenceRequest"]) -> float:
+        """
+        Get the fixed time the messages of requests occupy the link.
+
+        :param requests: the list of requests to be transferred
+        :return: message overhead
+        """
+        num_messages: int = 1 if self.coalesce_messages else len(requests)
+        return self.message_overhead * num_messages
@@ -4,6 +4,7 @@ from typing import Dict, List, TYPE_CHECKING
 from enum import Enum
 
 from simulator.event_simulator.base_node import NodeType
+from simulator.event_simulator.link_codec import LinkCodec
 from simulator.event_simulator.request import InferenceRequest, RequestLocation
 
 if TYPE_CHECKING:
@@ -19,20 +20,27 @@ class TransmissionType(Enum):
 
 class TransmissionObject:
     def __init__(self, requests: List[InferenceRequest], duration: float, bandwidth_usage: float,
-                 transmission_type: TransmissionType, link_uid: int) -> None:
+                 transmission_type: TransmissionType, link_uid: int, size: float = 0,
+                 bandwidth_reserved: bool = True, codec_delay: float = 0) -> None:
         """
         Represent a request on the fly.
 
         :param requests: the list of inference requests on the fly
-        :param duration: how long this transmission takes
+        :param duration: how long this transmission takes (-1 if decided by fair sharing)
         :param bandwidth_usage: how much bandwidth this transmission uses
         :param transmission_type: type of transmission
         :param link_uid: uid of the link this transmission is on
+        :param size: size of this transmission
+        :param bandwidth_reserved: whether bandwidth_usage is reserved on nics and link
+        :param codec_delay: time spent on encoding and decoding (added to latency)
         :return: None
         """
         self.requests: List[InferenceRequest] = requests
         self.duration: float = duration
         self.bandwidth_usage: float = bandwidth_usage
+        self.size: float = size
+        self.bandwidth_reserved: bool = bandwidth_reserved
+        self.codec_delay: float = codec_delay
         self.send_finished: bool = False
         self.transmission_type: TransmissionType = transmission_type
         self.link_uid: int = link_uid
@@ -82,6 +90,9 @@ class NetworkLink:
         self.latency: float = latency
         self.bandwidth: float = bandwidth
 
+        # codec for transmissions between compute nodes (None means sending activations as is)
+        self.link_codec: LinkCodec or None = None
+
         # connectivity
         self.node_in: "ComputeNode" or "SourceNode" = node_in
         self.node_in_type: NodeType = node_in.node_type
@@ -96,33 +107,72 @@ class NetworkLink:
         # logging
         self.entity_name: str = f"Link-{self.link_uid}"
 
-    def calculate_transmission_time(self, requests: List[InferenceRequest], planned_bandwidth: float) -> float:
+    def set_link_codec(self, link_codec: LinkCodec or None) -> None:
         """
-        Calculate the transmission time of requests over this link using the planned bandwidth.
+        Set the codec of this link. Only links between compute nodes carry activations and can have a codec.
 
-        :param requests: the list of requests to be transferred
-        :param planned_bandwidth: planned bandwidth
-        :return: transmission time
+        :param link_codec: the codec (None means sending activations as is)
+        :return: None
         """
-        # check that the planned bandwidth is smaller than available
-        assert planned_bandwidth <= self.available_bandwidth, "Demand more bandwidth than possible!"
+        assert link_codec is None or (self.node_in_type == NodeType.Compute and
+                                      self.node_out_type == NodeType.Compute), \
+            "Only links between compute nodes can have a codec!"
+        self.link_codec = link_codec
 
-        # calculate the time needed and return
-        total_time: float = self.latency
+    def calculate_transmission_size(self, requests: List[InferenceRequest]) -> float:
+        """
+        Calculate the size of requests transmitted over this link.
+
+        :param requests: the list of requests to be transferred
+        :return: transmission size
+        """
+        total_size: float = 0
         if self.node_in_type == NodeType.Source or self.node_out_type == NodeType.Sink:
             # transmission between coordinator and compute nodes contains no activation
-            total_size: float = 0
             for request in requests:
                 total_size += request.token_size * request.token_seq_length
-            total_time += total_size / planned_bandwidth
+        elif self.link_codec is not None:
+            # transmission between compute nodes contains activation (quantized and compressed by the codec)
+            total_size = self.link_codec.get_transmission_size(requests=requests)
         else:
             # transmission between compute nodes contains activation
-            total_size: float = 0
             for request in requests:
                 total_size += request.token_size * request.token_seq_length
                 total_size += request.activation_size * request.token_seq_length
-            total_time += total_size / planned_bandwidth
-        return total_time
+        return total_size
+
+    def calculate_message_overhead(self, requests: List[InferenceRequest]) -> float:
+        """
+        Calculate the fixed time the messages of requests occupy this link.
+
+        :param requests: the list of requests to be transferred
+        :return: message overhead
+        """
+        return 0 if self.link_codec is None else self.link_codec.get_message_overhead(requests=requests)
+
+    def calculate_codec_delay(self, requests: List[InferenceRequest]) -> float:
+        """
+        Calculate the time spent on encoding and decoding requests transmitted over this link.
+
+        :param requests: the list of requests to be transferred
+        :return: codec delay
+        """
+        return 0 if self.link_codec is None else self.link_codec.get_codec_delay(requests=requests)
+
+    def calculate_transmission_time(self, requests: List[InferenceRequest], planned_bandwidth: float) -> float:
+        """
+        Calculate the transmission time of requests over this link using the planned bandwidth.
+
+        :param requests: the list of requests to be transferred
+        :param planned_bandwidth: planned bandwidth
+        :return: transmission time
+        """
+        # check that the planned bandwidth is smaller than available
+        assert planned_bandwidth <= self.available_bandwidth, "Demand more bandwidth than possible!"
+
+        # calculate the time needed and return
+        return self.latency + self.calculate_message_overhead(requests=requests) + \
+            self.calculate_transmission_size(requests=requests) / planned_bandwidth
 
     def get_available_bandwidth(self) -> float:
         """
@@ -158,37 +208,53 @@ class NetworkLink:
         return LinkStatus.Available
 
     def start_sending(self, requests: List[InferenceRequest], bandwidth_requirement: float,
-                      transmission_type: TransmissionType) -> TransmissionObject:
+                      transmission_type: TransmissionType, reserve_bandwidth: bool = True) -> TransmissionObject:
         """
         Start sending a list of requests over current link. (Allocate resources)
+        Note: 1. if reserve_bandwidth is False (fair share network), no bandwidth is reserved and the duration
+                 of the transmission is decided by the network
+              2. in the fair share network, message overhead is added to the size of the transmission (as
+                 the amount of data the link could have sent in that time)
 
         :param requests: the list of requests to send
         :param bandwidth_requirement: the amount of bandwidth allocated
         :param transmission_type: type of transmission
+        :param reserve_bandwidth: whether to reserve the bandwidth on nics and link
         :return: a TransmissionObject that represents this send
         """
-        # check whether we have enough bandwidth
-        _link_status = self.check_availability(planned_bandwidth=bandwidth_requirement)
-        assert _link_status == LinkStatus.Available, f"Can not allocate send over link with status {_link_status}!"
-
-        # calculate end time and build the transmission object
-        duration: float = self.calculate_transmission_time(requests=requests, planned_bandwidth=bandwidth_requirement)
-        transmission_object: TransmissionObject = TransmissionObject(requests=requests, duration=duration,
-                                                                     bandwidth_usage=bandwidth_requirement,
-                                                                     transmission_type=transmission_type,
-                                                                     link_uid=self.link_uid)
+        # check whether we have enough bandwidth and calculate end time
+        if reserve_bandwidth:
+            _link_status = self.check_availability(planned_bandwidth=bandwidth_requirement)
+            assert _link_status == LinkStatus.Available, \
+                f"Can not allocate send over link with status {_link_status}!"
+            duration: float = self.calculate_transmission_time(requests=requests,
+                                                               planned_bandwidth=bandwidth_requirement)
+        else:
+            duration: float = -1
+        size: float = self.calculate_transmission_size(requests=requests)
+        if not reserve_bandwidth:
+            size += self.calculate_message_overhead(requests=requests) * self.bandwidth
+
+        # build the transmission object
+        transmission_object: TransmissionObject = TransmissionObject(
+            requests=requests, duration=duration, bandwidth_usage=bandwidth_requirement,
+            transmission_type=transmission_type, link_uid=self.link_uid,
+            size=size, bandwidth_reserved=reserve_bandwidth,
+            codec_delay=self.calculate_codec_delay(requests=requests)
+        )
         transmission_object_handle: str = transmission_object.get_handle()
+        reserved_bandwidth: float = bandwidth_requirement if reserve_bandwidth else 0
 
         # then we put the transmission object into on-the-fly queues
         assert transmission_object_handle not in self.node_in.outbound_requests_on_the_fly
         assert transmission_object_handle not in self.requests_on_the_fly
         assert transmission_object_handle not in self.node_out.inbound_requests_on_the_fly
         self.node_in.outbound_requests_on_the_fly[transmission_object_handle] = transmission_object
-        self.node_in.outbound_available_bandwidth -= bandwidth_requirement
+        self.node_in.outbound_available_bandwidth -= reserved_bandwidth
         self.requests_on_the_fly[transmission_object_handle] = transmission_object
-        self.available_bandwidth -= bandwidth_requirement
+        self.available_bandwidth -= reserved_bandwidth
         self.node_out.inbound_requests_on_the_fly[transmission_object_handle] = transmission_object
-        self.node_out.inbound_available_bandwidth -= bandwidth_requirement
+        self.node_out.inbound_available_bandwidth -= reserved_bandwidth
 
         # return the transmission object to event handler
         return transmission_object
@@ -212,18 +278,22 @@ class NetworkLink:
 
         # remove from sender node
         bandwidth_used = self.node_in.outbound_requests_on_the_fly[transmission_object_handle].bandwidth_usage
+        if not cur_transmission_object.bandwidth_reserved:
+            bandwidth_used = 0
         self.node_in.outbound_available_bandwidth += bandwidth_used
         del self.node_in.outbound_requests_on_the_fly[transmission_object_handle]
 
         # remove from link
-        assert bandwidth_used == self.requests_on_the_fly[transmission_object_handle].bandwidth_usage
+        assert cur_transmission_object.bandwidth_usage == \
+               self.requests_on_the_fly[transmission_object_handle].bandwidth_usage
         self.available_bandwidth += bandwidth_used
         del self.requests_on_the_fly[transmission_object_handle]
 
         # remove from receiver
         # TODO: changing to a more accurate model. In reality, receiver nic bandwidth should be
         #  occupied during [latency, finish] (here is [0, finish - latency])
-        assert bandwidth_used == self.node_out.inbound_requests_on_the_fly[transmission_object_handle].bandwidth_usage
+        assert cur_transmission_object.bandwidth_usage == \
+               self.node_out.inbound_requests_on_the_fly[transmission_object_handle].bandwidth_usage
         self.node_out.inbound_available_bandwidth += bandwidth_used
         del self.node_out.inbound_requests_on_the_fly[transmission_object_handle]
 
@@ -151,14 +151,14 @@ class QueryManager:
         self.next_query_uid += 1
         return next_query_uid
 
-    def issue_query(self, creation_time: float, input_seq_length: int, output_seq_length: int) -> None:
+    def issue_query(self, creation_time: float, input_seq_length: int, output_seq_length: int) -> int:
         """
         Issue a new query into the cluster
 
         :param creation_time: time when this query is created
         :param input_seq_length: input sequence length
         :param output_seq_length: expected output sequence length
-        :return: None
+        :return: uid of the query
         """
         # construct the new query
         assert creation_time >= self.simulator.current_time, "Can not create queries for the past!"
@@ -180,6 +180,7 @@ class QueryManager:
                                                  activation_size=self.param.token_activation_size,
                                                  pipeline=None,
                                                  kv_tracker_ref=new_query.kv_tracker)
+        return new_query.query_uid
 
     def reject_query(self, request: InferenceRequest):
         """
@@ -0,0 +1,160 @@
+# 2026.10.19 Yixuan Mei
+
+import ast
+
+from typing import Dict, List, Any
+
+from simulator.event_simulator.utils import kbps, mbps, gbps, Byte, KB, MB, GB, Sec, MilliSec
+
+# names that can appear in config values
+CONFIG_UNITS: Dict[str, float] = {
+    "kbps": kbps, "mbps": mbps, "gbps": gbps,
+    "Byte": Byte, "KB": KB, "MB": MB, "GB": GB,
+    "Sec": Sec, "MilliSec": MilliSec,
+}
+
+
+def _parse_number(text: str) -> int or float or None:
+    """
+    Parse an int or float literal.
+
+    :param text: the text to parse
+    :return: the number, or None if text is not a number
+    """
+    # integers (checked without exceptions, since most values in config files are not integers)
+    digits = text[1:] if text[:1] in ("-", "+") else text
+    if digits.isdecimal():
+        return int(text)
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _parse_flat_list(text: str) -> List[Any] or None:
+    """
+    Parse a flat list of numbers and quoted strings, e.g. ['source', 0, 1, 'sink'].
+
+    :param text: the text to parse (already stripped)
+    :return: the list, or None if text is not a flat list
+    """
+    if len(text) < 2 or text[0] != "[" or text[-1] != "]" or "[" in text[1:-1]:
+        return None
+    body = text[1:-1].strip()
+    if len(body) == 0:
+        return []
+    values: List[Any] = []
+    for item in body.split(","):
+        item = item.strip()
+        if item.isdecimal():
+            values.append(int(item))
+        elif len(item) >= 2 and item[0] == item[-1] and item[0] in ("'", '"') and item[0] not in item[1:-1] and \
+                "\\" not in item:
+            values.append(item[1:-1])
+        else:
+            number = _parse_number(item)
+            if number is None:
+                return None
+            values.append(number)
+    return values
+
+
+def _eval_node(node: ast.AST) -> Any:
+    """
+    Evaluate a restricted expression (numbers, strings, units, lists and arithmetic).
+
+    :param node: ast node
+    :return: value of the expression
+    """
+    if isinstance(node, ast.Constant):
+        return node.value
+    elif isinstance(node, ast.Name):
+        assert node.id in CONFIG_UNITS, f"Unknown name {node.id} in config!"
+        return CONFIG_UNITS[node.id]
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _eval_node(node.operand)
+        return -operand if isinstance(node.op, ast.USub) else operand
+    elif isinstance(node, ast.BinOp):
+        left, right = _eval_node(node.left), _eval_node(node.right)
+        if isinstance(node.op, ast.Add):
+            return left + right
+        elif isinstance(node.op, ast.Sub):
+            return left - right
+        elif isinstance(node.op, ast.Mult):
+            return left * right
+        elif isinstance(node.op, ast.Div):
+            return left / right
+        elif isinstance(node.op, ast.Pow):
+            return left ** right
+    elif isinstance(node, (ast.List, ast.Tuple)):
+        values = [_eval_node(element) for element in node.elts]
+        return values if isinstance(node, ast.List) else tuple(values)
+    assert False, f"Unsupported expression in config: {ast.dump(node)}!"
+
+
+def parse_value(text: str) -> Any:
+    """
+    Parse a value in config files without eval. Supported values:
+        1. numbers, e.g. 1000 or 0.5
+        2. numbers with units, e.g. 10 * gbps, 24000.0 * MB, 1 * MilliSec
+        3. quoted strings and lists, e.g. "T4" or ['source', 0, 1, 'sink']
+        4. other arithmetic expressions of numbers and units
+    The result is the same as eval (with units imported) for all values above.
+
+    :param text: the text to parse
+    :return: value
+    """
+    text = text.strip()
+
+    # fast path 1: plain numbers
+    number = _parse_number(text)
+    if number is not None:
+        return number
+
+    # fast path 2: "<number> * <unit>"
+    parts = text.split("*")
+    if len(parts) == 2:
+        number, unit = _parse_number(parts[0].strip()), parts[1].strip()
+        if number is not None and unit in CONFIG_UNITS:
+            return number * CONFIG_UNITS[unit]
+
+    # fast path 3: flat lists
+    values = _parse_flat_list(text)
+    if values is not None:
+        return values
+
+    # slow path: restricted expressions
+    return _eval_node(ast.parse(text, mode="eval").body)
+
+
+def read_ini_file(file_name: str) -> Dict[str, Dict[str, str]]:
+    """
+    Read an ini file into {section -> {key -> raw value}}. This is a much faster replacement of ConfigParser
+    for the large files used in this project (e.g. cluster files with O(n^2) link sections).
+    Note: 1. comments start with "#" or ";" and must occupy a whole line
+          2. keys are lower-cased (same as ConfigParser)
+
+    :param file_name: name of the ini file
+    :return: {section -> {key -> raw value}}
+    """
+    config: Dict[str, Dict[str, str]] = {}
+    cur_section: Dict[str, str] or None = None
+    with open(file_name, "r") as file:
+        for line in file:
+            line = line.strip()
+            if len(line) == 0 or line[0] == "#" or line[0] == ";":
+                continue
+            if line[0] == "[":
+                assert line[-1] == "]", f"Bad section header: {line}!"
+                section_name = line[1:-1].strip()
+                assert section_name not in config, f"Found duplicate section {section_name}!"
+                cur_section = {}
+                config[section_name] = cur_section
+                continue
+            assert cur_section is not None, "Found key before any section!"
+            separator = line.find("=")
+            if separator == -1:
+                separator = line.find(":")
+            assert separator > 0, f"Bad line in ini file: {line}!"
+            cur_section[line[:separator].strip().lower()] = line[separator + 1:].strip()
+    return config
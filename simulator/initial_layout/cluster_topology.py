@@ -0,0 +1,358 @@
+# 2026.10.19 Yixuan Mei
+
+import os
+import re
+import threading
+
+import numpy as np
+
+from typing import Dict, List, Tuple
+
+from simulator.event_simulator.typed_config import CONFIG_UNITS, parse_value
+
+# encoding of source and sink in the integer arrays of ClusterTopology
+SOURCE_CODE: int = -1
+SINK_CODE: int = -2
+
+# suffix of the binary cache file created next to an ini cluster file
+BINARY_CACHE_SUFFIX: str = ".topology.npz"
+
+# link sections in standard format: [Link-<from>-<to>], bandwidth=<number> * <unit>, latency=<number> * <unit>
+_NUMBER: str = r"([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+LINK_SECTION_PATTERN: re.Pattern = re.compile(
+    r"^\[Link-(source|\d+)-(\d+|sink)\][ \t]*\n"
+    rf"[ \t]*bandwidth[ \t]*=[ \t]*{_NUMBER}[ \t]*\*[ \t]*(\w+)[ \t]*\n"
+    rf"[ \t]*latency[ \t]*=[ \t]*{_NUMBER}[ \t]*\*[ \t]*(\w+)[ \t]*$",
+    re.MULTILINE
+)
+
+
+def _encode(node: int or str) -> int:
+    """ Encode a node ("source", "sink" or compute node index) as an integer. """
+    if node == "source":
+        return SOURCE_CODE
+    elif node == "sink":
+        return SINK_CODE
+    else:
+        return int(node)
+
+
+def _decode(code: int) -> int or str:
+    """ Decode an integer back to "source", "sink" or compute node index. """
+    if code == SOURCE_CODE:
+        return "source"
+    elif code == SINK_CODE:
+        return "sink"
+    else:
+        return code
+
+
+class ClusterTopology:
+    def __init__(self, node_types: List[str], source_connected_nodes: List[int], sink_connected_nodes: List[int],
+                 connected_nodes: List[List[int or str]], links: List[Tuple[int or str, int or str]],
+                 link_bandwidth: np.ndarray, link_latency: np.ndarray, header: List[str]) -> None:
+        """
+        Typed in-memory representation of a cluster file (the ones generated by FakeClusterGenerator).
+        Note: 1. all lists keep the order in the cluster file, so that layouts built from the topology are
+                 the same as the ones built from the file directly
+              2. links are bidirectional, compute-compute links are stored as (i, j) with i < j
+              3. in the dense matrices, compute node i has index i, source has index n and sink has index n + 1
+              4. topologies are shared by all users (see load_cluster_topology), do not modify them
+
+        :param node_types: machine type of each compute node
+        :param source_connected_nodes: compute nodes connected with source
+        :param sink_connected_nodes: compute nodes connected with sink
+        :param connected_nodes: connected nodes of each compute node (may contain "source" and "sink")
+        :param links: end points of each link
+        :param link_bandwidth: bandwidth of each link
+        :param link_latency: latency of each link
+        :param header: comment lines at the beginning of the file
+        :return: None
+        """
+        assert len(connected_nodes) == len(node_types), "Number of compute nodes mismatch!"
+        assert len(links) == len(link_bandwidth) == len(link_latency), "Number of links mismatch!"
+
+        # nodes
+        self.num_compute_nodes: int = len(node_types)
+        self.node_types: List[str] = node_types
+        self.source_connected_nodes: List[int] = source_connected_nodes
+        self.sink_connected_nodes: List[int] = sink_connected_nodes
+        self.connected_nodes: List[List[int or str]] = connected_nodes
+        self.header: List[str] = header
+
+        # links
+        self.links: List[Tuple[int or str, int or str]] = links
+        self.link_bandwidth: np.ndarray = np.asarray(link_bandwidth, dtype=np.float64)
+        self.link_latency: np.ndarray = np.asarray(link_latency, dtype=np.float64)
+
+        # dense matrices
+        self.source_index: int = self.num_compute_nodes
+        self.sink_index: int = self.num_compute_nodes + 1
+        num_entities: int = self.num_compute_nodes + 2
+        from_indices = np.array([self.index_of(_from) for _from, _ in links], dtype=np.int64)
+        to_indices = np.array([self.index_of(_to) for _, _to in links], dtype=np.int64)
+        self.adjacency: np.ndarray = np.zeros((num_entities, num_entities), dtype=bool)
+        self.bandwidth: np.ndarray = np.zeros((num_entities, num_entities), dtype=np.float64)
+        self.latency: np.ndarray = np.zeros((num_entities, num_entities), dtype=np.float64)
+        for rows, cols in [(from_indices, to_indices), (to_indices, from_indices)]:
+            self.adjacency[rows, cols] = True
+            self.bandwidth[rows, cols] = self.link_bandwidth
+            self.latency[rows, cols] = self.link_latency
+
+    def index_of(self, node: int or str) -> int:
+        """
+        Get the index of a node in the dense matrices.
+
+        :param node: "source", "sink" or compute node index
+        :return: index in the dense matrices
+        """
+        if node == "source":
+            return self.source_index
+        elif node == "sink":
+            return self.sink_index
+        else:
+            assert 0 <= node < self.num_compute_nodes, "Bad compute node index!"
+            return node
+
+    def link_name(self, link_idx: int) -> str:
+        """
+        Get the section name of a link in the cluster file.
+
+        :param link_idx: index of the link
+        :return: section name (e.g. Link-source-0, Link-0-1, Link-1-sink)
+        """
+        from_node, to_node = self.links[link_idx]
+        return f"Link-{from_node}-{to_node}"
+
+    def is_complete_graph(self) -> bool:
+        """
+        Check whether the topology is a complete graph (every compute node is connected with source, sink
+        and all other compute nodes).
+
+        :return: whether the topology is a complete graph
+        """
+        n = self.num_compute_nodes
+        if sorted(self.source_connected_nodes) != list(range(n)) or sorted(self.sink_connected_nodes) != list(range(n)):
+            return False
+        declared = np.zeros((n, n + 2), dtype=np.int64)
+        for node_idx, cur_connected_nodes in enumerate(self.connected_nodes):
+            if len(cur_connected_nodes) != n + 1:
+                return False
+            if cur_connected_nodes[0] != "source" or cur_connected_nodes[-1] != "sink":
+                return False
+            declared[node_idx, cur_connected_nodes[1:-1]] += 1
+        expected = np.ones((n, n), dtype=np.int64) - np.eye(n, dtype=np.int64)
+        if not np.array_equal(declared[:, :n], expected):
+            return False
+        # connected nodes must also be in increasing order (same as the files generated by FakeClusterGenerator)
+        return all(cur_connected_nodes[1:-1] == sorted(cur_connected_nodes[1:-1])
+                   for cur_connected_nodes in self.connected_nodes)
+
+    def save_binary(self, file_name: str, source_mtime_ns: int = -1, source_size: int = -1) -> None:
+        """
+        Save the topology in binary format (npz).
+
+        :param file_name: name of the binary file
+        :param source_mtime_ns: modification time of the ini file this topology comes from (-1 = none)
+        :param source_size: size of the ini file this topology comes from (-1 = none)
+        :return: None
+        """
+        connected_indptr = np.cumsum([0] + [len(_nodes) for _nodes in self.connected_nodes], dtype=np.int64)
+        connected_codes = np.array([_encode(_node) for _nodes in self.connected_nodes for _node in _nodes],
+                                   dtype=np.int64)
+        with open(file_name, "wb") as file:
+            np.savez(file,
+                     node_types=np.array(self.node_types, dtype=str),
+                     source_connected_nodes=np.array(self.source_connected_nodes, dtype=np.int64),
+                     sink_connected_nodes=np.array(self.sink_connected_nodes, dtype=np.int64),
+                     connected_indptr=connected_indptr,
+                     connected_codes=connected_codes,
+                     link_from=np.array([_encode(_from) for _from, _ in self.links], dtype=np.int64),
+                     link_to=np.array([_encode(_to) for _, _to in self.links], dtype=np.int64),
+                     link_bandwidth=self.link_bandwidth,
+                     link_latency=self.link_latency,
+                     header=np.array(self.header, dtype=str),
+                     source_stat=np.array([source_mtime_ns, source_size], dtype=np.int64))
+
+
+def _parse_link_sections_fast(content: str, num_link_sections: int) -> \
+        Tuple[List[Tuple[int or str, int or str]], np.ndarray, np.ndarray] or None:
+    """
+    Parse all link sections with one regex pass and vectorized number conversion. This only works when all
+    link sections have the standard format written by the cluster generators, i.e.
+        [Link-<from>-<to>]
+        bandwidth=<number> * <unit>
+        latency=<number> * <unit>
+
+    :param content: content of the cluster file
+    :param num_link_sections: number of link sections in the file
+    :return: links, link bandwidth, link latency (or None if some link is not in standard format)
+    """
+    matches: List[Tuple[str, ...]] = LINK_SECTION_PATTERN.findall(content)
+    if len(matches) != num_link_sections:
+        return None
+    if len(matches) == 0:
+        return [], np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.float64)
+    from_nodes, to_nodes, bandwidth_numbers, bandwidth_units, latency_numbers, latency_units = zip(*matches)
+    if not set(bandwidth_units).union(latency_units).issubset(CONFIG_UNITS.keys()):
+        return None
+
+    # end points
+    links: List[Tuple[int or str, int or str]] = [
+        (_from if _from == "source" else int(_from), _to if _to == "sink" else int(_to))
+        for _from, _to in zip(from_nodes, to_nodes)
+    ]
+
+    # values (the same as python's number * unit, since numbers and units are converted to float anyway)
+    link_bandwidth = np.array(bandwidth_numbers, dtype=np.float64) * \
+        np.array([CONFIG_UNITS[_unit] for _unit in bandwidth_units], dtype=np.float64)
+    link_latency = np.array(latency_numbers, dtype=np.float64) * \
+        np.array([CONFIG_UNITS[_unit] for _unit in latency_units], dtype=np.float64)
+    return links, link_bandwidth, link_latency
+
+
+def _parse_ini_topology(file_name: str) -> ClusterTopology:
+    """
+    Parse a cluster file in ini format. This parser is specialized for cluster files and is much faster than
+    ConfigParser + eval on large clusters.
+
+    :param file_name: name of the cluster file
+    :return: cluster topology
+    """
+    header: List[str] = []
+    total_compute_nodes: int = -1
+    source_connected_nodes: List[int] = []
+    sink_connected_nodes: List[int] = []
+    node_info: Dict[int, Dict[str, str]] = {}
+    link_sections: List[str] = []
+
+    # split the file into sections
+    with open(file_name, "r") as file:
+        content = file.read()
+    sections: List[str] = ("\n" + content).split("\n[")
+    for line in sections[0].split("\n"):
+        line = line.strip()
+        if len(line) > 0 and (line[0] == "#" or line[0] == ";"):
+            header.append(line)
+
+    def parse_section(_section: str) -> Tuple[str, Dict[str, str]]:
+        # parse key = value (whole-line comments are skipped)
+        _section_name, _, _body = _section.partition("]")
+        _entries: Dict[str, str] = {}
+        for _line in _body.split("\n"):
+            _key, _separator, _value = _line.partition("=")
+            _key = _key.strip()
+            if len(_key) == 0 or _key[0] == "#" or _key[0] == ";":
+                continue
+            assert len(_separator) > 0, f"Bad line in cluster file: {_line}!"
+            _entries[_key.lower()] = _value.strip()
+        return _section_name.strip(), _entries
+
+    # nodes
+    for section in sections[1:]:
+        if section.startswith("Link-"):
+            link_sections.append(section)
+            continue
+        section_name, entries = parse_section(_section=section)
+        if section_name.startswith("ComputeNode-"):
+            cur_node = int(section_name.split("-")[1])
+            assert cur_node not in node_info, f"Found duplicate section {section_name}!"
+            node_info[cur_node] = entries
+        elif section_name == "NodeNames":
+            total_compute_nodes = parse_value(entries["total_compute_nodes"])
+        elif section_name == "SourceNode":
+            source_connected_nodes = parse_value(entries["connected_nodes"])
+        elif section_name == "SinkNode":
+            sink_connected_nodes = parse_value(entries["connected_nodes"])
+
+    # links (fall back to parsing section by section if some link is not in standard format)
+    parsed_links = _parse_link_sections_fast(content=content, num_link_sections=len(link_sections))
+    if parsed_links is not None:
+        links, link_bandwidth, link_latency = parsed_links
+    else:
+        links, bandwidth_list, latency_list = [], [], []
+        for section in link_sections:
+            section_name, entries = parse_section(_section=section)
+            _, from_node, to_node = section_name.split("-")
+            links.append((from_node if from_node == "source" else int(from_node),
+                          to_node if to_node == "sink" else int(to_node)))
+            bandwidth_list.append(parse_value(entries["bandwidth"]))
+            latency_list.append(parse_value(entries["latency"]))
+        link_bandwidth, link_latency = np.array(bandwidth_list), np.array(latency_list)
+
+    # check and build the topology
+    assert total_compute_nodes >= 0, "Cluster file has no [NodeNames] section!"
+    assert sorted(node_info.keys()) == list(range(total_compute_nodes)), "Compute node sections mismatch!"
+    node_types: List[str] = [node_info[_idx]["type"] for _idx in range(total_compute_nodes)]
+    connected_nodes: List[List[int or str]] = [parse_value(node_info[_idx]["connected_nodes"])
+                                               for _idx in range(total_compute_nodes)]
+    return ClusterTopology(node_types=node_types, source_connected_nodes=source_connected_nodes,
+                           sink_connected_nodes=sink_connected_nodes, connected_nodes=connected_nodes, links=links,
+                           link_bandwidth=link_bandwidth, link_latency=link_latency, header=header)
+
+
+def _load_binary_topology(file_name: str) -> Tuple[ClusterTopology, Tuple[int, int]]:
+    """
+    Load a cluster topology saved by ClusterTopology.save_binary.
+
+    :param file_name: name of the binary file
+    :return: cluster topology, (source_mtime_ns, source_size)
+    """
+    with np.load(file_name, allow_pickle=False) as data:
+        connected_indptr = data["connected_indptr"].tolist()
+        connected_codes = data["connected_codes"].tolist()
+        connected_nodes = [[_decode(_code) for _code in connected_codes[connected_indptr[i]: connected_indptr[i + 1]]]
+                           for i in range(len(connected_indptr) - 1)]
+        links = [(_decode(_from), _decode(_to)) for _from, _to in zip(data["link_from"].tolist(),
+                                                                      data["link_to"].tolist())]
+        topology = ClusterTopology(node_types=data["node_types"].tolist(),
+                                   source_connected_nodes=data["source_connected_nodes"].tolist(),
+                                   sink_connected_nodes=data["sink_connected_nodes"].tolist(),
+                                   connected_nodes=connected_nodes, links=links,
+                                   link_bandwidth=data["link_bandwidth"], link_latency=data["link_latency"],
+                                   header=data["header"].tolist())
+        source_stat = data["source_stat"].tolist()
+    return topology, (source_stat[0], source_stat[1])
+
+
+# process-wide cache of loaded topologies: (real path, mtime_ns, size) -> ClusterTopology
+_topology_cache: Dict[Tuple[str, int, int], ClusterTopology] = {}
+_topology_cache_lock: threading.Lock = threading.Lock()
+
+
+def load_cluster_topology(file_name: str, use_binary_cache: bool = False) -> ClusterTopology:
+    """
+    Load a cluster file (ini format, or binary format saved by ClusterTopology.save_binary if the file name
+    ends with .npz). Loaded topologies are cached in memory, so that each file is only parsed once by all
+    layout methods in the same process.
+
+    :param file_name: name of the cluster file
+    :param use_binary_cache: if True, a binary cache (<file_name>.topology.npz) is created next to the ini
+                             file and used in later loads (invalidated when the ini file changes)
+    :return: cluster topology (shared, do not modify)
+    """
+    file_stat = os.stat(file_name)
+    cache_key = (os.path.realpath(file_name), file_stat.st_mtime_ns, file_stat.st_size)
+    with _topology_cache_lock:
+        if cache_key in _topology_cache:
+            return _topology_cache[cache_key]
+
+        if file_name.endswith(".npz"):
+            # binary cluster file
+            topology, _ = _load_binary_topology(file_name=file_name)
+        else:
+            # ini cluster file (possibly with binary cache)
+            topology = None
+            cache_file_name = file_name + BINARY_CACHE_SUFFIX
+            if use_binary_cache and os.path.exists(cache_file_name):
+                cached_topology, source_stat = _load_binary_topology(file_name=cache_file_name)
+                if source_stat == (file_stat.st_mtime_ns, file_stat.st_size):
+                    topology = cached_topology
+            if topology is None:
+                topology = _parse_ini_topology(file_name=file_name)
+                if use_binary_cache:
+                    topology.save_binary(file_name=cache_file_name, source_mtime_ns=file_stat.st_mtime_ns,
+                                         source_size=file_stat.st_size)
+
+        _topology_cache[cache_key] = topology
+        return topology
@@ -0,0 +1,503 @@
+# 2026.10.19 Yixuan Mei
+
+import os
+import math
+import time
+import random
+
+from typing import Dict, List, Tuple
+
+from simulator.event_simulator.cluster_simulator import ClusterSimulator, SchedulingMethod, RequestPhase
+from simulator.scheduler.global_maxflow.global_maxflow_scheduler import KVParameters, SchedulingMode
+from simulator.trace_generator.simulator_query_feeder import OfflineRequestFeeder
+from simulator.model_manager.model_manager import ModelManager
+from simulator.initial_layout.cluster_topology import ClusterTopology, load_cluster_topology
+from simulator.initial_layout.fake_cluster_generator import write_sub_cluster
+from simulator.initial_layout.heterogeneous_layout.petals_layout import PetalsLayout
+from simulator.initial_layout.layout_cache import write_solution_layers
+from simulator.initial_layout.local_search_layout import LocalSearchLayout, LayoutFlowNetwork, local_search
+
+
+class CoPlacementLayout:
+    # Usage:
+    # 1. call "from_ini" to load a complete cluster topology and machine profile
+    # 2. call "search_layout" to split the machines between the models and place each model
+    # 3. call "save_layouts" to get the cluster file, simulator cluster file and solution of each model, and
+    #    "save_search_statistics" to compare with a static partition of the machines
+    # 4. call "simulate_co_placement" to compare the decode throughput of the co-placement and the static
+    #    partition in the simulator
+
+    def __init__(self, model_managers: List[ModelManager], weights: List[float],
+                 demands: List[float] or None = None) -> None:
+        """
+        Co-placement of multiple models on one cluster. Each machine serves one of the models (so VRAM and NIC
+        of a machine are never shared), and the objective is the weighted sum of the max flow of each model,
+        where the flow of each model is capped by its demand (if given).
+
+        :param model_managers: model manager of each model
+        :param weights: weight of each model in the objective
+        :param demands: [Optional] demand (max useful flow) of each model
+        :return: None
+        """
+        assert len(model_managers) >= 2, "Co-placement needs at least two models!"
+        assert len(weights) == len(model_managers), "Need one weight per model!"
+        assert demands is None or len(demands) == len(model_managers), "Need one demand per model!"
+        self.model_managers: List[ModelManager] = model_managers
+        self.num_models: int = len(model_managers)
+        self.weights: List[float] = weights
+        self.demands: List[float] = demands if demands is not None else [math.inf] * self.num_models
+
+        # loaded problem information
+        self.cluster_file_name: str or None = None
+        self.machine_profile_name: str or None = None
+        self.topology: ClusterTopology or None = None
+        self.layouts: List[LocalSearchLayout] = []
+        self.cluster_loaded: bool = False
+
+        # solution
+        # model_assignment[i] is the model served by compute node i (in the order of node_keys)
+        self.node_keys: List[int] = []
+        self.model_assignment: List[int] = []
+        self.starts: List[List[int]] = []
+        self.counts: List[List[int]] = []
+        self.flows: List[float] = []
+        self.objective: float = -1
+        self.solution_found: bool = False
+
+        # layout of each model on its sub cluster (set by save_layouts)
+        self.model_layouts: List[LocalSearchLayout] = []
+
+        # search statistics
+        self.static_model_assignment: List[int] = []
+        self.static_starts: List[List[int]] = []
+        self.static_counts: List[List[int]] = []
+        self.static_flows: List[float] = []
+        self.static_objective: float = -1
+        self.num_moves: int = -1
+        self.num_reassignments: int = -1
+        self.search_time: float = -1
+
+    def from_ini(self, cluster_file_name: str, machine_profile_name: str) -> None:
+        """
+        Load cluster topology and machine profiles.
+
+        :param cluster_file_name: name of the file that stores cluster topology
+        :param machine_profile_name: name of the file that stores machine profiling results
+        :return: None
+        """
+        self.cluster_file_name = cluster_file_name
+        self.machine_profile_name = machine_profile_name
+        self.topology = load_cluster_topology(file_name=cluster_file_name)
+        self.layouts = []
+        for model_manager in self.model_managers:
+            layout = LocalSearchLayout(model_manager=model_manager)
+            layout.from_ini(cluster_file_name=cluster_file_name, machine_profile_name=machine_profile_name)
+            self.layouts.append(layout)
+        self.cluster_loaded = True
+
+    def get_objective(self, flows: List[float]) -> float:
+        """
+        Get the objective of the co-placement.
+
+        :param flows: max flow of each model
+        :return: weighted sum of the flows (capped by demands)
+        """
+        return sum(weight * min(flow, demand) for weight, flow, demand in zip(self.weights, flows, self.demands))
+
+    def get_static_model_assignment(self) -> List[int]:
+        """
+        Statically partition the machines between the models: machines of each type are split in proportion
+        to the weights (largest remainder), like a hand partition of the cluster.
+
+        :return: model served by each compute node
+        """
+        node_types: List[str] = [self.topology.node_types[node_idx] for node_idx in self.node_keys]
+        model_assignment: List[int] = [-1 for _ in self.node_keys]
+        for machine_type in sorted(set(node_types)):
+            node_ids: List[int] = [node_id for node_id, node_type in enumerate(node_types)
+                                   if node_type == machine_type]
+            shares: List[float] = [len(node_ids) * weight / sum(self.weights) for weight in self.weights]
+            num_nodes: List[int] = [math.floor(share) for share in shares]
+            by_remainder = sorted(range(self.num_models), key=lambda _model: num_nodes[_model] - shares[_model])
+            for model_idx in by_remainder[:len(node_ids) - sum(num_nodes)]:
+                num_nodes[model_idx] += 1
+            offsets: List[int] = [sum(num_nodes[:model_idx]) for model_idx in range(self.num_models)]
+            for model_idx in range(self.num_models):
+                for node_id in node_ids[offsets[model_idx]: offsets[model_idx] + num_nodes[model_idx]]:
+                    model_assignment[node_id] = model_idx
+        return model_assignment
+
+    def get_initial_layout(self, model_idx: int, node_ids: List[int], seed: int) -> Tuple[List[int], List[int]]:
+        """
+        Place one model on the given compute nodes with Petals. Other compute nodes hold no layer.
+
+        :param model_idx: index of the model
+        :param node_ids: compute nodes that serve the model
+        :param seed: random seed of Petals
+        :return: start and count of each compute node
+        """
+        petals_layout = PetalsLayout(model_manager=self.model_managers[model_idx])
+        petals_layout.from_ini(cluster_file_name=self.cluster_file_name,
+                               machine_profile_name=self.machine_profile_name)
+        petals_layout.nodes = {self.node_keys[node_id]: petals_layout.nodes[self.node_keys[node_id]]
+                               for node_id in node_ids}
+        petals_layout.synthesize(seed=seed)
+        start, count = [0 for _ in self.node_keys], [0 for _ in self.node_keys]
+        for node_id in node_ids:
+            compute_node = petals_layout.nodes[self.node_keys[node_id]]
+            start[node_id] = compute_node.start_layer_idx
+            count[node_id] = compute_node.end_layer_idx - compute_node.start_layer_idx
+        return start, count
+
+    def propose_reassignment(self, networks: List[LayoutFlowNetwork], rng: random.Random) -> \
+            Tuple[int, int, int, int, int] or None:
+        """
+        Propose to move a compute node to another model. The node starts at layer 0 or at the end of a node of
+        the new model (so that it extends a pipeline) and holds as many layers as it can.
+
+        :param networks: flow network of each model
+        :param rng: random number generator
+        :return: (node_id, old model, new model, start, count), None if the proposed move is not valid
+        """
+        node_id = rng.randrange(len(self.node_keys))
+        old_model_idx = self.model_assignment[node_id]
+        new_model_idx = rng.choice([model_idx for model_idx in range(self.num_models) if
+                                    not model_idx == old_model_idx])
+        if len(networks[old_model_idx].active_nodes) == 1:
+            return None
+        network = networks[new_model_idx]
+        new_start = rng.choice([0] + [network.start[_id] + network.count[_id] for _id in network.active_nodes
+                                      if network.start[_id] + network.count[_id] < network.num_layers])
+        new_count = min(network.max_num_layers[node_id], network.num_layers - new_start)
+        return node_id, old_model_idx, new_model_idx, new_start, new_count
+
+    def search_layout(self, allow_partial_inference: bool, seed: int, max_run_time: float, patience: int,
+                      reassign_probability: float = 0.2) -> float:
+        """
+        Jointly search the machine partition and the placement of each model with max-flow-guided local search.
+        Each move either changes the layer windows of one model (see LayoutFlowNetwork.propose_move) or moves a
+        compute node to another model. Moves that do not decrease the objective are accepted.
+        Note: the search starts from the static partition (see get_static_model_assignment), where each model
+              is first searched separately with local search for half of max_run_time. From there, the baseline
+              that the co-placement is compared with continues the separate searches, and the joint search
+              starts, each for the other half of max_run_time. So both get max_run_time in total.
+
+        :param allow_partial_inference: whether partial inference is allowed
+        :param seed: random seed
+        :param max_run_time: max search time of the baseline and of the co-placement (each)
+        :param patience: stop after this many moves without improvement
+        :param reassign_probability: probability that a move changes the model of a compute node
+        :return: objective of the co-placement found
+        """
+        assert self.cluster_loaded, "Cluster must be loaded before searching for layout!"
+        search_start_time: float = time.time()
+        rng = random.Random(seed)
+
+        # Step 1: build the flow network of each model and the static partition
+        networks: List[LayoutFlowNetwork] = [layout.get_flow_network(allow_partial_inference=allow_partial_inference)
+                                             for layout in self.layouts]
+        self.node_keys = self.layouts[0].node_keys
+        self.static_model_assignment = self.get_static_model_assignment()
+        initial_layouts: List[Tuple[List[int], List[int]]] = []
+        for model_idx in range(self.num_models):
+            node_ids = [node_id for node_id, _model in enumerate(self.static_model_assignment) if _model == model_idx]
+            assert len(node_ids) > 0, "Each model must be served by at least one compute node!"
+            initial_layouts.append(self.get_initial_layout(model_idx=model_idx, node_ids=node_ids, seed=seed))
+        print("# ------------------------------------------------------------------------------------------ #")
+        print(f"[Co-Placement Layout - Info] Place {self.num_models} models on {len(self.node_keys)} nodes "
+              f"(weights {self.weights}, demands {self.demands}).")
+
+        # Step 2: search each model on its static partition (half of the time), where the joint search starts
+        shared_layouts: List[Tuple[List[int], List[int]]] = []
+        for model_idx, network in enumerate(networks):
+            network.set_active_nodes(node_ids=[node_id for node_id, _model in
+                                               enumerate(self.static_model_assignment) if _model == model_idx])
+            _, start, count, _ = local_search(network=network, start=initial_layouts[model_idx][0],
+                                              count=initial_layouts[model_idx][1], seed=seed, num_perturb_moves=0,
+                                              max_run_time=max_run_time / 2 / self.num_models, patience=patience,
+                                              flow_upper_bound=math.inf)
+            shared_layouts.append((start, count))
+
+        # Step 3: baseline, continue the search of each model on its static partition (the other half)
+        self.static_flows = []
+        static_layouts: List[Tuple[List[int], List[int]]] = []
+        for model_idx, network in enumerate(networks):
+            flow, start, count, _ = local_search(network=network, start=shared_layouts[model_idx][0],
+                                                 count=shared_layouts[model_idx][1], seed=seed + 1,
+                                                 num_perturb_moves=0, max_run_time=max_run_time / 2 / self.num_models,
+                                                 patience=patience, flow_upper_bound=math.inf)
+            self.static_flows.append(flow)
+            static_layouts.append((start, count))
+        self.static_starts = [layout[0] for layout in static_layouts]
+        self.static_counts = [layout[1] for layout in static_layouts]
+        self.static_objective = self.get_objective(flows=self.static_flows)
+        print(f"[Co-Placement Layout - Info] Static partition: objective {self.static_objective} "
+              f"(flows {[round(flow, 2) for flow in self.static_flows]}).")
+
+        # Step 4: joint search (the other half), which starts from the same layouts as the baseline in step 3
+        #         and also moves nodes between models
+        self.model_assignment = list(self.static_model_assignment)
+        flows: List[float] = [network.set_layout(start=shared_layouts[model_idx][0], count=shared_layouts[model_idx][1])
+                              for model_idx, network in enumerate(networks)]
+        current_objective = self.get_objective(flows=flows)
+        best_objective, best_flows = current_objective, list(flows)
+        best_assignment = list(self.model_assignment)
+        best_layouts = [(list(network.start), list(network.count)) for network in networks]
+        joint_start_time: float = time.time()
+        self.num_moves, self.num_reassignments, moves_since_improvement = 0, 0, 0
+        while moves_since_improvement < patience and time.time() - joint_start_time < max_run_time / 2:
+            if rng.random() < reassign_probability:
+                # move a compute node to another model
+                reassignment = self.propose_reassignment(networks=networks, rng=rng)
+                if reassignment is None:
+                    continue
+                node_id, old_model_idx, new_model_idx, new_start, new_count = reassignment
+                new_flows = list(flows)
+                new_flows[old_model_idx] = networks[old_model_idx].move(node_ids=[node_id], starts=[0], counts=[0])
+                new_flows[new_model_idx] = networks[new_model_idx].move(node_ids=[node_id], starts=[new_start],
+                                                                        counts=[new_count])
+                changed_models = [old_model_idx, new_model_idx]
+            else:
+                # change the layer windows of one model
+                model_idx = rng.randrange(self.num_models)
+                proposed_move = networks[model_idx].propose_move(rng=rng)
+                if proposed_move is None:
+                    continue
+                new_flows = list(flows)
+                new_flows[model_idx] = networks[model_idx].move(*proposed_move)
+                node_id, old_model_idx, new_model_idx = -1, -1, -1
+                changed_models = [model_idx]
+            self.num_moves += 1
+            moves_since_improvement += 1
+
+            # accept or revert the move
+            new_objective = self.get_objective(flows=new_flows)
+            if new_objective < current_objective - 1e-9:
+                for model_idx in changed_models:
+                    networks[model_idx].undo()
+                continue
+            if not node_id == -1:
+                self.model_assignment[node_id] = new_model_idx
+                networks[old_model_idx].set_active_nodes(
+                    node_ids=[_id for _id in networks[old_model_idx].active_nodes if not _id == node_id])
+                networks[new_model_idx].set_active_nodes(node_ids=networks[new_model_idx].active_nodes + [node_id])
+                self.num_reassignments += 1
+            flows, current_objective = new_flows, new_objective
+            if current_objective > best_objective + 1e-9:
+                best_objective, best_flows = current_objective, list(flows)
+                best_assignment = list(self.model_assignment)
+                best_layouts = [(list(network.start), list(network.count)) for network in networks]
+                moves_since_improvement = 0
+
+        # Step 5: keep the best co-placement
+        self.model_assignment = best_assignment
+        self.starts = [layout[0] for layout in best_layouts]
+        self.counts = [layout[1] for layout in best_layouts]
+        self.flows, self.objective = best_flows, best_objective
+        self.search_time = time.time() - search_start_time
+        self.solution_found = True
+        print(f"[Co-Placement Layout - Info] Joint search: objective {self.objective} "
+              f"(flows {[round(flow, 2) for flow in self.flows]}) after {self.num_moves} moves "
+              f"({self.num_reassignments} reassignments) in {self.search_time:.2f} seconds.")
+        if self.static_objective > 0:
+            print(f"[Co-Placement Layout - Info] Gain over static partition: "
+                  f"{round((self.objective / self.static_objective - 1) * 100, 2)}%.")
+        print("# ------------------------------------------------------------------------------------------ #")
+        return self.objective
+
+    def write_model_layouts(self, workspace_path: str, allow_partial_inference: bool, model_assignment: List[int],
+                            starts: List[List[int]], counts: List[List[int]],
+                            flows: List[float]) -> List[LocalSearchLayout]:
+        """
+        Write the layout of each model into workspace_path/model_{idx}:
+            cluster.ini: sub cluster of the compute nodes that serve the model (renumbered)
+            simulator_cluster.ini: simulator cluster file of the model
+            co_placement_sol.ini: layout of the model (on the sub cluster)
+
+        :param workspace_path: path to the workspace
+        :param allow_partial_inference: whether partial inference is allowed
+        :param model_assignment: model served by each compute node
+        :param starts: start layer of each compute node for each model
+        :param counts: number of layers of each compute node for each model
+        :param flows: max flow of each model (checked against the flow on the sub cluster)
+        :return: layout of each model on its sub cluster
+        """
+        model_layouts: List[LocalSearchLayout] = []
+        for model_idx in range(self.num_models):
+            model_path = os.path.join(workspace_path, f"model_{model_idx}")
+            os.makedirs(model_path, exist_ok=True)
+
+            # Step 1: sub cluster of the model
+            node_ids: List[int] = [node_id for node_id, _model in enumerate(model_assignment)
+                                   if _model == model_idx]
+            write_sub_cluster(topology=self.topology, complete_cluster_file_name=self.cluster_file_name,
+                              sub_cluster_file_name=os.path.join(model_path, "cluster.ini"),
+                              node_indices=[self.node_keys[node_id] for node_id in node_ids],
+                              sub_cluster_settings=[f"model: {self.model_managers[model_idx].model_name}",
+                                                    f"weight: {self.weights[model_idx]}",
+                                                    f"demand: {self.demands[model_idx]}"])
+
+            # Step 2: layout of the model on the sub cluster
+            layers: Dict[int, List[int]] = {
+                sub_node_idx: list(range(starts[model_idx][node_id],
+                                         starts[model_idx][node_id] + counts[model_idx][node_id]))
+                for sub_node_idx, node_id in enumerate(node_ids)
+            }
+            write_solution_layers(solution_file_name=os.path.join(model_path, "co_placement_sol.ini"),
+                                  layers=layers, node_idx_offset=2)
+            model_layout = LocalSearchLayout(model_manager=self.model_managers[model_idx])
+            model_layout.from_ini(cluster_file_name=os.path.join(model_path, "cluster.ini"),
+                                  machine_profile_name=self.machine_profile_name)
+            flow = model_layout.load_solution(solution_file_name=os.path.join(model_path, "co_placement_sol.ini"),
+                                              allow_partial_inference=allow_partial_inference)
+            assert math.isclose(flow, flows[model_idx], rel_tol=1e-6, abs_tol=1e-6), \
+                "Flow on the sub cluster does not match the flow found!"
+            model_layout.generate_simulator_cluster(
+                cluster_file_path=os.path.join(model_path, "simulator_cluster.ini"),
+                allow_partial_inference=allow_partial_inference
+            )
+            model_layouts.append(model_layout)
+        return model_layouts
+
+    def save_layouts(self, workspace_path: str, allow_partial_inference: bool) -> List[str]:
+        """
+        Save the layout of each model into workspace_path/model_{idx} (see write_model_layouts).
+        Note: the simulator of each model can be initialized with model_layouts[idx].set_initial_layout.
+
+        :param workspace_path: path to the workspace
+        :param allow_partial_inference: whether partial inference is allowed
+        :return: path to the simulator cluster file of each model
+        """
+        assert self.solution_found, "Must search before saving the layouts!"
+        self.model_layouts = self.write_model_layouts(workspace_path=workspace_path,
+                                                      allow_partial_inference=allow_partial_inference,
+                                                      model_assignment=self.model_assignment, starts=self.starts,
+                                                      counts=self.counts, flows=self.flows)
+        return [os.path.join(workspace_path, f"model_{model_idx}", "simulator_cluster.ini")
+                for model_idx in range(self.num_models)]
+
+    def simulate_model_layouts(self, workspace_path: str, model_layouts: List[LocalSearchLayout],
+                               flows: List[float], warm_up: float, duration: float) -> List[float]:
+        """
+        Run an offline simulation of each model on its own sub cluster, and measure its decode throughput.
+        Note: 1. the models never share a machine, so the simulators of the models run side by side and do not
+                 interact
+              2. models whose layout has no pipeline (zero flow) are not simulated, and decode nothing
+
+        :param workspace_path: path to the workspace where the layouts are written
+        :param model_layouts: layout of each model on its sub cluster
+        :param flows: max flow of each model
+        :param warm_up: warm up time of the simulation
+        :param duration: measured time of the simulation
+        :return: decode throughput of each model
+        """
+        decode_throughputs: List[float] = []
+        for model_idx, model_layout in enumerate(model_layouts):
+            if flows[model_idx] <= 1e-9:
+                decode_throughputs.append(0.0)
+                continue
+            model_manager: ModelManager = self.model_managers[model_idx]
+            simulator = ClusterSimulator(model_name=model_manager.model_name,
+                                         machine_num_dict=model_manager.machine_num_dict)
+            simulator.from_ini_file(config_file_name=os.path.join(workspace_path, f"model_{model_idx}",
+                                                                  "simulator_cluster.ini"))
+            scheduler_args = {
+                "kv_param": KVParameters(expected_kv_hwm=0.85, expected_output_length_ratio=1),
+                "scheduling_mode": SchedulingMode.Offline,
+            }
+            simulator.init_scheduler(scheduling_method=SchedulingMethod.MaxFlow, args=scheduler_args)
+            simulator.init_query_manager()
+            simulator.mark_as_ready()
+            finish_model_loading_time = model_layout.set_initial_layout(simulator=simulator)
+            simulator.update_scheduler()
+
+            feeder = OfflineRequestFeeder(initial_query_count=20, start_time=finish_model_loading_time,
+                                          duration=warm_up + duration, stop_at_duration=True, feed_hwm=0.8, seed=0)
+            feeder.auto_simulate(simulator=simulator)
+            analysis_start_time = finish_model_loading_time + warm_up
+            total_tokens = 0
+            for request_uid, (finish_time, request) in simulator.finished_requests.items():
+                if request.phase == RequestPhase.Increment and \
+                        analysis_start_time <= finish_time <= analysis_start_time + duration:
+                    total_tokens += request.token_seq_length
+            decode_throughputs.append(total_tokens / duration)
+        return decode_throughputs
+
+    def get_useful_throughput(self, throughputs: List[float], flows: List[float]) -> float:
+        """
+        Get the weighted sum of the useful decode throughput of each model (see simulate_co_placement).
+
+        :param throughputs: simulated decode throughput of each model
+        :param flows: max flow of each model
+        :return: weighted sum of the useful decode throughputs
+        """
+        return sum(weight * throughput * min(1.0, demand / flow) if flow > 0 else 0.0
+                   for weight, throughput, flow, demand in zip(self.weights, throughputs, flows, self.demands))
+
+    def simulate_co_placement(self, workspace_path: str, allow_partial_inference: bool, warm_up: float = 60,
+                              duration: float = 600) -> Dict[str, float or List[float] or None]:
+        """
+        Compare the co-placement with the static partition in the simulator. The layouts of the co-placement are
+        written into workspace_path/joint and those of the static partition into workspace_path/static, and the
+        models of each are simulated side by side (see simulate_model_layouts).
+        Note: demands are given in max flow, while the decode throughput of a model is only a fraction of its
+              max flow, so a model whose max flow exceeds its demand only needs (demand / max flow) of its decode
+              throughput. The simulated objective is the weighted sum of these useful decode throughputs.
+
+        :param workspace_path: path to the workspace
+        :param allow_partial_inference: whether partial inference is allowed
+        :param warm_up: warm up time of the simulation
+        :param duration: measured time of the simulation
+        :return: "joint_throughputs", "static_throughputs", "joint_objective", "static_objective" and "gain"
+                 (relative gain of the co-placement, None if the static partition decodes nothing)
+        """
+        assert self.solution_found, "Must search before simulating!"
+        assert duration > 0, "Simulation duration must be positive!"
+        joint_path = os.path.join(workspace_path, "joint")
+        static_path = os.path.join(workspace_path, "static")
+        joint_layouts = self.write_model_layouts(workspace_path=joint_path,
+                                                 allow_partial_inference=allow_partial_inference,
+                                                 model_assignment=self.model_assignment, starts=self.starts,
+                                                 counts=self.counts, flows=self.flows)
+        static_layouts = self.write_model_layouts(workspace_path=static_path,
+                                                  allow_partial_inference=allow_partial_inference,
+                                                  model_assignment=self.static_model_assignment,
+                                                  starts=self.static_starts, counts=self.static_counts,
+                                                  flows=self.static_flows)
+        joint_throughputs = self.simulate_model_layouts(workspace_path=joint_path, model_layouts=joint_layouts,
+                                                        flows=self.flows, warm_up=warm_up, duration=duration)
+        static_throughputs = self.simulate_model_layouts(workspace_path=static_path, model_layouts=static_layouts,
+                                                         flows=self.static_flows, warm_up=warm_up, duration=duration)
+        joint_objective = self.get_useful_throughput(throughputs=joint_throughputs, flows=self.flows)
+        static_objective = self.get_useful_throughput(throughputs=static_throughputs, flows=self.static_flows)
+        gain = joint_objective / static_objective - 1 if static_objective > 0 else None
+        print("# ------------------------------------------------------------------------------------------ #")
+        print(f"[Co-Placement Layout - Info] Simulated decode throughput: joint {joint_throughputs} "
+              f"(objective {joint_objective}), static {static_throughputs} (objective {static_objective}).")
+        if gain is not None:
+            print(f"[Co-Placement Layout - Info] Simulated gain over static partition: {round(gain * 100, 2)}%.")
+        print("# ------------------------------------------------------------------------------------------ #")
+        return {"joint_throughputs": joint_throughputs, "static_throughputs": static_throughputs,
+                "joint_objective": joint_objective, "static_objective": static_objective, "gain": gain}
+
+    def save_search_statistics(self, save_path: str) -> None:
+        """
+        Save statistics of the co-placement and the static partition baseline.
+
+        :param save_path: save path of the statistics file
+        :return: None
+        """
+        assert self.solution_found, "Must search before saving statistics!"
+        with open(save_path, "w") as file:
+            file.write(f"models = {[str(model_manager.model_name) for model_manager in self.model_managers]}\n")
+            file.write(f"weights = {self.weights}\n")
+            file.write(f"demands = {self.demands}\n")
+            file.write(f"objective = {self.objective}\n")
+            file.write(f"flows = {self.flows}\n")
+            file.write(f"model_assignment = {self.model_assignment}\n")
+            file.write(f"static_objective = {self.static_objective}\n")
+            file.write(f"static_flows = {self.static_flows}\n")
+            file.write(f"static_model_assignment = {self.static_model_assignment}\n")
+            file.write(f"num_moves = {self.num_moves}\n")
+            file.write(f"num_reassignments = {self.num_reassignments}\n")
+            file.write(f"search_time = {self.search_time}\n")
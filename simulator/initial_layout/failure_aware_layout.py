@@ -0,0 +1,356 @@
+# 2026.10.19 Yixuan Mei
+
+import os
+import math
+import time
+import random
+
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from simulator.event_simulator.cluster_simulator import ClusterSimulator, SchedulingMethod, RequestPhase
+from simulator.scheduler.global_maxflow.global_maxflow_scheduler import KVParameters, SchedulingMode
+from simulator.trace_generator.simulator_query_feeder import OfflineRequestFeeder
+from simulator.model_manager.model_manager import ModelManager
+from simulator.initial_layout.cluster_topology import load_cluster_topology
+from simulator.initial_layout.fake_cluster_generator import write_sub_cluster
+from simulator.initial_layout.layout_cache import write_solution_layers
+from simulator.initial_layout.local_search_layout import LocalSearchLayout, LayoutFlowNetwork
+
+
+def is_better_objective(new: Tuple[float, int, float], old: Tuple[float, int, float], eps: float = 1e-9) -> bool:
+    """
+    Compare two failure-aware objectives (worst-case flow, number of failures that lead to it, mean flow).
+    Higher worst case is better, then fewer failures at the worst case, then higher mean.
+
+    :param new: the new objective
+    :param old: the old objective
+    :param eps: tolerance of flows
+    :return: whether the new objective is strictly better
+    """
+    if not abs(new[0] - old[0]) <= eps:
+        return new[0] > old[0]
+    if not new[1] == old[1]:
+        return new[1] < old[1]
+    return new[2] > old[2] + eps
+
+
+def failure_aware_local_search(network: LayoutFlowNetwork, start: List[int], count: List[int], seed: int,
+                               num_failures: int, num_perturb_moves: int, max_run_time: float,
+                               patience: int) -> Tuple[Tuple[float, int, float], List[int], List[int], int]:
+    """
+    Hill climbing over layouts with the worst-case max flow under num_failures node failures as objective.
+    Ties are broken first by the number of failures that lead to the worst case (when the worst case is
+    zero, this is the number of single points of failure, which are removed one by one), and then by the
+    mean max flow over all failures. Moves that do not decrease the objective are accepted, and the search
+    stops when the best objective has not improved for patience moves or when max_run_time is reached.
+    Note: 1. the worst case is never larger than the max flow without failure, so a move whose max flow is
+             below the current worst case is rejected without checking failures
+          2. this is a module level function so that it can be run in a worker process
+
+    :param network: flow network of the cluster
+    :param start: start layer of each compute node in the initial layout
+    :param count: number of layers of each compute node in the initial layout
+    :param seed: random seed
+    :param num_failures: number of compute nodes that fail at the same time
+    :param num_perturb_moves: number of random moves applied to the initial layout before the search
+    :param max_run_time: max search time
+    :param patience: stop after this many moves without improvement
+    :return: best objective (worst-case flow, number of worst-case failures, mean max flow over failures),
+             start and count of the best layout, number of moves evaluated
+    """
+    search_start_time: float = time.time()
+    rng = random.Random(seed)
+
+    # Step 1: perturb the initial layout
+    network.set_layout(start=start, count=count)
+    for _ in range(num_perturb_moves):
+        proposed_move = network.propose_move(rng=rng)
+        if proposed_move is not None:
+            network.move(*proposed_move)
+    current_worst, _, current_num_worst, current_mean = network.get_worst_case_flow(num_failures=num_failures)
+    current: Tuple[float, int, float] = (current_worst, current_num_worst, current_mean)
+
+    # Step 2: hill climbing
+    best: Tuple[float, int, float] = current
+    best_start, best_count = list(network.start), list(network.count)
+    num_moves, moves_since_improvement = 0, 0
+    while moves_since_improvement < patience and time.time() - search_start_time < max_run_time:
+        proposed_move = network.propose_move(rng=rng)
+        if proposed_move is None:
+            continue
+        num_moves += 1
+        moves_since_improvement += 1
+        new_flow = network.move(*proposed_move)
+        if new_flow < current[0] - 1e-9:
+            network.undo()
+            continue
+        new_worst, _, new_num_worst, new_mean = network.get_worst_case_flow(num_failures=num_failures,
+                                                                            stop_below=current[0] - 1e-9)
+        new: Tuple[float, int, float] = (new_worst, new_num_worst, new_mean)
+        if is_better_objective(new=current, old=new):
+            network.undo()
+            continue
+        current = new
+        if is_better_objective(new=current, old=best):
+            best = current
+            best_start, best_count = list(network.start), list(network.count)
+            moves_since_improvement = 0
+    return best, best_start, best_count, num_moves
+
+
+class FailureAwareLayout(LocalSearchLayout):
+    # Usage:
+    # 1. call "from_ini" to load a complete cluster topology and machine profile
+    # 2. call "search_layout" to improve a layout (e.g. local_search_sol.ini) for node failures, or call
+    #    "load_solution" to check an existing layout
+    # 3. call "get_failure_flows" to get the max flow after each failure, and "simulate_node_failures" to
+    #    measure the throughput retained in the simulator
+    # 4. call "generate_simulator_cluster", "save_layout_solution" and "set_initial_layout" as in ILPLayout
+
+    def __init__(self, model_manager: ModelManager) -> None:
+        """
+        Replica-aware layout synthesizer. The layout maximizes the worst-case max flow when any num_failures
+        compute nodes fail, so that every layer window is held by more than one pipeline.
+
+        :return: None
+        """
+        super().__init__(model_manager=model_manager)
+
+        # failure statistics
+        self.num_failures: int = -1
+        self.initial_worst_case_flow: float = -1
+        self.worst_case_flow: float = -1
+        self.worst_case_failure: List[int] = []
+        self.mean_failure_flow: float = -1
+
+    def search_layout(self, heuristic_sol_path: str, allow_partial_inference: bool, seed: int, num_restarts: int,
+                      num_workers: int, max_run_time: float, patience: int, num_perturb_moves: int,
+                      num_failures: int = 1) -> float:
+        """
+        Search for a layout that maximizes the worst-case max flow under num_failures node failures. The first
+        restart starts from the given layout, and the other restarts start from random perturbations of it.
+        Restarts run in parallel.
+
+        :param heuristic_sol_path: path to the solution to start from
+        :param allow_partial_inference: whether partial inference is allowed
+        :param seed: random seed
+        :param num_restarts: number of restarts
+        :param num_workers: number of worker processes (restarts run in this process if 1)
+        :param max_run_time: max search time of each restart
+        :param patience: a restart stops after this many moves without improvement
+        :param num_perturb_moves: number of random moves applied to the initial layout in a restart
+        :param num_failures: number of compute nodes that fail at the same time
+        :return: worst-case max flow of the best layout
+        """
+        assert self.cluster_loaded, "Cluster must be loaded before searching for layout!"
+        assert num_restarts >= 1 and num_workers >= 1, "Need at least one restart and one worker!"
+        assert 1 <= num_failures < len(self.ilp_nodes), "Bad number of failures!"
+        search_start_time: float = time.time()
+        self.num_failures = num_failures
+
+        # Step 1: build flow network and load the initial layout
+        network: LayoutFlowNetwork = self.get_flow_network(allow_partial_inference=allow_partial_inference)
+        start, count = self.load_heuristic_layout(heuristic_sol_path=heuristic_sol_path)
+        self.initial_flow = network.set_layout(start=start, count=count)
+        self.initial_worst_case_flow, _, _, _ = network.get_worst_case_flow(num_failures=num_failures)
+        print("# ------------------------------------------------------------------------------------------ #")
+        print(f"[Failure Aware Layout - Info] Start from flow {self.initial_flow} (worst case "
+              f"{self.initial_worst_case_flow} under {num_failures} failures), {num_restarts} restarts on "
+              f"{num_workers} workers.")
+        total_capacity: int = sum(network.max_num_layers)
+        if total_capacity < (num_failures + 1) * network.num_layers:
+            # some layer is held by at most num_failures nodes in any layout
+            print(f"[Failure Aware Layout - Info] Total layer capacity {total_capacity} is less than "
+                  f"{num_failures + 1} x {network.num_layers} layers, the worst case is always 0 (the search only "
+                  f"reduces the number of failures that cut the pipelines).")
+
+        # Step 2: run the restarts
+        restart_args = [(network, start, count, seed + restart_idx, num_failures,
+                         0 if restart_idx == 0 else num_perturb_moves, max_run_time, patience)
+                        for restart_idx in range(num_restarts)]
+        if num_workers == 1:
+            results = [failure_aware_local_search(*args) for args in restart_args]
+        else:
+            with ProcessPoolExecutor(max_workers=min(num_workers, num_restarts)) as executor:
+                results = list(executor.map(failure_aware_local_search, *zip(*restart_args)))
+        best_result = results[0]
+        for result in results[1:]:
+            if is_better_objective(new=result[0], old=best_result[0]):
+                best_result = result
+        _, best_start, best_count, _ = best_result
+        self.num_moves = sum(result[3] for result in results)
+
+        # Step 3: load the best layout and its flow into ilp nodes and links
+        self.best_flow = self.set_layout_solution(network=network, start=best_start, count=best_count)
+        self.worst_case_flow, worst_nodes, _, self.mean_failure_flow = \
+            network.get_worst_case_flow(num_failures=num_failures)
+        self.worst_case_failure = [self.node_keys[node_id] for node_id in worst_nodes]
+        self.search_time = time.time() - search_start_time
+        print(f"[Failure Aware Layout - Info] Found: flow {self.best_flow}, worst case {self.worst_case_flow} "
+              f"(failure of {self.worst_case_failure}, mean {self.mean_failure_flow:.2f}) after {self.num_moves} "
+              f"moves in {self.search_time:.2f} seconds (restarts: {[round(result[0][0], 2) for result in results]}).")
+        print("# ------------------------------------------------------------------------------------------ #")
+        return self.worst_case_flow
+
+    def load_solution(self, solution_file_name: str, allow_partial_inference: bool, num_failures: int = 1) -> float:
+        """
+        Load an existing layout without searching, and compute its worst case under num_failures node failures.
+
+        :param solution_file_name: path to the solution file
+        :param allow_partial_inference: whether partial inference is allowed
+        :param num_failures: number of compute nodes that fail at the same time
+        :return: max flow of the layout
+        """
+        super().load_solution(solution_file_name=solution_file_name, allow_partial_inference=allow_partial_inference)
+        network: LayoutFlowNetwork = self.get_flow_network(allow_partial_inference=allow_partial_inference)
+        network.set_layout(start=[self.ilp_nodes[node_idx].start_layer_idx for node_idx in self.node_keys],
+                           count=[self.ilp_nodes[node_idx].end_layer_idx - self.ilp_nodes[node_idx].start_layer_idx
+                                  for node_idx in self.node_keys])
+        self.num_failures = num_failures
+        self.worst_case_flow, worst_nodes, _, self.mean_failure_flow = \
+            network.get_worst_case_flow(num_failures=num_failures)
+        self.initial_worst_case_flow = self.worst_case_flow
+        self.worst_case_failure = [self.node_keys[node_id] for node_id in worst_nodes]
+        return self.best_flow
+
+    def get_failure_flows(self, allow_partial_inference: bool, num_failures: int) -> Dict[Tuple[int, ...], float]:
+        """
+        Get the max flow of the current layout after each failure of num_failures compute nodes.
+
+        :param allow_partial_inference: whether partial inference is allowed
+        :param num_failures: number of compute nodes that fail at the same time
+        :return: {node idx of the failed nodes -> max flow after the failure}
+        """
+        assert self.solution_loaded, "Must find a solution before checking failures!"
+        network: LayoutFlowNetwork = self.get_flow_network(allow_partial_inference=allow_partial_inference)
+        network.set_layout(start=[self.ilp_nodes[node_idx].start_layer_idx for node_idx in self.node_keys],
+                           count=[self.ilp_nodes[node_idx].end_layer_idx - self.ilp_nodes[node_idx].start_layer_idx
+                                  for node_idx in self.node_keys])
+        failure_flows: Dict[Tuple[int, ...], float] = {}
+        for failed_nodes in combinations(range(network.num_nodes), num_failures):
+            failure_flows[tuple(self.node_keys[node_id] for node_id in failed_nodes)] = \
+                network.get_failure_flow(node_ids=list(failed_nodes))
+        return failure_flows
+
+    def simulate_node_failures(self, cluster_file_name: str, machine_profile_name: str, workspace_path: str,
+                               allow_partial_inference: bool, failed_node_sets: List[List[int]],
+                               warm_up: float = 60, duration: float = 0) -> List[Dict[str, float or None]]:
+        """
+        Measure the throughput retained in the simulator after each set of node failures.
+        Note: 1. the scheduler core can not remove nodes during simulation, so each failure is injected into a
+                 new simulator over the surviving nodes (workspace_path/failure_{idx}), where the surviving nodes
+                 reload their layers with issue_command_load_model
+              2. the first entry is the cluster without failure, which is the base of the retained ratio
+              3. if duration > 0, the decode throughput of an offline simulation is measured as well (after
+                 warm_up seconds), and "retained_throughput" is None if the cluster without failure decodes
+                 no token
+
+        :param cluster_file_name: name of the complete cluster file used in from_ini
+        :param machine_profile_name: name of the machine profile file used in from_ini
+        :param workspace_path: path to the workspace
+        :param allow_partial_inference: whether partial inference is allowed
+        :param failed_node_sets: node idx of the compute nodes that fail in each scenario
+        :param warm_up: warm up time of the offline simulation
+        :param duration: measured time of the offline simulation (0 means only the max flow is measured)
+        :return: "max_flow", "retained_flow" (and "decode_throughput", "retained_throughput") of each scenario
+        """
+        assert self.solution_loaded, "Must find a solution before simulating failures!"
+        topology = load_cluster_topology(file_name=cluster_file_name)
+        results: List[Dict[str, float or None]] = []
+        print("# ------------------------------------------------------------------------------------------ #")
+        for scenario_idx, failed_nodes in enumerate([[]] + failed_node_sets):
+            scenario_path = os.path.join(workspace_path, f"failure_{scenario_idx}")
+            os.makedirs(scenario_path, exist_ok=True)
+
+            # Step 1: surviving cluster and its layout
+            surviving_nodes: List[int] = [node_idx for node_idx in self.node_keys if node_idx not in failed_nodes]
+            write_sub_cluster(topology=topology, complete_cluster_file_name=cluster_file_name,
+                              sub_cluster_file_name=os.path.join(scenario_path, "cluster.ini"),
+                              node_indices=surviving_nodes, sub_cluster_settings=[f"failed nodes: {failed_nodes}"])
+            write_solution_layers(
+                solution_file_name=os.path.join(scenario_path, "failure_sol.ini"),
+                layers={sub_node_idx: list(range(self.ilp_nodes[node_idx].start_layer_idx,
+                                                 self.ilp_nodes[node_idx].end_layer_idx))
+                        for sub_node_idx, node_idx in enumerate(surviving_nodes)},
+                node_idx_offset=2
+            )
+            surviving_layout = LocalSearchLayout(model_manager=self.model_manager)
+            surviving_layout.from_ini(cluster_file_name=os.path.join(scenario_path, "cluster.ini"),
+                                      machine_profile_name=machine_profile_name)
+            layout_flow = surviving_layout.load_solution(
+                solution_file_name=os.path.join(scenario_path, "failure_sol.ini"),
+                allow_partial_inference=allow_partial_inference
+            )
+            result: Dict[str, float] = {"max_flow": 0.0, "decode_throughput": 0.0}
+            if layout_flow <= 1e-9:
+                # no pipeline survives
+                results.append(result)
+                print(f"[Failure Aware Layout - Info] Failure of {failed_nodes}: no pipeline survives.")
+                continue
+
+            # Step 2: load the surviving layout into a new simulator
+            surviving_layout.generate_simulator_cluster(
+                cluster_file_path=os.path.join(scenario_path, "simulator_cluster.ini"),
+                allow_partial_inference=allow_partial_inference
+            )
+            simulator = ClusterSimulator(model_name=self.model_manager.model_name,
+                                         machine_num_dict=self.model_manager.machine_num_dict)
+            simulator.from_ini_file(config_file_name=os.path.join(scenario_path, "simulator_cluster.ini"))
+            scheduler_args = {
+                "kv_param": KVParameters(expected_kv_hwm=0.85, expected_output_length_ratio=1),
+                "scheduling_mode": SchedulingMode.Offline,
+            }
+            simulator.init_scheduler(scheduling_method=SchedulingMethod.MaxFlow, args=scheduler_args)
+            simulator.init_query_manager()
+            simulator.mark_as_ready()
+            finish_model_loading_time = surviving_layout.set_initial_layout(simulator=simulator)
+            simulator.update_scheduler()
+            result["max_flow"] = simulator.scheduler.core.flow_graph.flow_value
+            assert math.isclose(result["max_flow"], layout_flow, rel_tol=1e-6, abs_tol=1e-6), \
+                "Flow in simulator does not match the flow of the layout!"
+
+            # Step 3: decode throughput of an offline simulation
+            if duration > 0:
+                feeder = OfflineRequestFeeder(initial_query_count=20, start_time=finish_model_loading_time,
+                                              duration=warm_up + duration, stop_at_duration=True, feed_hwm=0.8,
+                                              seed=0)
+                feeder.auto_simulate(simulator=simulator)
+                analysis_start_time = finish_model_loading_time + warm_up
+                total_tokens = 0
+                for request_uid, (finish_time, request) in simulator.finished_requests.items():
+                    if request.phase == RequestPhase.Increment and \
+                            analysis_start_time <= finish_time <= analysis_start_time + duration:
+                        total_tokens += request.token_seq_length
+                result["decode_throughput"] = total_tokens / duration
+            results.append(result)
+            print(f"[Failure Aware Layout - Info] Failure of {failed_nodes}: max flow {result['max_flow']}, "
+                  f"decode throughput {result['decode_throughput']}.")
+
+        # retained ratios
+        assert results[0]["max_flow"] > 0, "Cluster without failure has zero flow!"
+        for result in results:
+            result["retained_flow"] = result["max_flow"] / results[0]["max_flow"]
+            if duration > 0:
+                # None if the cluster without failure decodes nothing (e.g. duration is too short)
+                base_throughput: float = results[0]["decode_throughput"]
+                result["retained_throughput"] = result["decode_throughput"] / base_throughput \
+                    if base_throughput > 0 else None
+        print("# ------------------------------------------------------------------------------------------ #")
+        return results
+
+    def save_search_statistics(self, save_path: str) -> None:
+        """
+        Save statistics of the search and the worst case under node failures.
+
+        :param save_path: save path of the statistics file
+        :return: None
+        """
+        super().save_search_statistics(save_path=save_path)
+        with open(save_path, "a") as file:
+            file.write(f"num_failures = {self.num_failures}\n")
+            file.write(f"initial_worst_case_flow = {self.initial_worst_case_flow}\n")
+            file.write(f"worst_case_flow = {self.worst_case_flow}\n")
+            file.write(f"worst_case_failure = {self.worst_case_failure}\n")
+            file.write(f"mean_failure_flow = {self.mean_failure_flow}\n")
@@ -3,18 +3,22 @@ import os.path
 import random
 import itertools
 
-from typing import Dict, List, Tuple
-from configparser import ConfigParser
+import numpy as np
+
+from typing import Dict, List, Tuple, Set
 from simulator.event_simulator.utils import kbps, mbps, gbps, Byte, KB, MB, GB, Sec, MilliSec
+from simulator.initial_layout.cluster_topology import ClusterTopology, load_cluster_topology
 
 
-def create_weighted_list(strings: List[str], probabilities: List[float], m: int) -> List[str]:
+def create_weighted_list(strings: List[str], probabilities: List[float], m: int,
+                         rng: np.random.Generator or None = None) -> List[str]:
     """
     Create a weighted list of strings based on the given probabilities and the total number of strings to generate.
 
     :param strings: the list of strings to be weighted
     :param probabilities: the list of probabilities for each string
     :param m: the total number of strings to generate
+    :param rng: [Optional] random number generator used for shuffling (the random module is used if None)
     :return: a list of strings (in random order)
     """
     # normalize the probabilities
@@ -33,7 +37,10 @@ def create_weighted_list(strings: List[str], probabilities: List[float], m: int)
     weighted_list = [string for string, count in zip(strings, counts) for _ in range(count)]
 
     # Shuffle the list to ensure random order
-    random.shuffle(weighted_list)
+    if rng is not None:
+        rng.shuffle(weighted_list)
+    else:
+        random.shuffle(weighted_list)
 
     return weighted_list
 
@@ -558,6 +565,21 @@ class PartitionedClusterGenerator:
                         sub_file.write(f"\n")
 
 
+def _format_value(value: float, unit: float, unit_name: str) -> str:
+    """
+    Format a value as "<number> * <unit>" if this is exact, otherwise as a plain number.
+
+    :param value: the value
+    :param unit: value of the unit
+    :param unit_name: name of the unit
+    :return: formatted value
+    """
+    number: float = value / unit
+    if number * unit == value:
+        return f"{int(number)} * {unit_name}" if number.is_integer() else f"{number} * {unit_name}"
+    return f"{value}"
+
+
 def prune_cluster(complete_cluster_file_name: str, pruned_cluster_file_name: str,
                   min_keep: int, max_keep: int, keep_bandwidth_threshold: float) -> None:
     """
@@ -575,22 +597,15 @@ def prune_cluster(complete_cluster_file_name: str, pruned_cluster_file_name: str
     assert min_keep <= max_keep, "min_keep must be smaller than or equal to max_keep!"
 
     # load the ini and check whether it is a complete graph
-    complete_config = ConfigParser()
-    complete_config.read(complete_cluster_file_name)
-    total_num_compute_nodes = eval(complete_config["NodeNames"]["total_compute_nodes"])
-    assert sorted(eval(complete_config["SourceNode"]["connected_nodes"])) == list(range(total_num_compute_nodes)), \
-        "Not a complete graph!"
-    assert sorted(eval(complete_config["SinkNode"]["connected_nodes"])) == list(range(total_num_compute_nodes)), \
-        "Not a complete graph!"
-    for i in range(total_num_compute_nodes):
-        connected_nodes: List[int or str] = ["source"] + list(range(total_num_compute_nodes)) + ["sink"]
-        connected_nodes.remove(i)
-        assert eval(complete_config[f"ComputeNode-{i}"]["connected_nodes"]) == connected_nodes, "Not a complete graph!"
+    topology: ClusterTopology = load_cluster_topology(file_name=complete_cluster_file_name)
+    assert topology.is_complete_graph(), "Not a complete graph!"
+    total_num_compute_nodes: int = topology.num_compute_nodes
+    source_idx, sink_idx = topology.source_index, topology.sink_index
 
     # prune the source connections
     source_link_speed: List[Tuple[float, Tuple[str, int]]] = []
     for i in range(total_num_compute_nodes):
-        link_bandwidth = eval(complete_config[f"Link-source-{i}"]["bandwidth"])
+        link_bandwidth = topology.bandwidth[source_idx, i].item()
         source_link_speed.append((link_bandwidth, ("source", i)))
     source_link_speed.sort(reverse=True)
     pruned_source_connections: List[str] = []
@@ -606,7 +621,7 @@ def prune_cluster(complete_cluster_file_name: str, pruned_cluster_file_name: str
     # prune the sink connections
     sink_link_speed: List[Tuple[float, Tuple[int, str]]] = []
     for i in range(total_num_compute_nodes):
-        link_bandwidth = eval(complete_config[f"Link-{i}-sink"]["bandwidth"])
+        link_bandwidth = topology.bandwidth[i, sink_idx].item()
         sink_link_speed.append((link_bandwidth, (i, "sink")))
     sink_link_speed.sort(reverse=True)
     pruned_sink_connections: List[str] = []
@@ -620,19 +635,16 @@ def prune_cluster(complete_cluster_file_name: str, pruned_cluster_file_name: str
     pruned_sink_connections.sort()
 
     # prune the compute node connections
-    pruned_compute_connections: List[str] = []
+    pruned_compute_connections: Set[str] = set()
+    compute_bandwidth: List[List[float]] = topology.bandwidth[:total_num_compute_nodes,
+                                                              :total_num_compute_nodes].tolist()
     for i in range(total_num_compute_nodes):
-        # get link speed
+        # get link speed (links are stored as Link-{small idx}-{large idx})
         link_speed: List[Tuple[float, str]] = []
         for j in range(total_num_compute_nodes):
             if i != j:
-                if f"Link-{i}-{j}" in complete_config:
-                    assert f"Link-{j}-{i}" not in complete_config, "Duplicate edge found!"
-                    assert i < j, "Wrong link idx order!"
-                    link_speed.append((eval(complete_config[f"Link-{i}-{j}"]["bandwidth"]), f"Link-{i}-{j}"))
-                else:
-                    assert j < i, "Wrong link idx order!"
-                    link_speed.append((eval(complete_config[f"Link-{j}-{i}"]["bandwidth"]), f"Link-{j}-{i}"))
+                link_name = f"Link-{i}-{j}" if i < j else f"Link-{j}-{i}"
+                link_speed.append((compute_bandwidth[i][j], link_name))
         link_speed.sort(reverse=True)
 
         # keep the first min_keep links (need to check no overflow)
@@ -646,39 +658,66 @@ def prune_cluster(complete_cluster_file_name: str, pruned_cluster_file_name: str
                 cur_keep_links.append(link_speed[idx][1])
 
         # insert the links into the pruned_compute_connections
-        for link_name in cur_keep_links:
-            if link_name not in pruned_compute_connections:
-                pruned_compute_connections.append(link_name)
-    pruned_compute_connections.sort()
+        pruned_compute_connections.update(cur_keep_links)
+    pruned_compute_connections: List[str] = sorted(pruned_compute_connections)
 
     # write the pruned file
+    write_pruned_cluster(topology=topology, complete_cluster_file_name=complete_cluster_file_name,
+                         pruned_cluster_file_name=pruned_cluster_file_name,
+                         kept_links=pruned_source_connections + pruned_sink_connections + pruned_compute_connections,
+                         pruning_settings=[f"min_keep: {min_keep}", f"max_keep: {max_keep}",
+                                           f"keep_bandwidth_threshold: {keep_bandwidth_threshold} "
+                                           f"({keep_bandwidth_threshold / mbps} mbps)"])
+
+
+def write_pruned_cluster(topology: ClusterTopology, complete_cluster_file_name: str, pruned_cluster_file_name: str,
+                         kept_links: List[str], pruning_settings: List[str]) -> None:
+    """
+    Write a pruned cluster file that only keeps the given links of the complete cluster.
+
+    :param topology: topology of the complete cluster
+    :param complete_cluster_file_name: name of the complete cluster file
+    :param pruned_cluster_file_name: name of the pruned cluster file
+    :param kept_links: names of the links to keep (e.g. Link-source-0, Link-0-1, Link-1-sink)
+    :param pruning_settings: settings of the pruning method (written into the file header)
+    :return: None
+    """
+    # links to keep
+    kept_link_set: Set[str] = set(kept_links)
+    pruned_source_connections: List[str] = sorted(_name for _name in kept_link_set if "source" in _name)
+    pruned_sink_connections: List[str] = sorted(_name for _name in kept_link_set if "sink" in _name)
+    pruned_compute_connections: List[str] = sorted(_name for _name in kept_link_set if
+                                                   "source" not in _name and "sink" not in _name)
+
+    # bandwidth and latency of each link
+    link_values: Dict[str, Tuple[float, float]] = {
+        topology.link_name(link_idx): (bandwidth, latency) for link_idx, (bandwidth, latency) in
+        enumerate(zip(topology.link_bandwidth.tolist(), topology.link_latency.tolist()))
+    }
+    assert kept_link_set.issubset(link_values.keys()), "Found links that are not in the complete cluster!"
+
     with open(pruned_cluster_file_name, "w") as pruned_file:
         # write header into the pruned file
         pruned_file.write(f"# ********************************************************************************** #\n")
         pruned_file.write(f"# This file is pruned from {complete_cluster_file_name}.\n")
         pruned_file.write(f"# Pruning Settings:\n")
-        pruned_file.write(f"#     min_keep: {min_keep}\n")
-        pruned_file.write(f"#     max_keep: {max_keep}\n")
-        pruned_file.write(f"#     keep_bandwidth_threshold: {keep_bandwidth_threshold} "
-                          f"({keep_bandwidth_threshold / mbps} mbps)\n")
+        for setting in pruning_settings:
+            pruned_file.write(f"#     {setting}\n")
         pruned_file.write(f"# Original file heading is as follows:\n")
-        with open(complete_cluster_file_name, "r") as complete_file:
-            ori_lines = complete_file.readlines()
-            for line in ori_lines:
-                if line.startswith("#"):
-                    pruned_file.write(line)
+        for line in topology.header:
+            pruned_file.write(f"{line}\n")
         pruned_file.write(f"\n")
 
         # write node names
         pruned_file.write(f"[NodeNames]\n")
-        pruned_file.write(f"total_compute_nodes={total_num_compute_nodes}\n")
+        pruned_file.write(f"total_compute_nodes={topology.num_compute_nodes}\n")
         pruned_file.write(f"\n")
 
         # write source node
         pruned_file.write(f"[SourceNode]\n")
         source_connected_nodes = []
-        for i in eval(complete_config["SourceNode"]["connected_nodes"]):
-            if f"Link-source-{i}" in pruned_source_connections:
+        for i in topology.source_connected_nodes:
+            if f"Link-source-{i}" in kept_link_set:
                 source_connected_nodes.append(i)
         pruned_file.write(f"connected_nodes={source_connected_nodes}\n")
         pruned_file.write(f"\n")
@@ -686,43 +725,103 @@ def prune_cluster(complete_cluster_file_name: str, pruned_cluster_file_name: str
         # write sink node
         pruned_file.write(f"[SinkNode]\n")
         sink_connected_nodes = []
-        for i in eval(complete_config["SinkNode"]["connected_nodes"]):
-            if f"Link-{i}-sink" in pruned_sink_connections:
+        for i in topology.sink_connected_nodes:
+            if f"Link-{i}-sink" in kept_link_set:
                 sink_connected_nodes.append(i)
         pruned_file.write(f"connected_nodes={sink_connected_nodes}\n")
         pruned_file.write(f"\n")
 
         # write compute nodes
-        for i in range(total_num_compute_nodes):
+        for i in range(topology.num_compute_nodes):
             pruned_file.write(f"[ComputeNode-{i}]\n")
             connected_nodes = []
-            for j in eval(complete_config[f"ComputeNode-{i}"]["connected_nodes"]):
+            for j in topology.connected_nodes[i]:
                 if j == "source":
-                    if f"Link-source-{i}" in pruned_source_connections:
+                    if f"Link-source-{i}" in kept_link_set:
                         connected_nodes.append(j)
                 elif j == "sink":
-                    if f"Link-{i}-sink" in pruned_sink_connections:
+                    if f"Link-{i}-sink" in kept_link_set:
                         connected_nodes.append(j)
                 else:
-                    if f"Link-{i}-{j}" in pruned_compute_connections or f"Link-{j}-{i}" in pruned_compute_connections:
+                    if f"Link-{min(i, j)}-{max(i, j)}" in kept_link_set:
                         connected_nodes.append(j)
-            pruned_file.write(f"type={complete_config[f'ComputeNode-{i}']['type']}\n")
+            pruned_file.write(f"type={topology.node_types[i]}\n")
             pruned_file.write(f"connected_nodes={connected_nodes}\n")
             pruned_file.write(f"\n")
 
         # write links
-        for link_name in pruned_source_connections:
+        for link_name in pruned_source_connections + pruned_sink_connections + pruned_compute_connections:
+            bandwidth, latency = link_values[link_name]
             pruned_file.write(f"[{link_name}]\n")
-            pruned_file.write(f"bandwidth={complete_config[link_name]['bandwidth']}\n")
-            pruned_file.write(f"latency={complete_config[link_name]['latency']}\n")
-            pruned_file.write(f"\n")
-        for link_name in pruned_sink_connections:
-            pruned_file.write(f"[{link_name}]\n")
-            pruned_file.write(f"bandwidth={complete_config[link_name]['bandwidth']}\n")
-            pruned_file.write(f"latency={complete_config[link_name]['latency']}\n")
-            pruned_file.write(f"\n")
-        for link_name in pruned_compute_connections:
-            pruned_file.write(f"[{link_name}]\n")
-            pruned_file.write(f"bandwidth={complete_config[link_name]['bandwidth']}\n")
-            pruned_file.write(f"latency={complete_config[link_name]['latency']}\n")
+            pruned_file.write(f"bandwidth={_format_value(value=bandwidth, unit=mbps, unit_name='mbps')}\n")
+            pruned_file.write(f"latency={_format_value(value=latency, unit=MilliSec, unit_name='MilliSec')}\n")
             pruned_file.write(f"\n")
+
+
+def write_sub_cluster(topology: ClusterTopology, complete_cluster_file_name: str, sub_cluster_file_name: str,
+                      node_indices: List[int], sub_cluster_settings: List[str]) -> None:
+    """
+    Write a cluster file that only keeps the given compute nodes (and the links between them) of the complete
+    cluster. Compute nodes are renumbered as 0, 1, ... in the order of node_indices.
+
+    :param topology: topology of the complete cluster
+    :param complete_cluster_file_name: name of the complete cluster file
+    :param sub_cluster_file_name: name of the sub cluster file
+    :param node_indices: compute nodes to keep (index in the complete cluster)
+    :param sub_cluster_settings: settings of the sub cluster (written into the file header)
+    :return: None
+    """
+    new_index: Dict[int or str, int or str] = {node_idx: _id for _id, node_idx in enumerate(node_indices)}
+    new_index["source"], new_index["sink"] = "source", "sink"
+
+    # links to keep (with renumbered end points)
+    kept_links: List[Tuple[int or str, int or str, float, float]] = []
+    for (from_node, to_node), bandwidth, latency in zip(topology.links, topology.link_bandwidth.tolist(),
+                                                        topology.link_latency.tolist()):
+        if from_node in new_index and to_node in new_index:
+            new_from, new_to = new_index[from_node], new_index[to_node]
+            if isinstance(new_from, int) and isinstance(new_to, int) and new_from > new_to:
+                new_from, new_to = new_to, new_from
+            kept_links.append((new_from, new_to, bandwidth, latency))
+
+    with open(sub_cluster_file_name, "w") as sub_file:
+        # write header into the sub cluster file
+        sub_file.write(f"# ********************************************************************************** #\n")
+        sub_file.write(f"# This file is a sub cluster of {complete_cluster_file_name}.\n")
+        sub_file.write(f"# Sub Cluster Settings:\n")
+        for setting in sub_cluster_settings:
+            sub_file.write(f"#     {setting}\n")
+        sub_file.write(f"# Original file heading is as follows:\n")
+        for line in topology.header:
+            sub_file.write(f"{line}\n")
+        sub_file.write(f"\n")
+
+        # write node names
+        sub_file.write(f"[NodeNames]\n")
+        sub_file.write(f"total_compute_nodes={len(node_indices)}\n")
+        sub_file.write(f"\n")
+
+        # write source and sink node
+        sub_file.write(f"[SourceNode]\n")
+        source_connected_nodes = [new_index[i] for i in topology.source_connected_nodes if i in new_index]
+        sub_file.write(f"connected_nodes={source_connected_nodes}\n")
+        sub_file.write(f"\n")
+        sub_file.write(f"[SinkNode]\n")
+        sink_connected_nodes = [new_index[i] for i in topology.sink_connected_nodes if i in new_index]
+        sub_file.write(f"connected_nodes={sink_connected_nodes}\n")
+        sub_file.write(f"\n")
+
+        # write compute nodes
+        for node_idx in node_indices:
+            sub_file.write(f"[ComputeNode-{new_index[node_idx]}]\n")
+            connected_nodes = [new_index[j] for j in topology.connected_nodes[node_idx] if j in new_index]
+            sub_file.write(f"type={topology.node_types[node_idx]}\n")
+            sub_file.write(f"connected_nodes={connected_nodes}\n")
+            sub_file.write(f"\n")
+
+        # write links
+        for from_node, to_node, bandwidth, latency in kept_links:
+            sub_file.write(f"[Link-{from_node}-{to_node}]\n")
+            sub_file.write(f"bandwidth={_format_value(value=bandwidth, unit=mbps, unit_name='mbps')}\n")
+            sub_file.write(f"latency={_format_value(value=latency, unit=MilliSec, unit_name='MilliSec')}\n")
+            sub_file.write(f"\n")
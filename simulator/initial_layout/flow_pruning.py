@@ -0,0 +1,285 @@
+# 2026.10.19 Yixuan Mei
+
+import time
+
+from typing import Dict, List, Tuple
+
+from simulator.model_manager.model_manager import ModelManager
+from simulator.initial_layout.cluster_topology import ClusterTopology, load_cluster_topology
+from simulator.initial_layout.fake_cluster_generator import write_pruned_cluster
+from simulator.initial_layout.ilp_layout.ilp_layout import ILPLayout, ILPLink
+from simulator.initial_layout.incremental_maxflow import IncrementalMaxFlow
+
+
+class PruningReport:
+    def __init__(self, max_flow_loss: float, min_keep: int, network_headroom: float,
+                 num_links_before: int, num_links_after: int,
+                 compute_bound: float, network_bound_before: float, network_bound_after: float,
+                 num_free_removals: int, num_flow_checks: int, prune_time: float) -> None:
+        """
+        Report of flow-preserving pruning.
+        Note: flow bound = min(compute bound, network bound), where compute bound is the flow upper bound
+              computed by ILPLayout.get_flow_upper_bound (network is instant) and network bound is the max
+              flow when each compute node can process any number of layers at its max throughput.
+
+        :param max_flow_loss: max allowed loss of flow bound (fraction)
+        :param min_keep: number of fastest links kept for each node
+        :param network_headroom: network flow preserved, relative to compute bound
+        :param num_links_before: number of links before pruning
+        :param num_links_after: number of links after pruning
+        :param compute_bound: compute bound of the cluster
+        :param network_bound_before: network bound before pruning
+        :param network_bound_after: network bound after pruning
+        :param num_free_removals: number of removed links that carry no flow (no flow check needed)
+        :param num_flow_checks: number of incremental flow checks (rerouting)
+        :param prune_time: time used for pruning
+        :return: None
+        """
+        self.max_flow_loss: float = max_flow_loss
+        self.min_keep: int = min_keep
+        self.network_headroom: float = network_headroom
+        self.num_links_before: int = num_links_before
+        self.num_links_after: int = num_links_after
+        self.compute_bound: float = compute_bound
+        self.network_bound_before: float = network_bound_before
+        self.network_bound_after: float = network_bound_after
+        self.num_free_removals: int = num_free_removals
+        self.num_flow_checks: int = num_flow_checks
+        self.prune_time: float = prune_time
+
+    @property
+    def flow_bound_before(self) -> float:
+        return min(self.compute_bound, self.network_bound_before)
+
+    @property
+    def flow_bound_after(self) -> float:
+        return min(self.compute_bound, self.network_bound_after)
+
+    @property
+    def flow_preserved(self) -> float:
+        return self.flow_bound_after / self.flow_bound_before
+
+    @property
+    def links_removed(self) -> float:
+        return 1 - self.num_links_after / self.num_links_before
+
+    def summary(self) -> str:
+        """
+        Get a one-line summary of the report.
+
+        :return: summary
+        """
+        return (f"[Flow Pruning] max_flow_loss={self.max_flow_loss}, min_keep={self.min_keep}, "
+                f"network_headroom={self.network_headroom}: "
+                f"links {self.num_links_before} -> {self.num_links_after} ({self.links_removed * 100:.1f}% removed), "
+                f"flow bound {self.flow_bound_before:.2f} -> {self.flow_bound_after:.2f} "
+                f"({self.flow_preserved * 100:.2f}% preserved), {self.num_free_removals} free removals, "
+                f"{self.num_flow_checks} flow checks, {self.prune_time:.2f}s")
+
+
+class FlowPreservingPruner:
+    def __init__(self, complete_cluster_file_name: str, machine_profile_name: str,
+                 model_manager: ModelManager) -> None:
+        """
+        Prune links of a cluster while bounding the loss of its flow upper bound. Links are considered from
+        the slowest to the fastest. A link that carries no flow in the current max flow is removed directly,
+        otherwise its flow is rerouted incrementally and the link is only removed if rerouting succeeds.
+
+        :param complete_cluster_file_name: name of the cluster file to prune (need not be a complete graph)
+        :param machine_profile_name: name of the machine profile file
+        :param model_manager: model manager
+        :return: None
+        """
+        self.complete_cluster_file_name: str = complete_cluster_file_name
+        self.topology: ClusterTopology = load_cluster_topology(file_name=complete_cluster_file_name)
+
+        # load the cluster as in ILP layout to get link and node throughput
+        self.layout: ILPLayout = ILPLayout(model_manager=model_manager)
+        self.layout.from_ini(cluster_file_name=complete_cluster_file_name, machine_profile_name=machine_profile_name)
+        self.compute_bound: float = self.layout.get_flow_upper_bound()
+        self.node_capacity: Dict[int, float] = {
+            _idx: max(_node.layer_count_2_throughput.values()) for _idx, _node in self.layout.ilp_nodes.items()
+        }
+
+    def _build_network(self, links: List[Tuple[int or str, int or str]], source_capacity: float) -> \
+            Tuple[IncrementalMaxFlow, int, int, Dict[Tuple[int or str, int or str], List[int]]]:
+        """
+        Build the flow network. Each compute node is split into an in vertex and an out vertex, and a super
+        source limits the total flow to source_capacity.
+
+        :param links: links in the network
+        :param source_capacity: capacity of the super source
+        :return: flow network, super source, sink, link -> its forward arcs
+        """
+        # vertices: 0 = super source, 1 = source, 2 = sink, 3 + 2i = in of node i, 4 + 2i = out of node i
+        network = IncrementalMaxFlow(num_vertices=3 + 2 * self.topology.num_compute_nodes)
+        network.add_arc(from_vertex=0, to_vertex=1, capacity=source_capacity)
+        for node_idx, capacity in self.node_capacity.items():
+            network.add_arc(from_vertex=3 + 2 * node_idx, to_vertex=4 + 2 * node_idx, capacity=capacity)
+
+        # links
+        link_arcs: Dict[Tuple[int or str, int or str], List[int]] = {}
+        for from_idx, to_idx in links:
+            link: ILPLink = self.layout.ilp_links[(from_idx, to_idx)]
+            if from_idx == "source":
+                arcs = [network.add_arc(from_vertex=1, to_vertex=3 + 2 * to_idx, capacity=link.throughput)]
+            elif to_idx == "sink":
+                arcs = [network.add_arc(from_vertex=4 + 2 * from_idx, to_vertex=2, capacity=link.throughput)]
+            else:
+                arcs = [network.add_arc(from_vertex=4 + 2 * from_idx, to_vertex=3 + 2 * to_idx,
+                                        capacity=link.throughput),
+                        network.add_arc(from_vertex=4 + 2 * to_idx, to_vertex=3 + 2 * from_idx,
+                                        capacity=link.throughput)]
+            link_arcs[(from_idx, to_idx)] = arcs
+        return network, 0, 2, link_arcs
+
+    def get_network_bound(self, links: List[Tuple[int or str, int or str]]) -> float:
+        """
+        Get the network bound (max flow when nodes can process any number of layers at max throughput).
+
+        :param links: links in the network
+        :return: network bound
+        """
+        network, super_source, sink, _ = self._build_network(links=links, source_capacity=float("inf"))
+        eps = 1e-9 * max(1.0, max(self.node_capacity.values(), default=1.0))
+        return network.augment(source=super_source, sink=sink, eps=eps)
+
+    def _protected_links(self, min_keep: int) -> List[Tuple[int or str, int or str]]:
+        """
+        Get the links that are never pruned: the min_keep fastest links of source, sink and each compute
+        node (same as prune_cluster).
+
+        :param min_keep: number of links to keep for each node
+        :return: protected links
+        """
+        links_of_node: Dict[int or str, List[Tuple[float, Tuple[int or str, int or str]]]] = {}
+        for link_tuple, link in self.layout.ilp_links.items():
+            for end_point in link_tuple:
+                links_of_node.setdefault(end_point, []).append((link.bandwidth, link_tuple))
+        protected: List[Tuple[int or str, int or str]] = []
+        for node_links in links_of_node.values():
+            node_links.sort(key=lambda x: (-x[0], str(x[1])))
+            protected += [_link for _, _link in node_links[:min_keep]]
+        return protected
+
+    def prune(self, max_flow_loss: float, min_keep: int = 1, network_headroom: float = 1) -> \
+            Tuple[List[Tuple[int or str, int or str]], PruningReport]:
+        """
+        Prune the cluster so that flow bound after pruning >= (1 - max_flow_loss) * flow bound before pruning.
+        Note: the network is usually much faster than compute, so that most links can be removed without
+              changing the flow bound. network_headroom > 1 keeps more network flow than compute bound, i.e.
+              network bound after pruning >= (1 - max_flow_loss) * min(network bound before pruning,
+              network_headroom * compute bound), which leaves more freedom for the layout.
+
+        :param max_flow_loss: max allowed loss of flow bound (fraction, 0 means the bound is kept exactly)
+        :param min_keep: keep at least the min_keep fastest links of each node
+        :param network_headroom: network flow to preserve, relative to compute bound (>= 1)
+        :return: links kept, pruning report
+        """
+        assert 0 <= max_flow_loss < 1, "Max flow loss should be in [0, 1)!"
+        assert network_headroom >= 1, "Network headroom should be at least 1!"
+        start_time = time.time()
+
+        # Step 1: get the flow bound before pruning
+        all_links: List[Tuple[int or str, int or str]] = list(self.layout.ilp_links.keys())
+        network_bound_before: float = self.get_network_bound(links=all_links)
+
+        # Step 2: build a network whose flow is capped at the flow we must preserve
+        required_flow: float = (1 - max_flow_loss) * min(network_bound_before, network_headroom * self.compute_bound)
+        eps: float = 1e-9 * max(1.0, required_flow)
+        network, super_source, sink, link_arcs = self._build_network(links=all_links, source_capacity=required_flow)
+        network.augment(source=super_source, sink=sink, eps=eps)
+        assert network.flow_value(source=super_source) >= required_flow - eps * len(all_links), \
+            "Failed to route the required flow!"
+
+        # Step 3: try to remove links from the slowest to the fastest
+        protected = set(self._protected_links(min_keep=min_keep))
+        candidates = sorted([_link for _link in all_links if _link not in protected],
+                            key=lambda x: (self.layout.ilp_links[x].throughput, str(x)))
+        kept_links = set(all_links)
+        num_free_removals, num_flow_checks = 0, 0
+        for link_tuple in candidates:
+            arcs = link_arcs[link_tuple]
+            carries_flow = any(network.arc_flow[_arc] > eps for _arc in arcs)
+            if network.remove_arcs(arcs=arcs, eps=eps):
+                kept_links.remove(link_tuple)
+                if carries_flow:
+                    num_flow_checks += 1
+                else:
+                    num_free_removals += 1
+            else:
+                num_flow_checks += 1
+
+        # Step 4: get the flow bound after pruning
+        pruned_links = [_link for _link in all_links if _link in kept_links]
+        network_bound_after: float = self.get_network_bound(links=pruned_links)
+        report = PruningReport(max_flow_loss=max_flow_loss, min_keep=min_keep, network_headroom=network_headroom,
+                               num_links_before=len(all_links),
+                               num_links_after=len(pruned_links), compute_bound=self.compute_bound,
+                               network_bound_before=network_bound_before, network_bound_after=network_bound_after,
+                               num_free_removals=num_free_removals, num_flow_checks=num_flow_checks,
+                               prune_time=time.time() - start_time)
+        assert network_bound_after >= required_flow * (1 - 1e-6), "Pruning lost too much flow!"
+        return pruned_links, report
+
+    def prune_to_file(self, pruned_cluster_file_name: str, max_flow_loss: float, min_keep: int = 1,
+                      network_headroom: float = 1) -> PruningReport:
+        """
+        Prune the cluster and write the pruned cluster into a file.
+
+        :param pruned_cluster_file_name: name of the pruned cluster file
+        :param max_flow_loss: max allowed loss of flow bound (fraction)
+        :param min_keep: keep at least the min_keep fastest links of each node
+        :param network_headroom: network flow to preserve, relative to compute bound (>= 1)
+        :return: pruning report
+        """
+        pruned_links, report = self.prune(max_flow_loss=max_flow_loss, min_keep=min_keep,
+                                          network_headroom=network_headroom)
+        write_pruned_cluster(topology=self.topology, complete_cluster_file_name=self.complete_cluster_file_name,
+                             pruned_cluster_file_name=pruned_cluster_file_name,
+                             kept_links=[f"Link-{_from}-{_to}" for _from, _to in pruned_links],
+                             pruning_settings=[f"method: flow preserving",
+                                               f"max_flow_loss: {max_flow_loss}",
+                                               f"min_keep: {min_keep}",
+                                               f"network_headroom: {network_headroom}",
+                                               f"flow bound: {report.flow_bound_before} -> "
+                                               f"{report.flow_bound_after}"])
+        return report
+
+    def tradeoff(self, max_flow_losses: List[float], min_keep: int = 1,
+                 network_headroom: float = 1) -> List[PruningReport]:
+        """
+        Get the tradeoff between flow preserved and links removed under different max flow losses.
+
+        :param max_flow_losses: a list of max flow losses
+        :param min_keep: keep at least the min_keep fastest links of each node
+        :param network_headroom: network flow to preserve, relative to compute bound (>= 1)
+        :return: a list of pruning reports
+        """
+        return [self.prune(max_flow_loss=_loss, min_keep=min_keep, network_headroom=network_headroom)[1]
+                for _loss in max_flow_losses]
+
+
+def flow_preserving_prune_cluster(complete_cluster_file_name: str, pruned_cluster_file_name: str,
+                                  machine_profile_name: str, model_manager: ModelManager,
+                                  max_flow_loss: float, min_keep: int = 1,
+                                  network_headroom: float = 1) -> PruningReport:
+    """
+    Prune a cluster file while bounding the loss of its flow upper bound (see FlowPreservingPruner).
+
+    :param complete_cluster_file_name: name of the cluster file to prune
+    :param pruned_cluster_file_name: name of the pruned cluster file
+    :param machine_profile_name: name of the machine profile file
+    :param model_manager: model manager
+    :param max_flow_loss: max allowed loss of flow bound (fraction)
+    :param min_keep: keep at least the min_keep fastest links of each node
+    :param network_headroom: network flow to preserve, relative to compute bound (>= 1)
+    :return: pruning report
+    """
+    pruner = FlowPreservingPruner(complete_cluster_file_name=complete_cluster_file_name,
+                                  machine_profile_name=machine_profile_name, model_manager=model_manager)
+    report = pruner.prune_to_file(pruned_cluster_file_name=pruned_cluster_file_name,
+                                  max_flow_loss=max_flow_loss, min_keep=min_keep,
+                                  network_headroom=network_headroom)
+    print(report.summary())
+    return report
@@ -0,0 +1,250 @@
+# 2026.10.19 Yixuan Mei
+
+import heapq
+import time
+
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Any
+
+from simulator.model_manager.model_manager import ModelManager
+from simulator.initial_layout.heterogeneous_layout.swarm_layout import SwarmLayout
+from simulator.initial_layout.heterogeneous_layout.petals_layout import PetalsLayout
+from simulator.initial_layout.local_search_layout import LocalSearchLayout, LayoutFlowNetwork
+
+
+# per-process state of the candidate evaluation workers (set by init_candidate_worker)
+_worker_state: Dict[str, Any] = {}
+
+
+def init_candidate_worker(method: str, synthesizer: PetalsLayout or SwarmLayout, network: LayoutFlowNetwork,
+                          node_keys: List[int], top_k: int) -> None:
+    """
+    Initialize the state of a candidate evaluation worker. The synthesizer and flow network are sent to each
+    worker only once instead of once per candidate.
+
+    :param method: "Petals" or "Swarm"
+    :param synthesizer: heuristic layout synthesizer with the cluster loaded
+    :param network: flow network of the complete cluster
+    :param node_keys: node idx of each compute node in the flow network
+    :param top_k: number of best candidates to keep
+    :return: None
+    """
+    _worker_state.clear()
+    _worker_state["method"] = method
+    _worker_state["synthesizer"] = synthesizer
+    _worker_state["network"] = network
+    _worker_state["node_keys"] = node_keys
+    _worker_state["top_k"] = top_k
+    _worker_state["top_flows"] = []
+
+
+def evaluate_candidate(param: int) -> Tuple[int, float, float or None, List[int] or None, List[int] or None]:
+    """
+    Synthesize the layout of one candidate and score it by max flow.
+    Note: 1. the compute bound of a layout (the min total throughput over all layers, i.e. the max flow when all
+             network transmissions are instant) is an upper bound of its max flow
+          2. each worker keeps the top-k flows it has seen, a candidate whose compute bound is no larger than the
+             k-th of them can not enter the global top-k, so its max flow is not computed
+
+    :param param: seed (Petals) or number of stages (Swarm)
+    :return: param, compute bound, max flow (None if pruned), start and count of each compute node
+    """
+    # Step 1: synthesize the layout
+    synthesizer, network = _worker_state["synthesizer"], _worker_state["network"]
+    if _worker_state["method"] == "Petals":
+        synthesizer.synthesize(seed=param)
+    else:
+        synthesizer.synthesize(num_stages=param)
+    start: List[int] = [synthesizer.nodes[node_idx].start_layer_idx for node_idx in _worker_state["node_keys"]]
+    count: List[int] = [synthesizer.nodes[node_idx].end_layer_idx - synthesizer.nodes[node_idx].start_layer_idx
+                        for node_idx in _worker_state["node_keys"]]
+
+    # Step 2: compute bound
+    layer_throughput = np.zeros(network.num_layers + 1)
+    for node_id in range(network.num_nodes):
+        node_throughput = network.layer_count_2_throughput[node_id][count[node_id]]
+        layer_throughput[start[node_id]] += node_throughput
+        layer_throughput[start[node_id] + count[node_id]] -= node_throughput
+    compute_bound = float(np.min(np.cumsum(layer_throughput)[:-1]))
+
+    # Step 3: max flow (skipped if the candidate can not enter the top-k)
+    top_flows: List[float] = _worker_state["top_flows"]
+    if len(top_flows) >= _worker_state["top_k"] and compute_bound <= top_flows[0]:
+        return param, compute_bound, None, None, None
+    flow = network.set_layout(start=start, count=count)
+    if len(top_flows) < _worker_state["top_k"]:
+        heapq.heappush(top_flows, flow)
+    elif flow > top_flows[0]:
+        heapq.heapreplace(top_flows, flow)
+    return param, compute_bound, flow, start, count
+
+
+class HeuristicLayoutSearch:
+    # Usage:
+    # 1. call "from_ini" to load a complete cluster topology and machine profile
+    # 2. call "search" with the seeds (Petals) or stage counts (Swarm) to try
+    # 3. use "best_param" to synthesize the best layout, and "save_search_statistics" to save the top-k and the
+    #    quality distribution
+
+    def __init__(self, model_manager: ModelManager) -> None:
+        """
+        Best-of search over many seeds (Petals) or stage counts (Swarm). Candidates are evaluated in parallel
+        and scored by the max flow of their layout over the complete cluster.
+
+        :return: None
+        """
+        self.model_manager: ModelManager = model_manager
+        self.cluster_file_name: str or None = None
+        self.machine_profile_name: str or None = None
+        self.flow_layout: LocalSearchLayout or None = None
+        self.cluster_loaded: bool = False
+
+        # search results
+        self.method: str or None = None
+        self.top_k: List[Tuple[float, float, int]] = []
+        self.compute_bounds: List[float] = []
+        self.flows: List[float] = []
+        self.num_pruned: int = -1
+        self.skipped_params: List[int] = []
+        self.search_time: float = -1
+        self.flow_upper_bound: float = -1
+        self.search_done: bool = False
+
+    def from_ini(self, cluster_file_name: str, machine_profile_name: str) -> None:
+        """
+        Load cluster topology and machine profiles.
+
+        :param cluster_file_name: name of the file that stores cluster topology
+        :param machine_profile_name: name of the file that stores machine profiling results
+        :return: None
+        """
+        self.cluster_file_name = cluster_file_name
+        self.machine_profile_name = machine_profile_name
+        self.flow_layout = LocalSearchLayout(model_manager=self.model_manager)
+        self.flow_layout.from_ini(cluster_file_name=cluster_file_name, machine_profile_name=machine_profile_name)
+        self.flow_upper_bound = self.flow_layout.get_flow_upper_bound()
+        self.cluster_loaded = True
+
+    def search(self, method: str, params: List[int], allow_partial_inference: bool, num_workers: int,
+               top_k: int) -> float:
+        """
+        Synthesize the layout of each candidate and keep the top-k by max flow.
+        Note: Swarm candidates whose number of stages does not divide the model, or whose stages are larger than
+              some node can hold, are skipped
+
+        :param method: "Petals" (params are seeds) or "Swarm" (params are numbers of stages)
+        :param params: seeds or numbers of stages to try
+        :param allow_partial_inference: whether partial inference is allowed when computing max flow (Petals
+                                        layouts rely on partial inference, Swarm layouts do not)
+        :param num_workers: number of worker processes (candidates are evaluated in this process if 1)
+        :param top_k: number of best candidates to keep
+        :return: max flow of the best candidate
+        """
+        assert self.cluster_loaded, "Cluster must be loaded before searching for layout!"
+        assert method in ["Petals", "Swarm"], f"Unknown heuristic method: {method}!"
+        assert len(params) >= 1 and num_workers >= 1 and top_k >= 1, "Need at least one candidate and worker!"
+        search_start_time: float = time.time()
+
+        # Step 1: load the heuristic synthesizer and the flow network
+        if method == "Petals":
+            synthesizer = PetalsLayout(model_manager=self.model_manager)
+        else:
+            synthesizer = SwarmLayout(model_manager=self.model_manager)
+        synthesizer.from_ini(cluster_file_name=self.cluster_file_name, machine_profile_name=self.machine_profile_name)
+        self.skipped_params = []
+        if method == "Swarm":
+            num_layers: int = synthesizer.model_card.num_layers
+            min_max_num_layers = min(node.max_num_layers for node in synthesizer.nodes.values())
+            self.skipped_params = [num_stages for num_stages in params if not num_layers % num_stages == 0 or
+                                   num_layers // num_stages > min_max_num_layers]
+            params = [num_stages for num_stages in params if num_stages not in self.skipped_params]
+            assert len(params) >= 1, "No valid Swarm candidate!"
+        network: LayoutFlowNetwork = self.flow_layout.get_flow_network(allow_partial_inference=allow_partial_inference)
+        print("# ------------------------------------------------------------------------------------------ #")
+        print(f"[Heuristic Layout Search - Info] Evaluate {len(params)} {method} candidates on {num_workers} workers "
+              f"(upper bound {self.flow_upper_bound}).")
+        if len(self.skipped_params) > 0:
+            print(f"[Heuristic Layout Search - Info] Skip infeasible Swarm candidates {self.skipped_params} (#layers "
+                  f"must be divisible by num_stages, and stages can not exceed the max #layers of any node).")
+
+        # Step 2: evaluate the candidates
+        init_args = (method, synthesizer, network, self.flow_layout.node_keys, top_k)
+        if num_workers == 1:
+            init_candidate_worker(*init_args)
+            results = [evaluate_candidate(param=param) for param in params]
+            _worker_state.clear()
+        else:
+            with ProcessPoolExecutor(max_workers=min(num_workers, len(params)), initializer=init_candidate_worker,
+                                     initargs=init_args) as executor:
+                chunk_size = max(1, len(params) // (4 * num_workers))
+                results = list(executor.map(evaluate_candidate, params, chunksize=chunk_size))
+
+        # Step 3: keep the top-k
+        self.method = method
+        self.compute_bounds = [result[1] for result in results]
+        self.flows = [result[2] for result in results if result[2] is not None]
+        self.num_pruned = len(results) - len(self.flows)
+        self.top_k = sorted([(result[2], result[1], result[0]) for result in results if result[2] is not None],
+                            key=lambda candidate: -candidate[0])[:top_k]
+        self.search_time = time.time() - search_start_time
+        self.search_done = True
+        print(f"[Heuristic Layout Search - Info] Best: {self.top_k[0][0]} ({method} param {self.best_param}) in "
+              f"{self.search_time:.2f} seconds ({self.num_pruned} candidates pruned by compute bound).")
+        print(f"[Heuristic Layout Search - Info] Top-{top_k}: "
+              f"{[(candidate[2], round(candidate[0], 2)) for candidate in self.top_k]}.")
+        print("# ------------------------------------------------------------------------------------------ #")
+        return self.top_k[0][0]
+
+    @property
+    def best_param(self) -> int:
+        """
+        Seed (Petals) or number of stages (Swarm) of the best candidate.
+
+        :return: param of the best candidate
+        """
+        assert self.search_done, "Must search before getting the best candidate!"
+        return self.top_k[0][2]
+
+    def get_quality_distribution(self) -> Dict[str, float]:
+        """
+        Get the distribution of max flow over the candidates whose max flow is computed, and the distribution of
+        compute bound over all candidates.
+
+        :return: {statistic name -> value}
+        """
+        assert self.search_done, "Must search before getting the quality distribution!"
+        flows, compute_bounds = np.array(self.flows), np.array(self.compute_bounds)
+        distribution: Dict[str, float] = {}
+        for name, values in [("flow", flows), ("compute_bound", compute_bounds)]:
+            distribution[f"{name}_min"] = float(np.min(values))
+            distribution[f"{name}_p25"] = float(np.percentile(values, 25))
+            distribution[f"{name}_median"] = float(np.median(values))
+            distribution[f"{name}_p75"] = float(np.percentile(values, 75))
+            distribution[f"{name}_max"] = float(np.max(values))
+            distribution[f"{name}_mean"] = float(np.mean(values))
+        return distribution
+
+    def save_search_statistics(self, save_path: str) -> None:
+        """
+        Save the top-k candidates and the quality distribution.
+
+        :param save_path: save path of the statistics file
+        :return: None
+        """
+        assert self.search_done, "Must search before saving statistics!"
+        with open(save_path, "w") as file:
+            file.write(f"method = {self.method}\n")
+            file.write(f"best_param = {self.best_param}\n")
+            file.write(f"best_flow = {self.top_k[0][0]}\n")
+            file.write(f"flow_upper_bound = {self.flow_upper_bound}\n")
+            file.write(f"num_candidates = {len(self.compute_bounds)}\n")
+            file.write(f"num_pruned = {self.num_pruned}\n")
+            file.write(f"skipped_params = {self.skipped_params}\n")
+            file.write(f"search_time = {self.search_time}\n")
+            for statistic_name, value in self.get_quality_distribution().items():
+                file.write(f"{statistic_name} = {value}\n")
+            file.write(f"top_k_params = {[candidate[2] for candidate in self.top_k]}\n")
+            file.write(f"top_k_flows = {[candidate[0] for candidate in self.top_k]}\n")
+            file.write(f"top_k_compute_bounds = {[candidate[1] for candidate in self.top_k]}\n")
@@ -5,12 +5,16 @@ import random
 from configparser import ConfigParser
 from typing import Dict, Tuple, List
 
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
 from simulator.event_simulator.utils import kbps, mbps, gbps, Byte, KB, MB, GB, Sec, MilliSec
 from simulator.event_simulator.cluster_simulator import ClusterSimulator
 from simulator.event_simulator.query_manager import QueryManagerParameters
 from simulator.scheduler.global_maxflow.global_maxflow_scheduler import FlowParameters
 from simulator.model_manager.model_manager import ModelManager
 from simulator.initial_layout.ilp_layout.ilp_layout import MachineProfile, ModelCard, ILPNode, ILPLink
+from simulator.initial_layout.cluster_topology import ClusterTopology, load_cluster_topology
 
 
 class PetalsLayout:
@@ -37,7 +41,7 @@ class PetalsLayout:
         self.node_idx_offset: int = 2
 
         # solution
-        self.layer_throughput: List[int] = []
+        self.layer_throughput: List[float] = []
 
     def from_ini(self, cluster_file_name: str, machine_profile_name: str) -> None:
         """
@@ -60,39 +64,28 @@ class PetalsLayout:
                                                                  config=machine_profile_parser)
 
         # load cluster topology
-        cluster_file_parser = ConfigParser()
-        cluster_file_parser.read(cluster_file_name)
+        topology: ClusterTopology = load_cluster_topology(file_name=cluster_file_name)
 
         # check that the topology is a complete graph
-        total_num_compute_nodes = eval(cluster_file_parser["NodeNames"]["total_compute_nodes"])
-        assert sorted(eval(cluster_file_parser["SourceNode"]["connected_nodes"])) == list(
-            range(total_num_compute_nodes)), "Not a complete graph!"
-        assert sorted(eval(cluster_file_parser["SinkNode"]["connected_nodes"])) == list(
-            range(total_num_compute_nodes)), "Not a complete graph!"
-        for i in range(total_num_compute_nodes):
-            connected_nodes: List[int or str] = ["source"] + list(range(total_num_compute_nodes)) + ["sink"]
-            connected_nodes.remove(i)
-            assert eval(cluster_file_parser[f"ComputeNode-{i}"]["connected_nodes"]) == connected_nodes, \
-                "Not a complete graph!"
+        assert topology.is_complete_graph(), "Not a complete graph!"
 
         # model
         self.model_card = ModelCard(model_manager=self.model_manager)
 
         # source and sink
         self.source = ILPNode(node_index=-1, machine_type=self.machine_profiles["SourceNode"], max_num_layers=-1,
-                              connected_node_indices=eval(cluster_file_parser["SourceNode"]["connected_nodes"]),
+                              connected_node_indices=list(topology.source_connected_nodes),
                               layer_count_2_throughput={})
         self.sink = ILPNode(node_index=-1, machine_type=self.machine_profiles["SinkNode"], max_num_layers=-1,
-                            connected_node_indices=eval(cluster_file_parser["SinkNode"]["connected_nodes"]),
+                            connected_node_indices=list(topology.sink_connected_nodes),
                             layer_count_2_throughput={})
 
         # compute nodes
-        total_compute_nodes: int = eval(cluster_file_parser["NodeNames"]["total_compute_nodes"])
+        total_compute_nodes: int = topology.num_compute_nodes
         for node_idx in range(total_compute_nodes):
-            # extract machine name, type and connected nodes from file
-            machine_name: str = f"ComputeNode-{node_idx}"
-            machine_type: MachineProfile = self.machine_profiles[cluster_file_parser[machine_name]["type"]]
-            connected_nodes: List[int] = eval(cluster_file_parser[machine_name]["connected_nodes"])
+            # extract machine type and connected nodes from topology
+            machine_type: MachineProfile = self.machine_profiles[topology.node_types[node_idx]]
+            connected_nodes: List[int] = list(topology.connected_nodes[node_idx])
 
             # compute max number of layers that can be stored on this node
             # Note: max # layers = (VRAM size / 2) / layer size
@@ -121,29 +114,18 @@ class PetalsLayout:
 
         # links
         # Note: links here are bidirectional
-        for entity_name in cluster_file_parser.sections():
-            if "Link-" in entity_name:
-                # end points
-                from_idx: int or str = entity_name.split("-")[1]
-                if not from_idx == "source":
-                    from_idx = int(from_idx)
-                to_idx: int or str = entity_name.split("-")[2]
-                if not to_idx == "sink":
-                    to_idx = int(to_idx)
-
-                # bandwidth and latency
-                bandwidth: float = eval(cluster_file_parser[entity_name]["bandwidth"])
-                latency: float = eval(cluster_file_parser[entity_name]["latency"])
-                if from_idx == "source" or to_idx == "sink":
-                    throughput: float = bandwidth / self.model_card.token_size
-                else:
-                    assert isinstance(from_idx, int) and isinstance(to_idx, int), "Bad index!"
-                    throughput: float = bandwidth / self.model_card.activation_size
-                self.links[(from_idx, to_idx)] = ILPLink(from_index=from_idx,
-                                                         to_index=to_idx,
-                                                         throughput=throughput,
-                                                         bandwidth=bandwidth,
-                                                         latency=latency)
+        for (from_idx, to_idx), bandwidth, latency in zip(topology.links, topology.link_bandwidth.tolist(),
+                                                          topology.link_latency.tolist()):
+            if from_idx == "source" or to_idx == "sink":
+                throughput: float = bandwidth / self.model_card.token_size
+            else:
+                assert isinstance(from_idx, int) and isinstance(to_idx, int), "Bad index!"
+                throughput: float = bandwidth / self.model_card.activation_size
+            self.links[(from_idx, to_idx)] = ILPLink(from_index=from_idx,
+                                                     to_index=to_idx,
+                                                     throughput=throughput,
+                                                     bandwidth=bandwidth,
+                                                     latency=latency)
 
         # mark cluster as loaded
         self.cluster_loaded = True
@@ -170,27 +152,27 @@ class PetalsLayout:
         random.shuffle(machine_perf_id)
 
         # assign layers to nodes
-        self.layer_throughput: List[int] = [0 for _ in range(self.model_card.num_layers)]
+        layer_throughput: np.ndarray = np.zeros(self.model_card.num_layers, dtype=np.float64)
         for perf, node_id in machine_perf_id:
             compute_node = self.nodes[node_id]
             max_hold_layers = compute_node.max_num_layers
 
             # find the best interval
-            best_start_idx = 0
-            best_interval = sorted(self.layer_throughput[0: max_hold_layers])
-            for i in range(self.model_card.num_layers - max_hold_layers + 1):
-                cur_interval = sorted(self.layer_throughput[i: i + max_hold_layers])
-                if cur_interval < best_interval:
-                    best_start_idx = i
-                    best_interval = cur_interval
+            # the best interval is the one whose sorted layer throughput is lexicographically smallest (the
+            # first one if there are ties), lexsort is stable and uses the last key as the primary key
+            window_size = min(max_hold_layers, self.model_card.num_layers)
+            windows = as_strided(layer_throughput, shape=(self.model_card.num_layers - window_size + 1, window_size),
+                                 strides=(layer_throughput.strides[0], layer_throughput.strides[0]), writeable=False)
+            sorted_windows = np.sort(windows, axis=1)
+            best_start_idx = int(np.lexsort(sorted_windows.T[::-1])[0])
             best_end_idx = min(best_start_idx + max_hold_layers, self.model_card.num_layers)
 
             # set interval and throughput
             compute_node.start_layer_idx = best_start_idx
             compute_node.end_layer_idx = best_end_idx
-            for layer_id in range(best_start_idx, best_end_idx):
-                self.layer_throughput[layer_id] += perf
+            layer_throughput[best_start_idx: best_end_idx] += perf
 
+        self.layer_throughput = layer_throughput.tolist()
         self.solution_found = True
 
     def generate_simulator_cluster(self, cluster_file_path: str, max_out_links_per_node: int) -> None:
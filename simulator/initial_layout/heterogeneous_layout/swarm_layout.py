@@ -10,6 +10,7 @@ from simulator.event_simulator.cluster_simulator import ClusterSimulator
 from simulator.event_simulator.query_manager import QueryManagerParameters
 from simulator.model_manager.model_manager import ModelManager
 from simulator.initial_layout.ilp_layout.ilp_layout import MachineProfile, ModelCard, ILPNode, ILPLink
+from simulator.initial_layout.cluster_topology import ClusterTopology, load_cluster_topology
 from simulator.scheduler.global_maxflow.global_maxflow_scheduler import FlowParameters
 
 
@@ -62,39 +63,28 @@ class SwarmLayout:
                                                                  config=machine_profile_parser)
 
         # load cluster topology
-        cluster_file_parser = ConfigParser()
-        cluster_file_parser.read(cluster_file_name)
+        topology: ClusterTopology = load_cluster_topology(file_name=cluster_file_name)
 
         # check that the topology is a complete graph
-        total_num_compute_nodes = eval(cluster_file_parser["NodeNames"]["total_compute_nodes"])
-        assert sorted(eval(cluster_file_parser["SourceNode"]["connected_nodes"])) == list(
-            range(total_num_compute_nodes)), "Not a complete graph!"
-        assert sorted(eval(cluster_file_parser["SinkNode"]["connected_nodes"])) == list(
-            range(total_num_compute_nodes)), "Not a complete graph!"
-        for i in range(total_num_compute_nodes):
-            connected_nodes: List[int or str] = ["source"] + list(range(total_num_compute_nodes)) + ["sink"]
-            connected_nodes.remove(i)
-            assert eval(cluster_file_parser[f"ComputeNode-{i}"]["connected_nodes"]) == connected_nodes, \
-                "Not a complete graph!"
+        assert topology.is_complete_graph(), "Not a complete graph!"
 
         # model
         self.model_card = ModelCard(model_manager=self.model_manager)
 
         # source and sink
         self.source = ILPNode(node_index=-1, machine_type=self.machine_profiles["SourceNode"], max_num_layers=-1,
-                              connected_node_indices=eval(cluster_file_parser["SourceNode"]["connected_nodes"]),
+                              connected_node_indices=list(topology.source_connected_nodes),
                               layer_count_2_throughput={})
         self.sink = ILPNode(node_index=-1, machine_type=self.machine_profiles["SinkNode"], max_num_layers=-1,
-                            connected_node_indices=eval(cluster_file_parser["SinkNode"]["connected_nodes"]),
+                            connected_node_indices=list(topology.sink_connected_nodes),
                             layer_count_2_throughput={})
 
         # compute nodes
-        total_compute_nodes: int = eval(cluster_file_parser["NodeNames"]["total_compute_nodes"])
+        total_compute_nodes: int = topology.num_compute_nodes
         for node_idx in range(total_compute_nodes):
-            # extract machine name, type and connected nodes from file
-            machine_name: str = f"ComputeNode-{node_idx}"
-            machine_type: MachineProfile = self.machine_profiles[cluster_file_parser[machine_name]["type"]]
-            connected_nodes: List[int] = eval(cluster_file_parser[machine_name]["connected_nodes"])
+            # extract machine type and connected nodes from topology
+            machine_type: MachineProfile = self.machine_profiles[topology.node_types[node_idx]]
+            connected_nodes: List[int] = list(topology.connected_nodes[node_idx])
 
             # compute max number of layers that can be stored on this node
             # Note: max # layers = (VRAM size / 2) / layer size
@@ -123,29 +113,18 @@ class SwarmLayout:
 
         # links
         # Note: links here are bidirectional
-        for entity_name in cluster_file_parser.sections():
-            if "Link-" in entity_name:
-                # end points
-                from_idx: int or str = entity_name.split("-")[1]
-                if not from_idx == "source":
-                    from_idx = int(from_idx)
-                to_idx: int or str = entity_name.split("-")[2]
-                if not to_idx == "sink":
-                    to_idx = int(to_idx)
-
-                # bandwidth and latency
-                bandwidth: float = eval(cluster_file_parser[entity_name]["bandwidth"])
-                latency: float = eval(cluster_file_parser[entity_name]["latency"])
-                if from_idx == "source" or to_idx == "sink":
-                    throughput: float = bandwidth / self.model_card.token_size
-                else:
-                    assert isinstance(from_idx, int) and isinstance(to_idx, int), "Bad index!"
-                    throughput: float = bandwidth / self.model_card.activation_size
-                self.links[(from_idx, to_idx)] = ILPLink(from_index=from_idx,
-                                                         to_index=to_idx,
-                                                         throughput=throughput,
-                                                         bandwidth=bandwidth,
-                                                         latency=latency)
+        for (from_idx, to_idx), bandwidth, latency in zip(topology.links, topology.link_bandwidth.tolist(),
+                                                          topology.link_latency.tolist()):
+            if from_idx == "source" or to_idx == "sink":
+                throughput: float = bandwidth / self.model_card.token_size
+            else:
+                assert isinstance(from_idx, int) and isinstance(to_idx, int), "Bad index!"
+                throughput: float = bandwidth / self.model_card.activation_size
+            self.links[(from_idx, to_idx)] = ILPLink(from_index=from_idx,
+                                                     to_index=to_idx,
+                                                     throughput=throughput,
+                                                     bandwidth=bandwidth,
+                                                     latency=latency)
 
         # mark cluster as loaded
         self.cluster_loaded = True
@@ -0,0 +1,362 @@
+# 2026.10.19 Yixuan Mei
+import numpy as np
+
+from typing import Dict, List, Tuple, Set
+
+from simulator.event_simulator.utils import mbps, MilliSec
+from simulator.initial_layout.cluster_topology import ClusterTopology
+from simulator.initial_layout.fake_cluster_generator import create_weighted_list
+
+
+class LinkTierStatistics:
+    def __init__(self, avg_bandwidth: float, var_bandwidth: float, avg_latency: float, var_latency: float) -> None:
+        """
+        Statistics of links in one tier of the network hierarchy.
+
+        :param avg_bandwidth: average bandwidth
+        :param var_bandwidth: variance of bandwidth (bandwidth is uniform in avg +/- var)
+        :param avg_latency: average latency
+        :param var_latency: variance of latency (latency is uniform in avg +/- var)
+        :return: None
+        """
+        self.avg_bandwidth: float = avg_bandwidth
+        self.var_bandwidth: float = var_bandwidth
+        self.avg_latency: float = avg_latency
+        self.var_latency: float = var_latency
+
+
+def _round_bandwidth(raw_bandwidth: float) -> float:
+    """
+    Round bandwidth in the same way as the other cluster generators (in mbps).
+
+    :param raw_bandwidth: raw bandwidth
+    :return: rounded bandwidth in mbps
+    """
+    if raw_bandwidth > 10 * mbps:
+        return int(raw_bandwidth / mbps)
+    elif raw_bandwidth > 1 * mbps:
+        return round(raw_bandwidth / mbps, 1)
+    else:
+        return round(raw_bandwidth / mbps, 3)
+
+
+class HierarchicalClusterGenerator:
+    def __init__(self) -> None:
+        """
+        HierarchicalClusterGenerator generates a sparse cluster topology for large clusters (e.g. 1000 nodes).
+        Compute nodes are placed into racks of datacenters at different locations. Each compute node connects
+        with all nodes in its rack, a few nodes in other racks of its datacenter and a few nodes in the k
+        nearest datacenters. Link bandwidth depends on the tier (rack / datacenter / cross datacenter) and is
+        capped by the (oversubscribed) NIC of both end points. Source and sink are located in one of the
+        datacenters and connect to all compute nodes.
+        Note: the number of links is O(n * degree) instead of O(n^2) in FakeClusterGenerator, and the cluster
+              is streamed directly into an ini file or a binary file (see ClusterTopology).
+        """
+        # node statistics
+        self.node_statistics_set: bool = False
+        self.num_compute_nodes: int = -1
+        self.num_datacenters: int = -1
+        self.racks_per_datacenter: int = -1
+        self.node_type_percentage: Dict[str, float] = {}
+        self.datacenter_locations: List[Tuple[float, float]] or None = None
+        self.region_size: float = -1
+        self.coordinator_datacenter: int = -1
+
+        # connectivity statistics
+        self.connectivity_set: bool = False
+        self.intra_datacenter_degree: int = -1
+        self.cross_datacenter_degree: int = -1
+        self.num_nearest_datacenters: int = -1
+
+        # link statistics
+        self.link_statistics_set: bool = False
+        self.rack_tier: LinkTierStatistics or None = None
+        self.datacenter_tier: LinkTierStatistics or None = None
+        self.cross_datacenter_tier: LinkTierStatistics or None = None
+        self.latency_per_km: float = -1
+        self.nic_bandwidth: Dict[str, float] = {}
+        self.nic_oversubscription: float = -1
+
+    def set_node_statistics(self, num_compute_nodes: int, num_datacenters: int, racks_per_datacenter: int,
+                            node_type_percentage: Dict[str, float],
+                            datacenter_locations: List[Tuple[float, float]] or None = None,
+                            region_size: float = 4000, coordinator_datacenter: int = 0) -> None:
+        """
+        Set node statistics for this generator. Compute nodes are evenly distributed into datacenters and
+        racks (node ids are contiguous within each datacenter and rack).
+
+        :param num_compute_nodes: number of compute nodes in the cluster
+        :param num_datacenters: number of datacenters
+        :param racks_per_datacenter: number of racks in each datacenter
+        :param node_type_percentage: type name -> percentage
+        :param datacenter_locations: (x, y) location of each datacenter in km, randomly generated if None
+        :param region_size: size of the (square) region where datacenters are randomly placed, in km
+        :param coordinator_datacenter: the datacenter where source and sink are located
+        :return: None
+        """
+        # check input
+        assert num_compute_nodes >= num_datacenters * racks_per_datacenter, "Found empty racks!"
+        assert datacenter_locations is None or len(datacenter_locations) == num_datacenters, \
+            "Datacenter locations mismatch!"
+        assert 0 <= coordinator_datacenter < num_datacenters, "Bad coordinator datacenter!"
+
+        # set node statistics
+        self.num_compute_nodes = num_compute_nodes
+        self.num_datacenters = num_datacenters
+        self.racks_per_datacenter = racks_per_datacenter
+        self.node_type_percentage = node_type_percentage
+        self.datacenter_locations = datacenter_locations
+        self.region_size = region_size
+        self.coordinator_datacenter = coordinator_datacenter
+        self.node_statistics_set = True
+
+    def set_connectivity(self, intra_datacenter_degree: int, cross_datacenter_degree: int,
+                         num_nearest_datacenters: int) -> None:
+        """
+        Set connectivity for this generator. Each compute node connects with:
+            1. all other compute nodes in the same rack
+            2. intra_datacenter_degree random nodes in other racks of the same datacenter
+            3. cross_datacenter_degree random nodes in the num_nearest_datacenters nearest datacenters
+
+        :param intra_datacenter_degree: number of peers in other racks of the same datacenter
+        :param cross_datacenter_degree: number of peers in nearby datacenters
+        :param num_nearest_datacenters: number of nearby datacenters (k nearest by distance)
+        :return: None
+        """
+        assert intra_datacenter_degree >= 0 and cross_datacenter_degree >= 0, "Degree must be non-negative!"
+        assert num_nearest_datacenters >= 0, "Number of nearest datacenters must be non-negative!"
+        self.intra_datacenter_degree = intra_datacenter_degree
+        self.cross_datacenter_degree = cross_datacenter_degree
+        self.num_nearest_datacenters = num_nearest_datacenters
+        self.connectivity_set = True
+
+    def set_link_statistics(self, rack_tier: LinkTierStatistics, datacenter_tier: LinkTierStatistics,
+                            cross_datacenter_tier: LinkTierStatistics, latency_per_km: float,
+                            nic_bandwidth: Dict[str, float], nic_oversubscription: float) -> None:
+        """
+        Set link statistics for this generator.
+        Note: the bandwidth of a link is min(tier bandwidth, NIC share of both end points), where the NIC
+              share of a node is nic_bandwidth * nic_oversubscription / degree. Links to source and sink use
+              the datacenter tier if the node is in the coordinator datacenter and the cross datacenter tier
+              otherwise. Cross datacenter links have extra latency of latency_per_km * distance.
+
+        :param rack_tier: statistics of links within a rack
+        :param datacenter_tier: statistics of links between racks of the same datacenter
+        :param cross_datacenter_tier: statistics of links between datacenters
+        :param latency_per_km: extra latency per km of distance between datacenters
+        :param nic_bandwidth: machine type -> NIC bandwidth
+        :param nic_oversubscription: ratio between the sum of link bandwidth and NIC bandwidth on each node
+        :return: None
+        """
+        assert nic_oversubscription > 0, "NIC oversubscription must be positive!"
+        self.rack_tier = rack_tier
+        self.datacenter_tier = datacenter_tier
+        self.cross_datacenter_tier = cross_datacenter_tier
+        self.latency_per_km = latency_per_km
+        self.nic_bandwidth = nic_bandwidth
+        self.nic_oversubscription = nic_oversubscription
+        self.link_statistics_set = True
+
+    def generate_cluster(self, file_name: str, seed: int = 0) -> None:
+        """
+        Generate a sparse cluster and write into the given file. If file_name ends with .npz, the cluster is
+        saved in binary format (see ClusterTopology.save_binary), otherwise it is saved in ini format.
+        File format convention is the same as FakeClusterGenerator:
+            1. connected_nodes is sorted (source < compute node < sink)
+            2. each link is bidirectional and appear in sorted order (i.e. source-i, i-j with i < j and j-sink)
+
+        :param file_name: name of the file
+        :param seed: random seed
+        :return: None
+        """
+        # make sure the generator is properly initialized and set random seed
+        assert self.node_statistics_set and self.connectivity_set and self.link_statistics_set, "Not initialized!"
+        rng = np.random.default_rng(seed)
+        n: int = self.num_compute_nodes
+
+        # place the nodes into datacenters and racks
+        datacenter_of: np.ndarray = np.arange(n) * self.num_datacenters // n
+        rack_of: np.ndarray = np.zeros(n, dtype=np.int64)
+        for datacenter_idx in range(self.num_datacenters):
+            members = np.flatnonzero(datacenter_of == datacenter_idx)
+            rack_of[members] = datacenter_idx * self.racks_per_datacenter + \
+                np.arange(len(members)) * self.racks_per_datacenter // len(members)
+        node_types: List[str] = create_weighted_list(strings=list(self.node_type_percentage.keys()),
+                                                     probabilities=list(self.node_type_percentage.values()),
+                                                     m=n, rng=rng)
+        for node_type in set(node_types):
+            assert node_type in self.nic_bandwidth, f"NIC bandwidth of {node_type} is not given!"
+
+        # datacenter locations and the k nearest datacenters of each datacenter
+        if self.datacenter_locations is not None:
+            locations = np.array(self.datacenter_locations, dtype=np.float64)
+        else:
+            locations = rng.uniform(0, self.region_size, size=(self.num_datacenters, 2))
+        distance: np.ndarray = np.linalg.norm(locations[:, None, :] - locations[None, :, :], axis=2)
+        nearest_datacenters: List[np.ndarray] = []
+        for datacenter_idx in range(self.num_datacenters):
+            order = [_dc for _dc in np.argsort(distance[datacenter_idx], kind="stable") if _dc != datacenter_idx]
+            nearest_datacenters.append(np.array(order[:self.num_nearest_datacenters], dtype=np.int64))
+
+        # compute-compute edges: (begin, end) with begin < end
+        edges: Set[Tuple[int, int]] = set()
+        rack_members: Dict[int, np.ndarray] = {_rack: np.flatnonzero(rack_of == _rack)
+                                               for _rack in np.unique(rack_of).tolist()}
+        datacenter_members: Dict[int, np.ndarray] = {_dc: np.flatnonzero(datacenter_of == _dc)
+                                                     for _dc in range(self.num_datacenters)}
+        for members in rack_members.values():
+            members = members.tolist()
+            for i, begin in enumerate(members):
+                for end in members[i + 1:]:
+                    edges.add((begin, end))
+        for node_idx in range(n):
+            # peers in other racks of the same datacenter
+            same_datacenter = datacenter_members[int(datacenter_of[node_idx])]
+            candidates = same_datacenter[rack_of[same_datacenter] != rack_of[node_idx]]
+            num_peers = min(self.intra_datacenter_degree, len(candidates))
+            for peer in rng.choice(candidates, size=num_peers, replace=False).tolist():
+                edges.add((min(node_idx, peer), max(node_idx, peer)))
+
+            # peers in nearby datacenters
+            nearby = nearest_datacenters[int(datacenter_of[node_idx])]
+            if len(nearby) == 0:
+                continue
+            candidates = np.concatenate([datacenter_members[_dc] for _dc in nearby.tolist()])
+            num_peers = min(self.cross_datacenter_degree, len(candidates))
+            for peer in rng.choice(candidates, size=num_peers, replace=False).tolist():
+                edges.add((min(node_idx, peer), max(node_idx, peer)))
+        sorted_edges: List[Tuple[int, int]] = sorted(edges)
+
+        # degree of each node (source and sink included) and its share of NIC bandwidth
+        degree: np.ndarray = np.full(n, 2, dtype=np.int64)
+        for begin, end in sorted_edges:
+            degree[begin] += 1
+            degree[end] += 1
+        nic_share: List[float] = [self.nic_bandwidth[node_types[_idx]] * self.nic_oversubscription / degree[_idx]
+                                  for _idx in range(n)]
+
+        # links (in file order), bandwidth is in mbps and latency is in MilliSec (same as the ini file)
+        links: List[Tuple[int or str, int or str]] = []
+        link_bandwidth_mbps: List[float] = []
+        link_latency_ms: List[float] = []
+
+        def add_link(from_node: int or str, to_node: int or str) -> None:
+            # determine the tier and the distance
+            from_idx = to_idx = None
+            if from_node == "source":
+                to_idx = to_node
+                datacenter_pair = (self.coordinator_datacenter, int(datacenter_of[to_idx]))
+            elif to_node == "sink":
+                from_idx = from_node
+                datacenter_pair = (int(datacenter_of[from_idx]), self.coordinator_datacenter)
+            else:
+                from_idx, to_idx = from_node, to_node
+                datacenter_pair = (int(datacenter_of[from_idx]), int(datacenter_of[to_idx]))
+            if datacenter_pair[0] != datacenter_pair[1]:
+                tier = self.cross_datacenter_tier
+            elif from_idx is not None and to_idx is not None and rack_of[from_idx] == rack_of[to_idx]:
+                tier = self.rack_tier
+            else:
+                tier = self.datacenter_tier
+
+            # bandwidth (capped by NIC) and latency
+            raw_bandwidth = tier.avg_bandwidth + rng.uniform(-tier.var_bandwidth, tier.var_bandwidth)
+            for node_idx in (from_idx, to_idx):
+                if node_idx is not None:
+                    raw_bandwidth = min(raw_bandwidth, nic_share[node_idx])
+            raw_latency = tier.avg_latency + rng.uniform(-tier.var_latency, tier.var_latency) + \
+                self.latency_per_km * distance[datacenter_pair[0], datacenter_pair[1]]
+
+            # round in the same way as the ini file, so that ini and binary files are the same
+            links.append((from_node, to_node))
+            link_bandwidth_mbps.append(_round_bandwidth(raw_bandwidth=raw_bandwidth))
+            link_latency_ms.append(round(max(raw_latency, 0) / MilliSec, 3))
+
+        for node_idx in range(n):
+            add_link(from_node="source", to_node=node_idx)
+        for begin, end in sorted_edges:
+            add_link(from_node=begin, to_node=end)
+        for node_idx in range(n):
+            add_link(from_node=node_idx, to_node="sink")
+
+        # connected nodes of each compute node
+        neighbors: List[List[int]] = [[] for _ in range(n)]
+        for begin, end in sorted_edges:
+            neighbors[begin].append(end)
+            neighbors[end].append(begin)
+        connected_nodes: List[List[int or str]] = [["source"] + sorted(neighbors[_idx]) + ["sink"]
+                                                   for _idx in range(n)]
+
+        # header of the file
+        header: List[str] = [
+            f"# ************* Sparse cluster generated by HierarchicalClusterGenerator ************* #",
+            f"# seed: {seed}",
+            f"# Node Settings:",
+            f"#     num_compute_nodes: {n}",
+            f"#     num_datacenters: {self.num_datacenters}",
+            f"#     racks_per_datacenter: {self.racks_per_datacenter}",
+            f"#     node_type_percentage: {self.node_type_percentage}",
+            f"#     datacenter_locations: {[tuple(_loc) for _loc in locations.round(1).tolist()]}",
+            f"#     coordinator_datacenter: {self.coordinator_datacenter}",
+            f"# Connectivity Settings:",
+            f"#     intra_datacenter_degree: {self.intra_datacenter_degree}",
+            f"#     cross_datacenter_degree: {self.cross_datacenter_degree}",
+            f"#     num_nearest_datacenters: {self.num_nearest_datacenters}",
+            f"# Edge Settings:",
+        ]
+        for tier_name, tier in [("rack", self.rack_tier), ("datacenter", self.datacenter_tier),
+                                ("cross_datacenter", self.cross_datacenter_tier)]:
+            header += [
+                f"#     {tier_name}_avg_bandwidth: {tier.avg_bandwidth} ({tier.avg_bandwidth / mbps} mbps)",
+                f"#     {tier_name}_var_bandwidth: {tier.var_bandwidth} ({tier.var_bandwidth / mbps} mbps)",
+                f"#     {tier_name}_avg_latency: {tier.avg_latency} ({tier.avg_latency * 1000} MilliSec)",
+                f"#     {tier_name}_var_latency: {tier.var_latency} ({tier.var_latency * 1000} MilliSec)",
+            ]
+        header += [
+            f"#     latency_per_km: {self.latency_per_km} ({self.latency_per_km * 1000} MilliSec)",
+            f"#     nic_bandwidth: { {_type: _bw / mbps for _type, _bw in self.nic_bandwidth.items()} } (mbps)",
+            f"#     nic_oversubscription: {self.nic_oversubscription}",
+            f"# **********************************************************************************",
+        ]
+
+        # binary format
+        if file_name.endswith(".npz"):
+            topology = ClusterTopology(node_types=node_types, source_connected_nodes=list(range(n)),
+                                       sink_connected_nodes=list(range(n)), connected_nodes=connected_nodes,
+                                       links=links, link_bandwidth=np.array(link_bandwidth_mbps) * mbps,
+                                       link_latency=np.array(link_latency_ms) * MilliSec, header=header)
+            topology.save_binary(file_name=file_name)
+            return
+
+        # ini format
+        with open(file_name, "w") as f:
+            for line in header:
+                f.write(f"{line}\n")
+            f.write(f"\n")
+
+            # write the list of nodes in the cluster
+            f.write(f"[NodeNames]\n")
+            f.write(f"total_compute_nodes={n}\n")
+            f.write(f"\n")
+
+            # write type and connectivity for source and sink
+            f.write(f"[SourceNode]\n")
+            f.write(f"connected_nodes={list(range(n))}\n")
+            f.write(f"\n")
+            f.write(f"[SinkNode]\n")
+            f.write(f"connected_nodes={list(range(n))}\n")
+            f.write(f"\n")
+
+            # write type and connectivity for each compute node
+            for i in range(n):
+                f.write(f"[ComputeNode-{i}]\n")
+                f.write(f"type={node_types[i]}\n")
+                f.write(f"connected_nodes={connected_nodes[i]}\n")
+                f.write(f"\n")
+
+            # write properties of the network links
+            for (from_node, to_node), bandwidth, latency in zip(links, link_bandwidth_mbps, link_latency_ms):
+                f.write(f"[Link-{from_node}-{to_node}]\n")
+                f.write(f"bandwidth={bandwidth} * mbps\n")
+                f.write(f"latency={latency} * MilliSec\n")
+                f.write(f"\n")
@@ -3,17 +3,18 @@
 import math
 import time
 
-import gurobipy as gp
+import numpy as np
 
 from typing import List, Dict, Tuple, Set
 from configparser import ConfigParser
-from gurobipy import GRB
 
 from simulator.event_simulator.utils import kbps, mbps, gbps, Byte, KB, MB, GB, Sec, MilliSec, ATOL, is_close
 from simulator.event_simulator.cluster_simulator import ClusterSimulator
 from simulator.event_simulator.query_manager import QueryManagerParameters
 from simulator.model_manager.model_manager import ModelManager
 from simulator.scheduler.global_maxflow.global_maxflow_scheduler import FlowParameters
+from simulator.initial_layout.cluster_topology import ClusterTopology, load_cluster_topology
+from simulator.initial_layout.ilp_layout.milp_model import MILPModel, MILPSolver, VarType, INFINITY
 
 
 class MachineProfile:
@@ -140,30 +141,31 @@ class ILPLayout:
 
         # ilp model
         self.model_initialized: bool = False
-        self.ilp_model: gp.Model or None = None
-
-        # variables
-        self.var_node_start: Dict[str, gp.Var] = {}
-        self.var_node_hold_layer: Dict[int, Dict[str, gp.Var]] = {}
-        self.var_flow: Dict[str, gp.Var] = {}
-        self.var_edge_switch: Dict[str, gp.Var] = {}
-        # tmp variables that are only used when allow partial inference
-        self.tmp_var_compute_edge_cond1: Dict[str, gp.Var] = {}
-        self.tmp_var_compute_edge_cond2: Dict[str, gp.Var] = {}
-
-        # constraints
-        self.constr_hold: Dict[str, gp.Constr] = {}
-        self.constr_end: Dict[str, gp.Constr] = {}
-        self.constr_node_flow: Dict[str, gp.Constr] = {}
-        self.constr_node_throughput: Dict[str, gp.Constr] = {}
-        self.constr_edge_enabled: Dict[str, gp.Constr] = {}
-        self.constr_edge_disabled: Dict[str, gp.Constr] = {}
-        self.constr_edge_flow: Dict[str, gp.Constr] = {}
-        # tmp constraints that are only used when allow partial inference
-        self.tmp_constr_cond1_enabled: Dict[str, gp.Constr] = {}
-        self.tmp_constr_cond1_disabled: Dict[str, gp.Constr] = {}
-        self.tmp_constr_cond2_enabled: Dict[str, gp.Constr] = {}
-        self.tmp_constr_cond2_disabled: Dict[str, gp.Constr] = {}
+        self.ilp_model: MILPModel or None = None
+
+        # nodes and directed edges of the ILP (integer ids)
+        # node id: 0, ..., n - 1 are compute nodes (in the order of self.ilp_nodes), n is source, n + 1 is sink
+        self.node_keys: List[int] = []
+        self.node_labels: List[str] = []
+        self.edge_from: np.ndarray or None = None
+        self.edge_to: np.ndarray or None = None
+        self.edge_throughput: np.ndarray or None = None
+
+        # variables (indices of variables in the ilp model)
+        # hold_i_k is var_node_hold_layer[hold_offset[i] + k - 1]
+        self.var_node_start: np.ndarray or None = None
+        self.var_node_hold_layer: np.ndarray or None = None
+        self.hold_offset: np.ndarray or None = None
+        self.hold_layer_count: np.ndarray or None = None
+        self.var_flow: np.ndarray or None = None
+        self.var_edge_switch: np.ndarray or None = None
+        # tmp variables that are only used when allow partial inference (-1 for edges from source / to sink)
+        self.tmp_var_compute_edge_cond1: np.ndarray or None = None
+        self.tmp_var_compute_edge_cond2: np.ndarray or None = None
+
+        # model statistics
+        self.model_build_time: float = -1
+        self.model_memory_usage: float = -1
 
         # optimization status
         # stopping criteria
@@ -200,27 +202,25 @@ class ILPLayout:
                                                                  config=machine_profile_parser)
 
         # load cluster topology
-        cluster_file_parser = ConfigParser()
-        cluster_file_parser.read(cluster_file_name)
+        topology: ClusterTopology = load_cluster_topology(file_name=cluster_file_name)
 
         # model
         self.model_card = ModelCard(model_manager=self.model_manager)
 
         # source and sink
         self.ilp_source = ILPNode(node_index=-1, machine_type=self.machine_profiles["SourceNode"], max_num_layers=-1,
-                                  connected_node_indices=eval(cluster_file_parser["SourceNode"]["connected_nodes"]),
+                                  connected_node_indices=list(topology.source_connected_nodes),
                                   layer_count_2_throughput={})
         self.ilp_sink = ILPNode(node_index=-1, machine_type=self.machine_profiles["SinkNode"], max_num_layers=-1,
-                                connected_node_indices=eval(cluster_file_parser["SinkNode"]["connected_nodes"]),
+                                connected_node_indices=list(topology.sink_connected_nodes),
                                 layer_count_2_throughput={})
 
         # compute nodes
-        total_compute_nodes: int = eval(cluster_file_parser["NodeNames"]["total_compute_nodes"])
+        total_compute_nodes: int = topology.num_compute_nodes
         for node_idx in range(total_compute_nodes):
-            # extract machine name, type and connected nodes from file
-            machine_name: str = f"ComputeNode-{node_idx}"
-            machine_type: MachineProfile = self.machine_profiles[cluster_file_parser[machine_name]["type"]]
-            connected_nodes: List[int] = eval(cluster_file_parser[machine_name]["connected_nodes"])
+            # extract machine type and connected nodes from topology
+            machine_type: MachineProfile = self.machine_profiles[topology.node_types[node_idx]]
+            connected_nodes: List[int] = list(topology.connected_nodes[node_idx])
 
             # compute max number of layers that can be stored on this node
             # Note: max # layers = (VRAM size / 2) / layer size
@@ -249,79 +249,90 @@ class ILPLayout:
 
         # links
         # Note: links here are bidirectional
-        for entity_name in cluster_file_parser.sections():
-            if "Link-" in entity_name:
-                # end points
-                from_idx: int or str = entity_name.split("-")[1]
-                if not from_idx == "source":
-                    from_idx = int(from_idx)
-                to_idx: int or str = entity_name.split("-")[2]
-                if not to_idx == "sink":
-                    to_idx = int(to_idx)
-
-                # bandwidth and latency
-                bandwidth: float = eval(cluster_file_parser[entity_name]["bandwidth"])
-                latency: float = eval(cluster_file_parser[entity_name]["latency"])
-                if from_idx == "source" or to_idx == "sink":
-                    throughput: float = bandwidth / self.model_card.token_size
-                else:
-                    assert isinstance(from_idx, int) and isinstance(to_idx, int), "Bad index!"
-                    throughput: float = bandwidth / self.model_card.activation_size
-                self.ilp_links[(from_idx, to_idx)] = ILPLink(from_index=from_idx,
-                                                             to_index=to_idx,
-                                                             throughput=throughput,
-                                                             bandwidth=bandwidth,
-                                                             latency=latency)
+        for (from_idx, to_idx), bandwidth, latency in zip(topology.links, topology.link_bandwidth.tolist(),
+                                                          topology.link_latency.tolist()):
+            if from_idx == "source" or to_idx == "sink":
+                throughput: float = bandwidth / self.model_card.token_size
+            else:
+                assert isinstance(from_idx, int) and isinstance(to_idx, int), "Bad index!"
+                throughput: float = bandwidth / self.model_card.activation_size
+            self.ilp_links[(from_idx, to_idx)] = ILPLink(from_index=from_idx,
+                                                         to_index=to_idx,
+                                                         throughput=throughput,
+                                                         bandwidth=bandwidth,
+                                                         latency=latency)
 
         # mark cluster as loaded
         self.cluster_loaded = True
 
-    def get_end_layer_index(self, compute_node_idx: int) -> gp.LinExpr:
+    def get_end_layer_index_terms(self, rows: np.ndarray, node_ids: np.ndarray,
+                                  coefficient: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        Get the end layer index of compute node i.
+        Get the COO terms of coefficient * (end layer index of compute node i) for each row, where the end layer
+        index of compute node i is start_i + \\sum_k k * hold_i_k.
 
-        :param compute_node_idx: index of the compute node
-        :return: a LinExpr that represent the end layer index of compute node i
+        :param rows: the rows to add the terms to
+        :param node_ids: compute node id of each row
+        :param coefficient: coefficient of the end layer index
+        :return: rows, cols, vals
         """
-        start_var: gp.Var = self.var_node_start[f"start_{compute_node_idx}"]
-        k_hold_var: List[gp.LinExpr] = []
-        for layer_count in range(1, self.ilp_nodes[compute_node_idx].max_num_layers + 1):
-            hold_var_name = f"hold_{compute_node_idx}_{layer_count}"
-            hold_var: gp.Var = self.var_node_hold_layer[compute_node_idx][hold_var_name]
-            k_hold_var.append(layer_count * hold_var)
-        return start_var + gp.quicksum(k_hold_var)
+        counts = self.hold_layer_count[node_ids]
+        hold_rows = np.repeat(rows, counts)
+        hold_k_minus_one = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        hold_cols = self.var_node_hold_layer[np.repeat(self.hold_offset[node_ids], counts) + hold_k_minus_one]
+        return (np.concatenate([rows, hold_rows]),
+                np.concatenate([self.var_node_start[node_ids], hold_cols]),
+                np.concatenate([np.full(len(rows), coefficient, dtype=float), coefficient * (hold_k_minus_one + 1.0)]))
 
     def step1_initialize_ilp(self, seed: int, model_name: str) -> None:
         """
-        Initialize the ILP program.
+        Initialize the ILP program and index the nodes and directed edges.
 
         :param seed: random seed
         :param model_name: name of the model
         :return: None
         """
-        self.ilp_model = gp.Model(model_name)
-        self.ilp_model.Params.Seed = seed
+        self.ilp_model = MILPModel(name=model_name, seed=seed)
+
+        # nodes
+        self.node_keys = list(self.ilp_nodes.keys())
+        self.node_labels = [str(node_idx) for node_idx in self.node_keys] + ["source", "sink"]
+        node_key_2_id: Dict[int or str, int] = {node_idx: _id for _id, node_idx in enumerate(self.node_keys)}
+        node_key_2_id["source"], node_key_2_id["sink"] = len(self.node_keys), len(self.node_keys) + 1
+
+        # directed edges (the forward and backward edge of each link, except those into source / out of sink)
+        edge_from, edge_to, edge_throughput = [], [], []
+        for link_name_tuple, link in self.ilp_links.items():
+            if not link_name_tuple[0] == "sink" and not link_name_tuple[1] == "source":
+                edge_from.append(node_key_2_id[link_name_tuple[0]])
+                edge_to.append(node_key_2_id[link_name_tuple[1]])
+                edge_throughput.append(link.throughput)
+            if not link_name_tuple[1] == "sink" and not link_name_tuple[0] == "source":
+                edge_from.append(node_key_2_id[link_name_tuple[1]])
+                edge_to.append(node_key_2_id[link_name_tuple[0]])
+                edge_throughput.append(link.throughput)
+        self.edge_from = np.array(edge_from, dtype=np.int64)
+        self.edge_to = np.array(edge_to, dtype=np.int64)
+        self.edge_throughput = np.array(edge_throughput, dtype=float)
 
         # variables
-        self.var_node_start.clear()
-        self.var_node_hold_layer.clear()
-        self.var_flow.clear()
-        self.var_edge_switch.clear()
-        self.tmp_var_compute_edge_cond1.clear()
-        self.tmp_var_compute_edge_cond2.clear()
-
-        # constraints
-        self.constr_hold.clear()
-        self.constr_end.clear()
-        self.constr_node_flow.clear()
-        self.constr_node_throughput.clear()
-        self.constr_edge_enabled.clear()
-        self.constr_edge_disabled.clear()
-        self.constr_edge_flow.clear()
-        self.tmp_constr_cond1_enabled.clear()
-        self.tmp_constr_cond1_disabled.clear()
-        self.tmp_constr_cond2_enabled.clear()
-        self.tmp_constr_cond2_disabled.clear()
+        self.var_node_start = None
+        self.var_node_hold_layer = None
+        self.hold_offset = None
+        self.hold_layer_count = None
+        self.var_flow = None
+        self.var_edge_switch = None
+        self.tmp_var_compute_edge_cond1 = None
+        self.tmp_var_compute_edge_cond2 = None
+
+    def get_edge_names(self) -> List[str]:
+        """
+        Get the names of directed edges ("{from}_{to}"), which are used in variable and constraint names.
+
+        :return: name of each directed edge
+        """
+        return [f"{self.node_labels[_from]}_{self.node_labels[_to]}"
+                for _from, _to in zip(self.edge_from.tolist(), self.edge_to.tolist())]
 
     def step2_add_variables(self, allow_partial_inference: bool, remove_redundant: bool,
                             start_from_heuristic: bool, heuristic_sol_path: str) -> Tuple[int, int, int]:
@@ -335,6 +346,8 @@ class ILPLayout:
         :return: num_int, num_real, num_binary
         """
         num_int, num_real, num_binary = 0, 0, 0
+        num_nodes, num_edges = len(self.node_keys), len(self.edge_from)
+        edge_names: List[str] = self.get_edge_names()
 
         # Step 2.0: If we start from a heuristic solution, load the solution
         # we only set start layer id and end layer id for each node
@@ -350,116 +363,75 @@ class ILPLayout:
         # var_type: int
         # var_range: {0, 1, ..., # layers  - 1}
         # number of variables: n
-        for compute_node_idx, compute_node in self.ilp_nodes.items():
-            start_var_name = f"start_{compute_node_idx}"
-            if remove_redundant:
-                start_var = self.ilp_model.addVar(vtype=GRB.INTEGER,
-                                                  lb=0,
-                                                  name=start_var_name)
-            else:
-                start_var = self.ilp_model.addVar(vtype=GRB.INTEGER,
-                                                  lb=0,
-                                                  ub=self.model_card.num_layers - 1,
-                                                  name=start_var_name)
-            if start_from_heuristic:
-                heuristic_node_idx = compute_node_idx + heuristic_offset
-                layers_on_node: List[int] = eval(config["Solution"][f"compute_node_{heuristic_node_idx}"])
-                start_var.Start = min(layers_on_node)
-            self.var_node_start[start_var_name] = start_var
-            num_int += 1
+        self.var_node_start = self.ilp_model.add_vars(
+            count=num_nodes, vtype=VarType.Integer, names=[f"start_{node_idx}" for node_idx in self.node_keys],
+            lb=0, ub=INFINITY if remove_redundant else self.model_card.num_layers - 1
+        )
+        num_int += num_nodes
 
         # Step 2.2: add whether each node holds k layers as variable
         # var_name: hold_i_k (b_ik)
         # var_type: bool
         # var_range: {0, 1}
         # number of variables: kn
-        for compute_node_idx, compute_node in self.ilp_nodes.items():
-            self.var_node_hold_layer[compute_node_idx] = {}
-            for layer_count in range(1, compute_node.max_num_layers + 1):
-                hold_var_name = f"hold_{compute_node_idx}_{layer_count}"
-                hold_var = self.ilp_model.addVar(vtype=GRB.BINARY,
-                                                 name=hold_var_name)
-                if start_from_heuristic:
-                    heuristic_node_idx = compute_node_idx + heuristic_offset
-                    layers_on_node: List[int] = eval(config["Solution"][f"compute_node_{heuristic_node_idx}"])
-                    if layer_count == len(layers_on_node):
-                        hold_var.Start = 1
-                    else:
-                        hold_var.Start = 0
-                self.var_node_hold_layer[compute_node_idx][hold_var_name] = hold_var
-                num_binary += 1
+        self.hold_layer_count = np.array([self.ilp_nodes[node_idx].max_num_layers for node_idx in self.node_keys],
+                                         dtype=np.int64)
+        self.hold_offset = np.cumsum(self.hold_layer_count) - self.hold_layer_count
+        hold_names: List[str] = [f"hold_{node_idx}_{layer_count}" for node_idx in self.node_keys
+                                 for layer_count in range(1, self.ilp_nodes[node_idx].max_num_layers + 1)]
+        self.var_node_hold_layer = self.ilp_model.add_vars(count=len(hold_names), vtype=VarType.Binary,
+                                                           names=hold_names)
+        num_binary += len(hold_names)
+
+        # set start values of start_i and hold_i_k
+        # Note: only start_i is a placement variable, so that the number of layers on each node is left to the
+        #       solver when only the placement is fixed (see MILPModel.set_starts)
+        if start_from_heuristic:
+            start_values, hold_values = np.zeros(num_nodes), np.zeros(len(hold_names))
+            for node_id, node_idx in enumerate(self.node_keys):
+                heuristic_node_idx = node_idx + heuristic_offset
+                layers_on_node: List[int] = eval(config["Solution"][f"compute_node_{heuristic_node_idx}"])
+                start_values[node_id] = min(layers_on_node)
+                if len(layers_on_node) <= self.hold_layer_count[node_id]:
+                    hold_values[self.hold_offset[node_id] + len(layers_on_node) - 1] = 1
+            self.ilp_model.set_starts(var_indices=self.var_node_start, values=start_values)
+            self.ilp_model.set_starts(var_indices=self.var_node_hold_layer, values=hold_values, is_placement=False)
 
         # Step 2.3: add flow over each edge as variable
         # var_name: flow_i_j (f_ij)
         # var_type: continuous
         # var_range: [0, +inf)
         # number of variables: 2e
-        for link_name_tuple, link in self.ilp_links.items():
-            if not link_name_tuple[0] == "sink" and not link_name_tuple[1] == "source":
-                flow_var_name = f"flow_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                flow_var = self.ilp_model.addVar(vtype=GRB.CONTINUOUS,
-                                                 lb=0,
-                                                 ub=GRB.INFINITY,
-                                                 name=flow_var_name)
-                self.var_flow[flow_var_name] = flow_var
-                num_real += 1
-            if not link_name_tuple[1] == "sink" and not link_name_tuple[0] == "source":
-                reversed_flow_var_name = f"flow_{link_name_tuple[1]}_{link_name_tuple[0]}"
-                reversed_flow_var = self.ilp_model.addVar(vtype=GRB.CONTINUOUS,
-                                                          lb=0,
-                                                          ub=GRB.INFINITY,
-                                                          name=reversed_flow_var_name)
-                self.var_flow[reversed_flow_var_name] = reversed_flow_var
-                num_real += 1
+        self.var_flow = self.ilp_model.add_vars(count=num_edges, vtype=VarType.Continuous,
+                                                names=[f"flow_{edge_name}" for edge_name in edge_names],
+                                                lb=0, ub=INFINITY)
+        num_real += num_edges
 
         # Step 2.4 add whether each edge is enabled (edge switch) as variable
         # var_name: switch_i_j (d_ij)
         # var_type: bool
         # var_range: {0, 1}
         # number of variables: 2e
-        for link_name_tuple, link in self.ilp_links.items():
-            if not link_name_tuple[0] == "sink" and not link_name_tuple[1] == "source":
-                forward_switch_name = f"switch_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                forward_switch_var = self.ilp_model.addVar(vtype=GRB.BINARY,
-                                                           name=forward_switch_name)
-                self.var_edge_switch[forward_switch_name] = forward_switch_var
-                num_binary += 1
-            if not link_name_tuple[1] == "sink" and not link_name_tuple[0] == "source":
-                backward_switch_name = f"switch_{link_name_tuple[1]}_{link_name_tuple[0]}"
-                backward_switch_var = self.ilp_model.addVar(vtype=GRB.BINARY,
-                                                            name=backward_switch_name)
-                self.var_edge_switch[backward_switch_name] = backward_switch_var
-                num_binary += 1
+        self.var_edge_switch = self.ilp_model.add_vars(count=num_edges, vtype=VarType.Binary,
+                                                       names=[f"switch_{edge_name}" for edge_name in edge_names])
+        num_binary += num_edges
 
         # Step 2.5 add tmp condition variables for each edge between compute nodes if partial inference is allowed
         # var_name: edge_cond1_i_j and edge_cond2_i_j
         # var_type: bool
         # var_range: {0, 1}
         # number of variables: 4e
+        self.tmp_var_compute_edge_cond1 = np.full(num_edges, -1, dtype=np.int64)
+        self.tmp_var_compute_edge_cond2 = np.full(num_edges, -1, dtype=np.int64)
         if allow_partial_inference:
-            for link_name_tuple, link in self.ilp_links.items():
-                # edge between source and sink does not need tmp variables
-                if "source" in link_name_tuple or "sink" in link_name_tuple:
-                    continue
-
-                # variable names
-                forward_cond1_name = f"edge_cond1_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                forward_cond2_name = f"edge_cond2_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                backward_cond1_name = f"edge_cond1_{link_name_tuple[1]}_{link_name_tuple[0]}"
-                backward_cond2_name = f"edge_cond2_{link_name_tuple[1]}_{link_name_tuple[0]}"
-
-                # variables
-                forward_cond1_var = self.ilp_model.addVar(vtype=GRB.BINARY, name=forward_cond1_name)
-                forward_cond2_var = self.ilp_model.addVar(vtype=GRB.BINARY, name=forward_cond2_name)
-                backward_cond1_var = self.ilp_model.addVar(vtype=GRB.BINARY, name=backward_cond1_name)
-                backward_cond2_var = self.ilp_model.addVar(vtype=GRB.BINARY, name=backward_cond2_name)
-
-                # save variables
-                self.tmp_var_compute_edge_cond1[forward_cond1_name] = forward_cond1_var
-                self.tmp_var_compute_edge_cond2[forward_cond2_name] = forward_cond2_var
-                self.tmp_var_compute_edge_cond1[backward_cond1_name] = backward_cond1_var
-                self.tmp_var_compute_edge_cond2[backward_cond2_name] = backward_cond2_var
-                num_binary += 4
+            # edge between source and sink does not need tmp variables
+            compute_edges: np.ndarray = np.nonzero((self.edge_from < num_nodes) & (self.edge_to < num_nodes))[0]
+            cond_names: List[str] = [f"edge_cond{cond}_{edge_names[edge]}" for edge in compute_edges.tolist()
+                                     for cond in (1, 2)]
+            cond_vars = self.ilp_model.add_vars(count=len(cond_names), vtype=VarType.Binary, names=cond_names)
+            self.tmp_var_compute_edge_cond1[compute_edges] = cond_vars[0::2]
+            self.tmp_var_compute_edge_cond2[compute_edges] = cond_vars[1::2]
+            num_binary += len(cond_names)
 
         return num_int, num_real, num_binary
 
@@ -469,33 +441,32 @@ class ILPLayout:
 
         :return: number of constraints added
         """
-        num_constraint = 0
+        num_nodes = len(self.node_keys)
+        node_ids = np.arange(num_nodes)
 
-        for compute_node_idx, compute_node in self.ilp_nodes.items():
-            # Step 3.1: add constraint: only one model placement is valid
-            # constraint_name: hold_constraint_i
-            # constraint: \sum_k hold_i_k = 1 (\sum_k b_ik = 1)
-            # number of constraints: n
-            sum_of_hold_var: gp.LinExpr = gp.quicksum(list(self.var_node_hold_layer[compute_node_idx].values()))
-            hold_constraint_name = f"hold_constraint_{compute_node_idx}"
-            # noinspection PyTypeChecker
-            hold_constraint: gp.Constr = self.ilp_model.addConstr(sum_of_hold_var == 1,
-                                                                  name=hold_constraint_name)
-            self.constr_hold[hold_constraint_name] = hold_constraint
-            num_constraint += 1
-
-            # Step 3.2: add constraint: end layer idx on each node should <= # layers
-            # constraint_name: end_constraint_i
-            # constraint: start_i + \sum_k k * hold_i_k <= m (s_{i} + \sum_k k * b_{ik} <= m)
-            # number of constraints: n
-            end_layer_idx_expr: gp.LinExpr = self.get_end_layer_index(compute_node_idx=compute_node_idx)
-            end_constraint_name = f"end_constraint_{compute_node_idx}"
-            end_constraint: gp.Constr = self.ilp_model.addConstr(end_layer_idx_expr <= self.model_card.num_layers,
-                                                                 name=end_constraint_name)
-            self.constr_end[end_constraint_name] = end_constraint
-            num_constraint += 1
-
-        return num_constraint
+        # Step 3.1: add constraint: only one model placement is valid
+        # constraint_name: hold_constraint_i (row 2i)
+        # constraint: \sum_k hold_i_k = 1 (\sum_k b_ik = 1)
+        # number of constraints: n
+        hold_rows = np.repeat(2 * node_ids, self.hold_layer_count)
+
+        # Step 3.2: add constraint: end layer idx on each node should <= # layers
+        # constraint_name: end_constraint_i (row 2i + 1)
+        # constraint: start_i + \sum_k k * hold_i_k <= m (s_{i} + \sum_k k * b_{ik} <= m)
+        # number of constraints: n
+        end_rows, end_cols, end_vals = self.get_end_layer_index_terms(rows=2 * node_ids + 1, node_ids=node_ids,
+                                                                      coefficient=1)
+
+        # add constraints
+        constr_names: List[str] = [_name for node_idx in self.node_keys
+                                   for _name in (f"hold_constraint_{node_idx}", f"end_constraint_{node_idx}")]
+        self.ilp_model.add_constrs(rows=np.concatenate([hold_rows, end_rows]),
+                                   cols=np.concatenate([self.var_node_hold_layer, end_cols]),
+                                   vals=np.concatenate([np.ones(len(hold_rows)), end_vals]),
+                                   senses=np.tile(["=", "<"], num_nodes),
+                                   rhs=np.tile([1, self.model_card.num_layers], num_nodes),
+                                   names=constr_names)
+        return 2 * num_nodes
 
     def step4_flow_in_out_constraint(self) -> int:
         """
@@ -503,29 +474,21 @@ class ILPLayout:
 
         :return: number of constraints added
         """
-        num_constraint = 0
+        num_nodes = len(self.node_keys)
 
         # Step 4.1: add constraint: flow in = flow out for each compute node
         # constraint_name: node_flow_constraint_i
         # constraint: \sum_{u} flow_u_i = \sum_{j} flow_i_j (\sum_u f_{ui} = \sum_j f_{ij})
         # number of constraints: n
-        for compute_node_idx, compute_node in self.ilp_nodes.items():
-            # compute flow
-            flow_in_list, flow_out_list = [], []
-            for other_idx in compute_node.connected_node_indices:
-                if not other_idx == "sink":
-                    flow_in_list.append(self.var_flow[f"flow_{other_idx}_{compute_node_idx}"])
-                if not other_idx == "source":
-                    flow_out_list.append(self.var_flow[f"flow_{compute_node_idx}_{other_idx}"])
-
-            # add constraint
-            node_flow_constraint_name = f"node_flow_constraint_{compute_node_idx}"
-            node_flow_constraint = self.ilp_model.addConstr(gp.quicksum(flow_in_list) == gp.quicksum(flow_out_list),
-                                                            name=node_flow_constraint_name)
-            self.constr_node_flow[node_flow_constraint_name] = node_flow_constraint
-            num_constraint += 1
-
-        return num_constraint
+        into_node, out_of_node = self.edge_to < num_nodes, self.edge_from < num_nodes
+        self.ilp_model.add_constrs(
+            rows=np.concatenate([self.edge_to[into_node], self.edge_from[out_of_node]]),
+            cols=np.concatenate([self.var_flow[into_node], self.var_flow[out_of_node]]),
+            vals=np.concatenate([np.ones(into_node.sum()), -np.ones(out_of_node.sum())]),
+            senses="=", rhs=np.zeros(num_nodes),
+            names=[f"node_flow_constraint_{node_idx}" for node_idx in self.node_keys]
+        )
+        return num_nodes
 
     def step5_node_throughput_constraint(self) -> int:
         """
@@ -533,35 +496,25 @@ class ILPLayout:
 
         :return: number of constraints added
         """
-        num_constraint = 0
+        num_nodes = len(self.node_keys)
 
         # Step 5.1: add constraint: flow over each compute node is smaller than its inference throughput
         # constraint_name: node_throughput_constraint_i
         # constraint: \sum_{u} flow_u_i <= \sum_k hold_i_k * throughput at k layers
         #             (\sum_u f_{ui} <= \sum_k b_{ik} * throughput at k layers)
         # number of constraints: n
-        for compute_node_idx, compute_node in self.ilp_nodes.items():
-            # get flow through the node
-            flow_in_list: List[gp.Var] = []
-            for other_idx in compute_node.connected_node_indices:
-                if not other_idx == "sink":
-                    flow_in_list.append(self.var_flow[f"flow_{other_idx}_{compute_node_idx}"])
-
-            # get one hot throughput
-            one_hot_throughput_list: List[gp.LinExpr] = []
-            for layer_count in range(1, compute_node.max_num_layers + 1):
-                throughput_at_k: float = compute_node.layer_count_2_throughput[layer_count]
-                hold_k: gp.Var = self.var_node_hold_layer[compute_node_idx][f"hold_{compute_node_idx}_{layer_count}"]
-                one_hot_throughput_list.append(throughput_at_k * hold_k)
-
-            # add constraint
-            node_tp_constr_name = f"node_throughput_constraint_{compute_node_idx}"
-            node_tp_constr = self.ilp_model.addConstr(gp.quicksum(flow_in_list) <= gp.quicksum(one_hot_throughput_list),
-                                                      name=node_tp_constr_name)
-            self.constr_node_throughput[node_tp_constr_name] = node_tp_constr
-            num_constraint += 1
-
-        return num_constraint
+        into_node = self.edge_to < num_nodes
+        hold_throughput = np.array([self.ilp_nodes[node_idx].layer_count_2_throughput[layer_count]
+                                    for node_idx in self.node_keys
+                                    for layer_count in range(1, self.ilp_nodes[node_idx].max_num_layers + 1)])
+        self.ilp_model.add_constrs(
+            rows=np.concatenate([self.edge_to[into_node], np.repeat(np.arange(num_nodes), self.hold_layer_count)]),
+            cols=np.concatenate([self.var_flow[into_node], self.var_node_hold_layer]),
+            vals=np.concatenate([np.ones(into_node.sum()), -hold_throughput]),
+            senses="<", rhs=np.zeros(num_nodes),
+            names=[f"node_throughput_constraint_{node_idx}" for node_idx in self.node_keys]
+        )
+        return num_nodes
 
     def step6_edge_switch_constraint(self, allow_partial_inference: bool, remove_redundant: bool) -> int:
         """
@@ -571,237 +524,188 @@ class ILPLayout:
         :param remove_redundant: remove redundant constraints in the model
         :return: number of constraints added
         """
-        num_constraints = 0
-
-        # Step 6.1: build a list of edges that we need to process
-        list_name_list: List[Tuple[str or int, str or int]] = []
-        for link_name_tuple in self.ilp_links.keys():
-            if not link_name_tuple[0] == "sink" and not link_name_tuple[1] == "source":
-                list_name_list.append((link_name_tuple[0], link_name_tuple[1]))
-            if not link_name_tuple[1] == "sink" and not link_name_tuple[0] == "source":
-                list_name_list.append((link_name_tuple[1], link_name_tuple[0]))
+        num_nodes = len(self.node_keys)
+        source_id, sink_id = num_nodes, num_nodes + 1
+        assert not np.any((self.edge_from == source_id) & (self.edge_to == sink_id)), \
+            "Found direct link between source and sink!"
+        _m = self.model_card.num_layers
+        from_source: np.ndarray = np.nonzero(self.edge_from == source_id)[0]
+        to_sink: np.ndarray = np.nonzero(self.edge_to == sink_id)[0]
+        between_nodes: np.ndarray = np.nonzero((self.edge_from < num_nodes) & (self.edge_to < num_nodes))[0]
+
+        # Step 6.1: constraints of each edge are added together, below are their names (the position of a
+        # constraint in the list is its row relative to the first row of the edge)
+        if remove_redundant:
+            source_sink_prefixes = ["edge_disable_constr_"]
+        else:
+            source_sink_prefixes = ["edge_enable_constr_", "edge_disable_constr_"]
+        if allow_partial_inference and remove_redundant:
+            compute_prefixes = ["edge_cond1_disabled_", "edge_cond2_disabled_", "edge_disable_constr_"]
+        elif allow_partial_inference:
+            compute_prefixes = ["edge_cond1_enabled_", "edge_cond1_disabled_", "edge_cond2_enabled_",
+                                "edge_cond2_disabled_", "edge_enable_constr_", "edge_disable_constr_"]
+        else:
+            compute_prefixes = ["edge_disable_constr1_", "edge_disable_constr2_"]
+        edge_num_constraints = np.full(len(self.edge_from), len(source_sink_prefixes), dtype=np.int64)
+        edge_num_constraints[between_nodes] = len(compute_prefixes)
+        edge_first_row = np.cumsum(edge_num_constraints) - edge_num_constraints
+        num_constraints = int(edge_num_constraints.sum())
+        is_between_nodes = np.zeros(len(self.edge_from), dtype=bool)
+        is_between_nodes[between_nodes] = True
+        constr_names: List[str] = []
+        for edge_name, edge_is_between_nodes in zip(self.get_edge_names(), is_between_nodes.tolist()):
+            prefixes = compute_prefixes if edge_is_between_nodes else source_sink_prefixes
+            constr_names += [prefix + edge_name for prefix in prefixes]
 
         # Step 6.2: add constraint for edge switch
-        for link_name_tuple in list_name_list:
-            assert not (link_name_tuple[0] == "source" and link_name_tuple[1] == "sink"), \
-                "Found direct link between source and sink!"
-
-            if link_name_tuple[0] == "source":
-                # Case 1: link from source to i
-                # switch = cond(start_i == 0)
-
-                # ------------ Prop 1: Linearize b = 1 iff a = 0 ------------ #
-                # int a \in [0, m - 1]
-                # bool b = 0 or 1
-                # express b = 1 iff a = 0
-                # if a = 0 then b = 1:	b >= 1 - a
-                # if a > 0 then b = 0:	a <= m(1-b)
-                # ----------------------------------------------------------- #
-
-                # get the variables
-                edge_switch_var: gp.Var = self.var_edge_switch[f"switch_{link_name_tuple[0]}_{link_name_tuple[1]}"]
-                node_i_start_var: gp.Var = self.var_node_start[f"start_{link_name_tuple[1]}"]
-
-                # add two constraints
-                # d = edge_switch_var, s_i = node_i_start_var
-                # (1) if s_i = 0 then d = 1:	d >= 1 - s_i
-                if not remove_redundant:
-                    enable_condition_name = f"edge_enable_constr_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                    enable_condition_constr = self.ilp_model.addConstr(edge_switch_var >= 1 - node_i_start_var,
-                                                                       name=enable_condition_name)
-                    self.constr_edge_enabled[enable_condition_name] = enable_condition_constr
-                    num_constraints += 1
-                # (2) if s_i > 0 then d = 0:	s_i <= m(1-d)
-                disable_condition_name = f"edge_disable_constr_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                disable_condition_constr = self.ilp_model.addConstr(
-                    node_i_start_var <= self.model_card.num_layers * (1 - edge_switch_var),
-                    name=disable_condition_name)
-                self.constr_edge_disabled[disable_condition_name] = disable_condition_constr
-                num_constraints += 1
-
-            elif link_name_tuple[1] == "sink":
-                # Case 2: link from i to sink
-                # switch = cond(end_i == m)
-
-                # ------------ Prop 2: Linearize b = 1 iff a = m ------------ #
-                # int a \in [0, m]
-                # bool b = 0 or 1
-                # express b = 1 iff a = m
-                # if a = m then b = 1:		(m - 1)(b + 1) >= a
-                # if 0 <= a < m then b = 0:	mb <= a
-                # ----------------------------------------------------------- #
-
-                # get the variables
-                edge_switch_var: gp.Var = self.var_edge_switch[f"switch_{link_name_tuple[0]}_{link_name_tuple[1]}"]
-                node_i_start_var: gp.Var = self.var_node_start[f"start_{link_name_tuple[0]}"]
-
-                # compute node i's end position
-                k_hold_var: List[gp.LinExpr] = []
-                for layer_count in range(1, self.ilp_nodes[link_name_tuple[0]].max_num_layers + 1):
-                    hold_var_name = f"hold_{link_name_tuple[0]}_{layer_count}"
-                    hold_var: gp.Var = self.var_node_hold_layer[link_name_tuple[0]][hold_var_name]
-                    k_hold_var.append(layer_count * hold_var)
-                node_i_end_expr: gp.LinExpr = node_i_start_var + gp.quicksum(k_hold_var)
-
-                # add two constraints
-                # d = edge_switch_var, e_i = node_i_end_expr
-                # (1) if e_i = m then d = 1:		(m - 1)(d + 1) >= e_i
-                if not remove_redundant:
-                    enable_condition_name = f"edge_enable_constr_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                    enable_condition_constr = self.ilp_model.addConstr(
-                        (self.model_card.num_layers - 1) * (edge_switch_var + 1) >= node_i_end_expr,
-                        name=enable_condition_name)
-                    self.constr_edge_enabled[enable_condition_name] = enable_condition_constr
-                    num_constraints += 1
-                # (2) if 0 <= e_i < m then d = 0:	md <= e_i
-                disable_condition_name = f"edge_disable_constr_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                disable_condition_constr = self.ilp_model.addConstr(
-                    self.model_card.num_layers * edge_switch_var <= node_i_end_expr,
-                    name=disable_condition_name)
-                self.constr_edge_disabled[disable_condition_name] = disable_condition_constr
-                num_constraints += 1
-
-            else:
-                if allow_partial_inference:
-                    # Case 3.1: link between compute node i and j & allow partial inference
-                    # switch = cond(start_j <= end_i < end_j)
-
-                    # get the layer index variables
-                    start_j_var: gp.Var = self.var_node_start[f"start_{link_name_tuple[1]}"]
-                    end_i_expr: gp.LinExpr = self.get_end_layer_index(compute_node_idx=link_name_tuple[0])
-                    end_j_expr: gp.LinExpr = self.get_end_layer_index(compute_node_idx=link_name_tuple[1])
-
-                    # get the condition variables
-                    cond1_var_name = f"edge_cond1_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                    cond2_var_name = f"edge_cond2_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                    edge_switch_name = f"switch_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                    cond1_var: gp.Var = self.tmp_var_compute_edge_cond1[cond1_var_name]
-                    cond2_var: gp.Var = self.tmp_var_compute_edge_cond2[cond2_var_name]
-                    switch_var: gp.Var = self.var_edge_switch[edge_switch_name]
-
-                    # Condition 1: end_i - start_j >= 0
-                    # ------------ Prop 3: Linearize b = 1 iff a >= 0 ------------ #
-                    # int a \in [-m, m]
-                    # bool b = 0 or 1
-                    # express b = 1 iff a >= 0
-                    # if a >= 0 then b = 1:  	(m+1) b >= a + 1
-                    # if a < 0 then b = 0: 	    (m+1)(1 - b) >= -a
-                    # ------------------------------------------------------------ #
-                    # add two constraints
-                    # tmp_1 = end_i_expr - start_j_var, d_1 = cond1_var
-                    # (1) if tmp_1 >= 0 then d_1 = 1:	(m + 1) d_1 >= tmp_1 + 1
-                    if not remove_redundant:
-                        cond1_enabled_constr_name = f"edge_cond1_enabled_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                        cond1_enabled_constr = self.ilp_model.addConstr(
-                            (self.model_card.num_layers + 1) * cond1_var >= end_i_expr - start_j_var + 1,
-                            name=cond1_enabled_constr_name
-                        )
-                        self.tmp_constr_cond1_enabled[cond1_enabled_constr_name] = cond1_enabled_constr
-                        num_constraints += 1
-                    # (2) if tmp_1 < 0 then d_1 = 0: 	(m + 1)(1 - d_1) >= -tmp_1
-                    cond1_disabled_constr_name = f"edge_cond1_disabled_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                    cond1_disabled_constr = self.ilp_model.addConstr(
-                        (self.model_card.num_layers + 1) * (1 - cond1_var) >= start_j_var - end_i_expr,
-                        name=cond1_disabled_constr_name
-                    )
-                    self.tmp_constr_cond1_disabled[cond1_disabled_constr_name] = cond1_disabled_constr
-                    num_constraints += 1
-
-                    # Condition 2: end_j - end_i > 0
-                    # ------------ Prop 4: Linearize b = 1 iff a > 0 ------------ #
-                    # int a \in [-m, m]
-                    # bool b = 0 or 1
-                    # express b = 1 iff a > 0
-                    # if a > 0 then b = 1:  	(m+1) b >= a
-                    # if a <= 0 then b = 0: 	a >= 1 - (m+1) (1 - b)
-                    # ----------------------------------------------------------- #
-                    # add two constraints
-                    # tmp_2 = end_j_expr - end_i_expr, d_2 = cond2_var
-                    # (1) if tmp_2 > 0 then d_2 = 1:  	(m+1) d_2 >= tmp_2
-                    if not remove_redundant:
-                        cond2_enabled_constr_name = f"edge_cond2_enabled_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                        cond2_enabled_constr = self.ilp_model.addConstr(
-                            (self.model_card.num_layers + 1) * cond2_var >= end_j_expr - end_i_expr,
-                            name=cond2_enabled_constr_name
-                        )
-                        self.tmp_constr_cond2_enabled[cond2_enabled_constr_name] = cond2_enabled_constr
-                        num_constraints += 1
-                    # (2) if tmp_2 <= 0 then d_2 = 0: 	tmp_2 >= 1 - (m+1) (1 - d_2)
-                    cond2_disabled_constr_name = f"edge_cond2_disabled_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                    cond2_disabled_constr = self.ilp_model.addConstr(
-                        end_j_expr - end_i_expr >= 1 - (self.model_card.num_layers + 1) * (1 - cond2_var),
-                        name=cond2_disabled_constr_name
-                    )
-                    self.tmp_constr_cond2_disabled[cond2_disabled_constr_name] = cond2_disabled_constr
-                    num_constraints += 1
-
-                    # Switch constraint
-                    # ------------ Prop 5: Linearize z = 1 iff x and y are both 1 ------------ #
-                    # bool x, y, z
-                    # express z = 1 iff x and y are both 1
-                    # if x = 1, y = 1 then z = 1:	    x + y - z <= 1
-                    # if x = 0 or y = 0 then z = 0:	    z <= 0.5 * x + 0.5 * y
-                    # ------------------------------------------------------------------------ #
-                    # add two constraints
-                    # d_1 = cond1_var, d_2 = cond2_var, d = switch_var
-                    # (1) if d_1 = 1, d_2 = 1 then d = 1:		d_1 + d_2 - d <= 1
-                    if not remove_redundant:
-                        switch_enabled_constr_name = f"edge_enable_constr_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                        switch_enabled_constr = self.ilp_model.addConstr(
-                            cond1_var + cond2_var - switch_var <= 1,
-                            name=switch_enabled_constr_name
-                        )
-                        self.constr_edge_enabled[switch_enabled_constr_name] = switch_enabled_constr
-                        num_constraints += 1
-                    # (2) if d_1 = 0 or d_2 = 0 then d = 0:	    d <= 0.5 * d_1 + 0.5 * d_2
-                    switch_disabled_constr_name = f"edge_disable_constr_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                    switch_disabled_constr = self.ilp_model.addConstr(
-                        2 * switch_var <= cond1_var + cond2_var,
-                        name=switch_disabled_constr_name
-                    )
-                    self.constr_edge_disabled[switch_disabled_constr_name] = switch_disabled_constr
-                    num_constraints += 1
-
-                else:
-                    # Case 3.2: link between compute node i and j & does not allow partial inference
-                    # switch = cond(end_i == start_j)
-
-                    # get the layer index variables
-                    start_j_var: gp.Var = self.var_node_start[f"start_{link_name_tuple[1]}"]
-                    end_i_expr: gp.LinExpr = self.get_end_layer_index(compute_node_idx=link_name_tuple[0])
-
-                    # get the condition variables
-                    edge_switch_name = f"switch_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                    switch_var: gp.Var = self.var_edge_switch[edge_switch_name]
-
-                    # Switch constraint
-                    # ----------------- Prop 6: Linearize b = 0 if a \neq 0 ------------------ #
-                    # int a \in [-m, m]
-                    # bool b
-                    # express b = 0 if a \neq 0
-                    # b <= 1 + a / m
-                    # b <= 1 - a / m
-                    # ------------------------------------------------------------------------ #
-                    # add two constraints (both to disable constraints)
-                    # a = start_j_var - end_i_expr, b = switch_var (m = self.model_card.num_layers)
-                    _m = self.model_card.num_layers
-                    # (1) m * b <= m + a
-                    switch_disabled_constr1_name = f"edge_disable_constr1_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                    switch_disabled_constr1 = self.ilp_model.addConstr(
-                        _m * switch_var <= _m + (start_j_var - end_i_expr),
-                        name=switch_disabled_constr1_name
-                    )
-                    self.constr_edge_disabled[switch_disabled_constr1_name] = switch_disabled_constr1
-                    num_constraints += 1
-                    # (2) m * b <= m - a
-                    switch_disabled_constr2_name = f"edge_disable_constr2_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                    switch_disabled_constr2 = self.ilp_model.addConstr(
-                        _m * switch_var <= _m - (start_j_var - end_i_expr),
-                        name=switch_disabled_constr2_name
-                    )
-                    self.constr_edge_disabled[switch_disabled_constr2_name] = switch_disabled_constr2
-                    num_constraints += 1
+        senses, rhs = np.full(num_constraints, "<"), np.zeros(num_constraints)
+        rows_list, cols_list, vals_list = [], [], []
+
+        def add_row(edges: np.ndarray, position: int, sense: str, row_rhs: float,
+                    terms: List[Tuple[np.ndarray, float]], end_terms: List[Tuple[np.ndarray, float]]) -> None:
+            # terms: (variable of each edge, coefficient), end_terms: (compute node of each edge, coefficient)
+            rows = edge_first_row[edges] + position
+            senses[rows], rhs[rows] = sense, row_rhs
+            for variables, coefficient in terms:
+                rows_list.append(rows)
+                cols_list.append(variables)
+                vals_list.append(np.full(len(rows), coefficient, dtype=float))
+            for node_ids, coefficient in end_terms:
+                end_rows, end_cols, end_vals = self.get_end_layer_index_terms(rows=rows, node_ids=node_ids,
+                                                                              coefficient=coefficient)
+                rows_list.append(end_rows)
+                cols_list.append(end_cols)
+                vals_list.append(end_vals)
+
+        # Case 1: link from source to i
+        # switch = cond(start_i == 0)
+        # ------------ Prop 1: Linearize b = 1 iff a = 0 ------------ #
+        # int a \in [0, m - 1]
+        # bool b = 0 or 1
+        # express b = 1 iff a = 0
+        # if a = 0 then b = 1:	b >= 1 - a
+        # if a > 0 then b = 0:	a <= m(1-b)
+        # ----------------------------------------------------------- #
+        # d = edge_switch_var, s_i = node_i_start_var
+        edge_switch_var = self.var_edge_switch[from_source]
+        node_i_start_var = self.var_node_start[self.edge_to[from_source]]
+        # (1) if s_i = 0 then d = 1:	d >= 1 - s_i
+        if not remove_redundant:
+            add_row(edges=from_source, position=0, sense=">", row_rhs=1,
+                    terms=[(edge_switch_var, 1), (node_i_start_var, 1)], end_terms=[])
+        # (2) if s_i > 0 then d = 0:	s_i <= m(1-d)
+        add_row(edges=from_source, position=len(source_sink_prefixes) - 1, sense="<", row_rhs=_m,
+                terms=[(node_i_start_var, 1), (edge_switch_var, _m)], end_terms=[])
+
+        # Case 2: link from i to sink
+        # switch = cond(end_i == m)
+        # ------------ Prop 2: Linearize b = 1 iff a = m ------------ #
+        # int a \in [0, m]
+        # bool b = 0 or 1
+        # express b = 1 iff a = m
+        # if a = m then b = 1:		(m - 1)(b + 1) >= a
+        # if 0 <= a < m then b = 0:	mb <= a
+        # ----------------------------------------------------------- #
+        # d = edge_switch_var, e_i = end layer index of node i
+        edge_switch_var = self.var_edge_switch[to_sink]
+        node_i = self.edge_from[to_sink]
+        # (1) if e_i = m then d = 1:		(m - 1)(d + 1) >= e_i
+        if not remove_redundant:
+            add_row(edges=to_sink, position=0, sense=">", row_rhs=-(_m - 1),
+                    terms=[(edge_switch_var, _m - 1)], end_terms=[(node_i, -1)])
+        # (2) if 0 <= e_i < m then d = 0:	md <= e_i
+        add_row(edges=to_sink, position=len(source_sink_prefixes) - 1, sense="<", row_rhs=0,
+                terms=[(edge_switch_var, _m)], end_terms=[(node_i, -1)])
+
+        # Case 3: link between compute node i and j
+        node_i, node_j = self.edge_from[between_nodes], self.edge_to[between_nodes]
+        start_j_var = self.var_node_start[node_j]
+        switch_var = self.var_edge_switch[between_nodes]
+        if allow_partial_inference:
+            # Case 3.1: link between compute node i and j & allow partial inference
+            # switch = cond(start_j <= end_i < end_j)
+            cond1_var = self.tmp_var_compute_edge_cond1[between_nodes]
+            cond2_var = self.tmp_var_compute_edge_cond2[between_nodes]
+            _m_plus_one = _m + 1
+            position = 0
+
+            # Condition 1: end_i - start_j >= 0
+            # ------------ Prop 3: Linearize b = 1 iff a >= 0 ------------ #
+            # int a \in [-m, m]
+            # bool b = 0 or 1
+            # express b = 1 iff a >= 0
+            # if a >= 0 then b = 1:  	(m+1) b >= a + 1
+            # if a < 0 then b = 0: 	    (m+1)(1 - b) >= -a
+            # ------------------------------------------------------------ #
+            # tmp_1 = end_i - start_j, d_1 = cond1_var
+            # (1) if tmp_1 >= 0 then d_1 = 1:	(m + 1) d_1 >= tmp_1 + 1
+            if not remove_redundant:
+                add_row(edges=between_nodes, position=position, sense=">", row_rhs=1,
+                        terms=[(cond1_var, _m_plus_one), (start_j_var, 1)], end_terms=[(node_i, -1)])
+                position += 1
+            # (2) if tmp_1 < 0 then d_1 = 0: 	(m + 1)(1 - d_1) >= -tmp_1
+            add_row(edges=between_nodes, position=position, sense=">", row_rhs=-_m_plus_one,
+                    terms=[(cond1_var, -_m_plus_one), (start_j_var, -1)], end_terms=[(node_i, 1)])
+            position += 1
+
+            # Condition 2: end_j - end_i > 0
+            # ------------ Prop 4: Linearize b = 1 iff a > 0 ------------ #
+            # int a \in [-m, m]
+            # bool b = 0 or 1
+            # express b = 1 iff a > 0
+            # if a > 0 then b = 1:  	(m+1) b >= a
+            # if a <= 0 then b = 0: 	a >= 1 - (m+1) (1 - b)
+            # ----------------------------------------------------------- #
+            # tmp_2 = end_j - end_i, d_2 = cond2_var
+            # (1) if tmp_2 > 0 then d_2 = 1:  	(m+1) d_2 >= tmp_2
+            if not remove_redundant:
+                add_row(edges=between_nodes, position=position, sense=">", row_rhs=0,
+                        terms=[(cond2_var, _m_plus_one)], end_terms=[(node_j, -1), (node_i, 1)])
+                position += 1
+            # (2) if tmp_2 <= 0 then d_2 = 0: 	tmp_2 >= 1 - (m+1) (1 - d_2)
+            add_row(edges=between_nodes, position=position, sense=">", row_rhs=1 - _m_plus_one,
+                    terms=[(cond2_var, -_m_plus_one)], end_terms=[(node_j, 1), (node_i, -1)])
+            position += 1
+
+            # Switch constraint
+            # ------------ Prop 5: Linearize z = 1 iff x and y are both 1 ------------ #
+            # bool x, y, z
+            # express z = 1 iff x and y are both 1
+            # if x = 1, y = 1 then z = 1:	    x + y - z <= 1
+            # if x = 0 or y = 0 then z = 0:	    z <= 0.5 * x + 0.5 * y
+            # ------------------------------------------------------------------------ #
+            # d_1 = cond1_var, d_2 = cond2_var, d = switch_var
+            # (1) if d_1 = 1, d_2 = 1 then d = 1:		d_1 + d_2 - d <= 1
+            if not remove_redundant:
+                add_row(edges=between_nodes, position=position, sense="<", row_rhs=1,
+                        terms=[(cond1_var, 1), (cond2_var, 1), (switch_var, -1)], end_terms=[])
+                position += 1
+            # (2) if d_1 = 0 or d_2 = 0 then d = 0:	    d <= 0.5 * d_1 + 0.5 * d_2
+            add_row(edges=between_nodes, position=position, sense="<", row_rhs=0,
+                    terms=[(switch_var, 2), (cond1_var, -1), (cond2_var, -1)], end_terms=[])
 
+        else:
+            # Case 3.2: link between compute node i and j & does not allow partial inference
+            # switch = cond(end_i == start_j)
+            # ----------------- Prop 6: Linearize b = 0 if a \neq 0 ------------------ #
+            # int a \in [-m, m]
+            # bool b
+            # express b = 0 if a \neq 0
+            # b <= 1 + a / m
+            # b <= 1 - a / m
+            # ------------------------------------------------------------------------ #
+            # add two constraints (both to disable constraints)
+            # a = start_j_var - end_i_expr, b = switch_var (m = self.model_card.num_layers)
+            # (1) m * b <= m + a
+            add_row(edges=between_nodes, position=0, sense="<", row_rhs=_m,
+                    terms=[(switch_var, _m), (start_j_var, -1)], end_terms=[(node_i, 1)])
+            # (2) m * b <= m - a
+            add_row(edges=between_nodes, position=1, sense="<", row_rhs=_m,
+                    terms=[(switch_var, _m), (start_j_var, 1)], end_terms=[(node_i, -1)])
+
+        # add constraints
+        self.ilp_model.add_constrs(rows=np.concatenate(rows_list), cols=np.concatenate(cols_list),
+                                   vals=np.concatenate(vals_list), senses=senses, rhs=rhs, names=constr_names)
         return num_constraints
 
     def step7_edge_flow_constraint(self) -> int:
@@ -810,37 +714,20 @@ class ILPLayout:
 
         :return: number of constraints added
         """
-        num_constraints = 0
+        num_edges = len(self.edge_from)
 
         # constraint_name: edge_flow_constr_i_j
         # constraint: flow_i_j <= link_throughput * switch_i_j
         # number of constraints: 2e
-        for link_name_tuple, link in self.ilp_links.items():
-            link_throughput = link.throughput
-
-            if not link_name_tuple[0] == "sink" and not link_name_tuple[1] == "source":
-                forward_flow_var: gp.Var = self.var_flow[f"flow_{link_name_tuple[0]}_{link_name_tuple[1]}"]
-                forward_switch_var: gp.Var = self.var_edge_switch[f"switch_{link_name_tuple[0]}_{link_name_tuple[1]}"]
-                forward_edge_flow_constraint_name = f"edge_flow_constr_{link_name_tuple[0]}_{link_name_tuple[1]}"
-                forward_edge_flow_constraint = self.ilp_model.addConstr(
-                    forward_flow_var <= link_throughput * forward_switch_var,
-                    name=forward_edge_flow_constraint_name
-                )
-                self.constr_edge_flow[forward_edge_flow_constraint_name] = forward_edge_flow_constraint
-                num_constraints += 1
-
-            if not link_name_tuple[1] == "sink" and not link_name_tuple[0] == "source":
-                backward_flow_var: gp.Var = self.var_flow[f"flow_{link_name_tuple[1]}_{link_name_tuple[0]}"]
-                backward_switch_var: gp.Var = self.var_edge_switch[f"switch_{link_name_tuple[1]}_{link_name_tuple[0]}"]
-                backward_edge_flow_constraint_name = f"edge_flow_constr_{link_name_tuple[1]}_{link_name_tuple[0]}"
-                backward_edge_flow_constraint = self.ilp_model.addConstr(
-                    backward_flow_var <= link_throughput * backward_switch_var,
-                    name=backward_edge_flow_constraint_name
-                )
-                self.constr_edge_flow[backward_edge_flow_constraint_name] = backward_edge_flow_constraint
-                num_constraints += 1
-
-        return num_constraints
+        edge_ids = np.arange(num_edges)
+        self.ilp_model.add_constrs(
+            rows=np.concatenate([edge_ids, edge_ids]),
+            cols=np.concatenate([self.var_flow, self.var_edge_switch]),
+            vals=np.concatenate([np.ones(num_edges), -self.edge_throughput]),
+            senses="<", rhs=np.zeros(num_edges),
+            names=[f"edge_flow_constr_{edge_name}" for edge_name in self.get_edge_names()]
+        )
+        return num_edges
 
     def build_model(self, seed: int, model_name: str, enable_partial_inference: bool, remove_redundant: bool,
                     start_from_heuristic: bool, heuristic_sol_path: str) -> Tuple[int, int, int, int]:
@@ -848,7 +735,8 @@ class ILPLayout:
         Build the ILP model.
         Note: 1. Here we build the ILP model exactly as is based on the cluster we just loaded. Optimizations
                  like prune edge / layer fusion / limit on the lower bound of layers on node can be done by
-                 changing the cluster description file.
+                 changing the cluster description file. (Layer fusion can also be done by fuse_layers in
+                 layer_fusion.py after the cluster is loaded.)
 
         :param seed: random seed
         :param model_name: name of the ILP model
@@ -861,6 +749,7 @@ class ILPLayout:
         # prepare the ILP program
         assert self.cluster_loaded, "Must load a cluster before building the ilp model!"
         num_int, num_real, num_binary, num_constraint = 0, 0, 0, 0
+        build_start_time = time.time()
 
         # Step 1: initial the ILP program
         self.step1_initialize_ilp(seed=seed, model_name=model_name)
@@ -899,21 +788,29 @@ class ILPLayout:
         cur_num_constraint = self.step7_edge_flow_constraint()
         num_constraint += cur_num_constraint
 
-        # Step 8: set optimization target
-        source_flow_out_list: List[gp.Var] = []
-        for other_idx in self.ilp_source.connected_node_indices:
-            flow_var: gp.Var = self.var_flow[f"flow_source_{other_idx}"]
-            source_flow_out_list.append(flow_var)
-        self.ilp_model.setObjective(gp.quicksum(source_flow_out_list), GRB.MAXIMIZE)
+        # Step 8: set optimization target (flow out of source)
+        source_flow_out = self.var_flow[self.edge_from == len(self.node_keys)]
+        self.ilp_model.set_objective_coefficients(var_indices=source_flow_out,
+                                                  coefficients=np.ones(len(source_flow_out)), maximize=True)
 
         # return the size of the ILP problem
         self.model_initialized = True
+        self.model_build_time = time.time() - build_start_time
+        self.model_memory_usage = self.ilp_model.get_memory_usage()
+        print(f"[ILP Layout - Info] Built ILP model with {num_int + num_real + num_binary} variables and "
+              f"{num_constraint} constraints in {round(self.model_build_time, 2)} seconds "
+              f"({round(self.model_memory_usage / MB, 1)} MB).")
         return num_int, num_real, num_binary, num_constraint
 
     def search_layout(self, max_run_time: float, early_stop_threshold: float, early_stop_time: float,
-                      save_sol_path: str, save_model_path: str or None = None) -> None:
+                      save_sol_path: str, save_model_path: str or None = None,
+                      solver: MILPSolver = MILPSolver.Gurobi) -> None:
         """
         Search a layout that maximizes the max flow based on the ILP program.
+        Note: Gurobi supports all early stopping criteria below through callbacks. HiGHS (scipy) has no
+              callbacks, so it stops when max_run_time is reached or when the best solution found is at
+              least early_stop_threshold optimal (compared with the flow upper bound, early_stop_time is
+              not used).
 
         :param max_run_time: max running time allowed
         :param early_stop_threshold: a value between 0 and 1 (usually 0.98), if the solution is at least this close
@@ -922,6 +819,7 @@ class ILPLayout:
                                 amount of time, we will early stop the optimization
         :param save_sol_path: save solution into this path
         :param save_model_path: save model into this path
+        :param solver: the MILP solver to use (Gurobi or HiGHS)
         :return: None
         """
         # check input
@@ -939,49 +837,57 @@ class ILPLayout:
         self.opt_best_obj_found_time = self.opt_start_time
         self.opt_upper_bound = self.get_flow_upper_bound()
 
-        # define early stopping callback function
-        def early_stopping_callback(model, where):
-            if where == GRB.Callback.MIP:
-                best_objective = model.cbGet(GRB.Callback.MIP_OBJBST)
-
-                # update best objective found
-                current_time = time.time()
-                if best_objective > self.opt_best_obj:
-                    self.opt_best_obj = best_objective
-                    self.opt_best_obj_found_time = current_time
-
-                # criteria 1: if max time is reached, then we terminate the search
-                if current_time - self.opt_start_time >= self.max_run_time:
-                    print(f"[ILP Layout - Info] Early stop because max search time ({self.max_run_time}) is reached")
-                    print(f"[ILP Layout - Info] Found: {best_objective}, Upper Bound: {self.opt_upper_bound}.")
-                    model.terminate()
-                    return
-
-                # criteria 2: if early stop criteria is satisfied
-                if best_objective >= self.early_stop_threshold * self.opt_upper_bound:
-                    # if no improvement for a long time
-                    if current_time - self.opt_best_obj_found_time > self.early_stop_time:
-                        print(f"[ILP Layout - Info] Early stop because the best solution found is at least "
-                              f"{round(self.early_stop_threshold * 100, 1)}% optimal and no improvement is "
-                              f"made in {self.early_stop_time} seconds!")
-                        print(f"[ILP Layout - Info] Found: {best_objective}, Upper Bound: {self.opt_upper_bound}.")
-                        model.terminate()
-
-                # criteria 3: force early stop if really very optimal
-                if best_objective >= 0.995 * self.opt_upper_bound:
-                    print(f"[ILP Layout - Info] Early stop because the best solution found is at least 99.5% optimal!")
-                    print(f"[ILP Layout - Info] Found: {best_objective}, Upper Bound: {self.opt_upper_bound}.")
-                    model.terminate()
-
         # solve
-        print("# ----------------------------------------- Gurobi ----------------------------------------- #")
-        self.ilp_model.optimize(early_stopping_callback)
+        print(f"# ----------------------------------------- {solver.name:<6} "
+              f"----------------------------------------- #")
+        if solver == MILPSolver.Gurobi:
+            self.ilp_model.optimize(solver=solver, early_stop_callback=self.check_early_stop)
+        else:
+            self.ilp_model.optimize(solver=solver, time_limit=self.max_run_time,
+                                    mip_rel_gap=1 - self.early_stop_threshold, objective_bound=self.opt_upper_bound)
+            print(f"[ILP Layout - Info] Found: {self.ilp_model.objective_value}, Upper Bound: {self.opt_upper_bound}.")
         print("# ------------------------------------------------------------------------------------------ #")
 
         # save solution and model
-        self.ilp_model.write(save_sol_path)
+        self.ilp_model.write_solution(save_sol_path)
         if save_model_path is not None:
-            self.ilp_model.write(save_model_path)
+            self.ilp_model.write_model(save_model_path)
+
+    def check_early_stop(self, best_objective: float) -> bool:
+        """
+        Check whether the search should stop early, called each time the solver reports progress.
+
+        :param best_objective: best objective found so far
+        :return: whether to stop the search
+        """
+        # update best objective found
+        current_time = time.time()
+        if best_objective > self.opt_best_obj:
+            self.opt_best_obj = best_objective
+            self.opt_best_obj_found_time = current_time
+
+        # criteria 1: if max time is reached, then we terminate the search
+        if current_time - self.opt_start_time >= self.max_run_time:
+            print(f"[ILP Layout - Info] Early stop because max search time ({self.max_run_time}) is reached")
+            print(f"[ILP Layout - Info] Found: {best_objective}, Upper Bound: {self.opt_upper_bound}.")
+            return True
+
+        # criteria 2: if early stop criteria is satisfied
+        if best_objective >= self.early_stop_threshold * self.opt_upper_bound:
+            # if no improvement for a long time
+            if current_time - self.opt_best_obj_found_time > self.early_stop_time:
+                print(f"[ILP Layout - Info] Early stop because the best solution found is at least "
+                      f"{round(self.early_stop_threshold * 100, 1)}% optimal and no improvement is "
+                      f"made in {self.early_stop_time} seconds!")
+                print(f"[ILP Layout - Info] Found: {best_objective}, Upper Bound: {self.opt_upper_bound}.")
+                return True
+
+        # criteria 3: force early stop if really very optimal
+        if best_objective >= 0.995 * self.opt_upper_bound:
+            print(f"[ILP Layout - Info] Early stop because the best solution found is at least 99.5% optimal!")
+            print(f"[ILP Layout - Info] Found: {best_objective}, Upper Bound: {self.opt_upper_bound}.")
+            return True
+        return False
 
     def check_link_validity(self, from_idx: int or str, to_idx: int or str, allow_partial_inference: bool) -> bool:
         """
@@ -1147,12 +1053,17 @@ class ILPLayout:
 
         self.solution_loaded = True
 
-    def generate_simulator_cluster(self, cluster_file_path: str, allow_partial_inference: bool) -> None:
+    def generate_simulator_cluster(self, cluster_file_path: str, allow_partial_inference: bool,
+                                   include_all_links: bool = False) -> None:
         """
         Generate the cluster file and statistics file that will be used by the simulator.
+        Note: if include_all_links, all links of the cluster are written (instead of only the links that are
+              valid under the layout), so that nodes can reload a different model during simulation (the
+              MaxFlow scheduler only uses links that are valid under the models in vram)
 
         :param cluster_file_path: path to save the cluster file
         :param allow_partial_inference: whether partial inference is allowed
+        :param include_all_links: whether to write all links of the cluster
         :return: None
         """
         assert self.solution_loaded, "Solution must be loaded before generating simulator cluster!"
@@ -1215,15 +1126,17 @@ class ILPLayout:
             valid_links: Dict[Tuple[int or str, int or str], ILPLink] = {}
             for link_name_tuple, ilp_link in self.ilp_links.items():
                 if not link_name_tuple[0] == "sink" and not link_name_tuple[1] == "source":
-                    forward_link_valid = self.check_link_validity(from_idx=link_name_tuple[0],
-                                                                  to_idx=link_name_tuple[1],
-                                                                  allow_partial_inference=allow_partial_inference)
+                    forward_link_valid = include_all_links or self.check_link_validity(
+                        from_idx=link_name_tuple[0], to_idx=link_name_tuple[1],
+                        allow_partial_inference=allow_partial_inference
+                    )
                     if forward_link_valid:
                         valid_links[link_name_tuple] = ilp_link
                 if not link_name_tuple[1] == "sink" and not link_name_tuple[0] == "source":
-                    backward_link_valid = self.check_link_validity(from_idx=link_name_tuple[1],
-                                                                   to_idx=link_name_tuple[0],
-                                                                   allow_partial_inference=allow_partial_inference)
+                    backward_link_valid = include_all_links or self.check_link_validity(
+                        from_idx=link_name_tuple[1], to_idx=link_name_tuple[0],
+                        allow_partial_inference=allow_partial_inference
+                    )
                     if backward_link_valid:
                         valid_links[(link_name_tuple[1], link_name_tuple[0])] = ilp_link
 
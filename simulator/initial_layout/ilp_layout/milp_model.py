@@ -0,0 +1,687 @@
+# 2026.10.19 Yixuan Mei
+
+import sys
+import math
+import time
+
+import numpy as np
+
+from enum import Enum
+from typing import Dict, List, Tuple, Callable, Any
+
+try:
+    import gurobipy as gp
+    from gurobipy import GRB
+except ImportError:
+    gp, GRB = None, None
+
+
+class MILPSolver(Enum):
+    Gurobi = "MILPSolver.Gurobi"
+    HiGHS = "MILPSolver.HiGHS"
+
+
+class VarType:
+    # same codes as Gurobi
+    Continuous = "C"
+    Binary = "B"
+    Integer = "I"
+
+
+INFINITY: float = float("inf")
+
+# share of the HiGHS time limit used by the warm start (see _optimize_highs)
+WARM_START_TIME_SHARE: float = 0.2
+
+
+class LinExpr:
+    def __init__(self, coefficients: Dict[int, float] or None = None, constant: float = 0) -> None:
+        """
+        A linear expression sum_i coefficient_i * var_i + constant.
+
+        :param coefficients: {var index -> coefficient}
+        :param constant: constant term
+        :return: None
+        """
+        self.coefficients: Dict[int, float] = {} if coefficients is None else coefficients
+        self.constant: float = constant
+
+    def copy(self) -> "LinExpr":
+        return LinExpr(coefficients=dict(self.coefficients), constant=self.constant)
+
+    def add_inplace(self, other, multiplier: float = 1) -> "LinExpr":
+        """
+        self += multiplier * other
+
+        :param other: a number, a variable or an expression
+        :param multiplier: multiplier of other
+        :return: self
+        """
+        if isinstance(other, MILPVar):
+            self.coefficients[other.index] = self.coefficients.get(other.index, 0) + multiplier
+        elif isinstance(other, LinExpr):
+            for var_index, coefficient in other.coefficients.items():
+                self.coefficients[var_index] = self.coefficients.get(var_index, 0) + multiplier * coefficient
+            self.constant += multiplier * other.constant
+        else:
+            self.constant += multiplier * other
+        return self
+
+    def __add__(self, other) -> "LinExpr":
+        return self.copy().add_inplace(other)
+
+    def __radd__(self, other) -> "LinExpr":
+        return self.copy().add_inplace(other)
+
+    def __sub__(self, other) -> "LinExpr":
+        return self.copy().add_inplace(other, multiplier=-1)
+
+    def __rsub__(self, other) -> "LinExpr":
+        return (-self).add_inplace(other)
+
+    def __mul__(self, other: float) -> "LinExpr":
+        assert not isinstance(other, (MILPVar, LinExpr)), "Only linear expressions are supported!"
+        return LinExpr(coefficients={_idx: other * _coef for _idx, _coef in self.coefficients.items()},
+                       constant=other * self.constant)
+
+    def __rmul__(self, other: float) -> "LinExpr":
+        return self.__mul__(other)
+
+    def __neg__(self) -> "LinExpr":
+        return self.__mul__(-1)
+
+    def __le__(self, other) -> "TempConstr":
+        return TempConstr(expr=self - other, sense="<")
+
+    def __ge__(self, other) -> "TempConstr":
+        return TempConstr(expr=self - other, sense=">")
+
+    def __eq__(self, other) -> "TempConstr":
+        return TempConstr(expr=self - other, sense="=")
+
+    __hash__ = object.__hash__
+
+
+class MILPVar:
+    def __init__(self, index: int, name: str) -> None:
+        """
+        A decision variable in a MILP model.
+
+        :param index: index of the variable in the model
+        :param name: name of the variable
+        :return: None
+        """
+        self.index: int = index
+        self.name: str = name
+
+    def to_expr(self) -> LinExpr:
+        return LinExpr(coefficients={self.index: 1})
+
+    def __add__(self, other) -> LinExpr:
+        return self.to_expr().add_inplace(other)
+
+    def __radd__(self, other) -> LinExpr:
+        return self.to_expr().add_inplace(other)
+
+    def __sub__(self, other) -> LinExpr:
+        return self.to_expr().add_inplace(other, multiplier=-1)
+
+    def __rsub__(self, other) -> LinExpr:
+        return LinExpr(coefficients={self.index: -1}).add_inplace(other)
+
+    def __mul__(self, other: float) -> LinExpr:
+        assert not isinstance(other, (MILPVar, LinExpr)), "Only linear expressions are supported!"
+        return LinExpr(coefficients={self.index: other})
+
+    def __rmul__(self, other: float) -> LinExpr:
+        return self.__mul__(other)
+
+    def __neg__(self) -> LinExpr:
+        return LinExpr(coefficients={self.index: -1})
+
+    def __le__(self, other) -> "TempConstr":
+        return TempConstr(expr=self - other, sense="<")
+
+    def __ge__(self, other) -> "TempConstr":
+        return TempConstr(expr=self - other, sense=">")
+
+    def __eq__(self, other) -> "TempConstr":
+        return TempConstr(expr=self - other, sense="=")
+
+    __hash__ = object.__hash__
+
+
+class TempConstr:
+    def __init__(self, expr: LinExpr, sense: str) -> None:
+        """
+        A constraint (expr sense 0) that has not been added to a model yet.
+
+        :param expr: the linear expression
+        :param sense: "<", ">" or "="
+        :return: None
+        """
+        self.expr: LinExpr = expr
+        self.sense: str = sense
+
+
+class MILPConstr:
+    def __init__(self, index: int, name: str) -> None:
+        """
+        A constraint in a MILP model.
+
+        :param index: index of the constraint (row) in the model
+        :param name: name of the constraint
+        :return: None
+        """
+        self.index: int = index
+        self.name: str = name
+
+
+def quicksum(items: List[MILPVar or LinExpr or float]) -> LinExpr:
+    """
+    Sum a list of variables / expressions / numbers.
+
+    :param items: the items to sum
+    :return: a LinExpr
+    """
+    result = LinExpr()
+    for item in items:
+        result.add_inplace(item)
+    return result
+
+
+class MILPModel:
+    def __init__(self, name: str, seed: int = 0) -> None:
+        """
+        A solver-agnostic MILP model. Variables and constraints are stored in a neutral form and emitted to
+        the chosen solver when optimize is called. Variables and constraints can be added one at a time (with
+        linear expressions) or in bulk as sparse COO coefficients (add_vars / add_constrs).
+
+        :param name: name of the model
+        :param seed: random seed for the solver
+        :return: None
+        """
+        self.name: str = name
+        self.seed: int = seed
+
+        # variables (each add_vars call adds one chunk)
+        self.num_vars: int = 0
+        self.var_names: List[str] = []
+        self.var_type_chunks: List[np.ndarray] = []
+        self.var_lb_chunks: List[np.ndarray] = []
+        self.var_ub_chunks: List[np.ndarray] = []
+        self.start_index_chunks: List[np.ndarray] = []
+        self.start_value_chunks: List[np.ndarray] = []
+        self.start_placement_chunks: List[np.ndarray] = []
+
+        # constraints (each add_constrs call adds one COO block, row indices are global)
+        self.num_constrs: int = 0
+        self.constr_names: List[str] = []
+        self.coo_row_chunks: List[np.ndarray] = []
+        self.coo_col_chunks: List[np.ndarray] = []
+        self.coo_val_chunks: List[np.ndarray] = []
+        self.row_sense_chunks: List[np.ndarray] = []
+        self.row_rhs_chunks: List[np.ndarray] = []
+
+        # objective
+        self.objective_indices: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.objective_coefficients: np.ndarray = np.zeros(0)
+        self.objective_constant: float = 0
+        self.maximize: bool = True
+
+        # optimization results
+        self.solver: MILPSolver or None = None
+        self.gurobi_model = None
+        self.solution: np.ndarray or None = None
+        self.objective_value: float or None = None
+
+    def add_vars(self, count: int, vtype: str, names: List[str], lb: float or np.ndarray = 0,
+                 ub: float or np.ndarray = INFINITY) -> np.ndarray:
+        """
+        Add a batch of decision variables.
+
+        :param count: number of variables
+        :param vtype: VarType.Continuous, VarType.Binary or VarType.Integer
+        :param names: names of the variables
+        :param lb: lower bounds (a number or an array)
+        :param ub: upper bounds (a number or an array), binary variables are always in [0, 1]
+        :return: indices of the variables
+        """
+        assert vtype in (VarType.Continuous, VarType.Binary, VarType.Integer), "Unknown variable type!"
+        assert len(names) == count, "Each variable must have a name!"
+        lbs = np.broadcast_to(np.asarray(lb, dtype=float), (count,))
+        ubs = np.broadcast_to(np.asarray(ub, dtype=float), (count,))
+        if vtype == VarType.Binary:
+            lbs, ubs = np.maximum(lbs, 0), np.minimum(ubs, 1)
+        self.var_names += names
+        self.var_type_chunks.append(np.full(count, vtype))
+        self.var_lb_chunks.append(np.array(lbs))
+        self.var_ub_chunks.append(np.array(ubs))
+        indices = np.arange(self.num_vars, self.num_vars + count)
+        self.num_vars += count
+        return indices
+
+    def add_var(self, vtype: str, lb: float = 0, ub: float = INFINITY, name: str = "") -> MILPVar:
+        """
+        Add a decision variable.
+
+        :param vtype: VarType.Continuous, VarType.Binary or VarType.Integer
+        :param lb: lower bound
+        :param ub: upper bound (binary variables are always in [0, 1])
+        :param name: name of the variable
+        :return: the variable
+        """
+        name = name if not name == "" else f"x{self.num_vars}"
+        index = self.add_vars(count=1, vtype=vtype, names=[name], lb=lb, ub=ub)[0]
+        return MILPVar(index=int(index), name=name)
+
+    def set_starts(self, var_indices: np.ndarray, values: np.ndarray, is_placement: bool = True) -> None:
+        """
+        Set start values (warm start) of some variables.
+        Note: when fixing all start values makes the warm start of HiGHS infeasible, only the start values of
+              placement variables are fixed (see _optimize_highs).
+
+        :param var_indices: indices of the variables
+        :param values: start values
+        :param is_placement: whether the variables decide the placement
+        :return: None
+        """
+        assert len(var_indices) == len(values), "Each variable must have a start value!"
+        self.start_index_chunks.append(np.asarray(var_indices, dtype=np.int64))
+        self.start_value_chunks.append(np.asarray(values, dtype=float))
+        self.start_placement_chunks.append(np.full(len(values), is_placement))
+
+    def add_constrs(self, rows: np.ndarray, cols: np.ndarray, vals: np.ndarray, senses: str or np.ndarray,
+                    rhs: np.ndarray, names: List[str]) -> np.ndarray:
+        """
+        Add a batch of linear constraints A x (sense) rhs, where A is given in COO format.
+        Note: duplicate entries of A are summed.
+
+        :param rows: row of each coefficient (0 is the first constraint in this batch)
+        :param cols: variable index of each coefficient
+        :param vals: value of each coefficient
+        :param senses: "<", ">" or "=" (for all constraints or for each constraint)
+        :param rhs: right hand side of each constraint
+        :param names: names of the constraints
+        :return: indices of the constraints
+        """
+        count = len(rhs)
+        assert len(names) == count, "Each constraint must have a name!"
+        assert len(rows) == len(cols) == len(vals), "Bad COO coefficients!"
+        self.constr_names += names
+        self.coo_row_chunks.append(np.asarray(rows, dtype=np.int64) + self.num_constrs)
+        self.coo_col_chunks.append(np.asarray(cols, dtype=np.int64))
+        self.coo_val_chunks.append(np.asarray(vals, dtype=float))
+        self.row_sense_chunks.append(np.array(np.broadcast_to(np.asarray(senses), (count,))))
+        self.row_rhs_chunks.append(np.asarray(rhs, dtype=float))
+        indices = np.arange(self.num_constrs, self.num_constrs + count)
+        self.num_constrs += count
+        return indices
+
+    def add_constr(self, constr: TempConstr, name: str = "") -> MILPConstr:
+        """
+        Add a linear constraint, e.g. add_constr(x + 2 * y <= 3).
+
+        :param constr: the constraint
+        :param name: name of the constraint
+        :return: the constraint
+        """
+        assert isinstance(constr, TempConstr), "Constraint must be a comparison of linear expressions!"
+        name = name if not name == "" else f"R{self.num_constrs}"
+        cols = np.array(list(constr.expr.coefficients.keys()), dtype=np.int64)
+        vals = np.array(list(constr.expr.coefficients.values()), dtype=float)
+        index = self.add_constrs(rows=np.zeros(len(cols), dtype=np.int64), cols=cols, vals=vals,
+                                 senses=constr.sense, rhs=np.array([-constr.expr.constant]), names=[name])[0]
+        return MILPConstr(index=int(index), name=name)
+
+    def set_objective(self, expr: LinExpr or MILPVar, maximize: bool) -> None:
+        """
+        Set the optimization target.
+
+        :param expr: objective
+        :param maximize: maximize or minimize
+        :return: None
+        """
+        expr = quicksum([expr])
+        self.set_objective_coefficients(var_indices=np.array(list(expr.coefficients.keys()), dtype=np.int64),
+                                        coefficients=np.array(list(expr.coefficients.values()), dtype=float),
+                                        maximize=maximize, constant=expr.constant)
+
+    def set_objective_coefficients(self, var_indices: np.ndarray, coefficients: np.ndarray, maximize: bool,
+                                   constant: float = 0) -> None:
+        """
+        Set the optimization target as sum_i coefficients[i] * x[var_indices[i]] + constant.
+
+        :param var_indices: indices of the variables
+        :param coefficients: coefficients of the variables
+        :param maximize: maximize or minimize
+        :param constant: constant term
+        :return: None
+        """
+        self.objective_indices = np.asarray(var_indices, dtype=np.int64)
+        self.objective_coefficients = np.asarray(coefficients, dtype=float)
+        self.objective_constant = constant
+        self.maximize = maximize
+
+    def get_var_types(self) -> np.ndarray:
+        return np.concatenate(self.var_type_chunks) if self.num_vars > 0 else np.zeros(0, dtype="<U1")
+
+    def get_var_lbs(self) -> np.ndarray:
+        return np.concatenate(self.var_lb_chunks) if self.num_vars > 0 else np.zeros(0)
+
+    def get_var_ubs(self) -> np.ndarray:
+        return np.concatenate(self.var_ub_chunks) if self.num_vars > 0 else np.zeros(0)
+
+    def get_var_starts(self) -> np.ndarray:
+        """
+        Get start values of all variables.
+
+        :return: start value of each variable (nan if not set)
+        """
+        starts = np.full(self.num_vars, np.nan)
+        for var_indices, values in zip(self.start_index_chunks, self.start_value_chunks):
+            starts[var_indices] = values
+        return starts
+
+    def get_placement_starts(self) -> np.ndarray:
+        """
+        Get start values of placement variables.
+
+        :return: start value of each variable (nan if not set or not a placement variable)
+        """
+        starts = np.full(self.num_vars, np.nan)
+        for var_indices, values, is_placement in zip(self.start_index_chunks, self.start_value_chunks,
+                                                     self.start_placement_chunks):
+            starts[var_indices[is_placement]] = values[is_placement]
+        return starts
+
+    def get_row_senses(self) -> np.ndarray:
+        return np.concatenate(self.row_sense_chunks) if self.num_constrs > 0 else np.zeros(0, dtype="<U1")
+
+    def get_row_rhs(self) -> np.ndarray:
+        return np.concatenate(self.row_rhs_chunks) if self.num_constrs > 0 else np.zeros(0)
+
+    def get_constraint_matrix(self):
+        """
+        Get the constraint matrix (duplicate entries summed and zeros removed).
+
+        :return: scipy csr matrix of shape (num_constrs, num_vars)
+        """
+        from scipy.sparse import coo_matrix
+
+        if self.num_constrs == 0:
+            return coo_matrix((0, self.num_vars)).tocsr()
+        constr_matrix = coo_matrix((np.concatenate(self.coo_val_chunks),
+                                    (np.concatenate(self.coo_row_chunks), np.concatenate(self.coo_col_chunks))),
+                                   shape=(self.num_constrs, self.num_vars)).tocsr()
+        constr_matrix.eliminate_zeros()
+        constr_matrix.sort_indices()
+        return constr_matrix
+
+    def get_objective_vector(self) -> np.ndarray:
+        """
+        Get the objective as a dense vector.
+
+        :return: objective coefficients of each variable
+        """
+        objective_vector = np.zeros(self.num_vars)
+        np.add.at(objective_vector, self.objective_indices, self.objective_coefficients)
+        return objective_vector
+
+    def get_memory_usage(self) -> float:
+        """
+        Get the (approximate) memory used to store this model.
+
+        :return: memory usage in bytes
+        """
+        chunks = self.var_type_chunks + self.var_lb_chunks + self.var_ub_chunks + self.start_index_chunks + \
+            self.start_value_chunks + self.start_placement_chunks + self.coo_row_chunks + self.coo_col_chunks + \
+            self.coo_val_chunks + self.row_sense_chunks + self.row_rhs_chunks
+        memory_usage = sum(_chunk.nbytes for _chunk in chunks)
+        memory_usage += sum(sys.getsizeof(_name) for _name in self.var_names)
+        memory_usage += sum(sys.getsizeof(_name) for _name in self.constr_names)
+        return memory_usage
+
+    def optimize(self, solver: MILPSolver, early_stop_callback: Callable[[float], bool] or None = None,
+                 time_limit: float = INFINITY, mip_rel_gap: float or None = None,
+                 objective_bound: float or None = None) -> None:
+        """
+        Solve the model with the given solver.
+        Note: 1. Gurobi reports each incumbent to early_stop_callback, which decides whether to stop.
+              2. scipy's HiGHS interface has no callbacks, so early stopping is expressed with time_limit,
+                 mip_rel_gap (relative gap to stop at) and objective_bound (a known bound on the objective,
+                 which is added as a cut so that the gap is measured against it).
+
+        :param solver: the solver to use
+        :param early_stop_callback: called with the best objective found so far, return True to stop
+        :param time_limit: max solve time (HiGHS only, Gurobi should stop through the callback)
+        :param mip_rel_gap: relative gap (HiGHS only)
+        :param objective_bound: bound on the objective (HiGHS only)
+        :return: None
+        """
+        self.solver = solver
+        self.solution, self.objective_value = None, None
+        if solver == MILPSolver.Gurobi:
+            self._optimize_gurobi(early_stop_callback=early_stop_callback)
+        elif solver == MILPSolver.HiGHS:
+            self._optimize_highs(time_limit=time_limit, mip_rel_gap=mip_rel_gap, objective_bound=objective_bound)
+        else:
+            assert False, "Unknown MILP solver!"
+
+    def _build_gurobi_model(self) -> Tuple[Any, Any]:
+        """
+        Emit this model to Gurobi (through the matrix API).
+
+        :return: gurobi model, gurobi matrix variable
+        """
+        assert gp is not None, "Gurobi solver requires gurobipy!"
+        gurobi_model = gp.Model(self.name)
+        gurobi_model.Params.Seed = self.seed
+
+        # variables
+        gurobi_vars = gurobi_model.addMVar(shape=self.num_vars, lb=self.get_var_lbs(),
+                                           ub=np.minimum(self.get_var_ubs(), GRB.INFINITY),
+                                           vtype=self.get_var_types(), name=np.array(self.var_names))
+        starts = self.get_var_starts()
+        if not np.isnan(starts).all():
+            gurobi_vars.Start = np.where(np.isnan(starts), GRB.UNDEFINED, starts)
+
+        # constraints
+        gurobi_model.addMConstr(self.get_constraint_matrix(), gurobi_vars, self.get_row_senses(),
+                                self.get_row_rhs(), name=self.constr_names)
+
+        # objective
+        gurobi_model.setObjective(self.get_objective_vector() @ gurobi_vars + self.objective_constant,
+                                  GRB.MAXIMIZE if self.maximize else GRB.MINIMIZE)
+        return gurobi_model, gurobi_vars
+
+    def _optimize_gurobi(self, early_stop_callback: Callable[[float], bool] or None) -> None:
+        """
+        Solve the model with Gurobi.
+
+        :param early_stop_callback: called with the best objective found so far, return True to stop
+        :return: None
+        """
+        self.gurobi_model, gurobi_vars = self._build_gurobi_model()
+
+        # define early stopping callback function
+        def gurobi_callback(model, where):
+            if where == GRB.Callback.MIP:
+                best_objective = model.cbGet(GRB.Callback.MIP_OBJBST)
+                if early_stop_callback(best_objective):
+                    model.terminate()
+
+        # solve
+        if early_stop_callback is not None:
+            self.gurobi_model.optimize(gurobi_callback)
+        else:
+            self.gurobi_model.optimize()
+
+        # load solution
+        if self.gurobi_model.SolCount > 0:
+            self.solution = np.array(gurobi_vars.X)
+            self.objective_value = self.gurobi_model.ObjVal
+
+    def _optimize_highs(self, time_limit: float, mip_rel_gap: float or None, objective_bound: float or None) -> None:
+        """
+        Solve the model with HiGHS (through scipy).
+        Note: 1. scipy does not accept start values, so warm start is emulated in two phases: (1) solve with
+                 variables that have start values fixed, (2) solve the full model in the remaining time and keep
+                 the better of the two solutions.
+              2. phase (1) uses at most WARM_START_TIME_SHARE of the time limit. It first fixes all start values,
+                 and then only the start values of placement variables, which also works when the start
+                 solution is infeasible when fully fixed and lets the solver improve it.
+
+        :param time_limit: max solve time
+        :param mip_rel_gap: relative gap to stop at
+        :param objective_bound: bound on the objective
+        :return: None
+        """
+        from scipy.optimize import milp, LinearConstraint, Bounds
+
+        # Step 1: constraints and objective (scipy minimizes)
+        senses, rhs = self.get_row_senses(), self.get_row_rhs()
+        constraints = [LinearConstraint(self.get_constraint_matrix(), np.where(senses == "<", -np.inf, rhs),
+                                        np.where(senses == ">", np.inf, rhs))]
+        objective_vector = self.get_objective_vector()
+        sign = -1 if self.maximize else 1
+        integrality = (self.get_var_types() != VarType.Continuous).astype(int)
+        var_lbs, var_ubs = self.get_var_lbs(), self.get_var_ubs()
+
+        def objective_cut(bound: float, at_most: bool) -> LinearConstraint:
+            # objective <= bound if at_most else objective >= bound (with a small slack)
+            bound = bound - self.objective_constant
+            slack = 1e-6 * max(1.0, abs(bound))
+            if at_most:
+                return LinearConstraint(objective_vector.reshape(1, -1), -np.inf, bound + slack)
+            return LinearConstraint(objective_vector.reshape(1, -1), bound - slack, np.inf)
+
+        def run_highs(lbs: np.ndarray, ubs: np.ndarray, extra_constraints: List[LinearConstraint],
+                      remaining_time: float) -> np.ndarray or None:
+            options: Dict[str, Any] = {"disp": True}
+            if remaining_time < INFINITY:
+                options["time_limit"] = max(remaining_time, 0)
+            if mip_rel_gap is not None:
+                options["mip_rel_gap"] = mip_rel_gap
+            result = milp(c=sign * objective_vector, integrality=integrality, bounds=Bounds(lbs, ubs),
+                          constraints=constraints + extra_constraints, options=options)
+            print(f"[MILP Model - Info] HiGHS finished: {result.message}")
+            if result.x is None:
+                return None
+            # round integers, since HiGHS returns them with tolerance
+            solution = np.clip(result.x, lbs, ubs)
+            return np.where(integrality == 1, np.round(solution), solution)
+
+        def incumbent_cut(solution: np.ndarray or None) -> List[LinearConstraint]:
+            # only look for solutions that are at least as good as the incumbent
+            if solution is None:
+                return []
+            return [objective_cut(bound=objective_vector @ solution + self.objective_constant,
+                                  at_most=not self.maximize)]
+
+        def is_better(solution: np.ndarray or None, incumbent: np.ndarray or None) -> bool:
+            return solution is not None and (incumbent is None or
+                                             sign * objective_vector @ solution < sign * objective_vector @ incumbent)
+
+        # Step 2: (warm start) solve with all start values fixed, then with only placement start values fixed
+        start_time = time.time()
+        warm_start_deadline = start_time + WARM_START_TIME_SHARE * time_limit
+        bound_cuts = [] if objective_bound is None else [objective_cut(bound=objective_bound, at_most=self.maximize)]
+        best_solution: np.ndarray or None = None
+        starts, placement_starts = self.get_var_starts(), self.get_placement_starts()
+        has_start, has_placement_start = ~np.isnan(starts), ~np.isnan(placement_starts)
+        if has_start.any():
+            best_solution = run_highs(lbs=np.where(has_start, starts, var_lbs),
+                                      ubs=np.where(has_start, starts, var_ubs), extra_constraints=bound_cuts,
+                                      remaining_time=(warm_start_deadline - time.time()) / 2)
+            if best_solution is not None:
+                print(f"[MILP Model - Info] Objective of start solution: {objective_vector @ best_solution}.")
+            else:
+                print("[MILP Model - Info] No solution with all start values fixed.")
+        if has_placement_start.any() and not np.array_equal(has_start, has_placement_start):
+            solution = run_highs(lbs=np.where(has_placement_start, placement_starts, var_lbs),
+                                 ubs=np.where(has_placement_start, placement_starts, var_ubs),
+                                 extra_constraints=bound_cuts + incumbent_cut(solution=best_solution),
+                                 remaining_time=warm_start_deadline - time.time())
+            if is_better(solution=solution, incumbent=best_solution):
+                best_solution = solution
+                print(f"[MILP Model - Info] Objective with start placement: {objective_vector @ best_solution}.")
+
+        # Step 3: solve the full model (only looking for solutions better than the start solution)
+        solution = run_highs(lbs=var_lbs, ubs=var_ubs,
+                             extra_constraints=bound_cuts + incumbent_cut(solution=best_solution),
+                             remaining_time=time_limit - (time.time() - start_time))
+        if is_better(solution=solution, incumbent=best_solution):
+            best_solution = solution
+
+        # Step 4: save the best solution
+        if best_solution is not None:
+            self.solution = best_solution
+            self.objective_value = float(objective_vector @ best_solution) + self.objective_constant
+
+    def write_solution(self, file_name: str) -> None:
+        """
+        Write the solution in Gurobi's .sol format ("name value" per line).
+
+        :param file_name: name of the solution file
+        :return: None
+        """
+        assert file_name.endswith(".sol"), "Solution file must end with .sol!"
+        assert self.solution is not None, "No solution found by the solver!"
+        with open(file_name, "w") as file:
+            file.write(f"# Solution for model {self.name}\n")
+            file.write(f"# Objective value = {self.objective_value}\n")
+            for name, vtype, value in zip(self.var_names, self.get_var_types().tolist(), self.solution.tolist()):
+                if vtype == VarType.Continuous:
+                    file.write(f"{name} {value}\n")
+                else:
+                    file.write(f"{name} {int(round(value))}\n")
+
+    def write_model(self, file_name: str) -> None:
+        """
+        Write the model in LP format.
+
+        :param file_name: name of the model file
+        :return: None
+        """
+        assert file_name.endswith(".lp"), "Model file should end with .lp!"
+        if self.gurobi_model is not None:
+            self.gurobi_model.write(file_name)
+            return
+
+        def format_terms(cols: List[int], vals: List[float]) -> str:
+            terms: List[str] = []
+            for col, val in zip(cols, vals):
+                terms.append(f"{'-' if val < 0 else '+'} {abs(val)} {self.var_names[col]}")
+            return " ".join(terms) if len(terms) > 0 else "0"
+
+        constr_matrix = self.get_constraint_matrix()
+        row_senses, row_rhs = self.get_row_senses().tolist(), self.get_row_rhs().tolist()
+        var_types = self.get_var_types().tolist()
+        with open(file_name, "w") as file:
+            file.write(f"\\ Model {self.name}\n")
+            file.write("Maximize\n" if self.maximize else "Minimize\n")
+            objective_terms = format_terms(self.objective_indices.tolist(), self.objective_coefficients.tolist())
+            file.write(f"  obj: {objective_terms}\n")
+            file.write("Subject To\n")
+            for row, name in enumerate(self.constr_names):
+                begin, end = constr_matrix.indptr[row], constr_matrix.indptr[row + 1]
+                terms = format_terms(constr_matrix.indices[begin:end].tolist(), constr_matrix.data[begin:end].tolist())
+                sense = {"<": "<=", ">": ">=", "=": "="}[row_senses[row]]
+                file.write(f"  {name}: {terms} {sense} {row_rhs[row]}\n")
+            file.write("Bounds\n")
+            for name, vtype, lb, ub in zip(self.var_names, var_types, self.get_var_lbs().tolist(),
+                                           self.get_var_ubs().tolist()):
+                if vtype == VarType.Binary:
+                    continue
+                upper = "+inf" if math.isinf(ub) else ub
+                file.write(f"  {lb} <= {name} <= {upper}\n")
+            integer_names = [_name for _name, _vtype in zip(self.var_names, var_types) if _vtype == VarType.Integer]
+            binary_names = [_name for _name, _vtype in zip(self.var_names, var_types) if _vtype == VarType.Binary]
+            if len(integer_names) > 0:
+                file.write("Generals\n")
+                file.write("".join(f"  {_name}\n" for _name in integer_names))
+            if len(binary_names) > 0:
+                file.write("Binaries\n")
+                file.write("".join(f"  {_name}\n" for _name in binary_names))
+            file.write("End\n")
@@ -0,0 +1,267 @@
+# 2026.10.19 Yixuan Mei
+
+from typing import Dict, List, Tuple
+
+
+class IncrementalMaxFlow:
+    def __init__(self, num_vertices: int) -> None:
+        """
+        A small max flow solver (Dinic) that keeps its flow between calls, so that the max flow can be
+        updated incrementally when capacities change (e.g. when links are removed during pruning).
+        Note: arcs are stored in pairs, arc 2k is the forward arc and arc 2k + 1 is its reverse arc.
+
+        :param num_vertices: number of vertices
+        :return: None
+        """
+        self.num_vertices: int = num_vertices
+        self.adjacency: List[List[int]] = [[] for _ in range(num_vertices)]
+        self.arc_head: List[int] = []
+        self.arc_capacity: List[float] = []
+        self.arc_flow: List[float] = []
+
+    def add_vertex(self) -> int:
+        """
+        Add a vertex.
+
+        :return: index of the new vertex
+        """
+        self.adjacency.append([])
+        self.num_vertices += 1
+        return self.num_vertices - 1
+
+    def add_arc(self, from_vertex: int, to_vertex: int, capacity: float) -> int:
+        """
+        Add an arc (and its reverse arc).
+
+        :param from_vertex: tail of the arc
+        :param to_vertex: head of the arc
+        :param capacity: capacity of the arc
+        :return: index of the arc
+        """
+        arc: int = len(self.arc_head)
+        self.arc_head += [to_vertex, from_vertex]
+        self.arc_capacity += [capacity, 0.0]
+        self.arc_flow += [0.0, 0.0]
+        self.adjacency[from_vertex].append(arc)
+        self.adjacency[to_vertex].append(arc + 1)
+        return arc
+
+    def pop_arc(self) -> None:
+        """
+        Remove the last added arc (used for temporary arcs).
+
+        :return: None
+        """
+        arc: int = len(self.arc_head) - 2
+        from_vertex, to_vertex = self.arc_head[arc + 1], self.arc_head[arc]
+        assert self.adjacency[from_vertex][-1] == arc and self.adjacency[to_vertex][-1] == arc + 1, \
+            "Can only pop the last added arc!"
+        self.adjacency[from_vertex].pop()
+        self.adjacency[to_vertex].pop()
+        del self.arc_head[arc:]
+        del self.arc_capacity[arc:]
+        del self.arc_flow[arc:]
+
+    def tail(self, arc: int) -> int:
+        """
+        Get the tail of an arc.
+
+        :param arc: index of the arc
+        :return: tail of the arc
+        """
+        return self.arc_head[arc ^ 1]
+
+    def augment(self, source: int, sink: int, limit: float = float("inf"), eps: float = 1e-9) -> float:
+        """
+        Push more flow from source to sink on top of the current flow (Dinic's algorithm).
+
+        :param source: source vertex
+        :param sink: sink vertex
+        :param limit: max amount of flow to push
+        :param eps: residual capacity smaller than eps is treated as zero
+        :return: amount of flow pushed
+        """
+        arc_head, arc_capacity, arc_flow, adjacency = self.arc_head, self.arc_capacity, self.arc_flow, self.adjacency
+        total_pushed: float = 0
+        while limit - total_pushed > eps:
+            # Step 1: build the level graph with bfs
+            level: List[int] = [-1] * self.num_vertices
+            level[source] = 0
+            queue: List[int] = [source]
+            for vertex in queue:
+                for arc in adjacency[vertex]:
+                    head = arc_head[arc]
+                    if level[head] < 0 and arc_capacity[arc] - arc_flow[arc] > eps:
+                        level[head] = level[vertex] + 1
+                        queue.append(head)
+            if level[sink] < 0:
+                break
+
+            # Step 2: find augmenting paths in the level graph (iterative dfs)
+            next_arc: List[int] = [0] * self.num_vertices
+            path: List[int] = []
+            vertex: int = source
+            while limit - total_pushed > eps:
+                if vertex == sink:
+                    # push flow along the path
+                    pushed = min([limit - total_pushed] + [arc_capacity[_arc] - arc_flow[_arc] for _arc in path])
+                    for arc in path:
+                        arc_flow[arc] += pushed
+                        arc_flow[arc ^ 1] -= pushed
+                    total_pushed += pushed
+                    path.clear()
+                    vertex = source
+                    continue
+
+                # advance
+                advanced: bool = False
+                vertex_arcs = adjacency[vertex]
+                while next_arc[vertex] < len(vertex_arcs):
+                    arc = vertex_arcs[next_arc[vertex]]
+                    head = arc_head[arc]
+                    if level[head] == level[vertex] + 1 and arc_capacity[arc] - arc_flow[arc] > eps:
+                        path.append(arc)
+                        vertex = head
+                        advanced = True
+                        break
+                    next_arc[vertex] += 1
+
+                # retreat
+                if not advanced:
+                    if vertex == source:
+                        break
+                    level[vertex] = -1
+                    arc = path.pop()
+                    vertex = arc_head[arc ^ 1]
+                    next_arc[vertex] += 1
+        return total_pushed
+
+    def flow_value(self, source: int) -> float:
+        """
+        Get the value of the current flow.
+
+        :param source: source vertex
+        :return: net flow out of source
+        """
+        return sum(self.arc_flow[_arc] for _arc in self.adjacency[source])
+
+    def remove_arcs(self, arcs: List[int], eps: float = 1e-9) -> bool:
+        """
+        Set the capacity of the given (forward) arcs to zero and try to reroute their flow, so that the value
+        of the flow does not change. If this is not possible, nothing is changed.
+        Note: the flow on the removed arcs leaves an excess at their tails and a deficit at their heads. The
+              flow value is unchanged iff the excess can be routed to the deficit in the residual graph.
+
+        :param arcs: forward arcs to remove
+        :param eps: tolerance
+        :return: whether the arcs are removed
+        """
+        # Step 1: arcs without flow can be removed directly
+        imbalance: Dict[int, float] = {}
+        for arc in arcs:
+            cur_flow = self.arc_flow[arc]
+            if cur_flow > eps:
+                imbalance[self.tail(arc)] = imbalance.get(self.tail(arc), 0) + cur_flow
+                imbalance[self.arc_head[arc]] = imbalance.get(self.arc_head[arc], 0) - cur_flow
+        if len(imbalance) == 0:
+            for arc in arcs:
+                self.arc_capacity[arc] = 0.0
+                self.arc_flow[arc] = 0.0
+                self.arc_flow[arc ^ 1] = 0.0
+            return True
+
+        # Step 2: remove the arcs and reroute the flow from excess to deficit (roll back if this fails)
+        saved_flow: List[float] = list(self.arc_flow)
+        saved_capacity: List[Tuple[int, float]] = [(_arc, self.arc_capacity[_arc]) for _arc in arcs]
+        for arc in arcs:
+            self.arc_capacity[arc] = 0.0
+            self.arc_flow[arc] = 0.0
+            self.arc_flow[arc ^ 1] = 0.0
+        excess, deficit = self.route_imbalance(
+            supplies={vertex: amount for vertex, amount in imbalance.items() if amount > eps},
+            demands={vertex: -amount for vertex, amount in imbalance.items() if amount < -eps}, eps=eps
+        )
+        success: bool = sum(excess.values()) <= eps * max(1.0, len(imbalance))
+        if not success:
+            self.arc_flow = saved_flow
+            for arc, capacity in saved_capacity:
+                self.arc_capacity[arc] = capacity
+        return success
+
+    def route_imbalance(self, supplies: Dict[int, float], demands: Dict[int, float],
+                        eps: float = 1e-9) -> Tuple[Dict[int, float], Dict[int, float]]:
+        """
+        Route as much flow as possible from supply vertices to demand vertices in the residual graph, using
+        temporary terminals.
+
+        :param supplies: vertex -> amount of flow it can send
+        :param demands: vertex -> amount of flow it can receive
+        :param eps: tolerance
+        :return: remaining supplies and demands
+        """
+        # Step 1: add temporary terminals
+        num_vertices_before: int = self.num_vertices
+        temp_source, temp_sink = self.add_vertex(), self.add_vertex()
+        supply_arcs: Dict[int, int] = {vertex: self.add_arc(from_vertex=temp_source, to_vertex=vertex, capacity=amount)
+                                       for vertex, amount in supplies.items()}
+        demand_arcs: Dict[int, int] = {vertex: self.add_arc(from_vertex=vertex, to_vertex=temp_sink, capacity=amount)
+                                       for vertex, amount in demands.items()}
+
+        # Step 2: route the flow
+        self.augment(source=temp_source, sink=temp_sink, limit=sum(supplies.values()), eps=eps)
+        remaining_supplies = {vertex: supplies[vertex] - self.arc_flow[arc] for vertex, arc in supply_arcs.items()}
+        remaining_demands = {vertex: demands[vertex] - self.arc_flow[arc] for vertex, arc in demand_arcs.items()}
+
+        # Step 3: clean up temporary arcs and vertices
+        for _ in range(len(supply_arcs) + len(demand_arcs)):
+            self.pop_arc()
+        del self.adjacency[num_vertices_before:]
+        self.num_vertices = num_vertices_before
+        return remaining_supplies, remaining_demands
+
+    def set_capacities(self, arcs: List[int], capacities: List[float], source: int, sink: int,
+                       eps: float = 1e-9) -> None:
+        """
+        Set the capacity of the given (forward) arcs and keep the current flow feasible. Flow above the new
+        capacity is rerouted if possible, and cancelled otherwise (so the flow value may drop). Call augment
+        afterwards to get the new max flow.
+        Note: the cut flow leaves an excess at the tail and a deficit at the head of each arc. We first route
+              excess to deficit. After that, no flow goes from a deficit to an excess, so the remaining excess
+              came from source and can be sent back, and the remaining deficit can be covered from sink.
+
+        :param arcs: forward arcs to change
+        :param capacities: new capacity of each arc
+        :param source: source vertex
+        :param sink: sink vertex
+        :param eps: tolerance
+        :return: None
+        """
+        # Step 1: set the capacities and cut the flow above them
+        imbalance: Dict[int, float] = {}
+        for arc, capacity in zip(arcs, capacities):
+            self.arc_capacity[arc] = capacity
+            over_flow = self.arc_flow[arc] - capacity
+            if over_flow > eps:
+                self.arc_flow[arc] -= over_flow
+                self.arc_flow[arc ^ 1] += over_flow
+                imbalance[self.tail(arc)] = imbalance.get(self.tail(arc), 0) + over_flow
+                imbalance[self.arc_head[arc]] = imbalance.get(self.arc_head[arc], 0) - over_flow
+        if len(imbalance) == 0:
+            return
+
+        # Step 2: reroute excess to deficit, send remaining excess back to source and cover remaining
+        # deficit from sink
+        excess, deficit = self.route_imbalance(
+            supplies={vertex: amount for vertex, amount in imbalance.items() if amount > eps},
+            demands={vertex: -amount for vertex, amount in imbalance.items() if amount < -eps}, eps=eps
+        )
+        excess = {vertex: amount for vertex, amount in excess.items() if amount > eps}
+        deficit = {vertex: amount for vertex, amount in deficit.items() if amount > eps}
+        # Note: augment ignores residual capacity below eps, so tiny leftovers are numerical noise
+        tolerance: float = max(1e-6, eps * sum(abs(amount) for amount in imbalance.values()))
+        if len(excess) > 0:
+            excess, _ = self.route_imbalance(supplies=excess, demands={source: sum(excess.values())}, eps=eps)
+            assert sum(excess.values()) <= tolerance, "Failed to send excess back to source!"
+        if len(deficit) > 0:
+            _, deficit = self.route_imbalance(supplies={sink: sum(deficit.values())}, demands=deficit, eps=eps)
+            assert sum(deficit.values()) <= tolerance, "Failed to cover deficit from sink!"
@@ -0,0 +1,99 @@
+# 2026.10.19 Yixuan Mei
+
+from typing import Dict, List
+
+from simulator.initial_layout.ilp_layout.ilp_layout import ILPLayout
+from simulator.initial_layout.layout_cache import load_solution_layers, write_solution_layers
+
+
+def get_fusion_factor(num_layers: int, max_num_layers: List[int], max_num_super_layers: int) -> int:
+    """
+    Get the number of consecutive layers fused into one super-layer.
+    Note: 1. the fusion factor must divide the number of layers and be no larger than the max number of layers
+             of the smallest machine (so that every machine can hold at least one super-layer)
+          2. we use the smallest such factor that leaves at most max_num_super_layers super-layers, or the
+             largest such factor if no factor leaves that few
+
+    :param num_layers: number of layers in the model
+    :param max_num_layers: max number of layers each compute node can hold
+    :param max_num_super_layers: target max number of super-layers
+    :return: fusion factor (1 means no fusion)
+    """
+    candidates: List[int] = [factor for factor in range(1, min(max_num_layers) + 1) if num_layers % factor == 0]
+    for factor in candidates:
+        if num_layers // factor <= max_num_super_layers:
+            return factor
+    return candidates[-1]
+
+
+def fuse_layers(ilp_layout: ILPLayout, fusion_factor: int) -> float:
+    """
+    Fuse every fusion_factor consecutive layers of a loaded ILP layout into one super-layer (in place). Holding
+    k super-layers has the throughput of holding k * fusion_factor layers, so the max flow of a fused layout is
+    the max flow of the same layout expanded to full granularity.
+
+    :param ilp_layout: ILP layout with the cluster loaded
+    :param fusion_factor: number of layers in each super-layer
+    :return: fraction of layer capacity lost (layers that do not fill a whole super-layer on a machine)
+    """
+    assert ilp_layout.cluster_loaded, "Cluster must be loaded before fusing layers!"
+    assert ilp_layout.model_card.num_layers % fusion_factor == 0, "Fusion factor must divide #layers!"
+    total_capacity, lost_capacity = 0, 0
+    for compute_node in ilp_layout.ilp_nodes.values():
+        fused_max_num_layers: int = compute_node.max_num_layers // fusion_factor
+        assert fused_max_num_layers >= 1, "Each machine must be able to hold at least one super-layer!"
+        total_capacity += compute_node.max_num_layers
+        lost_capacity += compute_node.max_num_layers - fused_max_num_layers * fusion_factor
+        compute_node.layer_count_2_throughput = {
+            layer_count: compute_node.layer_count_2_throughput[layer_count * fusion_factor]
+            for layer_count in range(1, fused_max_num_layers + 1)
+        }
+        compute_node.max_num_layers = fused_max_num_layers
+    ilp_layout.model_card.num_layers //= fusion_factor
+    return lost_capacity / total_capacity
+
+
+def fuse_layout_solution(solution_file_name: str, fused_solution_file_name: str, fused_layout: ILPLayout,
+                         fusion_factor: int) -> None:
+    """
+    Convert a solution at full granularity (e.g. a heuristic solution) into super-layers, so that it can be
+    used as the heuristic solution of a fused ILP layout. The start and end layer of each node are rounded to the
+    nearest super-layer boundary, so that nodes whose layers are consecutive stay connected after fusion.
+
+    :param solution_file_name: name of the solution file at full granularity
+    :param fused_solution_file_name: name of the fused solution file
+    :param fused_layout: ILP layout whose layers are fused
+    :param fusion_factor: number of layers in each super-layer
+    :return: None
+    """
+    fused_num_layers: int = fused_layout.model_card.num_layers
+    fused_layers: Dict[int, List[int]] = {}
+    for node_idx, layers in load_solution_layers(solution_file_name=solution_file_name).items():
+        if len(layers) == 0:
+            fused_layers[node_idx] = [0]
+            continue
+        fused_start: int = (min(layers) + fusion_factor // 2) // fusion_factor
+        fused_end: int = (max(layers) + 1 + fusion_factor // 2) // fusion_factor
+        fused_count: int = max(1, min(fused_end - fused_start, fused_layout.ilp_nodes[node_idx].max_num_layers))
+        fused_start = min(fused_start, fused_num_layers - fused_count)
+        fused_layers[node_idx] = list(range(fused_start, fused_start + fused_count))
+    write_solution_layers(solution_file_name=fused_solution_file_name, layers=fused_layers,
+                          node_idx_offset=fused_layout.node_idx_offset)
+
+
+def expand_layout_solution(fused_layout: ILPLayout, fusion_factor: int, save_path: str) -> None:
+    """
+    Save the solution of a fused ILP layout at full granularity.
+
+    :param fused_layout: ILP layout whose layers are fused (with solution loaded)
+    :param fusion_factor: number of layers in each super-layer
+    :param save_path: save path of the solution file at full granularity
+    :return: None
+    """
+    assert fused_layout.solution_loaded, "Must find a solution before expanding!"
+    expanded_layers: Dict[int, List[int]] = {
+        node_idx: list(range(compute_node.start_layer_idx * fusion_factor, compute_node.end_layer_idx * fusion_factor))
+        for node_idx, compute_node in fused_layout.ilp_nodes.items()
+    }
+    write_solution_layers(solution_file_name=save_path, layers=expanded_layers,
+                          node_idx_offset=fused_layout.node_idx_offset)
@@ -0,0 +1,310 @@
+# 2026.10.19 Yixuan Mei
+
+import os
+import json
+import math
+import time
+import shutil
+import hashlib
+import tempfile
+
+from configparser import ConfigParser
+from typing import Dict, List, Tuple, Any
+
+from simulator.model_manager.model_manager import ModelManager
+from simulator.initial_layout.cluster_topology import ClusterTopology, load_cluster_topology
+from simulator.initial_layout.ilp_layout.ilp_layout import MachineProfile
+
+
+class LayoutFingerprint:
+    def __init__(self, description: Dict[str, Any]) -> None:
+        """
+        Canonical fingerprint of a layout problem (model, machine mix, topology and layout settings).
+        Note: 1. two problems have the same key iff their canonical descriptions are the same
+              2. links are sorted, but compute node indices are kept, since layouts refer to nodes by index
+
+        :param description: canonical description (see get_layout_fingerprint)
+        :return: None
+        """
+        self.description: Dict[str, Any] = description
+        self.key: str = hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    @property
+    def node_types(self) -> List[str]:
+        return self.description["node_types"]
+
+    @property
+    def problem_key(self) -> str:
+        """ Problems with the same problem key only differ in topology, so their layouts are interchangeable. """
+        machine_mix = sorted((node_type, self.node_types.count(node_type)) for node_type in set(self.node_types))
+        problem = [self.description["model"], self.description["machine_profiles"], self.description["settings"],
+                   machine_mix]
+        return hashlib.sha256(json.dumps(problem, sort_keys=True).encode()).hexdigest()
+
+    def get_node_mapping(self, other: "LayoutFingerprint") -> List[int]:
+        """
+        Map compute nodes of this problem to compute nodes of another problem with the same machine mix. The
+        k-th node of a machine type is mapped to the k-th node of the same type in the other problem.
+
+        :param other: the other problem
+        :return: index of the corresponding node in the other problem for each node
+        """
+        assert self.problem_key == other.problem_key, "Can only map nodes between problems with the same mix!"
+        type_2_other_nodes: Dict[str, List[int]] = {}
+        for node_idx, node_type in enumerate(other.node_types):
+            type_2_other_nodes.setdefault(node_type, []).append(node_idx)
+        type_rank: Dict[str, int] = {}
+        node_mapping: List[int] = []
+        for node_type in self.node_types:
+            node_mapping.append(type_2_other_nodes[node_type][type_rank.get(node_type, 0)])
+            type_rank[node_type] = type_rank.get(node_type, 0) + 1
+        return node_mapping
+
+    def distance(self, other: "LayoutFingerprint") -> float:
+        """
+        Distance between the topologies of two problems with the same machine mix, which is the L1 distance
+        between the link bandwidths (a missing link has bandwidth 0), normalized to [0, 1].
+
+        :param other: the other problem
+        :return: distance (0 = same bandwidth on every link)
+        """
+        node_mapping: List[int] = self.get_node_mapping(other=other)
+        other_bandwidth: Dict[Tuple[str, str], float] = {(_from, _to): bandwidth for _from, _to, bandwidth, _
+                                                         in other.description["links"]}
+        difference, total = 0.0, 0.0
+        for _from, _to, bandwidth, _ in self.description["links"]:
+            mapped_from = _from if _from == "source" else str(node_mapping[int(_from)])
+            mapped_to = _to if _to == "sink" else str(node_mapping[int(_to)])
+            if (mapped_from, mapped_to) not in other_bandwidth:
+                mapped_from, mapped_to = mapped_to, mapped_from
+            other_link_bandwidth = other_bandwidth.pop((mapped_from, mapped_to), 0.0)
+            difference += abs(bandwidth - other_link_bandwidth)
+            total += bandwidth + other_link_bandwidth
+        for bandwidth in other_bandwidth.values():
+            difference += bandwidth
+            total += bandwidth
+        return difference / total if total > 0 else 0.0
+
+
+def get_layout_fingerprint(cluster_file_name: str, machine_profile_name: str, model_manager: ModelManager,
+                           settings: Dict[str, Any]) -> LayoutFingerprint:
+    """
+    Get the fingerprint of a layout problem.
+
+    :param cluster_file_name: name of the cluster file
+    :param machine_profile_name: name of the machine profile file
+    :param model_manager: model manager
+    :param settings: layout settings that change the problem (e.g. allow_partial_inference)
+    :return: fingerprint
+    """
+    topology: ClusterTopology = load_cluster_topology(file_name=cluster_file_name)
+
+    # machine profiles of the machine types used
+    machine_profile_parser = ConfigParser()
+    machine_profile_parser.read(machine_profile_name)
+    machine_profiles: Dict[str, List[float]] = {}
+    for machine_name in sorted(set(topology.node_types) | {"SourceNode", "SinkNode"}):
+        machine_profile = MachineProfile(machine_name=machine_name, config=machine_profile_parser)
+        machine_profiles[machine_name] = [machine_profile.inbound_nic_speed, machine_profile.outbound_nic_speed,
+                                          machine_profile.disk_speed, machine_profile.vram_size]
+
+    # model
+    model: Dict[str, Any] = {
+        "name": model_manager.model_name.value,
+        "machine_num_dict": sorted(model_manager.machine_num_dict.items()),
+        "profile_dir": None if model_manager.profile_dir is None else os.path.realpath(model_manager.profile_dir),
+        "num_layers": model_manager.get_num_layers(),
+    }
+
+    # links
+    links: List[List[str or float]] = sorted(
+        [str(_from), str(_to), bandwidth, latency] for (_from, _to), bandwidth, latency
+        in zip(topology.links, topology.link_bandwidth.tolist(), topology.link_latency.tolist())
+    )
+    return LayoutFingerprint(description={"model": model, "machine_profiles": machine_profiles,
+                                          "settings": settings, "node_types": list(topology.node_types),
+                                          "links": links})
+
+
+def load_solution_layers(solution_file_name: str) -> Dict[int, List[int]]:
+    """
+    Load the layers held by each compute node from a solution file (*_sol.ini).
+
+    :param solution_file_name: name of the solution file
+    :return: compute node index (without offset) -> layers
+    """
+    solution_parser = ConfigParser()
+    solution_parser.read(solution_file_name)
+    offset: int = eval(solution_parser["Settings"]["offset"])
+    return {int(compute_node_name.split("_")[2]) - offset: eval(layers)
+            for compute_node_name, layers in solution_parser["Solution"].items()}
+
+
+def write_solution_layers(solution_file_name: str, layers: Dict[int, List[int]], node_idx_offset: int) -> None:
+    """
+    Write the layers held by each compute node as a solution file (same format as *_sol.ini).
+
+    :param solution_file_name: name of the solution file
+    :param layers: compute node index (without offset) -> layers
+    :param node_idx_offset: offset of compute node names
+    :return: None
+    """
+    with open(solution_file_name, "w") as file:
+        file.write("[Settings]\n")
+        file.write(f"offset={node_idx_offset}\n")
+        file.write("\n")
+        file.write("[Solution]\n")
+        for node_idx in sorted(layers.keys()):
+            file.write(f"compute_node_{node_idx_offset + node_idx}={layers[node_idx]}\n")
+
+
+class LayoutCacheHit:
+    def __init__(self, exact: bool, distance: float, method: str, flow: float, entry_dir: str,
+                 layers: Dict[int, List[int]]) -> None:
+        """
+        A layout found in the layout cache.
+
+        :param exact: whether the cached layout is solved for exactly the same problem
+        :param distance: distance between the topologies (0 for exact hits)
+        :param method: layout method that found the cached layout
+        :param flow: max flow of the cached layout on its own problem
+        :param entry_dir: directory of the cache entry
+        :param layers: compute node index (of the queried problem) -> layers
+        :return: None
+        """
+        self.exact: bool = exact
+        self.distance: float = distance
+        self.method: str = method
+        self.flow: float = flow
+        self.entry_dir: str = entry_dir
+        self.layers: Dict[int, List[int]] = layers
+
+    def save_solution(self, save_path: str, node_idx_offset: int = 2) -> None:
+        """
+        Save the layout as a solution file (same format as *_sol.ini), which can be used as the heuristic
+        solution of ILP or local search.
+
+        :param save_path: save path of the solution file
+        :param node_idx_offset: offset of compute node names
+        :return: None
+        """
+        write_solution_layers(solution_file_name=save_path, layers=self.layers, node_idx_offset=node_idx_offset)
+
+    def get_file(self, file_name: str) -> str or None:
+        """
+        Get an extra file stored with the layout (e.g. ilp_solution.sol). Only available for exact hits, since
+        node indices are not remapped.
+
+        :param file_name: name of the file
+        :return: path to the file, None if not available
+        """
+        file_path = os.path.join(self.entry_dir, file_name)
+        return file_path if self.exact and os.path.exists(file_path) else None
+
+
+class LayoutCache:
+    def __init__(self, cache_dir: str) -> None:
+        """
+        Content-addressed store of solved layouts. Each entry is a directory named by the fingerprint key,
+        which holds the solution (solution.ini), extra files of the layout method and entry.json. Only the best
+        layout (highest flow) of each problem is kept.
+
+        :param cache_dir: path to the cache directory
+        :return: None
+        """
+        self.cache_dir: str = cache_dir
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+    def get_entry(self, key: str) -> Dict[str, Any] or None:
+        """
+        Get the metadata of a cache entry.
+
+        :param key: fingerprint key
+        :return: metadata in entry.json, None if not found
+        """
+        entry_file_name = os.path.join(self.cache_dir, key, "entry.json")
+        if not os.path.exists(entry_file_name):
+            return None
+        with open(entry_file_name, "r") as file:
+            return json.load(file)
+
+    def lookup(self, fingerprint: LayoutFingerprint, max_distance: float = 1.0) -> LayoutCacheHit or None:
+        """
+        Look up the layout of a problem. Returns the exact hit if the problem has been solved, otherwise the
+        nearest solved problem with the same model, machine mix and settings (its layout is mapped to the nodes
+        of this problem, see LayoutFingerprint.get_node_mapping).
+
+        :param fingerprint: fingerprint of the problem
+        :param max_distance: max distance of the nearest problem
+        :return: cache hit, None if not found
+        """
+        # Step 1: exact hit
+        entry = self.get_entry(key=fingerprint.key)
+        if entry is not None:
+            entry_dir = os.path.join(self.cache_dir, fingerprint.key)
+            return LayoutCacheHit(exact=True, distance=0.0, method=entry["method"], flow=entry["flow"],
+                                  entry_dir=entry_dir,
+                                  layers=load_solution_layers(os.path.join(entry_dir, "solution.ini")))
+
+        # Step 2: nearest problem with the same model, machine mix and settings
+        problem_key: str = fingerprint.problem_key
+        best_distance, best_key, best_fingerprint = max_distance, None, None
+        for key in sorted(_key for _key in os.listdir(self.cache_dir) if not _key.startswith(".")):
+            entry = self.get_entry(key=key)
+            if entry is None or not entry["problem_key"] == problem_key:
+                continue
+            cached_fingerprint = LayoutFingerprint(description=entry["fingerprint"])
+            distance = fingerprint.distance(other=cached_fingerprint)
+            if distance <= best_distance:
+                best_distance, best_key, best_fingerprint = distance, key, cached_fingerprint
+        if best_key is None:
+            return None
+        entry = self.get_entry(key=best_key)
+        entry_dir = os.path.join(self.cache_dir, best_key)
+        cached_layers: Dict[int, List[int]] = load_solution_layers(os.path.join(entry_dir, "solution.ini"))
+        node_mapping: List[int] = fingerprint.get_node_mapping(other=best_fingerprint)
+        return LayoutCacheHit(exact=False, distance=best_distance, method=entry["method"], flow=entry["flow"],
+                              entry_dir=entry_dir,
+                              layers={node_idx: cached_layers[node_mapping[node_idx]]
+                                      for node_idx in range(len(node_mapping))})
+
+    def store(self, fingerprint: LayoutFingerprint, solution_file_name: str, method: str, flow: float,
+              extra_files: Dict[str, str] or None = None) -> bool:
+        """
+        Store a solved layout. If the problem is already in the cache, the layout is only stored when it has
+        a higher flow (or the same flow and new extra files).
+        Note: the entry is written into a temporary directory first, so readers never see partial entries.
+
+        :param fingerprint: fingerprint of the problem
+        :param solution_file_name: the solution file (*_sol.ini)
+        :param method: layout method that found the layout
+        :param flow: max flow of the layout
+        :param extra_files: other files to store with the layout, {name in cache -> path} (e.g. ilp_solution.sol)
+        :return: whether the layout is stored
+        """
+        # Step 1: check existing entry
+        # a layout with the same flow only replaces the existing one if it brings new files (e.g. ILP solution)
+        existing_entry = self.get_entry(key=fingerprint.key)
+        if existing_entry is not None:
+            same_flow: bool = math.isclose(existing_entry["flow"], flow, rel_tol=1e-6)
+            new_files: bool = any(not os.path.exists(os.path.join(self.cache_dir, fingerprint.key, name_in_cache))
+                                  for name_in_cache in (extra_files if extra_files is not None else {}))
+            if (existing_entry["flow"] > flow and not same_flow) or (same_flow and not new_files):
+                return False
+
+        # Step 2: write the entry into a temporary directory
+        temp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp_")
+        shutil.copyfile(solution_file_name, os.path.join(temp_dir, "solution.ini"))
+        for name_in_cache, extra_file in (extra_files if extra_files is not None else {}).items():
+            shutil.copyfile(extra_file, os.path.join(temp_dir, name_in_cache))
+        with open(os.path.join(temp_dir, "entry.json"), "w") as file:
+            json.dump({"method": method, "flow": flow, "created": time.time(), "problem_key": fingerprint.problem_key,
+                       "fingerprint": fingerprint.description}, file)
+
+        # Step 3: replace the existing entry
+        entry_dir = os.path.join(self.cache_dir, fingerprint.key)
+        if os.path.exists(entry_dir):
+            shutil.rmtree(entry_dir)
+        os.rename(temp_dir, entry_dir)
+        return True
@@ -0,0 +1,443 @@
+# 2026.10.19 Yixuan Mei
+
+import math
+
+from typing import Dict, List, Set, Tuple
+
+from simulator.event_simulator.cluster_simulator import ClusterSimulator, RequestPhase
+from simulator.event_simulator.compute_node import ComputeNode
+from simulator.event_simulator.model import ModelStatus
+from simulator.trace_generator.simulator_query_feeder import OfflineRequestFeeder
+from simulator.initial_layout.local_search_layout import LocalSearchLayout, LayoutFlowNetwork, local_search
+
+
+class ReloadPlan:
+    def __init__(self, avg_input_len: float, avg_output_len: float, current_flow: float, target_flow: float,
+                 start: List[int], count: List[int], stages: List[List[int]], stage_flows: List[float],
+                 stage_load_times: List[float], drain_time: float) -> None:
+        """
+        A plan that moves the cluster to a target layout by reloading the model on groups of compute nodes
+        (stages) one after another. Nodes in a stage are drained and reloaded at the same time, and the other
+        nodes keep serving.
+        Note: all flows are computed with the throughput of the observed workload.
+
+        :param avg_input_len: average input length of the observed workload
+        :param avg_output_len: average output length of the observed workload
+        :param current_flow: max flow of the current layout
+        :param target_flow: max flow of the target layout
+        :param start: start layer of each compute node in the target layout
+        :param count: number of layers of each compute node in the target layout
+        :param stages: compute nodes (node id in the flow network) reloaded in each stage
+        :param stage_flows: max flow while the nodes of each stage are reloading
+        :param stage_load_times: expected time to load the new layers of each stage
+        :param drain_time: expected time to drain the nodes of a stage
+        :return: None
+        """
+        self.avg_input_len: float = avg_input_len
+        self.avg_output_len: float = avg_output_len
+        self.current_flow: float = current_flow
+        self.target_flow: float = target_flow
+        self.start: List[int] = start
+        self.count: List[int] = count
+        self.stages: List[List[int]] = stages
+        self.stage_flows: List[float] = stage_flows
+        self.stage_load_times: List[float] = stage_load_times
+        self.drain_time: float = drain_time
+
+        # cost: tokens not served while the stages are draining and reloading
+        # gain: extra tokens served per second with the target layout
+        self.estimated_cost: float = sum(max(0.0, current_flow - stage_flow) * (drain_time + load_time)
+                                         for stage_flow, load_time in zip(stage_flows, stage_load_times))
+        self.gain: float = target_flow - current_flow
+        self.break_even_time: float = self.estimated_cost / self.gain if self.gain > 0 else math.inf
+
+
+class LayoutReplanner:
+    # Usage:
+    # 1. generate the simulator cluster of a loaded layout with include_all_links=True, initialize the simulator
+    #    with MaxFlow scheduling (offline mode), call "set_initial_layout" and "update_scheduler"
+    # 2. call "start" of an offline request feeder
+    # 3. call "simulate" to run the simulation with periodic re-planning (can be called multiple times, e.g.
+    #    after changing the length sampler of the feeder to shift the workload)
+    # 4. call "save_replanning_statistics"
+
+    def __init__(self, layout: LocalSearchLayout, simulator: ClusterSimulator, feeder: OfflineRequestFeeder,
+                 allow_partial_inference: bool, max_stage_size: int = 1, min_gain: float = 0.05,
+                 max_search_time: float = 5, patience: int = 2000, max_transition_time: float = 600,
+                 max_break_even_time: float or None = None, max_nodes_changed: int or None = None,
+                 seed: int = 0) -> None:
+        """
+        Online layout re-planner. Periodically, the average input / output length of the finished queries is
+        used to re-weight the throughput of each compute node, and a target layout is searched with local search
+        starting from the current layout. If the target layout is good enough, the nodes whose layers change are
+        drained and reloaded in stages, while the MaxFlow scheduler routes new queries around them.
+        Note: a target layout is reloaded only if (1) its flow gain is at least min_gain of the current flow and
+              (2) its break-even time (estimated cost / flow gain) is at most max_break_even_time. The estimated
+              cost is the flow lost while the stages are reloading, i.e. sum over stages of (current flow - flow
+              during the stage) * (drain time + load time), where the drain time is the average latency of the
+              observed queries. Since each stage waits for a full query latency, the cost of reloading many
+              nodes in many stages is usually paid back after several minutes, so max_break_even_time should be
+              set to how long the workload is expected to last. Limiting the number of nodes reloaded
+              (max_nodes_changed) bounds the cost at the price of part of the gain.
+
+        :param layout: layout whose solution is loaded into the simulator
+        :param simulator: the cluster simulator (see Usage)
+        :param feeder: the offline request feeder that feeds the simulator
+        :param allow_partial_inference: whether partial inference is allowed
+        :param max_stage_size: max number of compute nodes reloaded at the same time
+        :param min_gain: min relative flow gain of the target layout to trigger reloading
+        :param max_search_time: max local search time of each re-planning
+        :param patience: local search stops after this many moves without improvement
+        :param max_transition_time: max time of moving the cluster to a target layout (simulation aborts if
+                                    nodes can not be drained or loaded within this time)
+        :param max_break_even_time: max break-even time of a target layout to reload into it (None means the
+                                    length of an epoch, see simulate)
+        :param max_nodes_changed: max number of compute nodes reloaded by a target layout (None means no limit)
+        :param seed: random seed
+        :return: None
+        """
+        assert layout.solution_loaded, "Layout must be loaded before re-planning!"
+        assert max_stage_size >= 1, "Need to reload at least one node in each stage!"
+        assert max_transition_time > 0, "Max transition time must be positive!"
+        assert max_nodes_changed is None or max_nodes_changed >= 1, "Need to allow at least one node to change!"
+        self.layout: LocalSearchLayout = layout
+        self.simulator: ClusterSimulator = simulator
+        self.feeder: OfflineRequestFeeder = feeder
+        self.max_stage_size: int = max_stage_size
+        self.min_gain: float = min_gain
+        self.max_search_time: float = max_search_time
+        self.patience: int = patience
+        self.max_transition_time: float = max_transition_time
+        self.max_break_even_time: float or None = max_break_even_time
+        self.max_nodes_changed: int or None = max_nodes_changed
+        self.seed: int = seed
+
+        # flow network and current layout (node id -> compute node in simulator)
+        self.network: LayoutFlowNetwork = layout.get_flow_network(allow_partial_inference=allow_partial_inference)
+        self.node_uids: List[int] = [
+            simulator.name_2_compute_node[f"compute_node_{layout.node_idx_offset + node_idx}"].node_uid
+            for node_idx in layout.node_keys
+        ]
+        self.start: List[int] = [layout.ilp_nodes[node_idx].start_layer_idx for node_idx in layout.node_keys]
+        self.count: List[int] = [layout.ilp_nodes[node_idx].end_layer_idx - layout.ilp_nodes[node_idx].start_layer_idx
+                                 for node_idx in layout.node_keys]
+
+        # statistics
+        self.num_replans: int = 0
+        self.epoch_log: List[Dict[str, float]] = []
+        self.replanning_log: List[Dict[str, float]] = []
+
+    # -------------------------------------- Planning -------------------------------------- #
+
+    def observe_workload(self, since: float) -> Tuple[float, float, float, int]:
+        """
+        Get the average input / output length and latency of the queries finished after a given time.
+        Note: a node is drained when all queries routed through it finish, so the average latency of the
+              queries is used as the expected draining time
+
+        :param since: start of the observation window
+        :return: average input length, average output length, average latency, number of finished queries
+        """
+        input_lengths, output_lengths, latencies = [], [], []
+        for finish_time, query in self.simulator.query_manager.finished_queries.values():
+            if finish_time > since:
+                input_lengths.append(query.input_seq_length)
+                output_lengths.append(query.output_seq_length)
+                latencies.append(finish_time - query.creation_time)
+        num_queries: int = len(input_lengths)
+        if num_queries == 0:
+            return 0, 0, 0, 0
+        return (sum(input_lengths) / num_queries, sum(output_lengths) / num_queries, sum(latencies) / num_queries,
+                num_queries)
+
+    def set_workload(self, avg_input_len: float, avg_output_len: float) -> None:
+        """
+        Re-weight the throughput of each compute node in the flow network with a workload.
+        Note: same as in ILPLayout, the throughput is bounded by nic throughput
+
+        :param avg_input_len: average input length of the workload
+        :param avg_output_len: average output length of the workload
+        :return: None
+        """
+        model_manager = self.layout.model_manager
+        for node_id, node_idx in enumerate(self.layout.node_keys):
+            ilp_node = self.layout.ilp_nodes[node_idx]
+            machine_type = ilp_node.machine_type
+            bottleneck_nic_speed: float = min(machine_type.inbound_nic_speed, machine_type.outbound_nic_speed)
+            bottleneck_nic_throughput: float = bottleneck_nic_speed / self.layout.model_card.activation_size
+            self.network.layer_count_2_throughput[node_id] = [0.0] + [
+                min(model_manager.get_token_throughput(machine_type=machine_type.type_name,
+                                                       num_on_node_layers=layer_count, avg_input_len=avg_input_len,
+                                                       avg_output_len=avg_output_len), bottleneck_nic_throughput)
+                for layer_count in range(1, ilp_node.max_num_layers + 1)
+            ]
+
+    def get_load_time(self, node_id: int, start: int, count: int) -> float:
+        """
+        Get the time for a compute node to load a new layer window (layers already in vram are kept).
+
+        :param node_id: node id in the flow network
+        :param start: new start layer
+        :param count: new number of layers
+        :return: loading time
+        """
+        model_params: List[float] = self.layout.model_manager.get_model_params()
+        old_layers = range(self.start[node_id], self.start[node_id] + self.count[node_id])
+        loading_size: float = sum(model_params[layer_id] for layer_id in range(start, start + count)
+                                  if layer_id not in old_layers)
+        return loading_size / self.simulator.compute_nodes[self.node_uids[node_id]].disk_speed
+
+    def get_changed_nodes(self, start: List[int], count: List[int]) -> List[int]:
+        """
+        Get the compute nodes whose layer window differs from the current layout.
+
+        :param start: start layer of each compute node
+        :param count: number of layers of each compute node
+        :return: node ids of the changed compute nodes
+        """
+        return [node_id for node_id in range(self.network.num_nodes)
+                if not (start[node_id], count[node_id]) == (self.start[node_id], self.count[node_id])]
+
+    def plan_reload(self, avg_input_len: float, avg_output_len: float, drain_time: float) -> ReloadPlan:
+        """
+        Search a target layout for a workload and plan the reloads that move the cluster to it.
+
+        :param avg_input_len: average input length of the workload
+        :param avg_output_len: average output length of the workload
+        :param drain_time: expected time to drain a node
+        :return: the reload plan
+        """
+        network = self.network
+        self.set_workload(avg_input_len=avg_input_len, avg_output_len=avg_output_len)
+
+        # Step 1: search from the current layout
+        current_flow: float = network.set_layout(start=self.start, count=self.count)
+        target_flow, start, count, _ = local_search(network=network, start=self.start, count=self.count,
+                                                    seed=self.seed + self.num_replans, num_perturb_moves=0,
+                                                    max_run_time=self.max_search_time, patience=self.patience,
+                                                    flow_upper_bound=math.inf,
+                                                    max_nodes_changed=self.max_nodes_changed)
+        self.num_replans += 1
+
+        # Step 2: revert the changes that are not needed for the target flow (hill climbing also accepts moves
+        # that do not improve the flow), so that as few nodes as possible are reloaded
+        network.set_layout(start=start, count=count)
+        changed_nodes: List[int] = self.get_changed_nodes(start=start, count=count)
+        changed_nodes.sort(key=lambda _node_id: -self.get_load_time(node_id=_node_id, start=start[_node_id],
+                                                                    count=count[_node_id]))
+        for node_id in changed_nodes:
+            reverted_flow = network.move(node_ids=[node_id], starts=[self.start[node_id]],
+                                         counts=[self.count[node_id]])
+            if reverted_flow < target_flow * (1 - 1e-9):
+                network.undo()
+        start, count = list(network.start), list(network.count)
+        changed_nodes = self.get_changed_nodes(start=start, count=count)
+
+        # Step 3: group the changed nodes into stages, greedily keeping the flow during each stage high
+        # Note: a node joins a non-empty stage only if some flow is left while the stage is reloading
+        network.set_layout(start=self.start, count=self.count)
+        stages, stage_flows, stage_load_times = [], [], []
+        while len(changed_nodes) > 0:
+            stage: List[int] = []
+            while len(stage) < self.max_stage_size and len(changed_nodes) > 0:
+                best_node = max(changed_nodes, key=lambda _node_id: network.get_failure_flow(stage + [_node_id]))
+                if len(stage) > 0 and network.get_failure_flow(node_ids=stage + [best_node]) <= 0:
+                    break
+                stage.append(best_node)
+                changed_nodes.remove(best_node)
+            stages.append(stage)
+            stage_flows.append(network.get_failure_flow(node_ids=stage))
+            stage_load_times.append(max(self.get_load_time(node_id=node_id, start=start[node_id],
+                                                           count=count[node_id]) for node_id in stage))
+            network.move(node_ids=stage, starts=[start[node_id] for node_id in stage],
+                         counts=[count[node_id] for node_id in stage])
+        return ReloadPlan(avg_input_len=avg_input_len, avg_output_len=avg_output_len, current_flow=current_flow,
+                          target_flow=target_flow, start=start, count=count, stages=stages,
+                          stage_flows=stage_flows, stage_load_times=stage_load_times, drain_time=drain_time)
+
+    # -------------------------------------- Reloading ------------------------------------- #
+
+    def get_busy_node_uids(self) -> Set[int]:
+        """
+        Get the compute nodes on the route of some query on the fly. Routes are fixed in the first iteration of
+        a query, so a node is drained when it is on no such route.
+
+        :return: uids of the busy compute nodes
+        """
+        busy_node_uids: Set[int] = set()
+        for request in self.simulator.requests_on_the_fly.values():
+            busy_node_uids.update(pipeline_stage.node_uid for pipeline_stage in request.mini_pipeline)
+        for query in self.simulator.query_manager.queries_on_the_fly.values():
+            if len(query.inference_history) > 0:
+                busy_node_uids.update(pipeline_stage.node_uid for pipeline_stage in query.inference_history[0].path)
+        return busy_node_uids
+
+    def execute_reload(self, plan: ReloadPlan, poll_interval: float) -> Dict[str, float]:
+        """
+        Reload the model on the compute nodes stage by stage. For each stage:
+            1. mark the nodes as draining and update the scheduler, so that new queries are routed around them
+            2. wait until no query on the fly is routed through the nodes
+            3. reload the model on the nodes and wait until they are ready
+        The scheduler is updated again when the next stage starts and after the last stage.
+        Note: reloading resets the kv cache, so nodes are drained at query level (instead of waiting for the
+              requests in their queues with request_uids_to_wait)
+
+        :param plan: the reload plan
+        :param poll_interval: interval of checking whether nodes are drained or loaded
+        :return: time spent on draining and loading and the decode throughput during the transition
+        """
+        simulator = self.simulator
+        transition_start_time: float = simulator.current_time
+        num_queries: int = len(simulator.query_manager.queries_on_the_fly)
+        drain_time, load_time = 0.0, 0.0
+        for stage in plan.stages:
+            node_uids: List[int] = [self.node_uids[node_id] for node_id in stage]
+
+            # Step 1: drain
+            drain_start_time: float = simulator.current_time
+            simulator.draining_compute_nodes = set(node_uids)
+            simulator.update_scheduler()
+            while not self.get_busy_node_uids().isdisjoint(node_uids):
+                assert simulator.current_time - transition_start_time < self.max_transition_time, \
+                    f"Nodes {node_uids} are not drained within {self.max_transition_time}s!"
+                simulator.simulate(until=simulator.current_time + poll_interval)
+            drain_time += simulator.current_time - drain_start_time
+
+            # Step 2: reload
+            load_start_time: float = simulator.current_time
+            new_layers: Dict[int, List[int]] = {
+                node_uid: list(range(plan.start[node_id], plan.start[node_id] + plan.count[node_id]))
+                for node_id, node_uid in zip(stage, node_uids)
+            }
+            for node_uid in node_uids:
+                simulator.issue_command_load_model(load_time=simulator.current_time, node_uid=node_uid,
+                                                   new_layers=new_layers[node_uid], request_uids_to_wait=[])
+            while True:
+                assert simulator.current_time - transition_start_time < self.max_transition_time, \
+                    f"Nodes {node_uids} are not loaded within {self.max_transition_time}s!"
+                simulator.simulate(until=simulator.current_time + poll_interval)
+                compute_nodes: List[ComputeNode] = [simulator.compute_nodes[node_uid] for node_uid in node_uids]
+                if all(compute_node.model_status == ModelStatus.Ready and
+                       sorted(compute_node.in_vram_model_layers.keys()) == new_layers[compute_node.node_uid]
+                       for compute_node in compute_nodes):
+                    break
+            load_time += simulator.current_time - load_start_time
+            for node_id in stage:
+                self.start[node_id], self.count[node_id] = plan.start[node_id], plan.count[node_id]
+
+        # all nodes serve again
+        simulator.draining_compute_nodes = set()
+        simulator.update_scheduler()
+
+        # queries rejected during the transition (when kv cache of the remaining nodes is full) are not replaced
+        # by the feeder, so we top up the queries on the fly
+        for i in range(num_queries - len(simulator.query_manager.queries_on_the_fly)):
+            input_length, output_length = self.feeder.length_sampler.sample_length()
+            simulator.query_manager.issue_query(creation_time=simulator.current_time + (i + 1) * 0.1,
+                                                input_seq_length=input_length, output_seq_length=output_length)
+
+        return {"drain_time": drain_time, "load_time": load_time,
+                "transition_time": simulator.current_time - transition_start_time,
+                "transition_throughput": self.get_decode_throughput(start_time=transition_start_time,
+                                                                    end_time=simulator.current_time)}
+
+    # ------------------------------------- Simulation ------------------------------------- #
+
+    def get_decode_throughput(self, start_time: float, end_time: float) -> float:
+        """
+        Get the decode throughput of the simulator in a time window.
+
+        :param start_time: start of the window
+        :param end_time: end of the window
+        :return: decode throughput (in #tokens / second)
+        """
+        if end_time <= start_time:
+            return 0
+        total_tokens: int = 0
+        for finish_time, request in self.simulator.finished_requests.values():
+            if request.phase == RequestPhase.Increment and start_time < finish_time <= end_time:
+                total_tokens += request.token_seq_length
+        return total_tokens / (end_time - start_time)
+
+    def simulate(self, until: float, replan_interval: float, poll_interval: float = 1) -> None:
+        """
+        Run the simulation with periodic re-planning. At the end of each epoch, a target layout is planned for
+        the workload observed in the epoch, and the cluster reloads into it if the flow gain is at least min_gain
+        and the estimated reload cost is paid back within max_break_even_time (one epoch if not set).
+
+        :param until: end time of the simulation
+        :param replan_interval: length of an epoch
+        :param poll_interval: interval of checking whether nodes are drained or loaded
+        :return: None
+        """
+        simulator = self.simulator
+        max_break_even_time: float = replan_interval if self.max_break_even_time is None else \
+            self.max_break_even_time
+        print("# ------------------------------------------------------------------------------------------ #")
+        while simulator.current_time < until:
+            # Step 1: simulate one epoch
+            epoch_start_time: float = simulator.current_time
+            simulator.simulate(until=min(epoch_start_time + replan_interval, until))
+            avg_input_len, avg_output_len, avg_latency, num_queries = self.observe_workload(since=epoch_start_time)
+            self.epoch_log.append({"start_time": epoch_start_time, "end_time": simulator.current_time,
+                                   "decode_throughput": self.get_decode_throughput(
+                                       start_time=epoch_start_time, end_time=simulator.current_time),
+                                   "avg_input_len": avg_input_len, "avg_output_len": avg_output_len})
+
+            # measure the last reload against the first epoch after it: the decode tokens lost during the
+            # transition (cost) and the time for the throughput gain to pay them back
+            if len(self.replanning_log) > 0 and self.replanning_log[-1]["executed"] and \
+                    "throughput_after" not in self.replanning_log[-1]:
+                last_entry: Dict[str, float] = self.replanning_log[-1]
+                last_entry["throughput_after"] = self.epoch_log[-1]["decode_throughput"]
+                last_entry["reload_cost"] = max(0.0, last_entry["throughput_before"] -
+                                                last_entry["transition_throughput"]) * last_entry["transition_time"]
+                throughput_gain: float = last_entry["throughput_after"] - last_entry["throughput_before"]
+                last_entry["measured_break_even_time"] = last_entry["reload_cost"] / throughput_gain \
+                    if throughput_gain > 0 else math.inf
+                print(f"[Layout Replanner - Info] Decode throughput {last_entry['throughput_before']:.2f} -> "
+                      f"{last_entry['throughput_after']:.2f} after reloading (cost {last_entry['reload_cost']:.1f} "
+                      f"tokens, break even after {last_entry['measured_break_even_time']:.1f}s).")
+            if simulator.current_time >= until or num_queries == 0:
+                continue
+
+            # Step 2: plan
+            plan: ReloadPlan = self.plan_reload(avg_input_len=avg_input_len, avg_output_len=avg_output_len,
+                                                drain_time=avg_latency)
+            executed: bool = len(plan.stages) > 0 and plan.gain >= self.min_gain * plan.current_flow and \
+                plan.break_even_time <= max_break_even_time
+            entry: Dict[str, float] = {
+                "time": simulator.current_time, "avg_input_len": avg_input_len, "avg_output_len": avg_output_len,
+                "current_flow": plan.current_flow, "target_flow": plan.target_flow,
+                "num_nodes_changed": sum(len(stage) for stage in plan.stages), "num_stages": len(plan.stages),
+                "min_stage_flow": min(plan.stage_flows, default=plan.current_flow),
+                "estimated_drain_time": avg_latency, "estimated_cost": plan.estimated_cost,
+                "break_even_time": plan.break_even_time, "executed": executed
+            }
+            print(f"[Layout Replanner - Info] t={simulator.current_time:.1f}: workload ({avg_input_len:.1f}, "
+                  f"{avg_output_len:.1f}), flow {plan.current_flow:.2f} -> {plan.target_flow:.2f} by reloading "
+                  f"{entry['num_nodes_changed']} nodes in {entry['num_stages']} stages "
+                  f"(estimated cost {plan.estimated_cost:.1f} tokens), executed: {executed}.")
+
+            # Step 3: reload
+            if executed:
+                entry["throughput_before"] = self.epoch_log[-1]["decode_throughput"]
+                entry.update(self.execute_reload(plan=plan, poll_interval=poll_interval))
+                print(f"[Layout Replanner - Info] Reloaded in {entry['transition_time']:.1f}s (drain "
+                      f"{entry['drain_time']:.1f}s, load {entry['load_time']:.1f}s), decode throughput during "
+                      f"transition {entry['transition_throughput']:.2f}.")
+            self.replanning_log.append(entry)
+        print("# ------------------------------------------------------------------------------------------ #")
+
+    def save_replanning_statistics(self, save_path: str) -> None:
+        """
+        Save the statistics of each epoch and each re-planning.
+
+        :param save_path: save path of the statistics file
+        :return: None
+        """
+        with open(save_path, "w") as file:
+            for epoch_idx, entry in enumerate(self.epoch_log):
+                file.write(f"epoch_{epoch_idx} = {entry}\n")
+            for replan_idx, entry in enumerate(self.replanning_log):
+                file.write(f"replan_{replan_idx} = {entry}\n")
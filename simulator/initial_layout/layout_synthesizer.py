@@ -7,11 +7,18 @@ from datetime import datetime
 from typing import List, Dict, Tuple, Any
 
 from simulator.initial_layout.fake_cluster_generator import prune_cluster
+from simulator.initial_layout.flow_pruning import flow_preserving_prune_cluster
 from simulator.initial_layout.ilp_layout.ilp_layout import ILPLayout
+from simulator.initial_layout.ilp_layout.milp_model import MILPSolver
 from simulator.initial_layout.homogeneous_layout.homogeneous_layout import HomogeneousLayout
 from simulator.initial_layout.heterogeneous_layout.swarm_layout import SwarmLayout
 from simulator.initial_layout.heterogeneous_layout.petals_layout import PetalsLayout
+from simulator.initial_layout.heterogeneous_layout.heuristic_search import HeuristicLayoutSearch
 from simulator.initial_layout.load_existing_layout import LoadExistingLayout
+from simulator.initial_layout.local_search_layout import LocalSearchLayout
+from simulator.initial_layout.layer_fusion import get_fusion_factor, fuse_layers, fuse_layout_solution, \
+    expand_layout_solution
+from simulator.initial_layout.layout_cache import LayoutCache, LayoutCacheHit, LayoutFingerprint, get_layout_fingerprint
 from simulator.model_manager.model_manager import ModelManager, ModelName
 from simulator.event_simulator.cluster_simulator import ClusterSimulator
 from simulator.event_simulator.query_manager import QueryManagerParameters
@@ -24,11 +31,13 @@ class LayoutMethod(Enum):
     Swarm = "LayoutMethod.Heterogeneous.Swarm"
     Petals = "LayoutMethod.Heterogeneous.Petals"
     LoadExisting = "LayoutMethod.LoadExisting"
+    LocalSearch = "LayoutMethod.LocalSearch"
 
 
 class LayoutSynthesizer:
     def __init__(self, complete_cluster_file_name: str, machine_profile_name: str, model_name: ModelName,
-                 workspace_path: str, layout_method: LayoutMethod, machine_num_dict: Dict[str, int]) -> None:
+                 workspace_path: str, layout_method: LayoutMethod, machine_num_dict: Dict[str, int],
+                 profile_dir: str or None = None) -> None:
         """
         Synthesize initial model layout for the cluster.
 
@@ -38,6 +47,7 @@ class LayoutSynthesizer:
         :param workspace_path: path to the workspace (all the files will be saved in this directory)
         :param layout_method: layout method
         :param machine_num_dict: {machine_name -> num of machine}
+        :param profile_dir: (optional) load model statistics from this profile directory
         :return: None
         """
         # paths
@@ -47,7 +57,8 @@ class LayoutSynthesizer:
 
         # model name and statistics
         self.model_name: ModelName = model_name
-        self.model_manager: ModelManager = ModelManager(model_name=model_name, machine_num_dict=machine_num_dict)
+        self.model_manager: ModelManager = ModelManager(model_name=model_name, machine_num_dict=machine_num_dict,
+                                                        profile_dir=profile_dir)
 
         # layout method
         self.layout_method: LayoutMethod = layout_method
@@ -61,6 +72,8 @@ class LayoutSynthesizer:
             self.layout_synthesizer = PetalsLayout(model_manager=self.model_manager)
         elif self.layout_method == LayoutMethod.LoadExisting:
             self.layout_synthesizer = LoadExistingLayout(model_manager=self.model_manager)
+        elif self.layout_method == LayoutMethod.LocalSearch:
+            self.layout_synthesizer = LocalSearchLayout(model_manager=self.model_manager)
         else:
             assert False, "Unknown layout method!"
 
@@ -80,6 +93,12 @@ class LayoutSynthesizer:
             "max_keep": int, keep at most first max_keep links for each node during pruning
             "keep_bandwidth_threshold": float, for links between [min_keep, max_keep), only those faster than
                                         the threshold will be kept.
+            "max_flow_loss": [Optional] float, if provided, use flow-preserving pruning instead (see
+                             flow_pruning.py), which removes links as long as the flow upper bound drops by at
+                             most this fraction (min_keep is still kept for each node, max_keep and
+                             keep_bandwidth_threshold are ignored)
+            "network_headroom": [Optional] float, network flow preserved by flow-preserving pruning, relative
+                                to compute bound (1 if not provided)
 
             # ILP related
             "use_existing_sol": bool, whether to use existing solution
@@ -89,12 +108,33 @@ class LayoutSynthesizer:
             "early_stop_time": float, early stop time (only useful when use_existing_sol = False)
             "early_stop_threshold": float, a value between 0 and 1 (only useful when use_existing_sol = False)
             "existing_sol_path": str, path to existing ILP solution (only useful when use_existing_sol = True)
+            "solver": [Optional] MILPSolver, MILPSolver.Gurobi (default) or MILPSolver.HiGHS (open-source, no
+                      license needed, early_stop_time is not supported)
 
             # heuristic solution to start from
             "start_from_heuristic": bool, whether to start from a heuristic solution (only useful when
                                     use_existing_sol = False)
             "heuristic_sol_path": str, path to heuristic solution (only useful when start_from_heuristic = True)
 
+            # layout cache (see layout_cache.py)
+            "layout_cache_dir": [Optional] str, if provided, look up the (pruned) cluster in this layout cache
+                                before solving (only useful when use_existing_sol = False). An exact hit with an
+                                ILP solution is loaded directly, otherwise the cached layout (exact or nearest)
+                                replaces the heuristic solution. The solution found is stored into the cache.
+            "layout_cache_max_distance": [Optional] float, max topology distance of the nearest cached layout
+                                         (1 if not provided)
+
+            # layer fusion (see layer_fusion.py)
+            "max_num_super_layers": [Optional] int, if provided, fuse consecutive layers into super-layers so that
+                                    there are at most this many (if possible), solve the ILP over super-layers and
+                                    then refine the layout at full granularity with local search (only useful when
+                                    use_existing_sol = False)
+            "refine_max_run_time": [Optional] float, max search time of refinement (60 if not provided)
+            "refine_num_restarts": [Optional] int, number of local search restarts in refinement, which run in
+                                   parallel (1 if not provided)
+            "refine_num_workers": [Optional] int, number of worker processes of refinement (min(refine_num_restarts,
+                                  #cpus) if not provided)
+
         When layout_method == LayoutMethod.Homogeneous:
             "seed": int, seed for random number generator
 
@@ -102,15 +142,42 @@ class LayoutSynthesizer:
             "seed": int, seed for random number generator
             "num_stages": int, should be able to divide total number of layers
             "max_out_links_per_node": int, how many nodes a node can connect to in the next stage
+            "search_num_stages": [Optional] List[int], if provided, try each number of stages in parallel and use
+                                 the one whose layout has the largest max flow (num_stages is ignored, see
+                                 heuristic_search.py)
+            "num_workers": [Optional] int, number of worker processes of the search (1 if not provided)
+            "top_k": [Optional] int, number of best candidates saved in the search statistics (5 if not provided)
 
         When layout_method == LayoutMethod.Heterogeneous.Petals:
             "seed": int, random seed
             "max_out_links_per_node": int, how many nodes a node can connect to in the next stage
+            "search_seeds": [Optional] List[int], if provided, try each seed in parallel and use the one whose
+                            layout has the largest max flow (seed is ignored, see heuristic_search.py)
+            "num_workers": [Optional] int, number of worker processes of the search (1 if not provided)
+            "top_k": [Optional] int, number of best candidates saved in the search statistics (5 if not provided)
 
         When layout_method == LayoutMethod.LoadExisting:
             "solution_file_name": str, name of solution file
             "simulator_cluster_file_name": str, name of simulator cluster file
 
+        When layout_method == LayoutMethod.LocalSearch:
+            "seed": int, random seed
+            "heuristic_sol_path": [Optional] str, path to the heuristic solution to start from (any *_sol.ini, if
+                                  not provided, we start from a Petals layout synthesized with seed)
+            "allow_partial_inference": bool, whether partial inference is allowed
+            "num_restarts": int, number of local search restarts
+            "num_workers": int, number of worker processes that run the restarts in parallel
+            "max_run_time": float, max search time of each restart
+            "patience": [Optional] int, a restart stops after this many moves without improvement (20000 if not
+                        provided)
+            "num_perturb_moves": [Optional] int, number of random moves applied to the heuristic solution at the
+                                 beginning of each restart except the first (5 if not provided)
+            "layout_cache_dir": [Optional] str, if provided, an exact hit in this layout cache is loaded without
+                                searching, and the nearest cached layout replaces the heuristic solution. The
+                                layout found is stored into the cache.
+            "layout_cache_max_distance": [Optional] float, max topology distance of the nearest cached layout
+                                         (1 if not provided)
+
         :param args: a dict of arguments, see above for more info
         :return: simulator_cluster_file_path
         """
@@ -135,13 +202,22 @@ class LayoutSynthesizer:
             enable_pruning: bool = args["enable_pruning"]
             if enable_pruning:
                 min_keep: int = args["min_keep"]
-                max_keep: int = args["max_keep"]
-                keep_bandwidth_threshold: float = args["keep_bandwidth_threshold"]
-                prune_cluster(
-                    complete_cluster_file_name=self.complete_cluster_file_name,
-                    pruned_cluster_file_name=os.path.join(self.workspace_path, "pruned_cluster.ini"),
-                    min_keep=min_keep, max_keep=max_keep, keep_bandwidth_threshold=keep_bandwidth_threshold
-                )
+                if args.get("max_flow_loss", None) is not None:
+                    flow_preserving_prune_cluster(
+                        complete_cluster_file_name=self.complete_cluster_file_name,
+                        pruned_cluster_file_name=os.path.join(self.workspace_path, "pruned_cluster.ini"),
+                        machine_profile_name=self.machine_profile_name, model_manager=self.model_manager,
+                        max_flow_loss=args["max_flow_loss"], min_keep=min_keep,
+                        network_headroom=args.get("network_headroom", 1)
+                    )
+                else:
+                    max_keep: int = args["max_keep"]
+                    keep_bandwidth_threshold: float = args["keep_bandwidth_threshold"]
+                    prune_cluster(
+                        complete_cluster_file_name=self.complete_cluster_file_name,
+                        pruned_cluster_file_name=os.path.join(self.workspace_path, "pruned_cluster.ini"),
+                        min_keep=min_keep, max_keep=max_keep, keep_bandwidth_threshold=keep_bandwidth_threshold
+                    )
                 processed_cluster_file_name = os.path.join(self.workspace_path, "pruned_cluster.ini")
             else:
                 processed_cluster_file_name = self.complete_cluster_file_name
@@ -156,18 +232,53 @@ class LayoutSynthesizer:
             start_from_heuristic: bool = args["start_from_heuristic"]
             heuristic_sol_path: str = args["heuristic_sol_path"]
 
-            # find a solution with ILP (or load saved solution)
+            # look up the layout cache
+            # an exact hit with ILP solution is loaded, other hits replace the heuristic solution
             use_existing_sol: bool = args["use_existing_sol"]
+            existing_sol_path: str = args["existing_sol_path"]
             allow_partial_inference: bool = args["allow_partial_inference"]
             remove_redundant: bool = args["remove_redundant"]
+            layout_cache, fingerprint = self.get_layout_cache(args=args, cluster_file_name=processed_cluster_file_name)
+            if layout_cache is not None and not use_existing_sol:
+                cache_hit: LayoutCacheHit or None = self.lookup_layout_cache(layout_cache=layout_cache,
+                                                                             fingerprint=fingerprint, args=args)
+                if cache_hit is not None and cache_hit.get_file(file_name="ilp_solution.sol") is not None:
+                    use_existing_sol = True
+                    existing_sol_path = cache_hit.get_file(file_name="ilp_solution.sol")
+                elif cache_hit is not None:
+                    start_from_heuristic = True
+                    heuristic_sol_path = os.path.join(self.workspace_path, "cached_sol.ini")
+                    cache_hit.save_solution(save_path=heuristic_sol_path)
+
+            # find a solution with ILP (or load saved solution)
+            fusion_factor: int = 1
             if use_existing_sol:
                 self.layout_synthesizer.load_and_verify_solution(
-                    save_sol_path=args["existing_sol_path"], allow_partial_inference=allow_partial_inference
+                    save_sol_path=existing_sol_path, allow_partial_inference=allow_partial_inference
                 )
             else:
                 max_run_time: float = args["max_run_time"]
                 early_stop_time: float = args["early_stop_time"]
                 early_stop_threshold: float = args["early_stop_threshold"]
+
+                # fuse consecutive layers into super-layers to shrink the ILP (see layer_fusion.py)
+                if args.get("max_num_super_layers", None) is not None:
+                    fusion_factor = get_fusion_factor(
+                        num_layers=self.layout_synthesizer.model_card.num_layers,
+                        max_num_layers=[node.max_num_layers for node in self.layout_synthesizer.ilp_nodes.values()],
+                        max_num_super_layers=args["max_num_super_layers"]
+                    )
+                if fusion_factor > 1:
+                    capacity_loss: float = fuse_layers(ilp_layout=self.layout_synthesizer, fusion_factor=fusion_factor)
+                    print(f"[Layout Synthesizer - Info] Fused every {fusion_factor} layers into a super-layer "
+                          f"({self.layout_synthesizer.model_card.num_layers} super-layers, "
+                          f"{round(capacity_loss * 100, 2)}% layer capacity lost before refinement).")
+                    if start_from_heuristic:
+                        fused_heuristic_sol_path = os.path.join(self.workspace_path, "fused_heuristic_sol.ini")
+                        fuse_layout_solution(solution_file_name=heuristic_sol_path,
+                                             fused_solution_file_name=fused_heuristic_sol_path,
+                                             fused_layout=self.layout_synthesizer, fusion_factor=fusion_factor)
+                        heuristic_sol_path = fused_heuristic_sol_path
                 self.layout_synthesizer.build_model(
                     seed=seed,
                     model_name=trail_name,
@@ -181,13 +292,42 @@ class LayoutSynthesizer:
                     early_stop_time=early_stop_time,
                     early_stop_threshold=early_stop_threshold,
                     save_sol_path=os.path.join(self.workspace_path, "ilp_solution.sol"),
-                    save_model_path=os.path.join(self.workspace_path, "ilp_model.lp")
+                    save_model_path=os.path.join(self.workspace_path, "ilp_model.lp"),
+                    solver=args.get("solver", MILPSolver.Gurobi)
                 )
                 self.layout_synthesizer.load_and_verify_solution(
                     save_sol_path=os.path.join(self.workspace_path, "ilp_solution.sol"),
                     allow_partial_inference=allow_partial_inference
                 )
 
+                # refine the fused solution at full granularity with local search
+                if fusion_factor > 1:
+                    fused_sol_path = os.path.join(self.workspace_path, "fused_ilp_sol.ini")
+                    expand_layout_solution(fused_layout=self.layout_synthesizer, fusion_factor=fusion_factor,
+                                           save_path=fused_sol_path)
+                    refine_num_restarts: int = args.get("refine_num_restarts", 1)
+                    refine_num_workers: int = args.get("refine_num_workers",
+                                                       min(refine_num_restarts, os.cpu_count() or 1))
+                    refined_layout = LocalSearchLayout(model_manager=self.model_manager)
+                    refined_layout.from_ini(
+                        cluster_file_name=processed_cluster_file_name,
+                        machine_profile_name=self.machine_profile_name
+                    )
+                    refined_layout.search_layout(
+                        heuristic_sol_path=fused_sol_path,
+                        allow_partial_inference=allow_partial_inference,
+                        seed=seed,
+                        num_restarts=refine_num_restarts,
+                        num_workers=refine_num_workers,
+                        max_run_time=args.get("refine_max_run_time", 60),
+                        patience=20000,
+                        num_perturb_moves=5
+                    )
+                    refined_layout.save_search_statistics(
+                        save_path=os.path.join(self.workspace_path, "refine_statistics.ini")
+                    )
+                    self.layout_synthesizer = refined_layout
+
             # generate simulator cluster input
             self.layout_synthesizer.generate_simulator_cluster(
                 cluster_file_path=os.path.join(self.workspace_path, "simulator_cluster.ini"),
@@ -197,6 +337,19 @@ class LayoutSynthesizer:
                 save_path=os.path.join(self.workspace_path, "ilp_sol.ini")
             )
 
+            # store the solution into the layout cache
+            # Note: the ILP solution of a fused model is not stored, since it can not be loaded at full granularity
+            if layout_cache is not None:
+                extra_files: Dict[str, str] = {}
+                if fusion_factor == 1:
+                    extra_files["ilp_solution.sol"] = existing_sol_path if use_existing_sol else \
+                        os.path.join(self.workspace_path, "ilp_solution.sol")
+                layout_cache.store(
+                    fingerprint=fingerprint, solution_file_name=os.path.join(self.workspace_path, "ilp_sol.ini"),
+                    method=self.layout_method.value, flow=self.layout_synthesizer.get_ilp_max_flow(),
+                    extra_files=extra_files
+                )
+
         elif self.layout_method == LayoutMethod.Homogeneous:
             self.layout_synthesizer: HomogeneousLayout
             self.layout_synthesizer.from_ini(
@@ -217,7 +370,11 @@ class LayoutSynthesizer:
                 cluster_file_name=self.complete_cluster_file_name,
                 machine_profile_name=self.machine_profile_name
             )
-            self.layout_synthesizer.synthesize(num_stages=args["num_stages"])
+            num_stages: int = args["num_stages"]
+            if args.get("search_num_stages", None) is not None:
+                num_stages = self.search_heuristic_layout(method="Swarm", params=args["search_num_stages"],
+                                                          allow_partial_inference=False, args=args)
+            self.layout_synthesizer.synthesize(num_stages=num_stages)
             self.layout_synthesizer.generate_simulator_cluster(
                 cluster_file_path=os.path.join(self.workspace_path, "simulator_cluster.ini"),
                 max_out_links_per_node=args["max_out_links_per_node"],
@@ -233,7 +390,11 @@ class LayoutSynthesizer:
                 cluster_file_name=self.complete_cluster_file_name,
                 machine_profile_name=self.machine_profile_name
             )
-            self.layout_synthesizer.synthesize(seed=args["seed"])
+            seed: int = args["seed"]
+            if args.get("search_seeds", None) is not None:
+                seed = self.search_heuristic_layout(method="Petals", params=args["search_seeds"],
+                                                    allow_partial_inference=True, args=args)
+            self.layout_synthesizer.synthesize(seed=seed)
             self.layout_synthesizer.generate_simulator_cluster(
                 cluster_file_path=os.path.join(self.workspace_path, "simulator_cluster.ini"),
                 max_out_links_per_node=args["max_out_links_per_node"]
@@ -253,12 +414,136 @@ class LayoutSynthesizer:
             )
             return args["simulator_cluster_file_name"]
 
+        elif self.layout_method == LayoutMethod.LocalSearch:
+            self.layout_synthesizer: LocalSearchLayout
+
+            # look up the layout cache
+            allow_partial_inference: bool = args["allow_partial_inference"]
+            heuristic_sol_path: str or None = args.get("heuristic_sol_path", None)
+            layout_cache, fingerprint = self.get_layout_cache(args=args,
+                                                              cluster_file_name=self.complete_cluster_file_name)
+            cache_hit: LayoutCacheHit or None = None
+            if layout_cache is not None:
+                cache_hit = self.lookup_layout_cache(layout_cache=layout_cache, fingerprint=fingerprint, args=args)
+                if cache_hit is not None:
+                    heuristic_sol_path = os.path.join(self.workspace_path, "cached_sol.ini")
+                    cache_hit.save_solution(save_path=heuristic_sol_path)
+
+            # get the heuristic solution to start from
+            if heuristic_sol_path is None:
+                petals_layout = PetalsLayout(model_manager=self.model_manager)
+                petals_layout.from_ini(
+                    cluster_file_name=self.complete_cluster_file_name,
+                    machine_profile_name=self.machine_profile_name
+                )
+                petals_layout.synthesize(seed=args["seed"])
+                heuristic_sol_path = os.path.join(self.workspace_path, "petals_sol.ini")
+                petals_layout.save_layout_solution(save_path=heuristic_sol_path)
+
+            # search for the layout (or load the exact hit in layout cache)
+            self.layout_synthesizer.from_ini(
+                cluster_file_name=self.complete_cluster_file_name,
+                machine_profile_name=self.machine_profile_name
+            )
+            if cache_hit is not None and cache_hit.exact:
+                self.layout_synthesizer.load_solution(solution_file_name=heuristic_sol_path,
+                                                      allow_partial_inference=allow_partial_inference)
+            else:
+                self.layout_synthesizer.search_layout(
+                    heuristic_sol_path=heuristic_sol_path,
+                    allow_partial_inference=allow_partial_inference,
+                    seed=args["seed"],
+                    num_restarts=args["num_restarts"],
+                    num_workers=args["num_workers"],
+                    max_run_time=args["max_run_time"],
+                    patience=args.get("patience", 20000),
+                    num_perturb_moves=args.get("num_perturb_moves", 5)
+                )
+            self.layout_synthesizer.generate_simulator_cluster(
+                cluster_file_path=os.path.join(self.workspace_path, "simulator_cluster.ini"),
+                allow_partial_inference=allow_partial_inference
+            )
+            self.layout_synthesizer.save_layout_solution(
+                save_path=os.path.join(self.workspace_path, "local_search_sol.ini")
+            )
+            self.layout_synthesizer.save_search_statistics(
+                save_path=os.path.join(self.workspace_path, "local_search_statistics.ini")
+            )
+
+            # store the layout into the layout cache
+            if layout_cache is not None:
+                layout_cache.store(
+                    fingerprint=fingerprint,
+                    solution_file_name=os.path.join(self.workspace_path, "local_search_sol.ini"),
+                    method=self.layout_method.value, flow=self.layout_synthesizer.best_flow
+                )
+
         else:
             assert False, f"Found unknown layout method: {self.layout_method}!"
 
         # return the paths to the simulator cluster file and statistics file
         return os.path.join(self.workspace_path, "simulator_cluster.ini")
 
+    def search_heuristic_layout(self, method: str, params: List[int], allow_partial_inference: bool,
+                                args: Dict[str, Any]) -> int:
+        """
+        Try many seeds (Petals) or numbers of stages (Swarm) in parallel and return the best one. The top-k and
+        quality distribution are saved to heuristic_search_statistics.ini.
+
+        :param method: "Petals" or "Swarm"
+        :param params: seeds or numbers of stages to try
+        :param allow_partial_inference: whether partial inference is allowed when computing max flow
+        :param args: arguments of synthesize
+        :return: seed or number of stages of the best candidate
+        """
+        heuristic_search = HeuristicLayoutSearch(model_manager=self.model_manager)
+        heuristic_search.from_ini(cluster_file_name=self.complete_cluster_file_name,
+                                  machine_profile_name=self.machine_profile_name)
+        heuristic_search.search(method=method, params=params, allow_partial_inference=allow_partial_inference,
+                                num_workers=args.get("num_workers", 1), top_k=args.get("top_k", 5))
+        heuristic_search.save_search_statistics(
+            save_path=os.path.join(self.workspace_path, "heuristic_search_statistics.ini")
+        )
+        return heuristic_search.best_param
+
+    def get_layout_cache(self, args: Dict[str, Any],
+                         cluster_file_name: str) -> Tuple[LayoutCache or None, LayoutFingerprint or None]:
+        """
+        Get the layout cache and the fingerprint of the layout problem (if "layout_cache_dir" is in args).
+
+        :param args: arguments of synthesize
+        :param cluster_file_name: the cluster file the layout is synthesized for
+        :return: layout cache and fingerprint (None, None if layout cache is not used)
+        """
+        if args.get("layout_cache_dir", None) is None:
+            return None, None
+        layout_cache = LayoutCache(cache_dir=args["layout_cache_dir"])
+        fingerprint = get_layout_fingerprint(
+            cluster_file_name=cluster_file_name, machine_profile_name=self.machine_profile_name,
+            model_manager=self.model_manager, settings={"allow_partial_inference": args["allow_partial_inference"]}
+        )
+        return layout_cache, fingerprint
+
+    def lookup_layout_cache(self, layout_cache: LayoutCache, fingerprint: LayoutFingerprint,
+                            args: Dict[str, Any]) -> LayoutCacheHit or None:
+        """
+        Look up the layout cache and print the result.
+
+        :param layout_cache: layout cache
+        :param fingerprint: fingerprint of the layout problem
+        :param args: arguments of synthesize
+        :return: cache hit (None if not found)
+        """
+        cache_hit = layout_cache.lookup(fingerprint=fingerprint,
+                                        max_distance=args.get("layout_cache_max_distance", 1.0))
+        if cache_hit is None:
+            print(f"[Layout Synthesizer - Info] Layout cache miss ({fingerprint.key[:12]}).")
+        else:
+            print(f"[Layout Synthesizer - Info] Layout cache {'exact' if cache_hit.exact else 'nearest'} hit "
+                  f"({fingerprint.key[:12]}): {cache_hit.method} layout with flow {cache_hit.flow} "
+                  f"(distance {cache_hit.distance:.4f}).")
+        return cache_hit
+
     def set_layout(self, simulator: ClusterSimulator) -> float:
         """
         Set the initial layout for the simulator.
@@ -286,6 +571,10 @@ class LayoutSynthesizer:
             self.layout_synthesizer: LoadExistingLayout
             return self.layout_synthesizer.set_initial_layout(simulator=simulator)
 
+        elif self.layout_method == LayoutMethod.LocalSearch:
+            self.layout_synthesizer: LocalSearchLayout
+            return self.layout_synthesizer.set_initial_layout(simulator=simulator)
+
         else:
             assert False, f"Found unknown layout method: {self.layout_method}!"
 
@@ -0,0 +1,596 @@
+# 2026.10.19 Yixuan Mei
+
+import time
+import random
+
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from simulator.model_manager.model_manager import ModelManager
+from simulator.initial_layout.ilp_layout.ilp_layout import ILPLayout, ILPLink
+from simulator.initial_layout.incremental_maxflow import IncrementalMaxFlow
+from simulator.initial_layout.layout_cache import load_solution_layers
+
+
+class LayoutFlowNetwork:
+    def __init__(self, num_layers: int, max_num_layers: List[int], layer_count_2_throughput: List[List[float]],
+                 edge_from: List[int], edge_to: List[int], edge_throughput: List[float],
+                 allow_partial_inference: bool) -> None:
+        """
+        Max flow of a model layout, which is updated incrementally when the layer windows of some nodes change.
+        Note: 1. node id 0, ..., n - 1 are compute nodes, n is source and n + 1 is sink (same as ILPLayout)
+              2. compute node i is split into vertex 2i (in) and 2i + 1 (out), the arc between them has the
+                 inference throughput of node i as capacity
+              3. each directed edge has its link throughput as capacity if it is valid under the current
+                 layout (same rules as ILPLayout.check_link_validity) and zero capacity otherwise
+
+        :param num_layers: number of layers in the model
+        :param max_num_layers: max number of layers each compute node can hold
+        :param layer_count_2_throughput: throughput of each compute node when holding k layers (index k)
+        :param edge_from: from node id of each directed edge
+        :param edge_to: to node id of each directed edge
+        :param edge_throughput: throughput of each directed edge
+        :param allow_partial_inference: whether partial inference is allowed
+        :return: None
+        """
+        self.num_layers: int = num_layers
+        self.num_nodes: int = len(max_num_layers)
+        self.max_num_layers: List[int] = max_num_layers
+        self.layer_count_2_throughput: List[List[float]] = layer_count_2_throughput
+        self.edge_from: List[int] = edge_from
+        self.edge_to: List[int] = edge_to
+        self.edge_throughput: List[float] = edge_throughput
+        self.allow_partial_inference: bool = allow_partial_inference
+
+        # layout: compute node i holds layers [start[i], start[i] + count[i])
+        # inactive nodes (e.g. nodes that serve another model) hold no layer (start = count = 0) and are not
+        # changed by propose_move
+        self.start: List[int] = [0 for _ in range(self.num_nodes)]
+        self.count: List[int] = [1 for _ in range(self.num_nodes)]
+        self.active_nodes: List[int] = list(range(self.num_nodes))
+
+        # flow network
+        num_nodes = self.num_nodes
+        self.source_vertex: int = 2 * num_nodes
+        self.sink_vertex: int = 2 * num_nodes + 1
+        self.max_flow: IncrementalMaxFlow = IncrementalMaxFlow(num_vertices=2 * num_nodes + 2)
+        self.node_arc: List[int] = [self.max_flow.add_arc(from_vertex=2 * node_id, to_vertex=2 * node_id + 1,
+                                                          capacity=0.0) for node_id in range(num_nodes)]
+        self.edge_arc: List[int] = []
+        self.node_edges: List[List[int]] = [[] for _ in range(num_nodes)]
+        for edge, (_from, _to) in enumerate(zip(edge_from, edge_to)):
+            from_vertex = self.source_vertex if _from == num_nodes else 2 * _from + 1
+            to_vertex = self.sink_vertex if _to == num_nodes + 1 else 2 * _to
+            self.edge_arc.append(self.max_flow.add_arc(from_vertex=from_vertex, to_vertex=to_vertex, capacity=0.0))
+            if _from < num_nodes:
+                self.node_edges[_from].append(edge)
+            if _to < num_nodes:
+                self.node_edges[_to].append(edge)
+        self.flow_value: float = 0
+
+        # undo information of the last move
+        self.undo_flow: List[float] = []
+        self.undo_capacity: List[Tuple[int, float]] = []
+        self.undo_layout: List[Tuple[int, int, int]] = []
+        self.undo_flow_value: float = 0
+
+    def set_active_nodes(self, node_ids: List[int]) -> None:
+        """
+        Set the compute nodes that can be changed by propose_move. The other nodes must hold no layer.
+
+        :param node_ids: ids of the active compute nodes
+        :return: None
+        """
+        assert len(node_ids) > 0, "Need at least one active node!"
+        self.active_nodes = sorted(node_ids)
+
+    def is_edge_valid(self, edge: int) -> bool:
+        """
+        Check whether a directed edge is valid under the current layout.
+
+        :param edge: index of the edge
+        :return: whether the edge is valid
+        """
+        _from, _to = self.edge_from[edge], self.edge_to[edge]
+        if _from == self.num_nodes:
+            return self.start[_to] == 0
+        elif _to == self.num_nodes + 1:
+            return self.start[_from] + self.count[_from] == self.num_layers
+        else:
+            s_j, e_i, e_j = self.start[_to], self.start[_from] + self.count[_from], self.start[_to] + self.count[_to]
+            if self.allow_partial_inference:
+                return s_j <= e_i < e_j
+            else:
+                return e_i == s_j
+
+    def set_layout(self, start: List[int], count: List[int]) -> float:
+        """
+        Set the layout and compute its max flow from scratch.
+
+        :param start: start layer of each compute node
+        :param count: number of layers held by each compute node
+        :return: max flow
+        """
+        self.start, self.count = list(start), list(count)
+        max_flow = self.max_flow
+        for arc in range(len(max_flow.arc_flow)):
+            max_flow.arc_flow[arc] = 0.0
+        for node_id, arc in enumerate(self.node_arc):
+            max_flow.arc_capacity[arc] = self.layer_count_2_throughput[node_id][self.count[node_id]]
+        for edge, arc in enumerate(self.edge_arc):
+            max_flow.arc_capacity[arc] = self.edge_throughput[edge] if self.is_edge_valid(edge=edge) else 0.0
+        self.flow_value = max_flow.augment(source=self.source_vertex, sink=self.sink_vertex)
+        return self.flow_value
+
+    def move(self, node_ids: List[int], starts: List[int], counts: List[int]) -> float:
+        """
+        Change the layer windows of some compute nodes and update the max flow incrementally. The move can be
+        reverted with undo.
+
+        :param node_ids: compute nodes to change
+        :param starts: new start layer of each compute node
+        :param counts: new number of layers of each compute node
+        :return: max flow after the move
+        """
+        max_flow = self.max_flow
+
+        # Step 1: save undo information and change the layout
+        self.undo_flow = list(max_flow.arc_flow)
+        self.undo_flow_value = self.flow_value
+        self.undo_layout = [(node_id, self.start[node_id], self.count[node_id]) for node_id in node_ids]
+        for node_id, start, count in zip(node_ids, starts, counts):
+            self.start[node_id], self.count[node_id] = start, count
+
+        # Step 2: find the arcs whose capacity changes
+        changed_arcs, changed_capacities = [], []
+        for node_id in node_ids:
+            arc = self.node_arc[node_id]
+            capacity = self.layer_count_2_throughput[node_id][self.count[node_id]]
+            if not max_flow.arc_capacity[arc] == capacity:
+                changed_arcs.append(arc)
+                changed_capacities.append(capacity)
+        for edge in set(edge for node_id in node_ids for edge in self.node_edges[node_id]):
+            arc = self.edge_arc[edge]
+            capacity = self.edge_throughput[edge] if self.is_edge_valid(edge=edge) else 0.0
+            if not max_flow.arc_capacity[arc] == capacity:
+                changed_arcs.append(arc)
+                changed_capacities.append(capacity)
+        self.undo_capacity = [(arc, max_flow.arc_capacity[arc]) for arc in changed_arcs]
+
+        # Step 3: repair the flow and augment it to a max flow
+        max_flow.set_capacities(arcs=changed_arcs, capacities=changed_capacities, source=self.source_vertex,
+                                sink=self.sink_vertex)
+        max_flow.augment(source=self.source_vertex, sink=self.sink_vertex)
+        self.flow_value = max_flow.flow_value(source=self.source_vertex)
+        return self.flow_value
+
+    def undo(self) -> None:
+        """
+        Revert the last move.
+
+        :return: None
+        """
+        self.max_flow.arc_flow = self.undo_flow
+        for arc, capacity in self.undo_capacity:
+            self.max_flow.arc_capacity[arc] = capacity
+        for node_id, start, count in self.undo_layout:
+            self.start[node_id], self.count[node_id] = start, count
+        self.flow_value = self.undo_flow_value
+        self.undo_flow, self.undo_capacity, self.undo_layout = [], [], []
+
+    def get_failure_flow(self, node_ids: List[int]) -> float:
+        """
+        Get the max flow after some compute nodes fail (i.e. hold no layer). The layout, the max flow and the
+        undo information of the last move are not changed.
+
+        :param node_ids: compute nodes that fail
+        :return: max flow after the failure
+        """
+        saved_undo = (self.undo_flow, self.undo_capacity, self.undo_layout, self.undo_flow_value)
+        failure_flow = self.move(node_ids=node_ids, starts=[self.start[node_id] for node_id in node_ids],
+                                 counts=[0 for _ in node_ids])
+        self.undo()
+        self.undo_flow, self.undo_capacity, self.undo_layout, self.undo_flow_value = saved_undo
+        return failure_flow
+
+    def get_worst_case_flow(self, num_failures: int,
+                            stop_below: float = -1) -> Tuple[float, List[int], int, float]:
+        """
+        Get the min (and mean) max flow over all failures of num_failures compute nodes that hold layers.
+        Note: 1. failures where no failed node carries flow are not computed, as the current max flow is still
+                 feasible after them
+              2. the number of failures checked is C(#nodes, num_failures), so num_failures should be small
+              3. the search stops early once the worst case is below stop_below (the returned flows are then
+                 not exact)
+
+        :param num_failures: number of compute nodes that fail at the same time
+        :param stop_below: stop once the worst case is below this flow
+        :return: worst-case max flow, compute nodes whose failure leads to it, number of failures that lead to
+                 it, mean max flow over the failures
+        """
+        node_flow: List[float] = [self.max_flow.arc_flow[self.node_arc[node_id]] for node_id in range(self.num_nodes)]
+        loaded_nodes: List[int] = [node_id for node_id in range(self.num_nodes) if self.count[node_id] > 0]
+        worst_flow, worst_nodes, num_worst = self.flow_value, [], 0
+        total_flow, num_checked = 0.0, 0
+        for failed_nodes in combinations(loaded_nodes, min(num_failures, len(loaded_nodes))):
+            num_checked += 1
+            if all(node_flow[node_id] <= 1e-9 for node_id in failed_nodes):
+                failure_flow = self.flow_value
+            else:
+                failure_flow = self.get_failure_flow(node_ids=list(failed_nodes))
+            total_flow += failure_flow
+            if failure_flow < worst_flow - 1e-9:
+                worst_flow, worst_nodes, num_worst = failure_flow, list(failed_nodes), 1
+                if worst_flow < stop_below:
+                    break
+            elif failure_flow <= worst_flow + 1e-9:
+                num_worst += 1
+        return worst_flow, worst_nodes, num_worst, total_flow / max(num_checked, 1)
+
+    def get_edge_flow(self, edge: int) -> float:
+        """
+        Get the flow over a directed edge.
+
+        :param edge: index of the edge
+        :return: flow over the edge
+        """
+        return max(self.max_flow.arc_flow[self.edge_arc[edge]], 0.0)
+
+    def is_node_saturated(self, node_id: int, eps: float = 1e-6) -> bool:
+        """
+        Check whether the inference throughput of a compute node is fully used by the max flow.
+
+        :param node_id: id of the compute node
+        :param eps: tolerance
+        :return: whether the node is saturated
+        """
+        arc = self.node_arc[node_id]
+        return self.max_flow.arc_flow[arc] >= self.max_flow.arc_capacity[arc] - eps
+
+    def get_residual_reachable(self, from_source: bool, eps: float = 1e-9) -> List[bool]:
+        """
+        Find the vertices reachable from source (or the vertices that can reach sink) in the residual graph.
+
+        :param from_source: search from source if True, otherwise search backwards from sink
+        :param eps: residual capacity smaller than eps is treated as zero
+        :return: whether each vertex is reachable
+        """
+        arc_head, arc_capacity, arc_flow = self.max_flow.arc_head, self.max_flow.arc_capacity, self.max_flow.arc_flow
+        reachable: List[bool] = [False] * self.max_flow.num_vertices
+        queue: List[int] = [self.source_vertex if from_source else self.sink_vertex]
+        reachable[queue[0]] = True
+        for vertex in queue:
+            for arc in self.max_flow.adjacency[vertex]:
+                # backwards: arc ^ 1 goes from the head of arc to vertex
+                residual_arc = arc if from_source else arc ^ 1
+                head = arc_head[arc]
+                if not reachable[head] and arc_capacity[residual_arc] - arc_flow[residual_arc] > eps:
+                    reachable[head] = True
+                    queue.append(head)
+        return reachable
+
+    def propose_move(self, rng: random.Random) -> Tuple[List[int], List[int], List[int]] or None:
+        """
+        Propose a random local move: shift, grow or shrink the layer window of a node, align it with the layer
+        boundaries of other nodes so that it bridges the min cut, move a layer boundary (together with all
+        nodes that start or end there, so that pipelines are kept), or swap the windows of two nodes.
+        The move is guided by max flow, as half of the moves change a node that is not saturated.
+
+        :param rng: random number generator
+        :return: (node_ids, starts, counts) of the move, None if the proposed move is not valid
+        """
+        # Step 1: select the node to change
+        if rng.random() < 0.5:
+            candidates = [node_id for node_id in self.active_nodes if not self.is_node_saturated(node_id)]
+            node_id = rng.choice(candidates) if len(candidates) > 0 else rng.choice(self.active_nodes)
+        else:
+            node_id = rng.choice(self.active_nodes)
+        start, count = self.start[node_id], self.count[node_id]
+
+        # Step 2: select the move
+        move_type = rng.randrange(6)
+        if move_type == 0:
+            # shift
+            new_start = start + rng.choice([-1, 1]) * rng.randint(1, count)
+            new_start = min(max(new_start, 0), self.num_layers - count)
+            return ([node_id], [new_start], [count]) if not new_start == start else None
+        elif move_type == 1:
+            # grow (at the front or at the back)
+            if count == self.max_num_layers[node_id]:
+                return None
+            if rng.random() < 0.5 and start > 0:
+                return [node_id], [start - 1], [count + 1]
+            elif start + count < self.num_layers:
+                return [node_id], [start], [count + 1]
+            return None
+        elif move_type == 2:
+            # shrink (from the front or from the back)
+            if count == 1:
+                return None
+            return ([node_id], [start + 1], [count - 1]) if rng.random() < 0.5 else ([node_id], [start], [count - 1])
+        elif move_type == 3:
+            # bridge: start at the end of a node reachable from source and end at the start of a node that can
+            # reach sink (in the residual graph), so that the node opens a new augmenting path
+            from_source = self.get_residual_reachable(from_source=True)
+            to_sink = self.get_residual_reachable(from_source=False)
+            new_starts = [0] + [self.start[_id] + self.count[_id] for _id in range(self.num_nodes)
+                                if not _id == node_id and from_source[2 * _id + 1]]
+            new_ends = [self.num_layers] + [self.start[_id] for _id in range(self.num_nodes)
+                                            if not _id == node_id and to_sink[2 * _id]]
+            new_start = rng.choice(new_starts)
+            new_ends = [_end for _end in new_ends if new_start < _end <= new_start + self.max_num_layers[node_id]]
+            if len(new_ends) == 0:
+                return None
+            new_count = rng.choice(new_ends) - new_start
+            return ([node_id], [new_start], [new_count]) if not (new_start, new_count) == (start, count) else None
+        elif move_type == 4:
+            # boundary: move the start / end boundary of the node, and all nodes that start or end there
+            boundary = start if rng.random() < 0.5 else start + count
+            delta = rng.choice([-1, 1])
+            if boundary == 0 or boundary == self.num_layers:
+                return None
+            node_ids, starts, counts = [], [], []
+            for _id in range(self.num_nodes):
+                if self.start[_id] + self.count[_id] == boundary:
+                    node_ids.append(_id)
+                    starts.append(self.start[_id])
+                    counts.append(self.count[_id] + delta)
+                elif self.start[_id] == boundary:
+                    node_ids.append(_id)
+                    starts.append(self.start[_id] + delta)
+                    counts.append(self.count[_id] - delta)
+            if not all(1 <= counts[i] <= self.max_num_layers[node_ids[i]] for i in range(len(node_ids))):
+                return None
+            return node_ids, starts, counts
+        else:
+            # swap
+            other_id = rng.choice(self.active_nodes)
+            other_start, other_count = self.start[other_id], self.count[other_id]
+            if other_id == node_id or (start, count) == (other_start, other_count):
+                return None
+            if other_count > self.max_num_layers[node_id] or count > self.max_num_layers[other_id]:
+                return None
+            return [node_id, other_id], [other_start, start], [other_count, count]
+
+
+def local_search(network: LayoutFlowNetwork, start: List[int], count: List[int], seed: int,
+                 num_perturb_moves: int, max_run_time: float, patience: int, flow_upper_bound: float,
+                 max_nodes_changed: int or None = None) -> Tuple[float, List[int], List[int], int]:
+    """
+    Hill climbing over layouts with max flow as objective. Moves that do not decrease the flow are accepted
+    (so that the search can walk on plateaus), and the search stops when the best flow has not improved for
+    patience moves or when max_run_time is reached.
+    Note: this is a module level function so that it can be run in a worker process.
+
+    :param network: flow network of the cluster
+    :param start: start layer of each compute node in the initial layout
+    :param count: number of layers of each compute node in the initial layout
+    :param seed: random seed
+    :param num_perturb_moves: number of random moves applied to the initial layout before the search
+    :param max_run_time: max search time
+    :param patience: stop after this many moves without improvement
+    :param flow_upper_bound: stop when this flow is reached
+    :param max_nodes_changed: max number of compute nodes whose layer window differs from the initial layout
+                              (None means no limit)
+    :return: best flow, start and count of the best layout, number of moves evaluated
+    """
+    search_start_time: float = time.time()
+    rng = random.Random(seed)
+    initial_start, initial_count = list(start), list(count)
+
+    def is_within_limit(move: Tuple[List[int], List[int], List[int]]) -> bool:
+        if max_nodes_changed is None:
+            return True
+        new_window: Dict[int, Tuple[int, int]] = {_id: (_start, _count) for _id, _start, _count in zip(*move)}
+        num_nodes_changed: int = sum(
+            1 for _id in range(network.num_nodes)
+            if not new_window.get(_id, (network.start[_id], network.count[_id])) ==
+            (initial_start[_id], initial_count[_id])
+        )
+        return num_nodes_changed <= max_nodes_changed
+
+    # Step 1: perturb the initial layout
+    current_flow: float = network.set_layout(start=start, count=count)
+    for _ in range(num_perturb_moves):
+        proposed_move = network.propose_move(rng=rng)
+        if proposed_move is not None and is_within_limit(move=proposed_move):
+            current_flow = network.move(*proposed_move)
+
+    # Step 2: hill climbing
+    best_flow, best_start, best_count = current_flow, list(network.start), list(network.count)
+    num_moves, moves_since_improvement = 0, 0
+    while moves_since_improvement < patience and time.time() - search_start_time < max_run_time:
+        if best_flow >= flow_upper_bound * (1 - 1e-9):
+            break
+        proposed_move = network.propose_move(rng=rng)
+        if proposed_move is None or not is_within_limit(move=proposed_move):
+            continue
+        num_moves += 1
+        moves_since_improvement += 1
+        new_flow = network.move(*proposed_move)
+        if new_flow < current_flow - 1e-9:
+            network.undo()
+            continue
+        current_flow = new_flow
+        if current_flow > best_flow + 1e-9:
+            best_flow, best_start, best_count = current_flow, list(network.start), list(network.count)
+            moves_since_improvement = 0
+    return best_flow, best_start, best_count, num_moves
+
+
+class LocalSearchLayout(ILPLayout):
+    # Usage:
+    # 1. call "from_ini" to load a complete cluster topology and machine profile
+    # 2. call "search_layout" to improve a heuristic layout (e.g. petals_sol.ini) with local search
+    # 3. call "generate_simulator_cluster", "save_layout_solution" and "set_initial_layout" as in ILPLayout
+
+    def __init__(self, model_manager: ModelManager) -> None:
+        """
+        Max-flow-guided local search layout synthesizer. Each move changes the layer windows of one or two
+        nodes and is scored by incremental max flow, which is much faster than solving the ILP.
+
+        :return: None
+        """
+        super().__init__(model_manager=model_manager)
+
+        # search statistics
+        self.search_time: float = -1
+        self.num_moves: int = -1
+        self.initial_flow: float = -1
+        self.best_flow: float = -1
+
+    def get_flow_network(self, allow_partial_inference: bool) -> LayoutFlowNetwork:
+        """
+        Build the flow network of the loaded cluster.
+
+        :param allow_partial_inference: whether partial inference is allowed
+        :return: flow network
+        """
+        assert self.cluster_loaded, "Cluster must be loaded before building the flow network!"
+        self.node_keys = list(self.ilp_nodes.keys())
+        node_key_2_id: Dict[int or str, int] = {node_idx: _id for _id, node_idx in enumerate(self.node_keys)}
+        node_key_2_id["source"], node_key_2_id["sink"] = len(self.node_keys), len(self.node_keys) + 1
+
+        # directed edges (same order as the edges in ILPLayout)
+        edge_from, edge_to, edge_throughput = [], [], []
+        for link_name_tuple, link in self.ilp_links.items():
+            if not link_name_tuple[0] == "sink" and not link_name_tuple[1] == "source":
+                edge_from.append(node_key_2_id[link_name_tuple[0]])
+                edge_to.append(node_key_2_id[link_name_tuple[1]])
+                edge_throughput.append(link.throughput)
+            if not link_name_tuple[1] == "sink" and not link_name_tuple[0] == "source":
+                edge_from.append(node_key_2_id[link_name_tuple[1]])
+                edge_to.append(node_key_2_id[link_name_tuple[0]])
+                edge_throughput.append(link.throughput)
+
+        return LayoutFlowNetwork(
+            num_layers=self.model_card.num_layers,
+            max_num_layers=[self.ilp_nodes[node_idx].max_num_layers for node_idx in self.node_keys],
+            layer_count_2_throughput=[[0.0] + [self.ilp_nodes[node_idx].layer_count_2_throughput[layer_count]
+                                               for layer_count in range(1, self.ilp_nodes[node_idx].max_num_layers + 1)]
+                                      for node_idx in self.node_keys],
+            edge_from=edge_from, edge_to=edge_to, edge_throughput=edge_throughput,
+            allow_partial_inference=allow_partial_inference
+        )
+
+    def load_heuristic_layout(self, heuristic_sol_path: str) -> Tuple[List[int], List[int]]:
+        """
+        Load the layout found by a heuristic method (e.g. petals_sol.ini or swarm_sol.ini).
+        Note: nodes that hold more layers than they can keep the first layers, and nodes that hold no layer
+              start with the first layer.
+
+        :param heuristic_sol_path: path to the heuristic solution
+        :return: start and count of each compute node
+        """
+        solution_layers: Dict[int, List[int]] = load_solution_layers(solution_file_name=heuristic_sol_path)
+        start, count = [], []
+        for node_idx in self.node_keys:
+            layers_on_node: List[int] = solution_layers[node_idx]
+            start.append(min(layers_on_node) if len(layers_on_node) > 0 else 0)
+            count.append(min(max(len(layers_on_node), 1), self.ilp_nodes[node_idx].max_num_layers))
+        return start, count
+
+    def search_layout(self, heuristic_sol_path: str, allow_partial_inference: bool, seed: int, num_restarts: int,
+                      num_workers: int, max_run_time: float, patience: int, num_perturb_moves: int) -> float:
+        """
+        Search for a layout with max-flow-guided local search. The first restart starts from the heuristic
+        layout, and the other restarts start from random perturbations of it. Restarts run in parallel.
+
+        :param heuristic_sol_path: path to the heuristic solution to start from
+        :param allow_partial_inference: whether partial inference is allowed
+        :param seed: random seed
+        :param num_restarts: number of restarts
+        :param num_workers: number of worker processes (restarts run in this process if 1)
+        :param max_run_time: max search time of each restart
+        :param patience: a restart stops after this many moves without improvement
+        :param num_perturb_moves: number of random moves applied to the heuristic layout in a restart
+        :return: max flow of the best layout
+        """
+        assert self.cluster_loaded, "Cluster must be loaded before searching for layout!"
+        assert num_restarts >= 1 and num_workers >= 1, "Need at least one restart and one worker!"
+        search_start_time: float = time.time()
+
+        # Step 1: build flow network and load the initial layout
+        network: LayoutFlowNetwork = self.get_flow_network(allow_partial_inference=allow_partial_inference)
+        start, count = self.load_heuristic_layout(heuristic_sol_path=heuristic_sol_path)
+        self.initial_flow = network.set_layout(start=start, count=count)
+        flow_upper_bound: float = self.get_flow_upper_bound()
+        print("# ------------------------------------------------------------------------------------------ #")
+        print(f"[Local Search Layout - Info] Start from flow {self.initial_flow} (upper bound {flow_upper_bound}), "
+              f"{num_restarts} restarts on {num_workers} workers.")
+
+        # Step 2: run the restarts
+        restart_args = [(network, start, count, seed + restart_idx, 0 if restart_idx == 0 else num_perturb_moves,
+                         max_run_time, patience, flow_upper_bound) for restart_idx in range(num_restarts)]
+        if num_workers == 1:
+            results = [local_search(*args) for args in restart_args]
+        else:
+            with ProcessPoolExecutor(max_workers=min(num_workers, num_restarts)) as executor:
+                results = list(executor.map(local_search, *zip(*restart_args)))
+        self.best_flow, best_start, best_count, _ = max(results, key=lambda result: result[0])
+        self.num_moves = sum(result[3] for result in results)
+        self.search_time = time.time() - search_start_time
+        print(f"[Local Search Layout - Info] Found: {self.best_flow} after {self.num_moves} moves in "
+              f"{self.search_time:.2f} seconds (restarts: {[round(result[0], 2) for result in results]}).")
+        print("# ------------------------------------------------------------------------------------------ #")
+
+        # Step 3: load the best layout and its flow into ilp nodes and links
+        return self.set_layout_solution(network=network, start=best_start, count=best_count)
+
+    def set_layout_solution(self, network: LayoutFlowNetwork, start: List[int], count: List[int]) -> float:
+        """
+        Load a layout and its max flow into ilp nodes and links.
+
+        :param network: flow network of the cluster
+        :param start: start layer of each compute node
+        :param count: number of layers of each compute node
+        :return: max flow of the layout
+        """
+        network.set_layout(start=start, count=count)
+        for node_id, node_idx in enumerate(self.node_keys):
+            self.ilp_nodes[node_idx].start_layer_idx = start[node_id]
+            self.ilp_nodes[node_idx].end_layer_idx = start[node_id] + count[node_id]
+        edge = 0
+        for link_name_tuple, link in self.ilp_links.items():
+            link: ILPLink
+            if not link_name_tuple[0] == "sink" and not link_name_tuple[1] == "source":
+                link.forward_flow = network.get_edge_flow(edge=edge)
+                link.forward_edge_switch = int(network.is_edge_valid(edge=edge))
+                edge += 1
+            if not link_name_tuple[1] == "sink" and not link_name_tuple[0] == "source":
+                link.backward_flow = network.get_edge_flow(edge=edge)
+                link.backward_edge_switch = int(network.is_edge_valid(edge=edge))
+                edge += 1
+        self.solution_loaded = True
+        return network.flow_value
+
+    def load_solution(self, solution_file_name: str, allow_partial_inference: bool) -> float:
+        """
+        Load an existing layout (e.g. from the layout cache) without searching.
+
+        :param solution_file_name: path to the solution file
+        :param allow_partial_inference: whether partial inference is allowed
+        :return: max flow of the layout
+        """
+        assert self.cluster_loaded, "Cluster must be loaded before loading solution!"
+        network: LayoutFlowNetwork = self.get_flow_network(allow_partial_inference=allow_partial_inference)
+        start, count = self.load_heuristic_layout(heuristic_sol_path=solution_file_name)
+        self.best_flow = self.set_layout_solution(network=network, start=start, count=count)
+        self.initial_flow, self.num_moves, self.search_time = self.best_flow, 0, 0
+        return self.best_flow
+
+    def save_search_statistics(self, save_path: str) -> None:
+        """
+        Save statistics of the local search.
+
+        :param save_path: save path of the statistics file
+        :return: None
+        """
+        assert self.solution_loaded, "Must find a solution before saving statistics!"
+        with open(save_path, "w") as file:
+            file.write(f"initial_flow = {self.initial_flow}\n")
+            file.write(f"best_flow = {self.best_flow}\n")
+            file.write(f"flow_upper_bound = {self.get_flow_upper_bound()}\n")
+            file.write(f"num_moves = {self.num_moves}\n")
+            file.write(f"search_time = {self.search_time}\n")
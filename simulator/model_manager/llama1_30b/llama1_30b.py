@@ -15,6 +15,18 @@ from simulator.model_manager.llama1_30b.a100.llama1_30b_a100 import LLaMa30BonA1
 from simulator.event_simulator.utils import kbps, mbps, gbps, Byte, KB, MB, GB, Sec, MilliSec, LLaMa1_30B_TOTAL_LAYERS
 
 
+# typical number of layers on node (normal cluster / small cluster) and initial normalized performance
+LLaMa30B_TYPICAL_LAYERS: Dict[str, int] = {
+    "A100": 12, "V100": 4, "L4": 8, "L4x2": 14, "T4": 4, "T4x2": 10, "T4x4": 20
+}
+LLaMa30B_SMALL_CLUSTER_TYPICAL_LAYERS: Dict[str, int] = {
+    "A100": 18, "V100": 7, "L4": 11, "L4x2": 22, "T4": 7, "T4x2": 15, "T4x4": 30
+}
+LLaMa30B_INITIAL_NORMALIZED_PERF: Dict[str, float] = {
+    "A100": 48, "V100": 25, "L4": 9, "L4x2": 15, "T4": 8, "T4x2": 15, "T4x4": 23
+}
+
+
 class LLaMa30BStatistics(ModelStatistics):
     def __init__(self, num_machines_dict: Dict[str, int]):
         """
@@ -23,16 +35,16 @@ class LLaMa30BStatistics(ModelStatistics):
         We suggest not including types with 0 machines (which might cause trouble).
         """
         # estimate the typical number of layers on node
-        typical_layers_dict = {"A100": 12, "V100": 4, "L4": 8, "L4x2": 14, "T4": 4, "T4x2": 10, "T4x4": 20}
+        typical_layers_dict = LLaMa30B_TYPICAL_LAYERS
         total_layer_capacity = 0
         for machine_name in num_machines_dict:
             total_layer_capacity += num_machines_dict[machine_name] * typical_layers_dict[machine_name]
         if total_layer_capacity < LLaMa1_30B_TOTAL_LAYERS * 1.2:
-            typical_layers_dict = {"A100": 18, "V100": 7, "L4": 11, "L4x2": 22, "T4": 7, "T4x2": 15, "T4x4": 30}
+            typical_layers_dict = LLaMa30B_SMALL_CLUSTER_TYPICAL_LAYERS
         typical_layers_dict = {m_type: typical_layers_dict[m_type] for m_type in num_machines_dict}
 
         # estimate the normalized performance
-        normalized_perf_dict = {"A100": 48, "V100": 25, "L4": 9, "L4x2": 15, "T4": 8, "T4x2": 15, "T4x4": 23}
+        normalized_perf_dict = LLaMa30B_INITIAL_NORMALIZED_PERF
         normalized_perf_dict = {m_type: normalized_perf_dict[m_type] for m_type in num_machines_dict}
         for iteration in range(10):
             new_normalized_perf_dict = {}
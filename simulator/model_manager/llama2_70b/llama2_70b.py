@@ -15,6 +15,18 @@ from simulator.model_manager.llama2_70b.a100.llama2_70b_a100 import LLaMa70BonA1
 from simulator.event_simulator.utils import kbps, mbps, gbps, Byte, KB, MB, GB, Sec, MilliSec, LLaMa2_70B_TOTAL_LAYERS
 
 
+# typical number of layers on node (normal cluster / small cluster) and initial normalized performance
+LLaMa70B_TYPICAL_LAYERS: Dict[str, int] = {
+    "A100": 8, "V100": 3, "L4": 4, "L4x2": 9, "T4": 3, "T4x2": 6, "T4x4": 12
+}
+LLaMa70B_SMALL_CLUSTER_TYPICAL_LAYERS: Dict[str, int] = {
+    "A100": 12, "V100": 4, "L4": 7, "L4x2": 14, "T4": 4, "T4x2": 9, "T4x4": 18
+}
+LLaMa70B_INITIAL_NORMALIZED_PERF: Dict[str, float] = {
+    "A100": 80, "V100": 40, "L4": 20, "L4x2": 30, "T4": 12.5, "T4x2": 20, "T4x4": 30
+}
+
+
 class LLaMa70BStatistics(ModelStatistics):
     def __init__(self, num_machines_dict: Dict[str, int]):
         """
@@ -23,16 +35,16 @@ class LLaMa70BStatistics(ModelStatistics):
         We suggest not including types with 0 machines (which might cause trouble).
         """
         # estimate the typical number of layers on node
-        typical_layers_dict = {"A100": 8, "V100": 3, "L4": 4, "L4x2": 9, "T4": 3, "T4x2": 6, "T4x4": 12}
+        typical_layers_dict = LLaMa70B_TYPICAL_LAYERS
         total_layer_capacity = 0
         for machine_name in num_machines_dict:
             total_layer_capacity += num_machines_dict[machine_name] * typical_layers_dict[machine_name]
         if total_layer_capacity < LLaMa2_70B_TOTAL_LAYERS * 1.2:
-            typical_layers_dict = {"A100": 12, "V100": 4, "L4": 7, "L4x2": 14, "T4": 4, "T4x2": 9, "T4x4": 18}
+            typical_layers_dict = LLaMa70B_SMALL_CLUSTER_TYPICAL_LAYERS
         typical_layers_dict = {m_type: typical_layers_dict[m_type] for m_type in num_machines_dict}
 
         # estimate the normalized performance
-        normalized_perf_dict = {"A100": 80, "V100": 40, "L4": 20, "L4x2": 30, "T4": 12.5, "T4x2": 20, "T4x4": 30}
+        normalized_perf_dict = LLaMa70B_INITIAL_NORMALIZED_PERF
         normalized_perf_dict = {m_type: normalized_perf_dict[m_type] for m_type in num_machines_dict}
         for iteration in range(10):
             new_normalized_perf_dict = {}
@@ -1,14 +1,22 @@
 # 2024.04.03 Yixuan Mei
 
+import os
+import pickle
+import hashlib
+import threading
+
 from enum import Enum
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 from simulator.event_simulator.model import MachineProfile
+from simulator.event_simulator.utils import linear_interpolate
 from simulator.event_simulator.compute_node import InferenceSettings
 from simulator.model_manager.example_small.example_small import ExampleSmallStatistics
 from simulator.model_manager.example_large.example_large import ExampleLargeStatistics
 from simulator.model_manager.llama2_70b.llama2_70b import LLaMa70BStatistics
 from simulator.model_manager.llama1_30b.llama1_30b import LLaMa30BStatistics
+from simulator.model_manager.base_classes import ModelStatistics
+from simulator.model_manager.profiled.profiled_model import ProfiledModelStatistics
 
 
 class ModelName(Enum):
@@ -20,31 +28,174 @@ class ModelName(Enum):
     LLaMa30B = "ModelName.LLaMa30B"
 
 
+# number of layers of each model, used to check that a profile directory matches the requested model
+MODEL_NUM_LAYERS: Dict[ModelName, int] = {
+    ModelName.ExampleSmall: 3,
+    ModelName.ExampleLarge: 8,
+    ModelName.LLaMa70B: 80,
+    ModelName.LLaMa30B: 60,
+}
+
+# process-wide cache of model statistics: (model name, machine mix, profile dir) -> ModelStatistics
+# Note: model statistics are read-only after construction, so they can be shared by all model managers
+_model_statistics_cache: Dict[Tuple, ModelStatistics] = {}
+_model_statistics_cache_lock: threading.Lock = threading.Lock()
+_model_statistics_disk_cache_dir: str or None = None
+
+
+def set_model_statistics_disk_cache(cache_dir: str or None) -> None:
+    """
+    Set the directory of the on-disk model statistics cache. Statistics built by this process will be
+    pickled into this directory and loaded by later processes (e.g. different runs of a sweep).
+
+    :param cache_dir: path to the cache directory (None = disable the on-disk cache)
+    :return: None
+    """
+    global _model_statistics_disk_cache_dir
+    if cache_dir is not None and not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    _model_statistics_disk_cache_dir = cache_dir
+
+
+def clear_model_statistics_cache() -> None:
+    """
+    Clear the in-memory model statistics cache (the on-disk cache is not touched).
+
+    :return: None
+    """
+    with _model_statistics_cache_lock:
+        _model_statistics_cache.clear()
+
+
+def _get_source_version(model_name: ModelName, profile_dir: str or None) -> float:
+    """
+    Get the version of the profiling results used to build the model statistics (latest modification
+    time of the source files), so that the on-disk cache is invalidated when profiling results change.
+
+    :param model_name: name of the LLM
+    :param profile_dir: profile directory (None = built-in profiling results)
+    :return: version of the profiling results
+    """
+    if profile_dir is not None:
+        source_dir = profile_dir
+    elif model_name == ModelName.LLaMa70B:
+        source_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "llama2_70b")
+    elif model_name == ModelName.LLaMa30B:
+        source_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "llama1_30b")
+    else:
+        source_dir = os.path.dirname(os.path.realpath(__file__))
+    version = 0
+    for dir_path, _, file_names in os.walk(source_dir):
+        for file_name in file_names:
+            if file_name.endswith(".py") or file_name.endswith(".csv") or file_name.endswith(".json"):
+                version = max(version, os.path.getmtime(os.path.join(dir_path, file_name)))
+    return version
+
+
+def _build_model_statistics(model_name: ModelName, machine_num_dict: Dict[str, int],
+                            profile_dir: str or None) -> ModelStatistics:
+    """
+    Build the model statistics (this is the slow path of get_model_statistics).
+
+    :param model_name: name of the LLM
+    :param machine_num_dict: {machine_name -> num of machine}
+    :param profile_dir: profile directory (None = built-in profiling results)
+    :return: model statistics
+    """
+    if profile_dir is not None:
+        model_statistics = ProfiledModelStatistics(profile_dir=profile_dir, num_machines_dict=machine_num_dict)
+        if model_statistics.model_name is not None:
+            assert model_statistics.model_name == model_name.value, \
+                f"Profile in {profile_dir} is for {model_statistics.model_name}, not {model_name.value}!"
+        assert model_statistics.num_layers == MODEL_NUM_LAYERS[model_name], \
+            f"Profile in {profile_dir} has {model_statistics.num_layers} layers, but {model_name.value} has " \
+            f"{MODEL_NUM_LAYERS[model_name]}!"
+        return model_statistics
+    elif model_name == ModelName.ExampleSmall:
+        return ExampleSmallStatistics()
+    elif model_name == ModelName.ExampleLarge:
+        return ExampleLargeStatistics()
+    elif model_name == ModelName.LLaMa70B:
+        return LLaMa70BStatistics(num_machines_dict=machine_num_dict)
+    elif model_name == ModelName.LLaMa30B:
+        return LLaMa30BStatistics(num_machines_dict=machine_num_dict)
+    else:
+        assert False, "Unknown model name!"
+
+
+def get_model_statistics(model_name: ModelName, machine_num_dict: Dict[str, int],
+                         profile_dir: str or None = None) -> ModelStatistics:
+    """
+    Get the model statistics of the given model and machine mix. Statistics are cached in memory (keyed
+    by model name, machine mix and profile dir) and optionally on disk (see set_model_statistics_disk_cache).
+    This function is thread-safe.
+
+    :param model_name: name of the LLM
+    :param machine_num_dict: {machine_name -> num of machine}
+    :param profile_dir: profile directory (None = built-in profiling results)
+    :return: model statistics
+    """
+    machine_mix: Tuple[Tuple[str, int], ...] = tuple(sorted(machine_num_dict.items()))
+    profile_key: str or None = None if profile_dir is None else os.path.realpath(profile_dir)
+    cache_key = (model_name.value, machine_mix, profile_key)
+
+    with _model_statistics_cache_lock:
+        # Step 1: in-memory cache
+        if cache_key in _model_statistics_cache:
+            return _model_statistics_cache[cache_key]
+
+        # Step 2: on-disk cache
+        cache_file_name: str or None = None
+        if _model_statistics_disk_cache_dir is not None:
+            source_version = _get_source_version(model_name=model_name, profile_dir=profile_dir)
+            key_hash = hashlib.sha1(repr((cache_key, source_version)).encode()).hexdigest()[:16]
+            cache_file_name = os.path.join(_model_statistics_disk_cache_dir, f"{model_name.name}-{key_hash}.pkl")
+            if os.path.exists(cache_file_name):
+                with open(cache_file_name, "rb") as f:
+                    model_statistics = pickle.load(f)
+                _model_statistics_cache[cache_key] = model_statistics
+                return model_statistics
+
+        # Step 3: build and save
+        model_statistics = _build_model_statistics(model_name=model_name, machine_num_dict=machine_num_dict,
+                                                   profile_dir=profile_dir)
+        _model_statistics_cache[cache_key] = model_statistics
+        if cache_file_name is not None:
+            tmp_file_name = f"{cache_file_name}.{os.getpid()}.tmp"
+            with open(tmp_file_name, "wb") as f:
+                pickle.dump(model_statistics, f)
+            os.replace(tmp_file_name, cache_file_name)
+        return model_statistics
+
+
 class ModelManager:
-    def __init__(self, model_name: ModelName, machine_num_dict: Dict[str, int]) -> None:
+    def __init__(self, model_name: ModelName, machine_num_dict: Dict[str, int],
+                 profile_dir: str or None = None, use_cache: bool = True) -> None:
         """
         Model manager.
 
         :param model_name: name of the LLM
         :param machine_num_dict: {machine_name -> num of machine}
+        :param profile_dir: if not None, load the statistics from this profile directory instead of the
+                            built-in profiling results (see model_manager/profiled/profile_fitter.py)
+        :param use_cache: whether to use the process-wide model statistics cache (see get_model_statistics)
         :return: None
         """
         # model name
         self.model_name: ModelName = model_name
         self.machine_num_dict: Dict[str, int] = machine_num_dict
         self.allow_force_set: bool = False
+        self.profile_dir: str or None = profile_dir
 
         # model
-        if self.model_name == ModelName.ExampleSmall:
-            self.model_statistics = ExampleSmallStatistics()
-        elif self.model_name == ModelName.ExampleLarge:
-            self.model_statistics = ExampleLargeStatistics()
-        elif self.model_name == ModelName.LLaMa70B:
-            self.model_statistics = LLaMa70BStatistics(num_machines_dict=machine_num_dict)
-        elif self.model_name == ModelName.LLaMa30B:
-            self.model_statistics = LLaMa30BStatistics(num_machines_dict=machine_num_dict)
+        # model statistics are shared by all model managers with the same model and machine mix
+        if use_cache:
+            self.model_statistics = get_model_statistics(model_name=model_name, machine_num_dict=machine_num_dict,
+                                                         profile_dir=profile_dir)
         else:
-            assert False, "Unknown model name!"
+            self.model_statistics = _build_model_statistics(model_name=model_name,
+                                                            machine_num_dict=machine_num_dict,
+                                                            profile_dir=profile_dir)
 
     # ---------------------------------------- Machine ---------------------------------------- #
 
@@ -93,6 +244,51 @@ class ModelManager:
         return self.model_statistics.get_typical_token_throughput(machine_type=machine_type,
                                                                   num_on_node_layers=num_on_node_layers)
 
+    def get_token_throughput(self, machine_type: str, num_on_node_layers: int, avg_input_len: float,
+                             avg_output_len: float) -> float:
+        """
+        Get the token throughput of given machine type when there are given number of layers on node and the
+        workload has the given average input / output length.
+        Note: 1. the per token time of prompt and decode phase is taken at the typical batch sizes of the node,
+                 and the two phases are weighted by the number of tokens they process in the workload
+              2. when the lengths are those used in profiling, this is the typical token throughput
+
+        :param machine_type: machine type
+        :param num_on_node_layers: number of layers on node
+        :param avg_input_len: average input length of the workload
+        :param avg_output_len: average output length of the workload
+        :return: token throughput (in #tokens / second)
+        """
+        machine_profile = self.get_profiling_results(machine_type=machine_type)
+        inference_settings = self.get_inference_settings(machine_type=machine_type,
+                                                         num_on_node_layers=num_on_node_layers)
+
+        # some helper functions
+        def _get_time(bs2time: Dict[int, float], num_tokens: int) -> float:
+            left, right = -1, 1000 * 1000
+            for point in bs2time:
+                if left < point <= num_tokens:
+                    left = point
+                if num_tokens <= point < right:
+                    right = point
+            return linear_interpolate(x_0=left, y_0=bs2time[left], x_1=right, y_1=bs2time[right],
+                                      x_target=num_tokens)
+
+        # per token time of each phase (at the typical batch size, rescaled to one request if needed)
+        prompt_num_tokens = inference_settings.prompt_typical_tokens
+        if inference_settings.prompt_typical_requests < 1:
+            prompt_num_tokens = int(prompt_num_tokens / inference_settings.prompt_typical_requests)
+        decode_num_tokens = inference_settings.decode_typical_tokens
+        prompt_token_time = _get_time(bs2time=machine_profile.prompt_bs2time,
+                                      num_tokens=prompt_num_tokens) / prompt_num_tokens
+        decode_token_time = _get_time(bs2time=machine_profile.decode_bs2time,
+                                      num_tokens=decode_num_tokens) / decode_num_tokens
+
+        # weight the phases by the workload
+        total_tokens = avg_input_len + avg_output_len
+        total_time = num_on_node_layers * (avg_input_len * prompt_token_time + avg_output_len * decode_token_time)
+        return total_tokens / total_time
+
     def get_kv_cache_capacity(self, machine_type: str, num_on_node_layers: int) -> int:
         """
         Get the kv cache capacity of given machine type when using the current model.
@@ -0,0 +1,292 @@
+# 2026.10.19 Yixuan Mei
+
+import os
+import re
+import inspect
+import csv
+import json
+import bisect
+import statistics
+
+from typing import Dict, List, Tuple
+
+from simulator.model_manager.model_manager import ModelName
+from simulator.model_manager.llama2_70b import llama2_70b
+from simulator.model_manager.llama1_30b import llama1_30b
+from simulator.model_manager.profiled.profiled_model import MODEL_PROFILE_FILE_NAME
+from simulator.event_simulator.utils import VLLM_BLOCK_SIZE
+
+# [Profile] phase=decode tokens=128 layers=4 time=31.250ms (printed by llm_sys/worker.py)
+PROFILE_LOG_PATTERN = re.compile(r"\[Profile\] phase=(prompt|decode) tokens=(\d+) layers=(\d+) time=([\d.]+)ms")
+
+
+def load_timing_trace(file_name: str) -> Dict[str, List[Tuple[int, float]]]:
+    """
+    Load a timing trace. Two formats are supported:
+        1. csv file with header "phase,num_tokens,num_layers,time_ms" (one row per measured batch)
+        2. worker logs of llm_sys, where each batch is logged as
+           "[Profile] phase=<prompt/decode> tokens=<num_tokens> layers=<num_layers> time=<time>ms"
+    Time of a batch is divided by the number of layers, since all layers are assumed to be the same.
+
+    :param file_name: name of the trace file
+    :return: {"prompt": [(num_tokens, layer_time_ms)], "decode": [(num_tokens, layer_time_ms)]}
+    """
+    samples: Dict[str, List[Tuple[int, float]]] = {"prompt": [], "decode": []}
+    with open(file_name, "r") as f:
+        first_line = f.readline()
+        f.seek(0)
+        if first_line.strip().replace(" ", "") == "phase,num_tokens,num_layers,time_ms":
+            reader = csv.DictReader(f, skipinitialspace=True)
+            for row in reader:
+                assert row["phase"] in samples, f"Found unknown phase {row['phase']}!"
+                samples[row["phase"]].append((int(row["num_tokens"]),
+                                              float(row["time_ms"]) / int(row["num_layers"])))
+        else:
+            for line in f:
+                match = PROFILE_LOG_PATTERN.search(line)
+                if match is None:
+                    continue
+                phase, num_tokens, num_layers, time_ms = match.groups()
+                samples[phase].append((int(num_tokens), float(time_ms) / int(num_layers)))
+    return samples
+
+
+def default_grid(phase: str, max_tokens: int) -> List[int]:
+    """
+    Get the default interpolation points (same spacing as the csv files of LLaMa70B).
+
+    :param phase: "prompt" or "decode"
+    :param max_tokens: max number of tokens to cover
+    :return: a sorted list of interpolation points
+    """
+    if phase == "prompt":
+        grid = list(range(0, max_tokens + 250, 250))
+    elif phase == "decode":
+        grid = [0] + list(range(2, 21, 2)) + list(range(25, 101, 5))
+        if max_tokens > 100:
+            grid += list(range(120, max_tokens + 20, 20))
+    else:
+        assert False, f"Found unknown phase {phase}!"
+    return grid
+
+
+def fit_bs2time(samples: List[Tuple[int, float]], grid: List[int],
+                enforce_monotone: bool = True) -> Dict[int, float]:
+    """
+    Fit an interpolation table (batch size -> layer time in ms) from measured samples.
+        1. each sample is assigned to its nearest point on the grid, and the median is used
+        2. grid points without samples are linearly interpolated (or extrapolated) from neighbors
+        3. batch size 0 is always mapped to 0
+        4. (optional) time is made non-decreasing w.r.t. batch size to remove measurement noise
+
+    :param samples: a list of (num_tokens, layer_time_ms)
+    :param grid: interpolation points
+    :param enforce_monotone: whether to make the table non-decreasing
+    :return: {batch size -> layer time (ms)}
+    """
+    grid = sorted(set(grid) | {0})
+    assert len(grid) >= 2, "Grid must contain at least one non-zero point!"
+
+    # Step 1: assign samples to nearest grid points
+    bins: Dict[int, List[float]] = {point: [] for point in grid}
+    for num_tokens, layer_time in samples:
+        if num_tokens <= 0:
+            continue
+        idx = bisect.bisect_left(grid, num_tokens)
+        if idx == len(grid):
+            idx = len(grid) - 1
+        elif idx > 0 and num_tokens - grid[idx - 1] < grid[idx] - num_tokens:
+            idx = idx - 1
+        bins[grid[idx]].append(layer_time)
+    known_points = [point for point in grid[1:] if len(bins[point]) > 0]
+    assert len(known_points) > 0, "No valid samples found!"
+    known_values = {point: statistics.median(bins[point]) for point in known_points}
+    known_values[0] = 0
+    known_points = [0] + known_points
+
+    # Step 2: fill the missing points
+    bs2time: Dict[int, float] = {}
+    for point in grid:
+        if point in known_values:
+            bs2time[point] = known_values[point]
+            continue
+        idx = bisect.bisect_left(known_points, point)
+        if idx == len(known_points):
+            # extrapolate with the last two known points
+            idx = len(known_points) - 1
+        left, right = known_points[idx - 1], known_points[idx]
+        slope = (known_values[right] - known_values[left]) / (right - left)
+        bs2time[point] = known_values[left] + slope * (point - left)
+
+    # Step 3: make time non-decreasing
+    if enforce_monotone:
+        cur_max = 0
+        for point in grid:
+            cur_max = max(cur_max, bs2time[point])
+            bs2time[point] = cur_max
+    return bs2time
+
+
+def fit_machine_profile(trace_file_names: List[str], machine_name: str, max_num_layers: int,
+                        vllm_num_blocks_dict: Dict[int, int], prompt_max_requests_dict: Dict[int, int],
+                        decode_max_tokens_dict: Dict[int, int], typical_layers: int,
+                        typical_layers_small_cluster: int, initial_normalized_perf: float,
+                        prompt_grid: List[int] or None = None, decode_grid: List[int] or None = None,
+                        enforce_monotone: bool = True) -> Dict:
+    """
+    Fit a machine profile from timing traces. The inference settings (vllm_num_blocks_dict, etc.) have the
+    same meaning as the ones hard-coded in the machine classes (e.g. LLaMa70BonT4).
+
+    :param trace_file_names: a list of trace files (see load_timing_trace)
+    :param machine_name: name of the machine
+    :param max_num_layers: max number of layers the machine can hold
+    :param vllm_num_blocks_dict: num layers -> num_blocks (reported by vLLM)
+    :param prompt_max_requests_dict: num layers -> max number of prompt requests in a batch
+    :param decode_max_tokens_dict: num layers -> max number of decode tokens in a batch
+    :param typical_layers: typical number of layers on node
+    :param typical_layers_small_cluster: typical number of layers on node when the cluster is small
+    :param initial_normalized_perf: initial estimation of the normalized performance
+    :param prompt_grid: interpolation points for prompt phase (None = default_grid)
+    :param decode_grid: interpolation points for decode phase (None = default_grid)
+    :param enforce_monotone: whether to make the fitted tables non-decreasing
+    :return: the machine profile (can be saved with save_profile_json)
+    """
+    # load all traces
+    samples: Dict[str, List[Tuple[int, float]]] = {"prompt": [], "decode": []}
+    for trace_file_name in trace_file_names:
+        cur_samples = load_timing_trace(file_name=trace_file_name)
+        samples["prompt"] += cur_samples["prompt"]
+        samples["decode"] += cur_samples["decode"]
+    assert len(samples["prompt"]) > 0 and len(samples["decode"]) > 0, "Need samples from both phases!"
+
+    # fit the tables
+    if prompt_grid is None:
+        prompt_grid = default_grid(phase="prompt", max_tokens=max(_tokens for _tokens, _ in samples["prompt"]))
+    if decode_grid is None:
+        decode_grid = default_grid(phase="decode", max_tokens=max(_tokens for _tokens, _ in samples["decode"]))
+    prompt_bs2time_ms = fit_bs2time(samples=samples["prompt"], grid=prompt_grid, enforce_monotone=enforce_monotone)
+    decode_bs2time_ms = fit_bs2time(samples=samples["decode"], grid=decode_grid, enforce_monotone=enforce_monotone)
+
+    return {
+        "machine_name": machine_name,
+        "max_num_layers": max_num_layers,
+        "typical_layers": typical_layers,
+        "typical_layers_small_cluster": typical_layers_small_cluster,
+        "initial_normalized_perf": initial_normalized_perf,
+        "vllm_num_blocks": vllm_num_blocks_dict,
+        "prompt_max_requests": prompt_max_requests_dict,
+        "decode_max_tokens": decode_max_tokens_dict,
+        "prompt_bs2time_ms": prompt_bs2time_ms,
+        "decode_bs2time_ms": decode_bs2time_ms,
+    }
+
+
+def build_model_profile(num_layers: int, token_size: float, activation_size: float,
+                        model_param_sizes: List[float], small_cluster_ratio: float = 1.2,
+                        num_iterations: int = 10, model_name: ModelName or None = None) -> Dict:
+    """
+    Build the model level profile.
+
+    :param num_layers: total number of layers in the model
+    :param token_size: size of a token
+    :param activation_size: size of the activation of a token
+    :param model_param_sizes: param size of each layer
+    :param small_cluster_ratio: cluster is small if total typical layers < num_layers * small_cluster_ratio
+    :param num_iterations: number of iterations when estimating normalized performance
+    :param model_name: [Optional] name of the model, checked when the profile is loaded by ModelManager
+    :return: the model profile (should be saved as model.json with save_profile_json)
+    """
+    assert len(model_param_sizes) == num_layers, "Total layer number mismatch!"
+    model_profile = {
+        "num_layers": num_layers,
+        "token_size": token_size,
+        "activation_size": activation_size,
+        "model_param_sizes": model_param_sizes,
+        "small_cluster_ratio": small_cluster_ratio,
+        "num_iterations": num_iterations,
+    }
+    if model_name is not None:
+        model_profile["model_name"] = model_name.value
+    return model_profile
+
+
+def save_profile_json(file_name: str, profile: Dict) -> None:
+    """
+    Save a profile (model or machine) into a json file.
+
+    :param file_name: name of the file
+    :param profile: the profile
+    :return: None
+    """
+    dir_name = os.path.dirname(file_name)
+    if dir_name and not os.path.exists(dir_name):
+        os.makedirs(dir_name)
+    with open(file_name, "w") as f:
+        json.dump(profile, f, indent=2)
+
+
+def export_builtin_profiles(model_name: ModelName, profile_dir: str) -> None:
+    """
+    Export the hard-coded profiling results of a built-in model (LLaMa70B / LLaMa30B) into a profile
+    directory, which can then be loaded by ModelManager(..., profile_dir=profile_dir).
+
+    :param model_name: ModelName.LLaMa70B or ModelName.LLaMa30B
+    :param profile_dir: path to the output profile directory
+    :return: None
+    """
+    if model_name == ModelName.LLaMa70B:
+        statistics_class = llama2_70b.LLaMa70BStatistics
+        typical_layers = llama2_70b.LLaMa70B_TYPICAL_LAYERS
+        small_cluster_typical_layers = llama2_70b.LLaMa70B_SMALL_CLUSTER_TYPICAL_LAYERS
+        initial_normalized_perf = llama2_70b.LLaMa70B_INITIAL_NORMALIZED_PERF
+    elif model_name == ModelName.LLaMa30B:
+        statistics_class = llama1_30b.LLaMa30BStatistics
+        typical_layers = llama1_30b.LLaMa30B_TYPICAL_LAYERS
+        small_cluster_typical_layers = llama1_30b.LLaMa30B_SMALL_CLUSTER_TYPICAL_LAYERS
+        initial_normalized_perf = llama1_30b.LLaMa30B_INITIAL_NORMALIZED_PERF
+    else:
+        assert False, "Only LLaMa70B and LLaMa30B can be exported!"
+
+    # instantiate with all machine types to get the per-machine objects
+    model_statistics = statistics_class(num_machines_dict={m_type: 1 for m_type in typical_layers})
+    save_profile_json(file_name=os.path.join(profile_dir, MODEL_PROFILE_FILE_NAME), profile=build_model_profile(
+        num_layers=len(model_statistics.get_model_params()),
+        token_size=model_statistics.get_model_token_size(),
+        activation_size=model_statistics.get_model_activation_size(),
+        model_param_sizes=model_statistics.get_model_params(),
+        model_name=model_name
+    ))
+
+    for machine in [model_statistics.t4, model_statistics.t4x2, model_statistics.t4x4, model_statistics.l4,
+                    model_statistics.l4x2, model_statistics.v100, model_statistics.a100]:
+        # read the csv files directly, so that the values in ms are kept exactly
+        csv_dir = os.path.dirname(os.path.realpath(inspect.getfile(type(machine))))
+        bs2time_ms: Dict[str, Dict[int, float]] = {}
+        for phase in ["prompt", "decode"]:
+            with open(os.path.join(csv_dir, f"{phase}_bs2time.csv"), "r") as f:
+                bs2time_ms[phase] = {int(row[0]): float(row[1]) for row in csv.reader(f)}
+            assert len(bs2time_ms[phase]) == len(getattr(machine, f"{phase}_bs2time")), "Profile size mismatch!"
+
+        num_layers_range = range(1, machine.max_num_layers + 1)
+        machine_profile = {
+            "machine_name": machine.machine_name,
+            "max_num_layers": machine.max_num_layers,
+            "typical_layers": typical_layers[machine.machine_name],
+            "typical_layers_small_cluster": small_cluster_typical_layers[machine.machine_name],
+            "initial_normalized_perf": initial_normalized_perf[machine.machine_name],
+            "vllm_num_blocks": {
+                _n: machine.kv_cache_capacity[_n] // (VLLM_BLOCK_SIZE * _n) for _n in num_layers_range
+            },
+            "prompt_max_requests": {
+                _n: machine.get_inference_settings(num_on_node_layers=_n).prompt_max_requests
+                for _n in num_layers_range
+            },
+            "decode_max_tokens": {
+                _n: machine.get_inference_settings(num_on_node_layers=_n).decode_max_tokens
+                for _n in num_layers_range
+            },
+            "prompt_bs2time_ms": bs2time_ms["prompt"],
+            "decode_bs2time_ms": bs2time_ms["decode"],
+        }
+        save_profile_json(file_name=os.path.join(profile_dir, f"{machine.machine_name}.json"),
+                          profile=machine_profile)
@@ -0,0 +1,392 @@
+# 2026.10.19 Yixuan Mei
+
+import os
+import json
+
+from typing import Dict, List
+
+from simulator.model_manager.base_classes import ModelOnMachine, ModelStatistics
+from simulator.model_manager.profiled.helper import profiled_workload_ratio, profiled_typical_statistics
+from simulator.event_simulator.model import MachineProfile
+from simulator.event_simulator.compute_node import InferenceSettings
+from simulator.event_simulator.utils import MilliSec
+from simulator.event_simulator.utils import VLLM_BLOCK_SIZE, MAX_INPUT_LEN, DECODE_PER_TOKEN_MAX_CONTEXT
+
+# name of the model-level profile file in a profile directory, all other json files are machine profiles
+MODEL_PROFILE_FILE_NAME = "model.json"
+
+
+def load_profile_json(file_name: str) -> Dict:
+    """
+    Load a profile file (model profile or machine profile). Dict keys that represent integers (number of
+    layers, number of tokens) are stored as strings in json, and are converted back here.
+
+    :param file_name: name of the profile file
+    :return: the profile as a dict
+    """
+    with open(file_name, "r") as f:
+        raw_profile = json.load(f)
+
+    profile = {}
+    for key, value in raw_profile.items():
+        if isinstance(value, dict):
+            value = {(int(_k) if _k.lstrip("-").isdigit() else _k): _v for _k, _v in value.items()}
+        profile[key] = value
+    return profile
+
+
+class ProfiledModelOnMachine(ModelOnMachine):
+    def __init__(self, machine_profile: Dict, total_num_layers: int) -> None:
+        """
+        Profiling results of a model on a machine, loaded from a machine profile file (see profile_fitter.py
+        for the format). Different from the hard-coded classes (e.g. LLaMa70BonT4), the profiling results
+        are loaded only once, and the inference settings are re-estimated in memory with update_estimation.
+
+        :param machine_profile: machine profile loaded by load_profile_json
+        :param total_num_layers: total number of layers in the model
+        :return: None
+        """
+        # basic parameters
+        self.machine_name: str = machine_profile["machine_name"]
+        self.total_num_layers: int = total_num_layers
+        self.max_num_layers: int = machine_profile["max_num_layers"]
+        self.typical_layers: int = machine_profile["typical_layers"]
+        self.typical_layers_small_cluster: int = machine_profile["typical_layers_small_cluster"]
+        self.initial_normalized_perf: float = machine_profile["initial_normalized_perf"]
+        self.prompt_max_requests_dict: Dict[int, int] = machine_profile["prompt_max_requests"]
+        self.decode_max_tokens_dict: Dict[int, int] = machine_profile["decode_max_tokens"]
+        vllm_num_blocks_dict: Dict[int, int] = machine_profile["vllm_num_blocks"]
+        for _num_layers in range(1, self.max_num_layers + 1):
+            assert _num_layers in vllm_num_blocks_dict, f"Missing vllm_num_blocks for {_num_layers} layers!"
+            assert _num_layers in self.prompt_max_requests_dict, f"Missing prompt_max_requests for {_num_layers}!"
+            assert _num_layers in self.decode_max_tokens_dict, f"Missing decode_max_tokens for {_num_layers}!"
+
+        # profile results (stored in ms in the profile file)
+        self.prompt_bs2time: Dict[int, float] = {
+            bs: ms * MilliSec for bs, ms in machine_profile["prompt_bs2time_ms"].items()
+        }
+        self.prompt_bs2vram: Dict[int, float] = {
+            bs: 0 for bs in self.prompt_bs2time
+        }  # We set all values to 0, as vLLM has already considered this in #blocks.
+        self.decode_bs2time: Dict[int, float] = {
+            bs: ms * MilliSec for bs, ms in machine_profile["decode_bs2time_ms"].items()
+        }
+        self.decode_bs2vram: Dict[int, float] = {
+            bs: 0 for bs in self.decode_bs2time
+        }  # We set all values to 0, as vLLM has already considered this in #blocks.
+        assert 0 in self.prompt_bs2time and 0 in self.decode_bs2time, "Profile must start from batch size 0!"
+
+        # kv cache & activation backup cache
+        # kv_entry = vllm_num_block * block_size * num_layers
+        self.kv_cache_capacity: Dict[int, int] = {
+            _num_layers: VLLM_BLOCK_SIZE * vllm_num_blocks_dict[_num_layers] * _num_layers for _num_layers in
+            range(1, self.max_num_layers + 1)
+        }
+        self.activation_backup_capacity: Dict[int, int] = {
+            _num_layers: 0 for _num_layers in self.kv_cache_capacity
+        }  # We set all values to 0, as we do not consider activation backup for the moment
+
+        # inference settings are built in update_estimation
+        self.num_layers_to_inference_settings: Dict[int, InferenceSettings] = {}
+
+    def update_estimation(self, num_machines_dict: Dict[str, int], typical_layers_dict: Dict[str, int],
+                          normalized_perf_dict: Dict[str, float]) -> None:
+        """
+        Rebuild the inference settings with the given estimation of the cluster.
+
+        :param num_machines_dict: a dict of {machine_name -> num of machines}
+        :param typical_layers_dict: a dict of {machine_name -> typical number of layers}
+        :param normalized_perf_dict: a dict of {machine_name -> normalized performance}
+        :return: None
+        """
+        self.num_layers_to_inference_settings = {}
+        for cur_num_layers in range(1, self.max_num_layers + 1):
+            cur_workload_ratio = profiled_workload_ratio(
+                total_num_layers=self.total_num_layers,
+                target_machine_name=self.machine_name,
+                target_num_layers=cur_num_layers,
+                num_machines_dict=num_machines_dict,
+                typical_layers_dict=typical_layers_dict,
+                normalized_perf_dict=normalized_perf_dict
+            )
+            prompt_typical_requests, prompt_typical_tokens, decode_typical_tokens = profiled_typical_statistics(
+                workload_ratio=cur_workload_ratio,
+                num_kv_cache_entries=self.kv_cache_capacity[cur_num_layers],
+                num_layers_on_node=cur_num_layers
+            )
+            assert prompt_typical_requests <= 1, "Typical requests should be less than 1!"
+            self.num_layers_to_inference_settings[cur_num_layers] = InferenceSettings(
+                prompt_max_requests=self.prompt_max_requests_dict[cur_num_layers],
+                prompt_max_tokens=self.prompt_max_requests_dict[cur_num_layers] * MAX_INPUT_LEN,
+                prompt_typical_requests=prompt_typical_requests,
+                prompt_typical_tokens=prompt_typical_tokens,
+                decode_max_context=self.decode_max_tokens_dict[cur_num_layers] * DECODE_PER_TOKEN_MAX_CONTEXT,
+                decode_max_tokens=self.decode_max_tokens_dict[cur_num_layers],
+                decode_typical_tokens=decode_typical_tokens
+            )
+
+    def get_profiling_results(self) -> MachineProfile:
+        """
+        Get the profiling results of running one layer of the model on the machine.
+
+        :return: MachineProfile
+        """
+        machine_profile = MachineProfile(prompt_bs2time=self.prompt_bs2time, prompt_bs2vram=self.prompt_bs2vram,
+                                         decode_bs2time=self.decode_bs2time, decode_bs2vram=self.decode_bs2vram)
+        return machine_profile
+
+    def get_max_num_layers(self) -> int:
+        """
+        Get the max number of layers that can be loaded into this machine.
+
+        :return: max number of layers that can be loaded into the machine
+        """
+        return self.max_num_layers
+
+    def get_inference_settings(self, num_on_node_layers: int) -> InferenceSettings:
+        """
+        Get the inference settings when there are given number of layers on node.
+        Note: The inference settings are dependent on the number of layers.
+
+        :param num_on_node_layers: number of layers on node
+        :return: inference settings
+        """
+        assert 0 < num_on_node_layers <= self.max_num_layers, "Bad number of layers on node!"
+        assert num_on_node_layers in self.num_layers_to_inference_settings, "Estimation not updated!"
+        return self.num_layers_to_inference_settings[num_on_node_layers]
+
+    def get_typical_token_throughput(self, num_on_node_layers: int) -> float:
+        """
+        Get typical token throughput when there are given number of layers on node.
+
+        :param num_on_node_layers: number of layers on node
+        :return: typical token throughput (in #tokens/s)
+        """
+        inference_settings = self.get_inference_settings(num_on_node_layers=num_on_node_layers)
+        prompt_typical_requests = inference_settings.prompt_typical_requests
+        prompt_typical_tokens = inference_settings.prompt_typical_tokens
+        decode_typical_tokens = inference_settings.decode_typical_tokens
+
+        # some helper functions
+        from simulator.event_simulator.utils import linear_interpolate
+
+        def _get_prompt_time(prompt_num_tokens: int) -> float:
+            prompt_left, prompt_right = -1, 1000 * 1000
+            for prompt_point in self.prompt_bs2time:
+                if prompt_left < prompt_point <= prompt_num_tokens:
+                    prompt_left = prompt_point
+                if prompt_num_tokens <= prompt_point < prompt_right:
+                    prompt_right = prompt_point
+            return linear_interpolate(x_0=prompt_left, y_0=self.prompt_bs2time[prompt_left],
+                                      x_1=prompt_right, y_1=self.prompt_bs2time[prompt_right],
+                                      x_target=prompt_num_tokens)
+
+        def _get_decode_time(decode_num_tokens: int) -> float:
+            decode_left, decode_right = -1, 1000 * 1000
+            for decode_point in self.decode_bs2time:
+                if decode_left < decode_point <= decode_num_tokens:
+                    decode_left = decode_point
+                if decode_num_tokens <= decode_point < decode_right:
+                    decode_right = decode_point
+            return linear_interpolate(x_0=decode_left, y_0=self.decode_bs2time[decode_left],
+                                      x_1=decode_right, y_1=self.decode_bs2time[decode_right],
+                                      x_target=decode_num_tokens)
+
+        # calculation method is dependent on prompt typical requests
+        if prompt_typical_requests >= 1:
+            # in linear region, no need to rescale
+            total_tokens = prompt_typical_tokens + decode_typical_tokens
+            layer_prompt_time = _get_prompt_time(prompt_num_tokens=prompt_typical_tokens)
+            layer_decode_time = _get_decode_time(decode_num_tokens=decode_typical_tokens)
+            total_time = num_on_node_layers * (layer_prompt_time + layer_decode_time)
+            return total_tokens / total_time
+        else:
+            # need to scale to 1
+            rescaling = 1 / prompt_typical_requests
+            total_tokens = rescaling * (prompt_typical_tokens + decode_typical_tokens)
+            layer_prompt_time = _get_prompt_time(prompt_num_tokens=int(prompt_typical_tokens * rescaling))
+            layer_decode_time = _get_decode_time(decode_num_tokens=decode_typical_tokens) * rescaling
+            total_time = num_on_node_layers * (layer_prompt_time + layer_decode_time)
+            return total_tokens / total_time
+
+    def get_kv_cache_capacity(self, num_on_node_layers: int) -> int:
+        """
+        Get the kv cache capacity of this machine when using the current model.
+
+        :param num_on_node_layers: number of layers on node
+        :return: kv cache capacity
+        """
+        return self.kv_cache_capacity[num_on_node_layers]
+
+    def get_activation_backup_capacity(self, num_on_node_layers: int) -> int:
+        """
+        Get the activation backup capacity of this machine when using the current model.
+
+        :param num_on_node_layers: number of layers on node
+        :return: activation backup capacity
+        """
+        return self.activation_backup_capacity[num_on_node_layers]
+
+
+class ProfiledModelStatistics(ModelStatistics):
+    def __init__(self, profile_dir: str, num_machines_dict: Dict[str, int]) -> None:
+        """
+        Model statistics loaded from a profile directory. The directory contains one model.json (model level
+        statistics) and one <machine_name>.json for each machine type (see profile_fitter.py). Each profile
+        file is read only once, and the normalized performance is estimated in memory using the same fixed
+        point iteration as LLaMa70BStatistics. New machine types can be added by adding a new profile file.
+
+        :param profile_dir: path to the profile directory of the model
+        :param num_machines_dict: {machine_name -> num of machine}
+        :return: None
+        """
+        # model statistics
+        model_profile = load_profile_json(file_name=os.path.join(profile_dir, MODEL_PROFILE_FILE_NAME))
+        self.token_size: float = model_profile["token_size"]
+        self.activation_size: float = model_profile["activation_size"]
+        self.model_param_sizes: List[float] = model_profile["model_param_sizes"]
+        total_num_layers: int = model_profile["num_layers"]
+        assert len(self.model_param_sizes) == total_num_layers, "Total layer number mismatch!"
+        # model name is optional in model.json (profiles of new models may not have a ModelName)
+        self.model_name: str or None = model_profile.get("model_name", None)
+        self.num_layers: int = total_num_layers
+
+        # load machine profiles (only the types that appear in the cluster)
+        self.machines: Dict[str, ProfiledModelOnMachine] = {}
+        for machine_name in num_machines_dict:
+            machine_profile_path = os.path.join(profile_dir, f"{machine_name}.json")
+            assert os.path.exists(machine_profile_path), f"Profile of {machine_name} not found in {profile_dir}!"
+            machine_profile = load_profile_json(file_name=machine_profile_path)
+            assert machine_profile["machine_name"] == machine_name, "Machine name mismatch!"
+            self.machines[machine_name] = ProfiledModelOnMachine(machine_profile=machine_profile,
+                                                                 total_num_layers=total_num_layers)
+
+        # estimate the typical number of layers on node
+        typical_layers_dict = {_name: _machine.typical_layers for _name, _machine in self.machines.items()}
+        total_layer_capacity = 0
+        for machine_name in num_machines_dict:
+            total_layer_capacity += num_machines_dict[machine_name] * typical_layers_dict[machine_name]
+        if total_layer_capacity < total_num_layers * model_profile["small_cluster_ratio"]:
+            typical_layers_dict = {_name: _machine.typical_layers_small_cluster for _name, _machine in
+                                   self.machines.items()}
+
+        # estimate the normalized performance
+        normalized_perf_dict = {_name: _machine.initial_normalized_perf for _name, _machine in self.machines.items()}
+        for iteration in range(model_profile["num_iterations"]):
+            new_normalized_perf_dict = {}
+            for machine_name, machine in self.machines.items():
+                machine.update_estimation(num_machines_dict=num_machines_dict,
+                                          typical_layers_dict=typical_layers_dict,
+                                          normalized_perf_dict=normalized_perf_dict)
+                typical_tp = machine.get_typical_token_throughput(num_on_node_layers=typical_layers_dict[machine_name])
+                new_normalized_perf_dict[machine_name] = typical_tp * typical_layers_dict[machine_name]
+            normalized_perf_dict = new_normalized_perf_dict
+
+        # save the final results
+        self.num_machines_dict: Dict[str, int] = num_machines_dict
+        self.typical_layers_dict: Dict[str, int] = typical_layers_dict
+        self.normalized_perf_dict: Dict[str, float] = normalized_perf_dict
+        for machine in self.machines.values():
+            machine.update_estimation(num_machines_dict=num_machines_dict,
+                                      typical_layers_dict=typical_layers_dict,
+                                      normalized_perf_dict=normalized_perf_dict)
+
+    def check_type_exist(self, machine_type: str) -> bool:
+        """
+        Check if the given machine type exists in the current cluster.
+
+        :param machine_type: machine type
+        :return: True if the given machine type exists in the current model, False otherwise
+        """
+        return machine_type in self.machines
+
+    def get_profiling_results(self, machine_type: str) -> MachineProfile:
+        """
+        Get the profiling results of running one layer of the model on given type of machine.
+
+        :param machine_type: machine type
+        :return: MachineProfile
+        """
+        assert self.check_type_exist(machine_type), "Machine type not found!"
+        return self.machines[machine_type].get_profiling_results()
+
+    def get_max_num_layers(self, machine_type: str) -> int:
+        """
+        Get the max number of layers the given type of machine can hold.
+
+        :param machine_type: machine type
+        :return: max number of layers the given type of machine can hold
+        """
+        assert self.check_type_exist(machine_type), "Machine type not found!"
+        return self.machines[machine_type].get_max_num_layers()
+
+    def get_inference_settings(self, machine_type: str, num_on_node_layers: int) -> InferenceSettings:
+        """
+        Get the inference settings of the given machine type when there are given number of layers.
+
+        :param machine_type: machine type
+        :param num_on_node_layers: number of layers on node
+        :return: InferenceSettings
+        """
+        assert self.check_type_exist(machine_type), "Machine type not found!"
+        return self.machines[machine_type].get_inference_settings(num_on_node_layers=num_on_node_layers)
+
+    def get_typical_token_throughput(self, machine_type: str, num_on_node_layers: int) -> float:
+        """
+        Get the typical token throughput of given machine type when there are given number of layers on node.
+        Note: this value is the time needed to infer all these layers
+
+        :param machine_type: machine type
+        :param num_on_node_layers: number of layers on node
+        :return: typical token throughput (in #tokens / second)
+        """
+        assert self.check_type_exist(machine_type), "Machine type not found!"
+        return self.machines[machine_type].get_typical_token_throughput(num_on_node_layers=num_on_node_layers)
+
+    def get_kv_cache_capacity(self, machine_type: str, num_on_node_layers: int) -> int:
+        """
+        Get the kv cache capacity of given machine type when using the current model.
+
+        :param machine_type: machine type
+        :param num_on_node_layers: number of layers on node
+        :return: kv cache capacity
+        """
+        assert self.check_type_exist(machine_type), "Machine type not found!"
+        return self.machines[machine_type].get_kv_cache_capacity(num_on_node_layers=num_on_node_layers)
+
+    def get_activation_backup_capacity(self, machine_type: str, num_on_node_layers: int) -> int:
+        """
+        Get the activation backup capacity of given machine type when using the current model.
+
+        :param machine_type: machine type
+        :param num_on_node_layers: number of layers on node
+        :return: activation backup capacity
+        """
+        assert self.check_type_exist(machine_type), "Machine type not found!"
+        return self.machines[machine_type].get_activation_backup_capacity(num_on_node_layers=num_on_node_layers)
+
+    # ----------------------------------------- Model ----------------------------------------- #
+
+    def get_model_params(self) -> List[float]:
+        """
+        Get the param size list of the model.
+
+        :return: a list of floats, representing the param size of each layer
+        """
+        return self.model_param_sizes
+
+    def get_model_token_size(self) -> float:
+        """
+        Get the token size of the model.
+
+        :return: token size
+        """
+        return self.token_size
+
+    def get_model_activation_size(self) -> float:
+        """
+        Get the activation size of the model.
+
+        :return: activation size of a token
+        """
+        return self.activation_size
@@ -1,6 +1,6 @@
 # 2023.01.25 Yixuan Mei
 import math
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Set
 
 from simulator.event_simulator.request import InferenceRequest, PipelineStage
 from simulator.event_simulator.network_link import NetworkLink
@@ -64,6 +64,8 @@ class GlobalFlowScheduler(BaseScheduler):
     def schedule_transmission(self, node: ComputeNode or SourceNode) -> Tuple[List[TransmissionSchedule], List[int]]:
         """
         Schedule transmission for a given node, send out requests based on the globally computed schedule.
+        Note: if the codec of a free link coalesces messages, all requests waiting for that link are sent
+              together in one transmission (otherwise one request is sent at a time)
 
         :param node: the node that initializes the transmission.
         :return: a list of transmission schedule, list of uids of nodes that needs transmission scheduling
@@ -73,36 +75,52 @@ class GlobalFlowScheduler(BaseScheduler):
         # find all requests that can be scheduled
         scheduled_request_uids: List[int] = []
         link_unavailable: Dict[int, bool] = {link_uid: False for link_uid in node.outbound_links}
+        coalescing_link_uids: Set[int] = set()
         for request_uid, request in node.outbound_request_dict.items():
             # get information about next pipeline stage for current request
             next_pipeline_stage: PipelineStage = request.get_next_pipeline_stage()
             next_link_uid: int = next_pipeline_stage.link_uid
             next_link: NetworkLink = node.outbound_links[next_link_uid]
 
+            # requests for a free link that coalesces messages are sent together
+            if next_link_uid in coalescing_link_uids:
+                scheduled_request_uids.append(request_uid)
+                continue
+
             # if we have not marked the target link as unavailable, check whether we can send the request
             if not link_unavailable[next_link_uid]:
                 # check whether this link is busy
                 # TODO: when there are backup objects, need to check type
                 if len(next_link.requests_on_the_fly) == 0:
                     scheduled_request_uids.append(request_uid)
+                    if next_link.link_codec is not None and next_link.link_codec.coalesce_messages:
+                        coalescing_link_uids.add(next_link_uid)
 
                 # whether this link was free or not, it will not be free after this check
                 link_unavailable[next_link_uid] = True
 
         # build transmission schedule
         transmission_schedule: List[TransmissionSchedule] = []
+        coalesced_schedules: Dict[int, TransmissionSchedule] = {}
         for request_uid in scheduled_request_uids:
             # find the request and march pipeline stage forward
             request: InferenceRequest = node.outbound_request_dict[request_uid]
             request.march_pipeline_stage()
 
-            # generate schedule entry
+            # coalesce into the existing schedule entry of the link
             current_stage: PipelineStage = request.get_current_pipeline_stage()
+            if current_stage.link_uid in coalesced_schedules:
+                coalesced_schedules[current_stage.link_uid].requests.append(request)
+                continue
+
+            # generate schedule entry
             new_schedule_entry = TransmissionSchedule(link_uid=current_stage.link_uid,
                                                       bandwidth_usage=math.floor(current_stage.bandwidth_usage),
                                                       requests=[request],
                                                       transmission_type=TransmissionType.NormalExecution)
             transmission_schedule.append(new_schedule_entry)
+            if current_stage.link_uid in coalescing_link_uids:
+                coalesced_schedules[current_stage.link_uid] = new_schedule_entry
         return transmission_schedule, []
 
     def schedule_execution(self, node: ComputeNode, executable_requests: List[InferenceRequest]) -> ExecutionSchedule:
@@ -132,6 +132,30 @@ class KVExpectation:
                 expected_output_length_ratio=self.kv_param.expected_output_length_ratio
             )
 
+    def update_layout(self, simulator: ClusterSimulator) -> None:
+        """
+        Update the KV expectations of compute nodes that have reloaded a different model. Such nodes must be
+        drained (i.e. no expected kv cache usage) before reloading.
+
+        :param simulator: cluster simulator
+        :return: None
+        """
+        assert self.initialized, "KV Expectation not initialized!"
+        for compute_node_id, compute_node in simulator.compute_nodes.items():
+            start_layer_idx = min(compute_node.in_vram_model_layers.keys())
+            end_layer_idx = max(compute_node.in_vram_model_layers.keys()) + 1
+            status: KVExpectedStatus = self.node_uid_to_status[compute_node_id]
+            if (status.start_layer_idx, status.end_layer_idx, status.total_kv_capacity) == \
+                    (start_layer_idx, end_layer_idx, compute_node.kv_cache_capacity):
+                continue
+            assert status.avail_kv_capacity == status.total_kv_capacity, "Found reloaded node that is not drained!"
+            self.node_uid_to_status[compute_node_id] = KVExpectedStatus(
+                node_uid=compute_node_id, start_layer_idx=start_layer_idx, end_layer_idx=end_layer_idx,
+                total_capacity=compute_node.kv_cache_capacity,
+                expected_kv_hwm=self.kv_param.expected_kv_hwm,
+                expected_output_length_ratio=self.kv_param.expected_output_length_ratio
+            )
+
     def add_request(self, input_seq_length: int, route: List[int],
                     start_idx_list: List[int], end_idx_list: List[int]) -> None:
         """
@@ -4,6 +4,8 @@ import networkx as nx
 from typing import Dict, List, Tuple
 
 from simulator.event_simulator.base_node import NodeType
+from simulator.event_simulator.model import ModelStatus
+from simulator.event_simulator.network_link import NetworkLink
 from simulator.event_simulator.cluster_simulator import ClusterSimulator
 from simulator.event_simulator.utils import is_close
 
@@ -113,6 +115,27 @@ class FlowGraph:
         assert isinstance(self.flow_graph, nx.DiGraph), "Graph type not supported!"
         self.flow_graph.add_edge(u_of_edge=f"{prev_node_uid}_out", v_of_edge=f"{next_node_uid}_in", capacity=throughput)
 
+    def is_link_valid(self, link: NetworkLink) -> bool:
+        """
+        Check whether a link can be used with the models in vram of its two end points (partial inference is
+        allowed, same as ILPLayout.check_link_validity). Links in a cluster file generated for a layout are
+        always valid, but a node may reload a different model during simulation.
+
+        :param link: the link to check
+        :return: whether the link is valid
+        """
+        last_layer_id: int = len(self.cluster_simulator.model) - 1
+        if link.node_in_type == NodeType.Source:
+            return 0 in link.node_out.in_vram_model_layers
+        elif link.node_out_type == NodeType.Sink:
+            return last_layer_id in link.node_in.in_vram_model_layers
+        elif len(link.node_in.in_vram_model_layers) == 0 or len(link.node_out.in_vram_model_layers) == 0:
+            return False
+        else:
+            prev_end_layer_idx: int = max(link.node_in.in_vram_model_layers) + 1
+            next_layer_ids = link.node_out.in_vram_model_layers
+            return min(next_layer_ids) <= prev_end_layer_idx <= max(next_layer_ids)
+
     def update_flow(self, time_stamp: float) -> Tuple[float, Dict[str, Dict[str, float]]]:
         """
         Create flow graph at current timestamp.
@@ -165,12 +188,17 @@ class FlowGraph:
             outbound_nic_throughput: float = compute_node.outbound_nic_speed / outbound_transmission_size
 
             # calculate inference throughput
-            num_layers_on_node = len(compute_node.in_vram_model_layers)
-            inference_throughput: float = self.cluster_simulator.model_manager.get_typical_token_throughput(
-                machine_type=compute_node.machine_type, num_on_node_layers=num_layers_on_node
-            )
-            assert is_close(inference_throughput, compute_node.get_typical_token_throughput()), \
-                "Typical inference throughput mismatch!"
+            # nodes that are draining or loading a new model take no new flow
+            if compute_node_uid in self.cluster_simulator.draining_compute_nodes or \
+                    not compute_node.model_status == ModelStatus.Ready:
+                inference_throughput: float = 0
+            else:
+                num_layers_on_node = len(compute_node.in_vram_model_layers)
+                inference_throughput: float = self.cluster_simulator.model_manager.get_typical_token_throughput(
+                    machine_type=compute_node.machine_type, num_on_node_layers=num_layers_on_node
+                )
+                assert is_close(inference_throughput, compute_node.get_typical_token_throughput()), \
+                    "Typical inference throughput mismatch!"
 
             # add node
             self.add_compute_node(node_uid=compute_node_uid, inference_throughput=inference_throughput,
@@ -181,9 +209,14 @@ class FlowGraph:
             # calculate link throughput
             if link.node_in_type == NodeType.Source or link.node_out_type == NodeType.Sink:
                 transmission_size: float = self.parameters.token_size
+            elif link.link_codec is not None:
+                # activations are quantized and compressed on the wire
+                transmission_size: float = link.link_codec.get_token_transmission_size(
+                    token_size=self.parameters.token_size, activation_size=self.parameters.token_activation_size
+                )
             else:
                 transmission_size: float = self.parameters.token_size + self.parameters.token_activation_size
-            link_throughput: float = link.bandwidth / transmission_size
+            link_throughput: float = link.bandwidth / transmission_size if self.is_link_valid(link=link) else 0
 
             # add link
             self.add_link(prev_node_uid=link.node_in.node_uid, next_node_uid=link.node_out.node_uid,
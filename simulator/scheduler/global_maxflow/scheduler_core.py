@@ -80,7 +80,7 @@ class SchedulerNode:
                 used_token_throughput: float = flow_graph.get_link_flow(prev_node_uid=prev_node_uid,
                                                                         next_node_uid=self.node_uid)["transmission"]
                 speed: float = node.inbound_links[prev_link_uid].bandwidth
-                used_speed: float = speed * used_token_throughput / token_throughput
+                used_speed: float = speed * used_token_throughput / token_throughput if token_throughput > 0 else 0
                 self.inbound_links_latency.append(latency)
                 self.inbound_links_speed.append(speed)
                 self.inbound_links_used_speed.append(used_speed)
@@ -157,7 +157,7 @@ class SchedulerNode:
                 used_token_throughput: float = flow_graph.get_link_flow(prev_node_uid=self.node_uid,
                                                                         next_node_uid=next_node_uid)["transmission"]
                 speed: float = node.outbound_links[next_link_uid].bandwidth
-                used_speed: float = speed * used_token_throughput / token_throughput
+                used_speed: float = speed * used_token_throughput / token_throughput if token_throughput > 0 else 0
                 self.outbound_links_latency.append(latency)
                 self.outbound_links_speed.append(speed)
                 self.outbound_links_used_speed.append(used_speed)
@@ -245,7 +245,7 @@ class SchedulerNode:
                                                                        self.outbound_links_used_token_throughput,
                                                                        self.outbound_simulator_nodes):
             # filter 1 & 3
-            if token_throughput < 0.05 * sum_of_used_token_throughput:
+            if token_throughput <= 0 or token_throughput < 0.05 * sum_of_used_token_throughput:
                 mask.append(False)
                 reason.append("Fail-Flow")
                 continue
@@ -363,7 +363,11 @@ class SchedulerNode:
         # update loads over the corresponding link
         index: int = self.outbound_link_uids.index(link_uid)
         assert index == self.outbound_node_uids.index(node_uid), "Index mismatch!"
-        self.execution_scheduler.update_loads(workload=request.token_seq_length, index=index)
+
+        # the route may be allocated before the latest scheduler update (e.g. before its next node starts
+        # draining), in which case the link may have no flow now and its load is not tracked
+        if not self.execution_scheduler.capacities[index] == 0:
+            self.execution_scheduler.update_loads(workload=request.token_seq_length, index=index)
 
 
 class SchedulerCore:
@@ -406,10 +410,22 @@ class SchedulerCore:
 
         # rebuild topology
         if self.creation_time_stamp is not None:
-            # TODO: in this branch, we are updating an existing scheduler in node failure, need to
-            #  implement weight / loads migration
+            # Note: 1. only updates with an unchanged topology are supported (nodes may be draining or reloading
+            #          models), so we rebuild the scheduler nodes from the new flow graph, and IWRR loads restart
+            #          from zero
+            #       2. queries on the fly keep their routes, their kv expectation is kept, and nodes that have
+            #          reloaded a different model get a new kv expectation entry
+            assert set(self.scheduler_nodes.keys()) == {self.cluster.source_node.node_uid,
+                                                        self.cluster.sink_node.node_uid,
+                                                        *self.cluster.compute_nodes.keys()}, \
+                "Topology change (e.g. node failure) is not supported when updating the scheduler!"
             self.creation_time_stamp = time_stamp
-            raise NotImplementedError
+            self.scheduler_nodes = {}
+            for node in [self.cluster.source_node, self.cluster.sink_node] + list(self.cluster.compute_nodes.values()):
+                self.scheduler_nodes[node.node_uid] = SchedulerNode(node=node, flow_graph=self.flow_graph,
+                                                                    scheduler_core=self,
+                                                                    scheduling_mode=self.scheduling_mode)
+            self.kv_expectation.update_layout(simulator=self.cluster)
 
         else:
             # build for the first time
@@ -46,7 +46,7 @@ class MaxFlowScheduler(BaseScheduler):
         # use IWRR to schedule all requests on this node (the list may contain requests that have been
         # scheduled and those will be ignored)
         self.cluster_topology.schedule_all_requests(node_uid=node.node_uid,
-                                                    request_uids=list(node.outbound_request_dict.keys()))
+                                                    request_dict=node.outbound_request_dict)
 
         # determine the free links and bandwidth usage over them
         free_links: Dict[int, float] = {}
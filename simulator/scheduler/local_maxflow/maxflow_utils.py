@@ -2,13 +2,15 @@
 import copy
 import networkx as nx
 
-from typing import List, Dict, Tuple
+from collections import deque
+from typing import List, Dict, Deque, Tuple
 
 from simulator.event_simulator.cluster_simulator import ClusterSimulator
 from simulator.event_simulator.network_link import NetworkLink
 from simulator.event_simulator.base_node import NodeType
 from simulator.event_simulator.compute_node import ComputeNode
 from simulator.event_simulator.coordinator_node import SourceNode, SinkNode
+from simulator.event_simulator.request import InferenceRequest
 
 
 class MaxFlowParameters:
@@ -27,6 +29,8 @@ class RequestDestinationCache:
     def __init__(self, all_link_uids: List[int]) -> None:
         """
         A cache for request destination.
+        Note: 1. requests first enter the cache as unscheduled (see add_new_requests), and are then assigned a
+                 link (see add_request). All operations are O(1) (amortized) per request.
 
         :param all_link_uids: uids of all outbound links from this node
         :return: None
@@ -36,8 +40,12 @@ class RequestDestinationCache:
 
         # cache: request_uid -> link_uid
         self.cache: Dict[int, int] = {}
-        # inverse_cache: link_uid -> the list of request_uids waiting on this link
-        self.inverse_cache: Dict[int, List[int]] = {link_uid: [] for link_uid in all_link_uids}
+        # inverse_cache: link_uid -> the queue of request_uids waiting on this link
+        self.inverse_cache: Dict[int, Deque[int]] = {link_uid: deque() for link_uid in all_link_uids}
+
+        # requests that have arrived but are not assigned a link (dict as an ordered set, queue in arrival order)
+        self.unscheduled_request_uids: Dict[int, None] = {}
+        self.unscheduled_queue: Deque[int] = deque()
 
     def contains(self, request_uid: int) -> bool:
         """
@@ -48,6 +56,45 @@ class RequestDestinationCache:
         """
         return request_uid in self.cache
 
+    def add_new_requests(self, request_dict: Dict[int, InferenceRequest]) -> List[int]:
+        """
+        Find requests that are new to this cache and mark them as unscheduled.
+        Note: request_dict must be ordered by arrival, and requests known to the cache (scheduled or unscheduled)
+              must arrive before new requests. This holds for the outbound request dict of nodes, since requests
+              leave the dict as soon as they are popped from the cache. New requests are found by scanning
+              backwards, so the cost is proportional to the number of new requests.
+
+        :param request_dict: request_uid -> request, ordered by arrival
+        :return: uids of the new requests, in arrival order
+        """
+        new_request_uids: List[int] = []
+        for request_uid in reversed(request_dict):
+            if request_uid in self.cache or request_uid in self.unscheduled_request_uids:
+                break
+            new_request_uids.append(request_uid)
+        new_request_uids.reverse()
+
+        # mark as unscheduled
+        for request_uid in new_request_uids:
+            self.unscheduled_request_uids[request_uid] = None
+            self.unscheduled_queue.append(request_uid)
+        return new_request_uids
+
+    def get_next_unscheduled_request(self) -> int or None:
+        """
+        Get the earliest arrived request_uid that is not assigned a link, return None if there is no such request.
+        The request is still unscheduled until it is added with add_request.
+
+        :return: request_uid or None
+        """
+        while not len(self.unscheduled_queue) == 0:
+            request_uid: int = self.unscheduled_queue[0]
+            if request_uid in self.unscheduled_request_uids:
+                return request_uid
+            # already scheduled
+            self.unscheduled_queue.popleft()
+        return None
+
     def add_request(self, request_uid: int, link_uid: int) -> None:
         """
         Add a request into cache
@@ -61,6 +108,7 @@ class RequestDestinationCache:
         assert request_uid not in self.cache, "Request already cached!"
 
         # save to cache
+        self.unscheduled_request_uids.pop(request_uid, None)
         self.cache[request_uid] = link_uid
         self.inverse_cache[link_uid].append(request_uid)
 
@@ -73,15 +121,16 @@ class RequestDestinationCache:
         """
         assert link_uid in self.all_link_uids, "Unknown link uid!"
 
-        if not len(self.inverse_cache[link_uid]) == 0:
+        link_queue: Deque[int] = self.inverse_cache[link_uid]
+        if not len(link_queue) == 0:
             # pop a request and return
-            request_uid: int = self.inverse_cache[link_uid].pop(0)
-            assert request_uid in self.cache, "Cache mismatch!"
+            request_uid: int = link_queue.popleft()
+            assert self.cache[request_uid] == link_uid, "Cache mismatch!"
             del self.cache[request_uid]
             return request_uid
-        else:
-            # return None
-            return None
+
+        # return None
+        return None
 
 
 class TopologyNode:
@@ -473,13 +522,14 @@ class ClusterTopology:
 
         return self.max_flow, self.flow_dict
 
-    def schedule_all_requests(self, node_uid: int, request_uids: List[int]) -> None:
+    def schedule_all_requests(self, node_uid: int, request_dict: Dict[int, InferenceRequest]) -> None:
         """
-        Schedule all requests provided and write into cache. The "request_uids" can contain scheduled
-        request uids and those scheduled ones will be ignored.
+        Schedule all requests provided and write into cache. The "request_dict" can contain scheduled
+        requests and those scheduled ones will be ignored.
+        Note: only the requests that are new to the cache are touched (see RequestDestinationCache.add_new_requests)
 
         :param node_uid: node uid
-        :param request_uids: the list of request uids to schedule
+        :param request_dict: the outbound request dict of the node (request_uid -> request, ordered by arrival)
         :return: None
         """
         assert self.flow_computed, "Max flow must be computed before scheduling"
@@ -492,16 +542,13 @@ class ClusterTopology:
             target_node = self.compute_nodes[node_uid]
 
         # find all unscheduled request uids
-        unscheduled_request_uids: List[int] = []
-        for request_uid in request_uids:
-            if not target_node.transmission_scheduling_cache.contains(request_uid=request_uid):
-                unscheduled_request_uids.append(request_uid)
+        cache: RequestDestinationCache = target_node.transmission_scheduling_cache
+        unscheduled_request_uids: List[int] = cache.add_new_requests(request_dict=request_dict)
 
         # schedule each unscheduled request using IWRR
         for unscheduled_request_uid in unscheduled_request_uids:
             cur_link_uid: int = target_node.interleaved_weighted_round_robin()
-            target_node.transmission_scheduling_cache.add_request(request_uid=unscheduled_request_uid,
-                                                                  link_uid=cur_link_uid)
+            cache.add_request(request_uid=unscheduled_request_uid, link_uid=cur_link_uid)
 
     def get_next_requests(self, node_uid: int, link_uids: List[int]) -> Dict[int, int or None]:
         """
@@ -12,6 +12,15 @@ from simulator.scheduler.base_scheduler import BaseScheduler, TransmissionSchedu
 
 class NaiveScheduler(BaseScheduler):
     """ This scheduler is used for unit testing. """
+    def __init__(self, seed: int = 0) -> None:
+        """
+        Naive scheduler.
+
+        :param seed: random seed for path selection
+        :return: None
+        """
+        self.rng: random.Random = random.Random(seed)
+
     def schedule_transmission(self, node: ComputeNode or SourceNode) -> Tuple[List[TransmissionSchedule], List[int]]:
         """
         Schedule transmission for a given node. Assign one request to each idle link and use all link
@@ -37,7 +46,7 @@ class NaiveScheduler(BaseScheduler):
                 # Case 1: initialization phase
                 # assign a random path
                 _free_links = list(link_uid_to_request.items())
-                random.shuffle(_free_links)
+                self.rng.shuffle(_free_links)
                 for link_uid, cur_request in _free_links:
                     if cur_request is None:
                         # get layers to infer on next node
@@ -1,9 +1,10 @@
 # 2023.01.04 Yixuan Mei
-import math
+import heapq
 import random
-from typing import List, Dict, Tuple
+from typing import List, Dict, Set, Tuple
 
 from simulator.event_simulator.request import InferenceRequest, RequestPhase, PipelineStage
+from simulator.event_simulator.model import ModelLayer
 from simulator.event_simulator.compute_node import ComputeNode
 from simulator.event_simulator.coordinator_node import SourceNode, SinkNode
 from simulator.event_simulator.utils import TOKEN_SLOW_LINK
@@ -11,8 +12,181 @@ from simulator.scheduler.execution_policy import execution_policy
 from simulator.scheduler.base_scheduler import BaseScheduler, TransmissionSchedule, ExecutionSchedule, TransmissionType
 
 
+class NeighborQueueIndex:
+    def __init__(self, node: ComputeNode or SourceNode) -> None:
+        """
+        Queue lengths of the next nodes of a node. Links are bucketed by the queue length of their next node,
+        and a heap over the lengths finds the shortest queues in O(log degree).
+        Note: 1. queue lengths are pushed by the scheduler when they change (see update)
+              2. sink always has the shortest queue (as it has no queue)
+
+        :param node: the node that sends requests
+        :return: None
+        """
+        self.num_links: int = len(node.outbound_links)
+        self.sink_link_uids: List[int] = []
+
+        # link uid -> queue length, queue length -> link uids (dict as an ordered set)
+        self.queue_lengths: Dict[int, int] = {}
+        self.buckets: Dict[int, Dict[int, None]] = {}
+        # lengths of non-empty buckets (may contain lengths whose bucket has become empty)
+        self.length_heap: List[int] = []
+        self.lengths_in_heap: Set[int] = set()
+
+        for link_uid, link in node.outbound_links.items():
+            next_node = link.node_out
+            if isinstance(next_node, SinkNode):
+                self.sink_link_uids.append(link_uid)
+            elif isinstance(next_node, ComputeNode):
+                self.update(link_uid=link_uid, queue_length=next_node.inbound_queue_length)
+            else:
+                assert False, "Unknown node type!"
+
+    def update(self, link_uid: int, queue_length: int) -> None:
+        """
+        Update the queue length of the next node of a link.
+
+        :param link_uid: uid of the link
+        :param queue_length: new queue length of the next node
+        :return: None
+        """
+        old_queue_length: int or None = self.queue_lengths.get(link_uid, None)
+        if old_queue_length == queue_length:
+            return
+
+        # move the link to the new bucket
+        if old_queue_length is not None:
+            del self.buckets[old_queue_length][link_uid]
+            if len(self.buckets[old_queue_length]) == 0:
+                del self.buckets[old_queue_length]
+        self.queue_lengths[link_uid] = queue_length
+        self.buckets.setdefault(queue_length, {})[link_uid] = None
+        if queue_length not in self.lengths_in_heap:
+            heapq.heappush(self.length_heap, queue_length)
+            self.lengths_in_heap.add(queue_length)
+
+    def get_shortest_queue_links(self) -> List[int]:
+        """
+        Get all links whose next node has the shortest queue.
+
+        :return: uids of links with the shortest queue
+        """
+        if not len(self.sink_link_uids) == 0:
+            return self.sink_link_uids
+
+        # remove lengths whose bucket has become empty
+        while not len(self.length_heap) == 0:
+            shortest_queue_length: int = self.length_heap[0]
+            if shortest_queue_length in self.buckets:
+                return list(self.buckets[shortest_queue_length])
+            heapq.heappop(self.length_heap)
+            self.lengths_in_heap.remove(shortest_queue_length)
+        return []
+
+
+def remove_candidate_link(candidate_links: List[int], candidate_positions: Dict[int, int], link_uid: int) -> None:
+    """
+    Remove a link from the candidate links in O(1) (order of candidates is not kept).
+
+    :param candidate_links: list of candidate link uids
+    :param candidate_positions: link uid -> position in candidate_links
+    :param link_uid: the link to remove
+    :return: None
+    """
+    position: int = candidate_positions.pop(link_uid)
+    last_link_uid: int = candidate_links.pop()
+    if not last_link_uid == link_uid:
+        candidate_links[position] = last_link_uid
+        candidate_positions[last_link_uid] = position
+
+
 class ShortestQueueScheduler(BaseScheduler):
     """ Select the node with the shortest queue. """
+    def __init__(self, seed: int = 0) -> None:
+        """
+        Shortest queue scheduler.
+        Note: 1. queue lengths of next nodes are indexed per sending node and updated when compute nodes report
+                 queue length changes, so that each scheduling round does not poll all next nodes
+              2. layers to infer on each link are cached until the models on either end change
+              3. ties between shortest queues are broken with the scheduler's own random stream, so that
+                 runs are reproducible without seeding the global random module
+
+        :param seed: random seed for tie breaking
+        :return: None
+        """
+        self.rng: random.Random = random.Random(seed)
+
+        # node uid -> queue index of its next nodes
+        self.queue_indices: Dict[int, NeighborQueueIndex] = {}
+        # compute node uid -> (uid of node sending to it, link uid)
+        self.predecessors: Dict[int, List[Tuple[int, int]]] = {}
+        # link uid -> (layers on sender, layers on receiver, layers to infer on receiver)
+        self.layer_slices: Dict[int, Tuple[Dict[int, ModelLayer] or None, Dict[int, ModelLayer],
+                                           List[int]]] = {}
+
+    def get_queue_index(self, node: ComputeNode or SourceNode) -> NeighborQueueIndex:
+        """
+        Get the queue index of a node's next nodes, build it when the node is first seen.
+
+        :param node: the node that sends requests
+        :return: the queue index
+        """
+        queue_index: NeighborQueueIndex or None = self.queue_indices.get(node.node_uid, None)
+        if queue_index is not None and queue_index.num_links == len(node.outbound_links):
+            return queue_index
+
+        # build the index and listen to queue length changes of next nodes
+        queue_index = NeighborQueueIndex(node=node)
+        self.queue_indices[node.node_uid] = queue_index
+        for link_uid, link in node.outbound_links.items():
+            if isinstance(link.node_out, ComputeNode):
+                predecessors: List[Tuple[int, int]] = self.predecessors.setdefault(link.node_out.node_uid, [])
+                if (node.node_uid, link_uid) not in predecessors:
+                    predecessors.append((node.node_uid, link_uid))
+                link.node_out.inbound_queue_listener = self.update_queue_length
+        return queue_index
+
+    def update_queue_length(self, node: ComputeNode) -> None:
+        """
+        Called when the inbound queue length of a compute node changes.
+
+        :param node: the compute node
+        :return: None
+        """
+        for sender_uid, link_uid in self.predecessors.get(node.node_uid, []):
+            self.queue_indices[sender_uid].update(link_uid=link_uid, queue_length=node.inbound_queue_length)
+
+    def get_layers_to_infer(self, node: ComputeNode or SourceNode, link_uid: int) -> List[int] or None:
+        """
+        Get the layers to infer on the next node of a link.
+
+        :param node: the node that sends requests
+        :param link_uid: uid of the link
+        :return: layers to infer (None if next node is sink)
+        """
+        next_node = node.outbound_links[link_uid].node_out
+        if isinstance(next_node, SinkNode):
+            return None
+
+        # check cache (models are replaced as a whole when reloading)
+        layers_on_cur_node: Dict[int, ModelLayer] or None = None
+        if not isinstance(node, SourceNode):
+            layers_on_cur_node = node.in_vram_model_layers
+        cached_slice = self.layer_slices.get(link_uid, None)
+        if cached_slice is not None and cached_slice[0] is layers_on_cur_node and \
+                cached_slice[1] is next_node.in_vram_model_layers:
+            return cached_slice[2]
+
+        # compute layers to infer
+        if layers_on_cur_node is None:
+            layers_to_infer = sorted(list(next_node.in_vram_model_layers.keys()))
+        else:
+            cur_last_layer = max(layers_on_cur_node.keys())
+            layers_to_infer = sorted([x for x in next_node.in_vram_model_layers.keys() if x > cur_last_layer])
+            assert not len(layers_to_infer) == 0, "Can not infer any layer on next node!"
+        self.layer_slices[link_uid] = (layers_on_cur_node, next_node.in_vram_model_layers, layers_to_infer)
+        return layers_to_infer
+
     def schedule_transmission(self, node: ComputeNode or SourceNode) -> Tuple[List[TransmissionSchedule], List[int]]:
         """
         Schedule transmission for a given node. Assign request to the link with shortest queue and use all link
@@ -31,70 +205,41 @@ class ShortestQueueScheduler(BaseScheduler):
             if available_bandwidth > TOKEN_SLOW_LINK:
                 free_links[link_uid] = available_bandwidth
 
-        # get all nodes with shortest queue
-        shortest_queue_length, shortest_queue_links = math.inf, []
-        for link_uid, link in node.outbound_links.items():
-            next_node = link.node_out
-            if isinstance(next_node, SinkNode):
-                # sink node always has the shortest queue (as it has no queue)
-                shortest_queue_links.append(link_uid)
-                break
-            elif isinstance(next_node, ComputeNode):
-                # compute nodes
-                queue_length = len(next_node.inbound_request_queue)
-                if queue_length < shortest_queue_length:
-                    shortest_queue_length = queue_length
-                    shortest_queue_links = [link_uid]
-                elif queue_length == shortest_queue_length:
-                    shortest_queue_links.append(link_uid)
-            else:
-                assert False, "Unknown node type!"
-
         # get free links with shortest queue
-        free_links_with_shortest_queue = []
-        for link_uid in shortest_queue_links:
-            if link_uid in free_links:
-                free_links_with_shortest_queue.append(link_uid)
+        shortest_queue_links: List[int] = self.get_queue_index(node=node).get_shortest_queue_links()
+        candidate_links: List[int] = [link_uid for link_uid in shortest_queue_links if link_uid in free_links]
+        candidate_positions: Dict[int, int] = {link_uid: idx for idx, link_uid in enumerate(candidate_links)}
 
         # assign requests to links
         link_uid_to_request: Dict[int, InferenceRequest or None] = {link_uid: None for link_uid in free_links}
+        num_unassigned_links: int = len(free_links)
         for request in node.outbound_request_dict.values():
+            if num_unassigned_links == 0:
+                break
+
             if request.phase == RequestPhase.Initialization:
                 # Case 1: initialization phase
-                # assign a random path
-                _free_links = list(link_uid_to_request.items())
-                random.shuffle(_free_links)
-                for link_uid, cur_request in _free_links:
-                    # can not assign request to link without shortest queue
-                    if link_uid not in free_links_with_shortest_queue:
-                        continue
-
-                    if cur_request is None:
-                        # get layers to infer on next node
-                        next_node = node.outbound_links[link_uid].node_out
-                        if isinstance(node, SourceNode):
-                            layers_to_infer = sorted(list(next_node.in_vram_model_layers.keys()))
-                        elif isinstance(next_node, SinkNode):
-                            layers_to_infer = None
-                        else:
-                            layers_on_cur_node = sorted(list(node.in_vram_model_layers.keys()))
-                            layers_on_next_node = sorted(list(next_node.in_vram_model_layers.keys()))
-                            cur_last_layer = max(layers_on_cur_node)
-                            layers_to_infer = sorted([x for x in layers_on_next_node if x > cur_last_layer])
-                            assert not len(layers_to_infer) == 0, "Can not infer any layer on next node!"
-
-                        # set pipeline
-                        request.add_pipeline_stage(PipelineStage(link_uid=link_uid,
-                                                                 bandwidth_usage=-1,
-                                                                 node_uid=next_node.node_uid,
-                                                                 layers_to_infer=layers_to_infer))
-                        if not request.pipeline_set:
-                            request.mark_pipeline_set()
-                        request.march_pipeline_stage()
-
-                        # assign request to link
-                        link_uid_to_request[link_uid] = request
-                        break
+                # assign a random free link with shortest queue
+                if len(candidate_links) == 0:
+                    continue
+                link_uid: int = candidate_links[self.rng.randrange(len(candidate_links))]
+                remove_candidate_link(candidate_links=candidate_links, candidate_positions=candidate_positions,
+                                      link_uid=link_uid)
+
+                # set pipeline
+                next_node = node.outbound_links[link_uid].node_out
+                request.add_pipeline_stage(PipelineStage(link_uid=link_uid,
+                                                         bandwidth_usage=-1,
+                                                         node_uid=next_node.node_uid,
+                                                         layers_to_infer=self.get_layers_to_infer(node=node,
+                                                                                                  link_uid=link_uid)))
+                if not request.pipeline_set:
+                    request.mark_pipeline_set()
+                request.march_pipeline_stage()
+
+                # assign request to link
+                link_uid_to_request[link_uid] = request
+                num_unassigned_links -= 1
 
             elif request.phase == RequestPhase.Increment:
                 # Case 2: increment phase
@@ -104,6 +249,10 @@ class ShortestQueueScheduler(BaseScheduler):
                 if link_to_use in free_links and link_uid_to_request[link_to_use] is None:
                     request.march_pipeline_stage()
                     link_uid_to_request[link_to_use] = request
+                    num_unassigned_links -= 1
+                    if link_to_use in candidate_positions:
+                        remove_candidate_link(candidate_links=candidate_links,
+                                              candidate_positions=candidate_positions, link_uid=link_to_use)
 
             else:
                 assert False, "Unknown request type!"
@@ -164,11 +164,18 @@ class SwarmScheduler(BaseScheduler):
         :param node: the node that initializes the transmission.
         :return: a list of transmission schedule
         """
+        # find requests that arrived since last scheduling (only these are touched below)
+        current_swarm_node: SwarmNode = self.nodes[node.node_uid]
+        new_request_uids: List[int] = current_swarm_node.transmission_scheduling_cache.add_new_requests(
+            request_dict=node.outbound_request_dict
+        )
+
         # update statistics for incoming nodes using new requests
         retransmission_node_uids: Set[int] = set()
         if node.node_type == NodeType.Compute:
-            for request_uid, request in node.outbound_request_dict.items():
+            for request_uid in new_request_uids:
                 # find the node and link this request comes from
+                request: InferenceRequest = node.outbound_request_dict[request_uid]
                 last_node_uid, last_link_uid = request.get_last_node_and_link_uid()
                 assert last_node_uid in self.nodes, "Unknown node found!"
                 last_swarm_node: SwarmNode = self.nodes[last_node_uid]
@@ -195,7 +202,6 @@ class SwarmScheduler(BaseScheduler):
 
         # use IWRR to schedule the requests
         # determine the max number of requests that should be scheduled
-        current_swarm_node: SwarmNode = self.nodes[node.node_uid]
         if not len(current_swarm_node.outbound_link_uids) == 1:
             # if there are multiple outbound links, limit max_new_send to make sure the performance
             # will not drop a lot when there is a burst of requests coming in
@@ -206,27 +212,28 @@ class SwarmScheduler(BaseScheduler):
         max_new_schedules: int = max_new_sends - len(current_swarm_node.transmission_scheduling_cache.cache)
         assert max_new_schedules >= 0, "Bad new schedule count!"
 
-        # schedule the requests
+        # schedule the requests (in arrival order)
         scheduled_count: int = 0
-        for request_uid, request in node.outbound_request_dict.items():
-            if not current_swarm_node.transmission_scheduling_cache.contains(request_uid=request_uid):
-                if scheduled_count >= max_new_schedules:
-                    break
-
-                if request.phase == RequestPhase.Initialization:
-                    # initialization chooses a path that balances workload
-                    next_link_uid: int = current_swarm_node.choose_server()
-                elif request.phase == RequestPhase.Increment:
-                    # increment phase follows the path set during initialization
-                    next_pipeline_stage: PipelineStage = request.get_next_pipeline_stage()
-                    request.march_pipeline_stage()
-                    next_link_uid = next_pipeline_stage.link_uid
-                else:
-                    assert False, "Unknown request phase!"
-
-                current_swarm_node.transmission_scheduling_cache.add_request(request_uid=request_uid,
-                                                                             link_uid=next_link_uid)
-                scheduled_count += 1
+        while scheduled_count < max_new_schedules:
+            request_uid: int or None = current_swarm_node.transmission_scheduling_cache.get_next_unscheduled_request()
+            if request_uid is None:
+                break
+            request: InferenceRequest = node.outbound_request_dict[request_uid]
+
+            if request.phase == RequestPhase.Initialization:
+                # initialization chooses a path that balances workload
+                next_link_uid: int = current_swarm_node.choose_server()
+            elif request.phase == RequestPhase.Increment:
+                # increment phase follows the path set during initialization
+                next_pipeline_stage: PipelineStage = request.get_next_pipeline_stage()
+                request.march_pipeline_stage()
+                next_link_uid = next_pipeline_stage.link_uid
+            else:
+                assert False, "Unknown request phase!"
+
+            current_swarm_node.transmission_scheduling_cache.add_request(request_uid=request_uid,
+                                                                         link_uid=next_link_uid)
+            scheduled_count += 1
 
         # determine the free links and available bandwidth over them
         free_links: Dict[int, float] = {}
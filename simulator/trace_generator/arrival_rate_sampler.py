@@ -1,12 +1,12 @@
 # 2024.03.25 Yixuan Mei
 
-import random
-import pickle
+import numpy as np
 
 from enum import Enum
-from typing import List
 from pathlib import Path
 
+from simulator.trace_generator.dataset_cache import load_dataset
+
 
 class ArrivalRateSource(Enum):
     # Azure code: full of spikes
@@ -16,35 +16,37 @@ class ArrivalRateSource(Enum):
 
 
 class ArrivalRateSampler:
-    def __init__(self, arrival_rate_source: ArrivalRateSource, target_avg_request_throughput: float, seed: int) -> None:
+    def __init__(self, arrival_rate_source: ArrivalRateSource, target_avg_request_throughput: float,
+                 seed: int or np.random.SeedSequence) -> None:
         """
         Sample the arrival rate from the selected source (rescaled to target average request throughput).
+        Note: each sampler has its own random stream, so the samples only depend on the seed
 
         :param arrival_rate_source: source of arrival rate
         :param target_avg_request_throughput: target average request throughput (per second)
-        :param seed: random seed
+        :param seed: random seed (or a seed sequence spawned from a parent seed)
         :return: None
         """
         # parameters
         self.arrival_rate_source: ArrivalRateSource = arrival_rate_source
         self.target_avg_request_throughput: float = target_avg_request_throughput
-        self.seed: int = seed
-        random.seed(seed)
+        self.seed: int or np.random.SeedSequence = seed
+        self.rng: np.random.Generator = np.random.default_rng(seed)
 
-        # load the arrival rate data
+        # load the arrival rate data (memory-mapped, see dataset_cache.py)
         cur_abs_path = Path(__file__).parent.absolute()
         if self.arrival_rate_source == ArrivalRateSource.AzureCode:
-            with open(cur_abs_path / "arrival_rate/azure_code_arrive_time.pkl", "rb") as file:
-                arrival_rate_list: List[float] = pickle.load(file)
+            npy_path = cur_abs_path / "arrival_rate/azure_code_arrive_time.npy"
         elif self.arrival_rate_source == ArrivalRateSource.AzureConv:
-            with open(cur_abs_path / "arrival_rate/azure_conv_arrive_time.pkl", "rb") as file:
-                arrival_rate_list: List[float] = pickle.load(file)
-        assert len(arrival_rate_list) == 1200, "Arrival rate list length should be 1200 (i.e. 3s interval)!"
+            npy_path = cur_abs_path / "arrival_rate/azure_conv_arrive_time.npy"
+        else:
+            assert False, "Found unknown arrival rate source!"
+        raw_arrival_rates, original_avg_arrival_rate, _, _ = load_dataset(npy_path=str(npy_path))
+        assert len(raw_arrival_rates) == 1200, "Arrival rate list length should be 1200 (i.e. 3s interval)!"
+        self.raw_arrival_rates: np.ndarray = raw_arrival_rates
 
         # rescale the arrival rate (here each interval is 3s)
-        original_avg_request_throughput: float = sum(arrival_rate_list) / len(arrival_rate_list)
-        rescale_factor: float = 3 * target_avg_request_throughput / original_avg_request_throughput
-        self.arrival_rate_list: List[float] = [rescale_factor * rate for rate in arrival_rate_list]
+        self.rescale_factor: float = 3 * target_avg_request_throughput / original_avg_arrival_rate
 
     def sample_arrival_rate(self) -> float:
         """
@@ -52,5 +54,16 @@ class ArrivalRateSampler:
 
         :return: arrival rate
         """
-        index: int = random.randint(0, len(self.arrival_rate_list) - 1)
-        return self.arrival_rate_list[index]
+        index: int = int(self.rng.integers(0, len(self.raw_arrival_rates), dtype=np.int64))
+        return self.rescale_factor * float(self.raw_arrival_rates[index])
+
+    def sample_arrival_rates(self, num_samples: int) -> np.ndarray:
+        """
+        Sample the arrival rates of consecutive 3s intervals in a batch (same random stream as
+        sample_arrival_rate).
+
+        :param num_samples: number of intervals
+        :return: arrival rate of each interval
+        """
+        indices: np.ndarray = self.rng.integers(0, len(self.raw_arrival_rates), size=num_samples, dtype=np.int64)
+        return self.rescale_factor * self.raw_arrival_rates[indices].astype(np.float64)
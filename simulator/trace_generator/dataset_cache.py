@@ -0,0 +1,86 @@
+# 2026.10.19 Yixuan Mei
+
+import os
+import pickle
+import numpy as np
+
+from typing import Dict, List, Tuple
+
+
+# process-wide cache of memory-mapped datasets: npy path -> (array, average, cdf values, cdf probabilities)
+# Note: arrays are mapped read-only, so pages are shared by all samplers in this process and by all processes
+#       that map the same file (e.g. workers of a sweep)
+_dataset_cache: Dict[str, Tuple[np.ndarray, float, np.ndarray, np.ndarray]] = {}
+
+
+def get_statistics_path(npy_path: str) -> str:
+    """
+    Get the path of the statistics file stored alongside a dataset.
+
+    :param npy_path: path to the dataset (.npy)
+    :return: path to the statistics file (.npz)
+    """
+    return os.path.splitext(npy_path)[0] + "_stats.npz"
+
+
+def save_dataset(values: List[int] or List[float] or np.ndarray, npy_path: str) -> None:
+    """
+    Save a dataset as .npy (the smallest of int16 / int32 / int64 that holds integer data, float64 otherwise),
+    together with its average and CDF. Files are written to a temporary file first and then renamed, so that
+    readers never see partial files.
+
+    :param values: values in the dataset
+    :param npy_path: path to save the dataset (.npy)
+    :return: None
+    """
+    array: np.ndarray = np.asarray(values)
+    assert array.ndim == 1 and len(array) > 0, "Dataset must be a non-empty list of values!"
+    if np.issubdtype(array.dtype, np.integer):
+        for dtype in [np.int16, np.int32, np.int64]:
+            if np.iinfo(dtype).min <= array.min() and array.max() <= np.iinfo(dtype).max:
+                array = array.astype(dtype)
+                break
+    else:
+        array = array.astype(np.float64)
+
+    # statistics: average and CDF over distinct values
+    cdf_values, counts = np.unique(array, return_counts=True)
+    cdf_probs: np.ndarray = np.cumsum(counts) / len(array)
+
+    # write
+    tmp_npy_path: str = f"{npy_path}.{os.getpid()}.tmp.npy"
+    np.save(tmp_npy_path, array)
+    os.replace(tmp_npy_path, npy_path)
+    stats_path: str = get_statistics_path(npy_path=npy_path)
+    tmp_stats_path: str = f"{stats_path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_stats_path, average=np.mean(array), cdf_values=cdf_values, cdf_probs=cdf_probs)
+    os.replace(tmp_stats_path, stats_path)
+
+
+def convert_pickle_dataset(pickle_path: str, npy_path: str) -> None:
+    """
+    Convert a dataset stored as a pickled list of values into .npy (see save_dataset).
+
+    :param pickle_path: path to the pickled list
+    :param npy_path: path to save the dataset (.npy)
+    :return: None
+    """
+    with open(pickle_path, "rb") as file:
+        values: List[int] or List[float] = pickle.load(file)
+    save_dataset(values=values, npy_path=npy_path)
+
+
+def load_dataset(npy_path: str) -> Tuple[np.ndarray, float, np.ndarray, np.ndarray]:
+    """
+    Load a dataset memory-mapped (read-only), together with its precomputed average and CDF.
+
+    :param npy_path: path to the dataset (.npy)
+    :return: values, average, CDF values (sorted distinct values), CDF probabilities (P[X <= value])
+    """
+    npy_path = os.path.abspath(npy_path)
+    if npy_path not in _dataset_cache:
+        array: np.ndarray = np.load(npy_path, mmap_mode="r")
+        with np.load(get_statistics_path(npy_path=npy_path)) as statistics:
+            _dataset_cache[npy_path] = (array, float(statistics["average"]), statistics["cdf_values"],
+                                        statistics["cdf_probs"])
+    return _dataset_cache[npy_path]
@@ -1,12 +1,13 @@
 # 2024.03.24 Yixuan Mei
 
-import random
-import pickle
+import numpy as np
 
 from enum import Enum
 from typing import List, Tuple
 from pathlib import Path
 
+from simulator.trace_generator.dataset_cache import load_dataset
+
 
 class Dataset(Enum):
     # SharedGPT: https://huggingface.co/datasets/anon8231489123/ShareGPT_Vicuna_unfiltered
@@ -33,50 +34,38 @@ class Dataset(Enum):
 
 
 class LengthSampler:
-    def __init__(self, dataset: Dataset, seed: int) -> None:
+    def __init__(self, dataset: Dataset, seed: int or np.random.SeedSequence) -> None:
         """
         Sample the length of input and output from the dataset.
+        Note: each sampler has its own random stream, so the samples only depend on the seed (and not on
+              other samplers constructed in the same process)
 
         :param dataset: type of dataset
-        :param seed: random seed
+        :param seed: random seed (or a seed sequence spawned from a parent seed)
         :return: None
         """
         # save parameters
         self.dataset: Dataset = dataset
-        self.seed: int = seed
-        random.seed(seed)
+        self.seed: int or np.random.SeedSequence = seed
+        self.rng: np.random.Generator = np.random.default_rng(seed)
 
-        # load the dataset
+        # load the dataset (memory-mapped, with precomputed averages and CDFs, see dataset_cache.py)
         cur_abs_path = Path(__file__).parent.absolute()
         if self.dataset == Dataset.SharedGPT:
-            with open(cur_abs_path / "length_data/shared_gpt_input.pkl", "rb") as file:
-                input_length_list: List[int] = pickle.load(file)
-            with open(cur_abs_path / "length_data/shared_gpt_output.pkl", "rb") as file:
-                output_length_list: List[int] = pickle.load(file)
+            dataset_name = "shared_gpt"
         elif self.dataset == Dataset.Alpaca:
-            with open(cur_abs_path / "length_data/alpaca_input.pkl", "rb") as file:
-                input_length_list: List[int] = pickle.load(file)
-            with open(cur_abs_path / "length_data/alpaca_output.pkl", "rb") as file:
-                output_length_list: List[int] = pickle.load(file)
+            dataset_name = "alpaca"
         elif self.dataset == Dataset.AzureCode:
-            with open(cur_abs_path / "length_data/azure_code_input.pkl", "rb") as file:
-                input_length_list: List[int] = pickle.load(file)
-            with open(cur_abs_path / "length_data/azure_code_output.pkl", "rb") as file:
-                output_length_list: List[int] = pickle.load(file)
+            dataset_name = "azure_code"
         elif self.dataset == Dataset.AzureConversation:
-            with open(cur_abs_path / "length_data/azure_conv_input.pkl", "rb") as file:
-                input_length_list: List[int] = pickle.load(file)
-            with open(cur_abs_path / "length_data/azure_conv_output.pkl", "rb") as file:
-                output_length_list: List[int] = pickle.load(file)
+            dataset_name = "azure_conv"
         else:
             assert False, "Found unknown dataset!"
-        self.input_length_list: List[int] = input_length_list
-        self.output_length_list: List[int] = output_length_list
-        assert len(self.input_length_list) == len(self.output_length_list)
-
-        # some statistics
-        self.average_input_length: float = sum(self.input_length_list) / len(self.input_length_list)
-        self.average_output_length: float = sum(self.output_length_list) / len(self.output_length_list)
+        self.input_lengths, self.average_input_length, self.input_cdf_values, self.input_cdf_probs = \
+            load_dataset(npy_path=str(cur_abs_path / f"length_data/{dataset_name}_input.npy"))
+        self.output_lengths, self.average_output_length, self.output_cdf_values, self.output_cdf_probs = \
+            load_dataset(npy_path=str(cur_abs_path / f"length_data/{dataset_name}_output.npy"))
+        assert len(self.input_lengths) == len(self.output_lengths)
         self.average_length: float = self.average_input_length + self.average_output_length
 
     def sample_length(self) -> Tuple[int, int]:
@@ -85,8 +74,96 @@ class LengthSampler:
 
         :return: input length, output length
         """
-        index: int = random.randint(0, len(self.input_length_list) - 1)
-        return self.input_length_list[index], self.output_length_list[index]
+        index: int = int(self.rng.integers(0, len(self.input_lengths), dtype=np.int64))
+        return int(self.input_lengths[index]), int(self.output_lengths[index])
+
+    def sample_lengths(self, num_samples: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sample pairs of input and output length in a batch. This draws from the same random stream as
+        sample_length, i.e. sampling n pairs in a batch gives the same pairs as calling sample_length n times.
+
+        :param num_samples: number of pairs to sample
+        :return: input lengths, output lengths
+        """
+        indices: np.ndarray = self.rng.integers(0, len(self.input_lengths), size=num_samples, dtype=np.int64)
+        return self.input_lengths[indices], self.output_lengths[indices]
+
+    def get_average_length(self) -> float:
+        """
+        Get the average length of input and output.
+
+        :return: average length
+        """
+        return self.average_length
+
+    def get_length_cdf(self, output: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the CDF of input (or output) length.
+
+        :param output: whether to get the CDF of output length
+        :return: sorted distinct lengths, P[length <= each of them]
+        """
+        if output:
+            return self.output_cdf_values, self.output_cdf_probs
+        return self.input_cdf_values, self.input_cdf_probs
+
+
+class MixtureLengthSampler:
+    def __init__(self, datasets: List[Dataset], weights: List[float],
+                 seed: int or np.random.SeedSequence) -> None:
+        """
+        Sample the length of input and output from a weighted mixture of datasets.
+        Note: the dataset of each sample is chosen with probability proportional to its weight, and each
+              dataset is sampled with its own LengthSampler (and random stream).
+
+        :param datasets: datasets in the mixture
+        :param weights: weight of each dataset
+        :param seed: random seed (or a seed sequence spawned from a parent seed)
+        :return: None
+        """
+        assert len(datasets) == len(weights) and len(datasets) > 0, "Datasets and weights mismatch!"
+        assert all(weight >= 0 for weight in weights) and sum(weights) > 0, "Weights must be non-negative!"
+
+        # save parameters
+        self.datasets: List[Dataset] = datasets
+        self.weights: np.ndarray = np.array(weights, dtype=np.float64) / sum(weights)
+        self.seed: int or np.random.SeedSequence = seed
+        seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        mixture_seed, *dataset_seeds = seed_sequence.spawn(len(datasets) + 1)
+        self.rng: np.random.Generator = np.random.default_rng(mixture_seed)
+
+        # one length sampler for each dataset
+        self.length_samplers: List[LengthSampler] = [
+            LengthSampler(dataset=dataset, seed=dataset_seed) for dataset, dataset_seed in zip(datasets, dataset_seeds)
+        ]
+        self.average_length: float = float(sum(
+            weight * length_sampler.get_average_length()
+            for weight, length_sampler in zip(self.weights, self.length_samplers)
+        ))
+
+    def sample_length(self) -> Tuple[int, int]:
+        """
+        Sample a pair of input and output length.
+
+        :return: input length, output length
+        """
+        dataset_idx: int = int(self.rng.choice(len(self.datasets), p=self.weights))
+        return self.length_samplers[dataset_idx].sample_length()
+
+    def sample_lengths(self, num_samples: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sample pairs of input and output length in a batch.
+
+        :param num_samples: number of pairs to sample
+        :return: input lengths, output lengths
+        """
+        dataset_indices: np.ndarray = self.rng.choice(len(self.datasets), size=num_samples, p=self.weights)
+        input_lengths: np.ndarray = np.zeros(num_samples, dtype=np.int64)
+        output_lengths: np.ndarray = np.zeros(num_samples, dtype=np.int64)
+        for dataset_idx, length_sampler in enumerate(self.length_samplers):
+            mask: np.ndarray = dataset_indices == dataset_idx
+            input_lengths[mask], output_lengths[mask] = length_sampler.sample_lengths(num_samples=int(mask.sum()))
+        return input_lengths, output_lengths
 
     def get_average_length(self) -> float:
         """
@@ -1,7 +1,7 @@
 # 2024.04.22 Yixuan Mei
 
 from enum import Enum
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional
 
 from simulator.event_simulator.cluster_simulator import ClusterSimulator
 from simulator.event_simulator.query_manager import QueryManager
@@ -12,35 +12,56 @@ from simulator.scheduler.naive_scheduler import NaiveScheduler
 from simulator.scheduler.shortest_queue.shortest_queue_scheduler import ShortestQueueScheduler
 from simulator.trace_generator.trace_generator import ArrivalRateSource, Dataset, TraceGenerator
 from simulator.trace_generator.length_sampler import LengthSampler
+from simulator.trace_generator.trace_replayer import TraceReplayer
 
 
 class OnlineRequestFeeder:
-    def __init__(self, cluster_token_throughput: float, start_time: float, duration: float, seed: int = 0):
+    def __init__(self, cluster_token_throughput: float, start_time: float, duration: float, seed: int = 0,
+                 trace_replayer: TraceReplayer or None = None):
         """
         Online mode: request will arrive based on real arrival rates (with assigned average).
+        Note: if a trace replayer is given, requests are replayed from the request log instead (streamed
+              during simulation, cluster_token_throughput and seed are not used).
 
         :param cluster_token_throughput: token throughput of the cluster
         :param start_time: simulation start time
         :param duration: simulation duration
         :param seed: random seed
+        :param trace_replayer: replayer of a request log (None means generating the trace)
         """
         # record the parameters
         self.cluster_token_throughput: float = cluster_token_throughput
         self.start_time: float = start_time
         self.duration: float = duration
         self.seed: int = seed
+        self.trace_replayer: TraceReplayer or None = trace_replayer
+
+        # replayed traces are streamed during simulation
+        self.trace: List[Tuple[float, int, int]] or None = None
+        if trace_replayer is not None:
+            print(f"Online Request Feeder: replaying trace from {trace_replayer.trace_file_path}.")
+            return
 
         # initialize the trace generator and generate the trace
         self.trace_generator = TraceGenerator(arrival_rate_source=ArrivalRateSource.AzureConv,
                                               length_dataset=Dataset.AzureConversation,
                                               cluster_token_throughput=cluster_token_throughput, seed=seed)
-        self.trace: List[Tuple[float, int, int]] = self.trace_generator.generate_trace(start_time=start_time,
-                                                                                       duration=int(duration))
+        self.trace = self.trace_generator.generate_trace(start_time=start_time, duration=duration)
 
         # calculate real avg arrival rate
         total_tokens = sum([entry[1] + entry[2] for entry in self.trace])
         print(f"Online Request Feeder: avg token feeding throughput {total_tokens / duration}.")
 
+    def iter_trace(self) -> Iterator[Tuple[float, int, int]]:
+        """
+        Iterate through the trace.
+
+        :return: an iterator of (query arrive time, input length, output length)
+        """
+        if self.trace_replayer is not None:
+            return self.trace_replayer.iter_trace(start_time=self.start_time, duration=self.duration)
+        return iter(self.trace)
+
     def auto_simulate(self, simulator: ClusterSimulator, watch_items: Optional[List[str]] = None,
                       watch_interval: Optional[float] = None):
         """
@@ -51,19 +72,12 @@ class OnlineRequestFeeder:
         :param watch_interval: watch interval
         :return: None
         """
+        # arrivals are issued lazily by the simulator as simulated time advances
         query_manager: QueryManager = simulator.query_manager
-        for idx, request_arrival in enumerate(self.trace):
-            arrive_time, input_length, output_length = request_arrival
-            query_manager.issue_query(creation_time=arrive_time,
-                                      input_seq_length=input_length,
-                                      output_seq_length=output_length)
-            if idx + 1 < len(self.trace):
-                simulator.simulate(until=self.trace[idx + 1][0],  # next arrival time
-                                   watch_items=watch_items, watch_interval=watch_interval)
-            else:
-                simulator.simulate(watch_items=watch_items, watch_interval=watch_interval)
+        simulator.set_query_arrivals(query_arrivals=self.iter_trace())
+        simulator.simulate(watch_items=watch_items, watch_interval=watch_interval)
         assert len(query_manager.queries_on_the_fly) == 0, "Found unfinished queries!"
-        assert len(query_manager.finished_queries) == len(self.trace), "Some queries missing!"
+        assert len(query_manager.finished_queries) == simulator.num_issued_query_arrivals, "Some queries missing!"
 
 
 class OfflineRequestFeeder:
@@ -100,14 +114,12 @@ class OfflineRequestFeeder:
         # simulator
         self.simulator: Optional[ClusterSimulator] = None
 
-    def auto_simulate(self, simulator: ClusterSimulator, watch_items: Optional[List[str]] = None,
-                      watch_interval: Optional[float] = None) -> None:
+    def start(self, simulator: ClusterSimulator) -> None:
         """
-        Run simulation.
+        Register the feeder into the simulator and launch the initial queries. After this, the caller may drive
+        the simulation itself (e.g. when the layout is re-planned during simulation).
 
         :param simulator: the cluster simulator, it should be fully initialized
-        :param watch_items: items to watch during simulation
-        :param watch_interval: watch interval
         :return: None
         """
         query_manager: QueryManager = simulator.query_manager
@@ -122,6 +134,19 @@ class OfflineRequestFeeder:
             query_manager.issue_query(creation_time=self.start_time + i * 0.1,
                                       input_seq_length=input_length, output_seq_length=output_length)
 
+    def auto_simulate(self, simulator: ClusterSimulator, watch_items: Optional[List[str]] = None,
+                      watch_interval: Optional[float] = None) -> None:
+        """
+        Run simulation.
+
+        :param simulator: the cluster simulator, it should be fully initialized
+        :param watch_items: items to watch during simulation
+        :param watch_interval: watch interval
+        :return: None
+        """
+        # register the feeder and launch the initial queries
+        self.start(simulator=simulator)
+
         # simulate
         if self.stop_at_duration:
             simulator.simulate(until=self.start_time + self.duration,
@@ -1,8 +1,8 @@
 # 2024.03.25 Yixuan Mei
 
-import random
+import numpy as np
 
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 from simulator.trace_generator.arrival_rate_sampler import ArrivalRateSampler, ArrivalRateSource
 from simulator.trace_generator.length_sampler import LengthSampler, Dataset
@@ -13,6 +13,8 @@ class TraceGenerator:
                  cluster_token_throughput: float, seed: int) -> None:
         """
         Generate traces based on realistic datasets.
+        Note: arrival rates, arrive times and lengths are drawn from three independent random streams spawned
+              from the seed, so the trace only depends on the seed
 
         :param arrival_rate_source: source of arrival rate
         :param length_dataset: dataset for input and output length
@@ -24,44 +26,94 @@ class TraceGenerator:
         self.length_dataset: Dataset = length_dataset
         self.cluster_token_throughput: float = cluster_token_throughput
         self.seed: int = seed
-        random.seed(seed)
+        arrival_rate_seed, arrive_time_seed, length_seed = np.random.SeedSequence(seed).spawn(3)
+        self.rng: np.random.Generator = np.random.default_rng(arrive_time_seed)
 
         # initialize samplers
-        self.length_sampler = LengthSampler(dataset=length_dataset, seed=seed)
+        self.length_sampler = LengthSampler(dataset=length_dataset, seed=length_seed)
         avg_token_length: float = self.length_sampler.get_average_length()
         ideal_request_throughput: float = cluster_token_throughput / avg_token_length
         self.arrival_rate_sampler = ArrivalRateSampler(arrival_rate_source=arrival_rate_source,
                                                        target_avg_request_throughput=ideal_request_throughput,
-                                                       seed=seed)
+                                                       seed=arrival_rate_seed)
 
-    def generate_trace(self, start_time: float, duration: int) -> List[Tuple[float, int, int]]:
+    def generate_trace_chunks(self, start_time: float, duration: float or None,
+                              chunk_duration: int = 3600) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Lazily generate a trace in chunks of chunk_duration seconds. Each chunk is generated with a few
+        vectorized draws, and the trace does not depend on chunk_duration.
+        Note: 1. arrivals in each 3s interval: the sampled arrival rate is rounded with the rounding error
+                 carried to the next interval (i.e. the number of arrivals up to an interval is the rounded
+                 sum of arrival rates up to that interval)
+              2. arrive times are uniform in each interval
+              3. if duration is not a multiple of 3, the last interval is truncated, and its arrival rate is
+                 scaled by the fraction kept
+
+        :param start_time: start time (s)
+        :param duration: duration (s) (None means an endless trace)
+        :param chunk_duration: duration of each chunk (s), must be a multiple of 3
+        :return: an iterator of (arrive times, input lengths, output lengths) of each chunk
+        """
+        assert duration is None or duration > 0, "Duration must be positive!"
+        assert chunk_duration > 0 and chunk_duration % 3 == 0, "Chunk duration must be a multiple of 3!"
+
+        total_intervals: int or None = None if duration is None else int(np.ceil(duration / 3))
+        last_interval_fraction: float = 1 if duration is None else duration / 3 - (total_intervals - 1)
+        interval_offset: int = 0
+        total_arrival_rate: float = 0
+        total_arrivals: int = 0
+        while total_intervals is None or interval_offset < total_intervals:
+            num_intervals: int = chunk_duration // 3
+            if total_intervals is not None:
+                num_intervals = min(num_intervals, total_intervals - interval_offset)
+
+            # Step 1: number of arrivals in each interval
+            interval_fractions = np.ones(num_intervals)
+            if total_intervals is not None and interval_offset + num_intervals == total_intervals:
+                interval_fractions[-1] = last_interval_fraction
+            cumulative_arrival_rate = total_arrival_rate + np.cumsum(
+                interval_fractions * self.arrival_rate_sampler.sample_arrival_rates(num_samples=num_intervals)
+            )
+            cumulative_arrivals = np.rint(cumulative_arrival_rate).astype(np.int64)
+            arrivals_per_interval = np.diff(cumulative_arrivals, prepend=total_arrivals)
+            total_arrival_rate = float(cumulative_arrival_rate[-1])
+            total_arrivals = int(cumulative_arrivals[-1])
+
+            # Step 2: arrive times (intervals do not overlap, so sorting the chunk sorts each interval)
+            interval_indices = np.repeat(np.arange(interval_offset, interval_offset + num_intervals),
+                                         arrivals_per_interval)
+            arrive_fractions = np.repeat(interval_fractions, arrivals_per_interval)
+            arrive_times = np.sort(start_time + 3 * (interval_indices + arrive_fractions *
+                                                     self.rng.random(len(interval_indices))))
+
+            # Step 3: lengths
+            input_lengths, output_lengths = self.length_sampler.sample_lengths(num_samples=len(arrive_times))
+            interval_offset += num_intervals
+            yield arrive_times, input_lengths, output_lengths
+
+    def iter_trace(self, start_time: float, duration: float or None,
+                   chunk_duration: int = 3600) -> Iterator[Tuple[float, int, int]]:
+        """
+        Lazily generate a trace entry by entry (see generate_trace_chunks).
+
+        :param start_time: start time (s)
+        :param duration: duration (s) (None means an endless trace)
+        :param chunk_duration: duration of each chunk (s), must be a multiple of 3
+        :return: an iterator of (query arrive time, input length, output length)
+        """
+        for arrive_times, input_lengths, output_lengths in self.generate_trace_chunks(
+                start_time=start_time, duration=duration, chunk_duration=chunk_duration):
+            yield from zip(arrive_times.tolist(), input_lengths.tolist(), output_lengths.tolist())
+
+    def generate_trace(self, start_time: float, duration: float) -> List[Tuple[float, int, int]]:
         """
         Generate a trace.
 
         :param start_time: start time (s)
-        :param duration: duration (s), must be a multiple of 3
+        :param duration: duration (s)
         :return: query arrive time, input length, output length
         """
-        assert duration % 3 == 0, "Duration must be a multiple of 3!"
-
-        # generate trace
-        trace: List[Tuple[float, int, int]] = []
-        prev_interval_diff = 0
-        for interval_idx in range(duration // 3):
-            # sample arrival rate and arrive time
-            raw_arrival_rate = self.arrival_rate_sampler.sample_arrival_rate()
-            arrival_rate: int = round(raw_arrival_rate + prev_interval_diff)
-            prev_interval_diff = raw_arrival_rate + prev_interval_diff - arrival_rate
-            assert -1 < prev_interval_diff < 1, "Diff too large!"
-
-            # get arrive time
-            arrive_time_list: List[float] = [start_time + interval_idx * 3 + 3 * random.random() for _ in
-                                             range(arrival_rate)]
-            arrive_time_list.sort()
-
-            for _, arrive_time in zip(range(arrival_rate), arrive_time_list):
-                input_length, output_length = self.length_sampler.sample_length()
-                trace.append((arrive_time, input_length, output_length))
+        trace: List[Tuple[float, int, int]] = list(self.iter_trace(start_time=start_time, duration=duration))
 
         # check and return
         assert not len(trace) == 0, "Empty trace!"
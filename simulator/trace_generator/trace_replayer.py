@@ -0,0 +1,247 @@
+# 2026.10.19 Yixuan Mei
+
+import os
+import math
+import csv
+import json
+import numpy as np
+
+from enum import Enum
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Tuple
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class TraceFormat(Enum):
+    # one json object per line
+    JSONL = "TraceFormat.JSONL"
+    # csv with a header line
+    CSV = "TraceFormat.CSV"
+    # parquet (requires pyarrow)
+    Parquet = "TraceFormat.Parquet"
+
+
+def get_trace_format(trace_file_path: str) -> TraceFormat:
+    """
+    Infer the format of a request log from its extension.
+
+    :param trace_file_path: path to the request log
+    :return: format of the request log
+    """
+    extension: str = os.path.splitext(trace_file_path)[1].lower()
+    if extension in [".jsonl", ".json", ".ndjson"]:
+        return TraceFormat.JSONL
+    elif extension in [".csv"]:
+        return TraceFormat.CSV
+    elif extension in [".parquet", ".pq"]:
+        return TraceFormat.Parquet
+    else:
+        assert False, f"Unknown trace file extension {extension}!"
+
+
+def parse_timestamp(value: Any) -> float:
+    """
+    Parse a timestamp in a request log into seconds.
+    Note: timestamps can be numbers (seconds), datetime objects or ISO 8601 strings. Datetimes without time
+          zone are treated as UTC.
+
+    :param value: the timestamp
+    :return: timestamp in seconds
+    """
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+def parse_length(value: Any) -> int or None:
+    """
+    Parse a sequence length in a request log.
+    Note: 1. lengths can be integers, or floats with an integral value (e.g. "12.0", as written by pandas when a
+             column has missing values)
+          2. missing lengths (None, empty string or NaN) return None
+
+    :param value: the length
+    :return: the length as an integer, or None if the length is missing
+    """
+    if value is None or (isinstance(value, str) and value.strip() == ""):
+        return None
+    length: float = float(value)
+    if math.isnan(length):
+        return None
+    assert length.is_integer() and length >= 0, f"Bad sequence length {value} in trace file!"
+    return int(length)
+
+
+class TraceReplayer:
+    def __init__(self, trace_file_path: str, window_start: float = 0, window_end: float or None = None,
+                 rate_scale: float = 1, speed_up: float = 1, seed: int = 0,
+                 timestamp_column: str = "timestamp", input_length_column: str = "input_len",
+                 output_length_column: str = "output_len", tenant_column: str = "tenant",
+                 batch_size: int = 65536) -> None:
+        """
+        Replay a request log (JSONL / CSV / Parquet) as a trace. The log is read in a streaming fashion, so
+        only the records that are being replayed are kept in memory.
+        Note: 1. the log must be sorted by timestamp
+              2. window_start and window_end are in seconds after the first record of the log, records outside
+                 [window_start, window_end) are skipped, and reading stops at window_end
+              3. the replayed arrive time of a record is start_time + (offset in window) / speed_up, i.e. a
+                 speed_up of 60 replays an hour of traffic in a minute (and 60x the arrival rate)
+              4. rate_scale changes the arrival rate without changing time: each record is replayed
+                 floor(rate_scale) times, plus once more with probability rate_scale - floor(rate_scale)
+              5. records with missing input or output length, or length < 1, are skipped
+
+        :param trace_file_path: path to the request log, format is inferred from the extension
+        :param window_start: start of the replayed window (s, after the first record)
+        :param window_end: end of the replayed window (s, after the first record, None means end of log)
+        :param rate_scale: arrival rate scale
+        :param speed_up: time compression factor
+        :param seed: random seed (used when rate_scale is not an integer)
+        :param timestamp_column: column of arrival timestamp
+        :param input_length_column: column of input length
+        :param output_length_column: column of output length
+        :param tenant_column: column of tenant (optional in the log)
+        :param batch_size: number of rows read at a time (Parquet only)
+        :return: None
+        """
+        assert os.path.exists(trace_file_path), f"Trace file {trace_file_path} does not exist!"
+        assert window_start >= 0, "Window start must be non-negative!"
+        assert window_end is None or window_end > window_start, "Window end must be larger than window start!"
+        assert rate_scale > 0, "Rate scale must be positive!"
+        assert speed_up > 0, "Speed up must be positive!"
+
+        # save parameters
+        self.trace_file_path: str = trace_file_path
+        self.trace_format: TraceFormat = get_trace_format(trace_file_path=trace_file_path)
+        self.window_start: float = window_start
+        self.window_end: float or None = window_end
+        self.rate_scale: float = rate_scale
+        self.speed_up: float = speed_up
+        self.seed: int = seed
+        self.timestamp_column: str = timestamp_column
+        self.input_length_column: str = input_length_column
+        self.output_length_column: str = output_length_column
+        self.tenant_column: str = tenant_column
+        self.batch_size: int = batch_size
+
+        # statistics of the last replay
+        self.num_records_read: int = 0
+        self.num_records_skipped: int = 0
+        self.num_arrivals: int = 0
+
+    def _read_rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the rows of the request log.
+
+        :return: an iterator of rows (column -> value)
+        """
+        if self.trace_format == TraceFormat.JSONL:
+            with open(self.trace_file_path, "r") as file:
+                for line in file:
+                    if not line.strip() == "":
+                        yield json.loads(line)
+
+        elif self.trace_format == TraceFormat.CSV:
+            with open(self.trace_file_path, "r", newline="") as file:
+                yield from csv.DictReader(file)
+
+        elif self.trace_format == TraceFormat.Parquet:
+            assert pq is not None, "Replaying Parquet traces requires pyarrow!"
+            parquet_file = pq.ParquetFile(self.trace_file_path)
+            columns: List[str] = [self.timestamp_column, self.input_length_column, self.output_length_column]
+            if self.tenant_column in parquet_file.schema_arrow.names:
+                columns.append(self.tenant_column)
+            for batch in parquet_file.iter_batches(batch_size=self.batch_size, columns=columns):
+                batch_dict: Dict[str, List[Any]] = batch.to_pydict()
+                for row_idx in range(batch.num_rows):
+                    yield {column: batch_dict[column][row_idx] for column in columns}
+
+        else:
+            assert False, "Found unknown trace format!"
+
+    def iter_records(self, start_time: float, duration: float or None) -> Iterator[Tuple[float, int, int, str]]:
+        """
+        Lazily replay the request log record by record.
+
+        :param start_time: start time of the replayed trace (s)
+        :param duration: duration of the replayed trace (s, after speed up, None means the whole window)
+        :return: an iterator of (query arrive time, input length, output length, tenant (None if not logged))
+        """
+        rng: np.random.Generator = np.random.default_rng(self.seed)
+        integer_scale: int = int(np.floor(self.rate_scale))
+        fractional_scale: float = self.rate_scale - integer_scale
+        self.num_records_read, self.num_records_skipped, self.num_arrivals = 0, 0, 0
+
+        first_timestamp: float or None = None
+        last_timestamp: float = -float("inf")
+        for row in self._read_rows():
+            self.num_records_read += 1
+
+            # Step 1: select the window
+            timestamp: float = parse_timestamp(value=row[self.timestamp_column])
+            assert timestamp >= last_timestamp, "Trace file must be sorted by timestamp!"
+            last_timestamp = timestamp
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            offset: float = timestamp - first_timestamp
+            if offset < self.window_start:
+                self.num_records_skipped += 1
+                continue
+            if self.window_end is not None and offset >= self.window_end:
+                break
+            arrive_time: float = start_time + (offset - self.window_start) / self.speed_up
+            if duration is not None and arrive_time >= start_time + duration:
+                break
+
+            # Step 2: parse and check the record
+            input_length: int or None = parse_length(value=row.get(self.input_length_column, None))
+            output_length: int or None = parse_length(value=row.get(self.output_length_column, None))
+            tenant: str or None = row.get(self.tenant_column, None)
+            tenant = None if tenant is None or tenant == "" else str(tenant)
+            if input_length is None or output_length is None or input_length < 1 or output_length < 1:
+                self.num_records_skipped += 1
+                continue
+
+            # Step 3: scale the arrival rate
+            num_copies: int = integer_scale
+            if fractional_scale > 0 and rng.random() < fractional_scale:
+                num_copies += 1
+            for _ in range(num_copies):
+                self.num_arrivals += 1
+                yield arrive_time, input_length, output_length, tenant
+
+    def iter_trace(self, start_time: float, duration: float or None) -> Iterator[Tuple[float, int, int]]:
+        """
+        Lazily replay the request log entry by entry (see iter_records).
+
+        :param start_time: start time of the replayed trace (s)
+        :param duration: duration of the replayed trace (s, after speed up, None means the whole window)
+        :return: an iterator of (query arrive time, input length, output length)
+        """
+        for arrive_time, input_length, output_length, _ in self.iter_records(start_time=start_time,
+                                                                             duration=duration):
+            yield arrive_time, input_length, output_length
+
+    def generate_trace(self, start_time: float, duration: float or None) -> List[Tuple[float, int, int]]:
+        """
+        Replay the request log as a trace.
+
+        :param start_time: start time of the replayed trace (s)
+        :param duration: duration of the replayed trace (s, after speed up, None means the whole window)
+        :return: query arrive time, input length, output length
+        """
+        trace: List[Tuple[float, int, int]] = list(self.iter_trace(start_time=start_time, duration=duration))
+
+        # check and return
+        assert not len(trace) == 0, "Empty trace!"
+        return trace
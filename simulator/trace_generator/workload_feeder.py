@@ -0,0 +1,375 @@
+# 2026.10.19 Yixuan Mei
+
+import heapq
+import numpy as np
+
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from simulator.event_simulator.cluster_simulator import ClusterSimulator
+from simulator.event_simulator.query_manager import QueryManager
+from simulator.scheduler.global_maxflow.global_maxflow_scheduler import GlobalFlowScheduler, SchedulingMode
+from simulator.trace_generator.length_sampler import LengthSampler, MixtureLengthSampler
+
+
+class ClientModel:
+    def __init__(self, name: str, max_concurrency: int or None) -> None:
+        """
+        Base class of client models. A client sends queries into the cluster, and at most max_concurrency of
+        its queries can be in the cluster at the same time (the others wait at the client in arrival order).
+        Note: arrivals are (arrive time, input length, output length). Subclasses override:
+              1. get_initial_arrivals: arrivals known when the feeder starts
+              2. get_arrivals: open-loop arrivals in a time window
+              3. get_arrivals_after_finish: arrivals triggered by a finished query (closed-loop)
+
+        :param name: name of the client (e.g. tenant)
+        :param max_concurrency: max number of queries of this client in the cluster (None means no limit)
+        :return: None
+        """
+        assert max_concurrency is None or max_concurrency > 0, "Max concurrency must be positive!"
+        self.name: str = name
+        self.max_concurrency: int or None = max_concurrency
+
+        # status (maintained by the workload feeder)
+        self.num_active_queries: int = 0
+        self.waiting_queries: Deque[Tuple[float, int, int]] = deque()
+
+        # statistics
+        self.num_issued_queries: int = 0
+        self.num_finished_queries: int = 0
+        self.total_waiting_time: float = 0
+
+    def get_initial_arrivals(self, start_time: float) -> List[Tuple[float, int, int]]:
+        """
+        Get the arrivals known when the feeder starts.
+
+        :param start_time: start time of the feeder
+        :return: a list of (arrive time, input length, output length)
+        """
+        return []
+
+    def get_arrivals(self, start_time: float, end_time: float) -> List[Tuple[float, int, int]]:
+        """
+        Get the open-loop arrivals in [start_time, end_time). Windows are consecutive and non-overlapping.
+
+        :param start_time: start of the window
+        :param end_time: end of the window
+        :return: a list of (arrive time, input length, output length)
+        """
+        return []
+
+    def get_arrivals_after_finish(self, finish_time: float) -> List[Tuple[float, int, int]]:
+        """
+        Get the arrivals triggered by a finished query of this client.
+
+        :param finish_time: when the query finishes
+        :return: a list of (arrive time, input length, output length)
+        """
+        return []
+
+
+class PoissonClient(ClientModel):
+    def __init__(self, name: str, request_rate: float, length_sampler: LengthSampler or MixtureLengthSampler,
+                 seed: int or np.random.SeedSequence, max_concurrency: int or None = None) -> None:
+        """
+        Open-loop client whose queries arrive as a Poisson process.
+
+        :param name: name of the client
+        :param request_rate: average number of queries per second
+        :param length_sampler: sampler of input and output length
+        :param seed: random seed of arrive times
+        :param max_concurrency: max number of queries of this client in the cluster (None means no limit)
+        :return: None
+        """
+        super().__init__(name=name, max_concurrency=max_concurrency)
+        assert request_rate > 0, "Request rate must be positive!"
+        self.request_rate: float = request_rate
+        self.length_sampler: LengthSampler or MixtureLengthSampler = length_sampler
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+
+    def get_arrivals(self, start_time: float, end_time: float) -> List[Tuple[float, int, int]]:
+        """
+        Get the open-loop arrivals in [start_time, end_time).
+
+        :param start_time: start of the window
+        :param end_time: end of the window
+        :return: a list of (arrive time, input length, output length)
+        """
+        num_arrivals: int = int(self.rng.poisson(self.request_rate * (end_time - start_time)))
+        arrive_times = np.sort(start_time + (end_time - start_time) * self.rng.random(num_arrivals))
+        input_lengths, output_lengths = self.length_sampler.sample_lengths(num_samples=num_arrivals)
+        return list(zip(arrive_times.tolist(), input_lengths.tolist(), output_lengths.tolist()))
+
+
+class TraceClient(ClientModel):
+    def __init__(self, name: str, trace: Iterator[Tuple[float, int, int]],
+                 max_concurrency: int or None = None) -> None:
+        """
+        Open-loop client that replays a trace, e.g. TraceGenerator.iter_trace or TraceReplayer.iter_trace.
+        The trace is consumed lazily, one feed interval at a time.
+
+        :param name: name of the client
+        :param trace: an iterator of (arrive time, input length, output length), sorted by arrive time
+        :param max_concurrency: max number of queries of this client in the cluster (None means no limit)
+        :return: None
+        """
+        super().__init__(name=name, max_concurrency=max_concurrency)
+        self.trace: Iterator[Tuple[float, int, int]] = trace
+        self.next_arrival: Tuple[float, int, int] or None = next(trace, None)
+
+    def get_arrivals(self, start_time: float, end_time: float) -> List[Tuple[float, int, int]]:
+        """
+        Get the open-loop arrivals in [start_time, end_time).
+        Note: arrivals before the first window are sent at the start of the first window.
+
+        :param start_time: start of the window
+        :param end_time: end of the window
+        :return: a list of (arrive time, input length, output length)
+        """
+        arrivals: List[Tuple[float, int, int]] = []
+        while self.next_arrival is not None and self.next_arrival[0] < end_time:
+            arrive_time, input_length, output_length = self.next_arrival
+            arrivals.append((max(arrive_time, start_time), input_length, output_length))
+            self.next_arrival = next(self.trace, None)
+        return arrivals
+
+
+class ClosedLoopClient(ClientModel):
+    def __init__(self, name: str, num_users: int, think_time: float,
+                 length_sampler: LengthSampler or MixtureLengthSampler, seed: int or np.random.SeedSequence,
+                 max_concurrency: int or None = None) -> None:
+        """
+        Closed-loop client with num_users users. Each user sends a query, waits for it to finish, thinks for an
+        exponentially distributed time and then sends the next query.
+        Note: users start after an initial think time, so that they do not arrive at the same time.
+
+        :param name: name of the client
+        :param num_users: number of users
+        :param think_time: average think time (s)
+        :param length_sampler: sampler of input and output length
+        :param seed: random seed of think times
+        :param max_concurrency: max number of queries of this client in the cluster (None means no limit)
+        :return: None
+        """
+        super().__init__(name=name, max_concurrency=max_concurrency)
+        assert num_users > 0, "Number of users must be positive!"
+        assert think_time >= 0, "Think time must be non-negative!"
+        self.num_users: int = num_users
+        self.think_time: float = think_time
+        self.length_sampler: LengthSampler or MixtureLengthSampler = length_sampler
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+
+    def get_initial_arrivals(self, start_time: float) -> List[Tuple[float, int, int]]:
+        """
+        Get the first query of each user.
+
+        :param start_time: start time of the feeder
+        :return: a list of (arrive time, input length, output length)
+        """
+        arrive_times = start_time + self.rng.exponential(self.think_time, size=self.num_users)
+        input_lengths, output_lengths = self.length_sampler.sample_lengths(num_samples=self.num_users)
+        return list(zip(arrive_times.tolist(), input_lengths.tolist(), output_lengths.tolist()))
+
+    def get_arrivals_after_finish(self, finish_time: float) -> List[Tuple[float, int, int]]:
+        """
+        The user whose query finished sends the next query after thinking.
+
+        :param finish_time: when the query finishes
+        :return: a list of (arrive time, input length, output length)
+        """
+        input_length, output_length = self.length_sampler.sample_length()
+        return [(finish_time + float(self.rng.exponential(self.think_time)), input_length, output_length)]
+
+
+class WorkloadFeeder:
+    def __init__(self, clients: List[ClientModel], start_time: float, duration: float,
+                 feed_interval: float = 10) -> None:
+        """
+        Feed the queries of a set of clients into the simulator. The feeder is driven by the simulator's event
+        queue: it issues queries in CommandFeedQueries events (scheduled at arrive times) and in query finish
+        callbacks, so the whole workload is simulated with a single call to simulator.simulate.
+        Note: 1. open-loop arrivals are generated one feed interval at a time
+              2. arrivals at or after start_time + duration are dropped, queries already waiting at their
+                 clients are still sent
+              3. queries are sent with creation time = when they leave the client, the time they wait at the
+                 client (because of max_concurrency) is recorded in the client's statistics
+
+        :param clients: clients that send queries
+        :param start_time: start time of the workload
+        :param duration: duration of the workload
+        :param feed_interval: length of the window in which open-loop arrivals are generated
+        :return: None
+        """
+        assert len(clients) > 0, "Workload feeder needs at least one client!"
+        assert duration > 0 and feed_interval > 0, "Duration and feed interval must be positive!"
+
+        # save parameters
+        self.clients: List[ClientModel] = clients
+        self.start_time: float = start_time
+        self.duration: float = duration
+        self.end_time: float = start_time + duration
+        self.feed_interval: float = feed_interval
+
+        # pending arrivals: (arrive time, arrival idx, client idx, input length, output length)
+        self.pending_arrivals: List[Tuple[float, int, int, int, int]] = []
+        self.next_arrival_idx: int = 0
+        self.next_window_start: float = start_time
+        self.scheduled_feed_times: Set[float] = set()
+
+        # query uid -> client idx
+        self.query_uid_to_client: Dict[int, int] = {}
+
+        # simulator
+        self.simulator: Optional[ClusterSimulator] = None
+
+    def start(self, simulator: ClusterSimulator) -> None:
+        """
+        Register the feeder into the simulator and schedule the first feed. After this, the caller may drive the
+        simulation itself.
+
+        :param simulator: the cluster simulator, it should be fully initialized
+        :return: None
+        """
+        scheduler = simulator.scheduler
+        assert not isinstance(scheduler, GlobalFlowScheduler) or scheduler.scheduling_mode == SchedulingMode.Online, \
+            "Workload feeder requires online scheduling (queries can not be rejected)!"
+        simulator.register_workload_feeder(workload_feeder=self)
+        self.simulator = simulator
+
+        for client_idx, client in enumerate(self.clients):
+            for arrival in client.get_initial_arrivals(start_time=self.start_time):
+                self._add_arrival(client_idx=client_idx, arrival=arrival)
+        self._schedule_feed(feed_time=self.start_time)
+
+    def auto_simulate(self, simulator: ClusterSimulator, watch_items: Optional[List[str]] = None,
+                      watch_interval: Optional[float] = None) -> None:
+        """
+        Run simulation.
+
+        :param simulator: the cluster simulator, it should be fully initialized
+        :param watch_items: items to watch during simulation
+        :param watch_interval: watch interval
+        :return: None
+        """
+        self.start(simulator=simulator)
+        simulator.simulate(watch_items=watch_items, watch_interval=watch_interval)
+
+        query_manager: QueryManager = simulator.query_manager
+        assert len(query_manager.queries_on_the_fly) == 0, "Found unfinished queries!"
+        assert len(query_manager.finished_queries) == sum(client.num_issued_queries for client in self.clients), \
+            "Some queries missing!"
+
+    def feed(self, current_time: float) -> None:
+        """
+        Handle a CommandFeedQueries event: generate the open-loop arrivals of the next window and send the
+        queries that have arrived.
+
+        :param current_time: current time
+        :return: None
+        """
+        self.scheduled_feed_times.discard(current_time)
+
+        # Step 1: generate open-loop arrivals
+        while self.next_window_start <= current_time and self.next_window_start < self.end_time:
+            window_end: float = min(self.next_window_start + self.feed_interval, self.end_time)
+            for client_idx, client in enumerate(self.clients):
+                for arrival in client.get_arrivals(start_time=self.next_window_start, end_time=window_end):
+                    self._add_arrival(client_idx=client_idx, arrival=arrival)
+            self.next_window_start = window_end
+        if self.next_window_start < self.end_time:
+            self._schedule_feed(feed_time=self.next_window_start)
+
+        # Step 2: send the queries that have arrived
+        while not len(self.pending_arrivals) == 0 and self.pending_arrivals[0][0] <= current_time:
+            arrive_time, _, client_idx, input_length, output_length = heapq.heappop(self.pending_arrivals)
+            client: ClientModel = self.clients[client_idx]
+            if client.max_concurrency is not None and client.num_active_queries >= client.max_concurrency:
+                client.waiting_queries.append((arrive_time, input_length, output_length))
+            else:
+                self._send_query(client_idx=client_idx, arrive_time=arrive_time, input_length=input_length,
+                                 output_length=output_length)
+
+    def on_query_finished(self, query_uid: int, finish_time: float) -> None:
+        """
+        Called by the simulator when a query finishes: free the slot of its client, send the next waiting query
+        of the client and add the arrivals triggered by the finish.
+
+        :param query_uid: uid of the finished query
+        :param finish_time: when the query finishes
+        :return: None
+        """
+        if query_uid not in self.query_uid_to_client:
+            return
+        client_idx: int = self.query_uid_to_client.pop(query_uid)
+        client: ClientModel = self.clients[client_idx]
+        client.num_active_queries -= 1
+        client.num_finished_queries += 1
+
+        if not len(client.waiting_queries) == 0:
+            arrive_time, input_length, output_length = client.waiting_queries.popleft()
+            self._send_query(client_idx=client_idx, arrive_time=arrive_time, input_length=input_length,
+                             output_length=output_length)
+        for arrival in client.get_arrivals_after_finish(finish_time=finish_time):
+            self._add_arrival(client_idx=client_idx, arrival=arrival)
+
+    def get_client_statistics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get statistics of each client.
+
+        :return: client name -> {num_issued_queries, num_finished_queries, avg_waiting_time}
+        """
+        client_statistics: Dict[str, Dict[str, float]] = {}
+        for client in self.clients:
+            client_statistics[client.name] = {
+                "num_issued_queries": client.num_issued_queries,
+                "num_finished_queries": client.num_finished_queries,
+                "avg_waiting_time": client.total_waiting_time / max(client.num_issued_queries, 1),
+            }
+        return client_statistics
+
+    def _add_arrival(self, client_idx: int, arrival: Tuple[float, int, int]) -> None:
+        """
+        Add an arrival of a client and schedule a feed at its arrive time.
+
+        :param client_idx: idx of the client
+        :param arrival: (arrive time, input length, output length)
+        :return: None
+        """
+        arrive_time, input_length, output_length = arrival
+        if arrive_time >= self.end_time:
+            return
+        heapq.heappush(self.pending_arrivals, (arrive_time, self.next_arrival_idx, client_idx,
+                                               int(input_length), int(output_length)))
+        self.next_arrival_idx += 1
+        self._schedule_feed(feed_time=arrive_time)
+
+    def _schedule_feed(self, feed_time: float) -> None:
+        """
+        Schedule a CommandFeedQueries event at feed_time (if there is not one already).
+
+        :param feed_time: when to feed
+        :return: None
+        """
+        if feed_time not in self.scheduled_feed_times:
+            self.scheduled_feed_times.add(feed_time)
+            self.simulator.issue_command_feed_queries(feed_time=feed_time)
+
+    def _send_query(self, client_idx: int, arrive_time: float, input_length: int, output_length: int) -> None:
+        """
+        Send a query of a client into the cluster now.
+
+        :param client_idx: idx of the client
+        :param arrive_time: when the query arrived at the client
+        :param input_length: input length
+        :param output_length: output length
+        :return: None
+        """
+        current_time: float = self.simulator.current_time
+        client: ClientModel = self.clients[client_idx]
+        query_uid: int = self.simulator.query_manager.issue_query(creation_time=current_time,
+                                                                  input_seq_length=input_length,
+                                                                  output_seq_length=output_length)
+        self.query_uid_to_client[query_uid] = client_idx
+        client.num_active_queries += 1
+        client.num_issued_queries += 1
+        client.total_waiting_time += current_time - arrive_time